@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+from json import loads as json_loads
+
+import pytest
+
+from .data import libraries
+from .util import read_fixture_obj
+
+# Arrays of objects that mostly have the same keys
+records = {
+    "github.json": lambda: read_fixture_obj("github.json.xz"),
+    "twitter.json statuses": lambda: read_fixture_obj("twitter.json.xz")["statuses"],
+    "citm_catalog.json performances": lambda: read_fixture_obj(
+        "citm_catalog.json.xz"
+    )["performances"],
+}
+
+
+@pytest.mark.parametrize("fixture", records)
+@pytest.mark.parametrize("library", libraries)
+def test_loads_records(benchmark, fixture, library):
+    dumper, loader = libraries[library]
+    benchmark.group = f"{fixture} records deserialization"
+    benchmark.extra_info["lib"] = library
+    data = libraries["json"][0](records[fixture]())
+    benchmark.extra_info["correct"] = json_loads(dumper(loader(data))) == json_loads(
+        data
+    )
+    benchmark(loader, data)
@@ -5,12 +5,33 @@ from .xorjson import __version__
 
 __all__ = (
     "__version__",
+    "clear_key_cache",
+    "configure_key_cache",
+    "Decoder",
+    "dump",
     "dumps",
+    "dumps_into",
+    "dumps_iter",
+    "dumps_lines",
+    "Encoder",
     "Fragment",
+    "inspect",
+    "items",
+    "iterparse",
+    "key_cache_info",
     "JSONDecodeError",
     "JSONEncodeError",
+    "load_path",
     "loads",
+    "loads_lazy",
+    "loads_lines",
+    "loads_many",
+    "loads_prefix",
+    "reformat",
+    "validate",
     "OPT_APPEND_NEWLINE",
+    "OPT_CACHE_STRINGS",
+    "OPT_DESERIALIZE_NUMPY",
     "OPT_INDENT_2",
     "OPT_NAIVE_UTC",
     "OPT_NON_STR_KEYS",
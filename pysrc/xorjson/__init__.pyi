@@ -1,22 +1,128 @@
 import json
-from typing import Any, Callable, Optional, Union
+import os
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 __version__: str
 
+def dump(
+    __obj: Any,
+    __fp: Any,
+    default: Optional[Callable[[Any], Any]] = ...,
+    option: Optional[int] = ...,
+    chunk_size: int = ...,
+) -> None: ...
 def dumps(
     __obj: Any,
     default: Optional[Callable[[Any], Any]] = ...,
     option: Optional[int] = ...,
+    *,
+    size_hint: Optional[int] = ...,
+) -> bytes: ...
+def dumps_into(
+    __obj: Any,
+    __buffer: Any,
+    offset: int = ...,
+    default: Optional[Callable[[Any], Any]] = ...,
+    option: Optional[int] = ...,
+) -> int: ...
+def dumps_iter(
+    __obj: Any,
+    default: Optional[Callable[[Any], Any]] = ...,
+    option: Optional[int] = ...,
+    chunk_size: int = ...,
+) -> Iterator[bytes]: ...
+def dumps_lines(
+    __iterable: Iterable[Any],
+    default: Optional[Callable[[Any], Any]] = ...,
+    option: Optional[int] = ...,
+) -> bytes: ...
+def inspect(__obj: Union[bytes, bytearray, memoryview, str]) -> Dict[str, int]: ...
+def items(
+    __source: Union[bytes, bytearray, memoryview, str, IO[bytes], IO[str]],
+    __prefix: str,
+    chunk_size: Optional[int] = ...,
+) -> Iterator[Any]: ...
+def iterparse(
+    __source: Union[bytes, bytearray, memoryview, str, IO[bytes], IO[str]],
+    chunk_size: Optional[int] = ...,
+) -> Iterator[Tuple[str, Any]]: ...
+def load_path(__path: Union[str, bytes, os.PathLike]) -> Any: ...
+def loads(
+    __obj: Union[bytes, bytearray, memoryview, str],
+    paths: Optional[Iterable[str]] = ...,
+    option: Optional[int] = ...,
+    columns: Union[bool, str, None] = ...,
+    type: Optional[Any] = ...,
+) -> Any: ...
+def loads_lazy(
+    __obj: Union[bytes, bytearray, memoryview, str],
+) -> Union[LazyDocument, str, int, float, bool, None]: ...
+def loads_lines(
+    __obj: Union[bytes, bytearray, memoryview, str, IO[bytes], IO[str]],
+) -> List[Any]: ...
+def loads_many(
+    __buffers: Iterable[Union[bytes, bytearray, memoryview, str]],
+    threads: Optional[int] = ...,
+    return_exceptions: bool = ...,
+) -> List[Any]: ...
+def loads_prefix(
+    __obj: Union[bytes, bytearray, memoryview, str],
+    offset: Optional[int] = ...,
+) -> Tuple[Any, int]: ...
+def reformat(
+    __obj: Union[bytes, bytearray, memoryview, str],
+    option: Optional[int] = ...,
 ) -> bytes: ...
-def loads(__obj: Union[bytes, bytearray, memoryview, str]) -> Any: ...
+
+def validate(__obj: Union[bytes, bytearray, memoryview, str]) -> None: ...
+def configure_key_cache(
+    capacity: Optional[int] = ...,
+    max_key_len: Optional[int] = ...,
+) -> None: ...
+def key_cache_info() -> Dict[str, int]: ...
+def clear_key_cache() -> None: ...
 
 class JSONDecodeError(json.JSONDecodeError): ...
 class JSONEncodeError(TypeError): ...
 
+class Decoder:
+    def feed(self, __chunk: Union[bytes, bytearray, memoryview, str]) -> List[Any]: ...
+    def close(self) -> List[Any]: ...
+
+class Encoder:
+    size_hint: int
+    def __init__(
+        self,
+        default: Optional[Callable[[Any], Any]] = ...,
+        option: Optional[int] = ...,
+    ) -> None: ...
+    def encode(self, __obj: Any) -> bytes: ...
+
 class Fragment(tuple):
     contents: Union[bytes, str]
 
+class LazyDocument:
+    def __getitem__(self, __key: Union[str, int]) -> Any: ...
+    def __iter__(self) -> Iterator[Any]: ...
+    def __len__(self) -> int: ...
+    def get(self, key: str, default: Any = ...) -> Any: ...
+    def keys(self) -> List[str]: ...
+    def materialize(self) -> Any: ...
+
 OPT_APPEND_NEWLINE: int
+OPT_CACHE_STRINGS: int
+OPT_DESERIALIZE_NUMPY: int
 OPT_INDENT_2: int
 OPT_NAIVE_UTC: int
 OPT_NON_STR_KEYS: int
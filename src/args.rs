@@ -0,0 +1,113 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::opt::Opt;
+use crate::str::unicode_to_str;
+use crate::typeref::{INT_TYPE, NONE};
+use core::ptr::NonNull;
+use pyo3_ffi::{PyObject, Py_ssize_t};
+
+/// Match vectorcall arguments against the parameters `names`, writing each
+/// argument to the matching index of `out`. Positional arguments fill
+/// parameters in order and keyword arguments are matched by name. The first
+/// `required` parameters must be given. An argument of `None` is treated as
+/// not given.
+pub fn parse_args(
+    fname: &str,
+    names: &[&str],
+    required: usize,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+    out: &mut [Option<NonNull<PyObject>>],
+) -> Result<(), String> {
+    debug_assert!(names.len() == out.len());
+    let num_args = ffi!(PyVectorcall_NARGS(nargs as usize)) as usize;
+    if unlikely!(num_args > names.len()) {
+        return Err(format!(
+            "{}() takes at most {} arguments ({} given)",
+            fname,
+            names.len(),
+            num_args
+        ));
+    }
+    for (idx, slot) in out.iter_mut().enumerate().take(num_args) {
+        *slot = Some(nonnull!(*args.add(idx)));
+    }
+    if unlikely!(!kwnames.is_null()) {
+        for i in 0..ffi!(Py_SIZE(kwnames)) as usize {
+            let arg = ffi!(PyTuple_GET_ITEM(kwnames, i as Py_ssize_t));
+            let kwname = unicode_to_str(arg).unwrap_or("");
+            match names.iter().position(|&name| name == kwname) {
+                Some(idx) => {
+                    if unlikely!(idx < num_args) {
+                        return Err(format!(
+                            "{}() got multiple values for argument: '{}'",
+                            fname, names[idx]
+                        ));
+                    }
+                    out[idx] = Some(nonnull!(*args.add(num_args + i)));
+                }
+                None => {
+                    return Err(format!(
+                        "{}() got an unexpected keyword argument: '{}'",
+                        fname, kwname
+                    ));
+                }
+            }
+        }
+    }
+    for slot in out.iter_mut() {
+        if let Some(val) = slot {
+            if unsafe { val.as_ptr() == NONE } {
+                *slot = None;
+            }
+        }
+    }
+    for (idx, slot) in out.iter().enumerate().take(required) {
+        if unlikely!(slot.is_none()) {
+            return Err(format!(
+                "{}() missing required argument: '{}'",
+                fname, names[idx]
+            ));
+        }
+    }
+    Ok(())
+}
+
+/// Return the value of an `option` argument if it is absent or an int in
+/// `0..=max`.
+pub fn parse_option(ptr: Option<NonNull<PyObject>>, max: i32) -> Option<Opt> {
+    match ptr {
+        None => Some(0),
+        Some(opts) => {
+            if unlikely!(ob_type!(opts.as_ptr()) != unsafe { INT_TYPE }) {
+                return None;
+            }
+            let val = ffi!(PyLong_AsLong(opts.as_ptr())) as i32;
+            if unlikely!(!(0..=max).contains(&val)) {
+                None
+            } else {
+                Some(val as Opt)
+            }
+        }
+    }
+}
+
+/// Return the value of a non-negative int argument, or `default` if absent.
+pub fn parse_usize(ptr: Option<NonNull<PyObject>>, default: usize) -> Option<usize> {
+    match ptr {
+        None => Some(default),
+        Some(val) => {
+            if unlikely!(ob_type!(val.as_ptr()) != unsafe { INT_TYPE }) {
+                return None;
+            }
+            let val = ffi!(PyLong_AsSsize_t(val.as_ptr()));
+            if unlikely!(val < 0) {
+                ffi!(PyErr_Clear());
+                None
+            } else {
+                Some(val as usize)
+            }
+        }
+    }
+}
@@ -0,0 +1,147 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::numpy::{array_to_ndarray, values_to_ndarray};
+use crate::deserialize::pyobject::{get_unicode_key, get_unicode_value};
+use crate::deserialize::yyjson::*;
+use crate::deserialize::DeserializeError;
+use crate::ffi::yyjson::yyjson_val;
+use crate::opt::{Opt, CACHE_STRINGS, DESERIALIZE_NUMPY};
+use crate::typeref::{load_numpy_types, NumpyTypes};
+use core::ptr::{null_mut, NonNull};
+use std::borrow::Cow;
+
+/// Converts yyjson values to Python objects according to `loads()` options
+/// that change the result. Without such options, `val_to_pyobject()` is
+/// used instead.
+pub struct Builder {
+    numpy_types: Option<&'static NumpyTypes>,
+    cache_strings: bool,
+}
+
+impl Builder {
+    /// Return a builder for `opts`, or an error if an option cannot be
+    /// used, such as `OPT_DESERIALIZE_NUMPY` without numpy installed.
+    #[cold]
+    pub fn new(opts: Opt) -> Result<Self, DeserializeError<'static>> {
+        let mut numpy_types = None;
+        if opt_enabled!(opts, DESERIALIZE_NUMPY) {
+            match unsafe {
+                crate::module::state()
+                    .numpy_types
+                    .get_or_init(load_numpy_types)
+            } {
+                Some(val) => numpy_types = Some(unsafe { val.as_ref() }),
+                None => {
+                    return Err(DeserializeError::invalid(Cow::Borrowed(
+                        "OPT_DESERIALIZE_NUMPY requires numpy to be installed",
+                    )))
+                }
+            }
+        }
+        Ok(Builder {
+            numpy_types,
+            cache_strings: opt_enabled!(opts, CACHE_STRINGS),
+        })
+    }
+
+    /// Convert `val` and its children to Python objects.
+    pub fn build(
+        &mut self,
+        val: *mut yyjson_val,
+    ) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+        let obj = self.build_value(val);
+        if unlikely!(obj.is_null()) {
+            Err(DeserializeError::invalid(Cow::Borrowed(
+                "Failed to create a value while deserializing",
+            )))
+        } else {
+            Ok(nonnull!(obj))
+        }
+    }
+
+    /// Convert `values`, the values of one field across records, to a list,
+    /// or to a `numpy.ndarray` if `OPT_DESERIALIZE_NUMPY` is enabled and they
+    /// are all numbers. A null value is missing and is converted to `None`.
+    pub fn build_column(
+        &mut self,
+        values: &[*mut yyjson_val],
+    ) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+        let obj = self.build_column_value(values);
+        if unlikely!(obj.is_null()) {
+            Err(DeserializeError::invalid(Cow::Borrowed(
+                "Failed to create a value while deserializing",
+            )))
+        } else {
+            Ok(nonnull!(obj))
+        }
+    }
+
+    fn build_column_value(&mut self, values: &[*mut yyjson_val]) -> *mut pyo3_ffi::PyObject {
+        if let Some(types) = self.numpy_types {
+            if let Some(ndarray) = values_to_ndarray(types, values) {
+                return ndarray;
+            }
+        }
+        let list = ffi!(PyList_New(values.len() as isize));
+        for (idx, &val) in values.iter().enumerate() {
+            let item = if val.is_null() {
+                use_immortal!(crate::typeref::NONE)
+            } else {
+                self.build_value(val)
+            };
+            if unlikely!(item.is_null()) {
+                ffi!(Py_DECREF(list));
+                return null_mut();
+            }
+            ffi!(PyList_SET_ITEM(list, idx as isize, item));
+        }
+        list
+    }
+
+    /// Return a new reference, or null with an exception set.
+    fn build_value(&mut self, val: *mut yyjson_val) -> *mut pyo3_ffi::PyObject {
+        if !unsafe_yyjson_is_ctn(val) {
+            match ElementType::from_tag(val) {
+                ElementType::String if self.cache_strings => get_unicode_value(yyjson_get_str(val)),
+                _ => scalar_to_pyobject(val).as_ptr(),
+            }
+        } else if unsafe_yyjson_is_arr(val) {
+            if let Some(types) = self.numpy_types {
+                if let Some(ndarray) = array_to_ndarray(types, val) {
+                    return ndarray;
+                }
+            }
+            let len = unsafe_yyjson_get_len(val);
+            let list = ffi!(PyList_New(len as isize));
+            let mut next = unsafe_yyjson_get_first(val);
+            for idx in 0..len {
+                let item = self.build_value(next);
+                if unlikely!(item.is_null()) {
+                    ffi!(Py_DECREF(list));
+                    return null_mut();
+                }
+                ffi!(PyList_SET_ITEM(list, idx as isize, item));
+                next = next_sibling(next);
+            }
+            list
+        } else {
+            let len = unsafe_yyjson_get_len(val);
+            let dict = ffi!(_PyDict_NewPresized(len as isize));
+            let mut next_key = unsafe_yyjson_get_first(val);
+            for _ in 0..len {
+                let next_val = unsafe { next_key.add(1) };
+                let item = self.build_value(next_val);
+                if unlikely!(item.is_null()) {
+                    ffi!(Py_DECREF(dict));
+                    return null_mut();
+                }
+                let pykey = get_unicode_key(yyjson_get_str(next_key));
+                ffi!(PyDict_SetItem(dict, pykey, item));
+                ffi!(Py_DECREF(pykey));
+                ffi!(Py_DECREF(item));
+                next_key = next_sibling(next_val);
+            }
+            dict
+        }
+    }
+}
@@ -1,8 +1,9 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
-use associative_cache::{AssociativeCache, Capacity2048, HashDirectMapped, RoundRobinReplacement};
+use crate::ffi::PyLock;
 use core::ffi::c_void;
-use once_cell::unsync::OnceCell;
+use core::ptr::NonNull;
+use core::sync::atomic::{AtomicUsize, Ordering};
 use std::hash::Hasher;
 
 #[repr(transparent)]
@@ -33,15 +34,181 @@ impl Drop for CachedKey {
     }
 }
 
-pub type KeyMap =
-    AssociativeCache<u64, CachedKey, Capacity2048, HashDirectMapped, RoundRobinReplacement>;
+pub const DEFAULT_CAPACITY: usize = 2048;
+pub const DEFAULT_MAX_KEY_LEN: usize = 64;
 
-pub static mut KEY_MAP: OnceCell<KeyMap> = OnceCell::new();
+/// Limits of `configure_key_cache()`.
+pub const MAX_CAPACITY: usize = 1 << 20;
+pub const MAX_KEY_LEN: usize = 1024;
+
+struct Slot {
+    hash: u64,
+    key: CachedKey,
+}
+
+/// The slots of a `KeyMap`. It is direct-mapped: each hash has one slot,
+/// and a string that maps to an occupied slot evicts the string in it.
+struct Slots {
+    slots: Box<[Option<Slot>]>,
+    occupancy: usize,
+    hits: u64,
+    misses: u64,
+    evictions: u64,
+}
+
+impl Slots {
+    /// Return `capacity` empty slots, rounded up to a power of two.
+    fn new(capacity: usize) -> Self {
+        let capacity = if capacity == 0 {
+            0
+        } else {
+            capacity.next_power_of_two()
+        };
+        Slots {
+            slots: (0..capacity).map(|_| None).collect(),
+            occupancy: 0,
+            hits: 0,
+            misses: 0,
+            evictions: 0,
+        }
+    }
+
+    #[inline(always)]
+    fn get_or_insert(
+        &mut self,
+        hash: u64,
+        create: impl FnOnce() -> *mut pyo3_ffi::PyObject,
+    ) -> *mut pyo3_ffi::PyObject {
+        if unlikely!(self.slots.is_empty()) {
+            return create();
+        }
+        let idx = (hash as usize) & (self.slots.len() - 1);
+        let slot = unsafe { self.slots.get_unchecked_mut(idx) };
+        match slot {
+            Some(entry) if entry.hash == hash => {
+                self.hits += 1;
+                entry.key.get()
+            }
+            _ => {
+                self.misses += 1;
+                if slot.is_some() {
+                    self.evictions += 1;
+                } else {
+                    self.occupancy += 1;
+                }
+                let mut key = CachedKey::new(create());
+                let pyob = key.get();
+                *slot = Some(Slot {
+                    hash: hash,
+                    key: key,
+                });
+                pyob
+            }
+        }
+    }
+}
+
+/// A cache of strings by the hash of their contents, safe to use from any
+/// thread that holds a thread state.
+pub struct KeyMap {
+    slots: PyLock<Slots>,
+    max_key_len: AtomicUsize,
+}
+
+impl Default for KeyMap {
+    fn default() -> Self {
+        KeyMap::new(DEFAULT_CAPACITY, DEFAULT_MAX_KEY_LEN)
+    }
+}
+
+impl KeyMap {
+    /// Return an empty cache of `capacity` slots, rounded up to a power of
+    /// two, for strings of at most `max_key_len` bytes. A capacity of 0
+    /// caches nothing.
+    pub fn new(capacity: usize, max_key_len: usize) -> Self {
+        KeyMap {
+            slots: PyLock::new(Slots::new(capacity)),
+            max_key_len: AtomicUsize::new(max_key_len),
+        }
+    }
+
+    pub fn capacity(&self) -> usize {
+        self.slots.lock().slots.len()
+    }
+
+    pub fn max_key_len(&self) -> usize {
+        self.max_key_len.load(Ordering::Relaxed)
+    }
+
+    /// Return a new reference to the string for `key`. It is made by
+    /// `create`, which returns a new reference, unless it is cached, and is
+    /// cached if it is short enough.
+    #[inline(always)]
+    pub fn get(
+        &self,
+        key: &str,
+        create: impl FnOnce() -> *mut pyo3_ffi::PyObject,
+    ) -> *mut pyo3_ffi::PyObject {
+        if unlikely!(key.len() > self.max_key_len()) {
+            return create();
+        }
+        let hash = cache_hash(key.as_bytes());
+        self.slots.lock().get_or_insert(hash, create)
+    }
+
+    /// Replace the cache with an empty one of `capacity` slots for strings
+    /// of at most `max_key_len` bytes, and reset the counters.
+    pub fn configure(&self, capacity: usize, max_key_len: usize) {
+        let prev = core::mem::replace(&mut *self.slots.lock(), Slots::new(capacity));
+        drop(prev);
+        self.max_key_len.store(max_key_len, Ordering::Relaxed);
+    }
+
+    /// Release the cached strings. The counters are kept.
+    pub fn clear(&self) {
+        let prev = {
+            let mut slots = self.slots.lock();
+            slots.occupancy = 0;
+            let capacity = slots.slots.len();
+            core::mem::replace(&mut slots.slots, (0..capacity).map(|_| None).collect())
+        };
+        drop(prev);
+    }
+
+    /// Return a dict of the configuration and counters of the cache.
+    pub fn to_pydict(&self) -> NonNull<pyo3_ffi::PyObject> {
+        let counts = {
+            let slots = self.slots.lock();
+            [
+                slots.occupancy as u64,
+                slots.hits,
+                slots.misses,
+                slots.evictions,
+            ]
+        };
+        let dict = ffi!(PyDict_New());
+        for (key, val) in [
+            ("capacity\0", self.capacity() as u64),
+            ("max_key_len\0", self.max_key_len() as u64),
+            ("occupancy\0", counts[0]),
+            ("hits\0", counts[1]),
+            ("misses\0", counts[2]),
+            ("evictions\0", counts[3]),
+        ] {
+            let pyval = ffi!(PyLong_FromUnsignedLongLong(val));
+            ffi!(PyDict_SetItemString(
+                dict,
+                key.as_ptr() as *const core::ffi::c_char,
+                pyval
+            ));
+            ffi!(Py_DECREF(pyval));
+        }
+        nonnull!(dict)
+    }
+}
 
 #[inline(always)]
 pub fn cache_hash(key: &[u8]) -> u64 {
-    // try to omit code for >64 path in ahash
-    assume!(key.len() <= 64);
     let mut hasher = ahash::AHasher::default();
     hasher.write(key);
     hasher.finish()
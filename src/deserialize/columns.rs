@@ -0,0 +1,166 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::DeserializeError;
+use crate::opt::Opt;
+use core::ptr::NonNull;
+use pyo3_ffi::PyObject;
+use std::borrow::Cow;
+
+#[cold]
+fn not_found() -> DeserializeError<'static> {
+    DeserializeError::invalid(Cow::Borrowed(
+        "loads() columns refers to no value in the document",
+    ))
+}
+
+#[cold]
+fn not_records() -> DeserializeError<'static> {
+    DeserializeError::invalid(Cow::Borrowed(
+        "loads() columns requires an array of objects",
+    ))
+}
+
+/// Deserialize the array of objects that `tokens` refer to in the document
+/// `ptr` to a dict of each key to a list of its values, in record order.
+/// A record that does not have a key has `None` for it. The records are
+/// never created as dicts.
+#[cfg(feature = "yyjson")]
+pub fn deserialize_columns(
+    ptr: *mut PyObject,
+    tokens: &[String],
+    opts: Opt,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    use crate::deserialize::builder::Builder;
+    use crate::deserialize::deserializer::allow_threads;
+    use crate::deserialize::pointer::resolve_yyjson;
+    use crate::deserialize::pyobject::get_unicode_key;
+    use crate::deserialize::utf8::read_input_to_buf;
+    use crate::deserialize::yyjson::*;
+    use crate::ffi::yyjson::yyjson_val;
+    use core::ptr::null_mut;
+
+    struct Column {
+        key: &'static str,
+        values: Vec<*mut yyjson_val>,
+    }
+
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    let mut builder = Builder::new(opts)?;
+    with_doc(data, allow_threads(ptr), |doc| {
+        let arr = resolve_yyjson(yyjson_doc_get_root(doc), tokens).ok_or_else(not_found)?;
+        if !unsafe_yyjson_is_arr(arr) {
+            return Err(not_records());
+        }
+        let nrows = unsafe_yyjson_get_len(arr);
+        let mut columns: Vec<Column> = Vec::new();
+        let mut record = unsafe_yyjson_get_first(arr);
+        for row in 0..nrows {
+            if !unsafe_yyjson_is_ctn(record) || unsafe_yyjson_is_arr(record) {
+                return Err(not_records());
+            }
+            let mut next_key = unsafe_yyjson_get_first(record);
+            for pos in 0..unsafe_yyjson_get_len(record) {
+                let key = yyjson_get_str(next_key);
+                let next_val = unsafe { next_key.add(1) };
+                // Records usually have the same keys in the same order.
+                let idx = if pos < columns.len() && columns[pos].key == key {
+                    pos
+                } else {
+                    match columns.iter().position(|col| col.key == key) {
+                        Some(idx) => idx,
+                        None => {
+                            columns.push(Column {
+                                key: key,
+                                values: vec![null_mut(); nrows],
+                            });
+                            columns.len() - 1
+                        }
+                    }
+                };
+                columns[idx].values[row] = next_val;
+                next_key = next_sibling(next_val);
+            }
+            record = next_sibling(record);
+        }
+
+        let dict = ffi!(_PyDict_NewPresized(columns.len() as isize));
+        for col in columns.iter() {
+            let pyval = match builder.build_column(&col.values) {
+                Ok(val) => val.as_ptr(),
+                Err(err) => {
+                    ffi!(Py_DECREF(dict));
+                    return Err(err);
+                }
+            };
+            let pykey = get_unicode_key(col.key);
+            ffi!(PyDict_SetItem(dict, pykey, pyval));
+            ffi!(Py_DECREF(pykey));
+            ffi!(Py_DECREF(pyval));
+        }
+        Ok(nonnull!(dict))
+    })?
+}
+
+/// Deserialize the array of objects that `tokens` refer to in the document
+/// `ptr` to a dict of each key to a list of its values. The serde_json
+/// backend creates Python objects while parsing, so the records are
+/// deserialized and then pivoted.
+#[cfg(not(feature = "yyjson"))]
+pub fn deserialize_columns(
+    ptr: *mut PyObject,
+    tokens: &[String],
+    _opts: Opt,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    use crate::deserialize::pointer::resolve_pyobject;
+    use crate::typeref::{DICT_TYPE, LIST_TYPE, NONE};
+
+    let obj = crate::deserialize::deserialize(ptr)?;
+    let res = match resolve_pyobject(obj.as_ptr(), tokens) {
+        None => Err(not_found()),
+        Some(arr) => {
+            if is_type!(ob_type!(arr), LIST_TYPE) {
+                let dict = ffi!(PyDict_New());
+                let mut valid = true;
+                for row in 0..ffi!(Py_SIZE(arr)) {
+                    let record = ffi!(PyList_GET_ITEM(arr, row));
+                    if !is_type!(ob_type!(record), DICT_TYPE) {
+                        valid = false;
+                        break;
+                    }
+                    let mut pos = 0;
+                    let mut key: *mut PyObject = core::ptr::null_mut();
+                    let mut val: *mut PyObject = core::ptr::null_mut();
+                    while pydict_next!(record, &mut pos, &mut key, &mut val) != 0 {
+                        let mut col = ffi!(PyDict_GetItem(dict, key));
+                        if col.is_null() {
+                            col = ffi!(PyList_New(0));
+                            for _ in 0..row {
+                                ffi!(PyList_Append(col, NONE));
+                            }
+                            ffi!(PyDict_SetItem(dict, key, col));
+                            ffi!(Py_DECREF(col));
+                        }
+                        ffi!(PyList_Append(col, val));
+                    }
+                    pos = 0;
+                    while pydict_next!(dict, &mut pos, &mut key, &mut val) != 0 {
+                        if ffi!(Py_SIZE(val)) <= row {
+                            ffi!(PyList_Append(val, NONE));
+                        }
+                    }
+                }
+                if valid {
+                    Ok(nonnull!(dict))
+                } else {
+                    ffi!(Py_DECREF(dict));
+                    Err(not_records())
+                }
+            } else {
+                Err(not_records())
+            }
+        }
+    };
+    ffi!(Py_DECREF(obj.as_ptr()));
+    res
+}
@@ -0,0 +1,493 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::deserializer::{allow_threads, deserialize_buffer};
+use crate::deserialize::utf8::is_valid_utf8;
+use crate::deserialize::DeserializeError;
+use crate::str::unicode_to_str;
+use crate::typeref::{BYTEARRAY_TYPE, BYTES_TYPE, MEMORYVIEW_TYPE, STR_TYPE};
+use crate::util::INVALID_STR;
+use core::ffi::{c_char, c_ulong, c_void};
+use core::ptr::null_mut;
+use pyo3_ffi::*;
+use std::borrow::Cow;
+
+#[derive(Clone, Copy, PartialEq)]
+enum State {
+    Between,
+    Container,
+    String,
+    StringEscape,
+    Scalar,
+}
+
+/// Finds where top-level values end in input that arrives in chunks. It
+/// only tracks nesting and strings; the values are validated when they are
+/// deserialized.
+struct Scanner {
+    pos: usize,
+    start: usize,
+    depth: usize,
+    state: State,
+}
+
+#[inline(always)]
+fn is_separator(ch: u8) -> bool {
+    // RFC 7464 record separators are treated as whitespace.
+    matches!(ch, b' ' | b'\t' | b'\n' | b'\r' | 0x1e)
+}
+
+impl Scanner {
+    fn new() -> Self {
+        Scanner {
+            pos: 0,
+            start: 0,
+            depth: 0,
+            state: State::Between,
+        }
+    }
+
+    #[inline(always)]
+    fn complete(&mut self, end: usize, spans: &mut Vec<(usize, usize)>) {
+        spans.push((self.start, end));
+        self.state = State::Between;
+        self.depth = 0;
+    }
+
+    /// Scan `data` from where the last call stopped and append the start and
+    /// end of each top-level value that is complete to `spans`, stopping
+    /// once it has `limit` of them. A number or literal at the end of `data`
+    /// is not complete until a separator or `finish()`.
+    fn scan(&mut self, data: &[u8], spans: &mut Vec<(usize, usize)>, limit: usize) {
+        let mut idx = self.pos;
+        while idx < data.len() && spans.len() < limit {
+            let ch = data[idx];
+            match self.state {
+                State::Between => {
+                    if !is_separator(ch) {
+                        self.start = idx;
+                        self.state = match ch {
+                            b'{' | b'[' => {
+                                self.depth = 1;
+                                State::Container
+                            }
+                            b'"' => State::String,
+                            _ => State::Scalar,
+                        };
+                    }
+                }
+                State::Container => match ch {
+                    b'"' => self.state = State::String,
+                    b'{' | b'[' => self.depth += 1,
+                    b'}' | b']' => {
+                        self.depth -= 1;
+                        if self.depth == 0 {
+                            self.complete(idx + 1, spans);
+                        }
+                    }
+                    _ => {}
+                },
+                State::String => {
+                    match data[idx..].iter().position(|&ch| ch == b'"' || ch == b'\\') {
+                        None => idx = data.len() - 1,
+                        Some(offset) => {
+                            idx += offset;
+                            if data[idx] == b'\\' {
+                                self.state = State::StringEscape;
+                            } else if self.depth == 0 {
+                                self.complete(idx + 1, spans);
+                            } else {
+                                self.state = State::Container;
+                            }
+                        }
+                    }
+                }
+                State::StringEscape => self.state = State::String,
+                State::Scalar => {
+                    if is_separator(ch) || matches!(ch, b'{' | b'[' | b'"') {
+                        self.complete(idx, spans);
+                        continue;
+                    }
+                }
+            }
+            idx += 1;
+        }
+        self.pos = idx;
+    }
+
+    /// Complete a number or literal at the end of the input. Return whether
+    /// no value is left incomplete.
+    fn finish(&mut self, len: usize, spans: &mut Vec<(usize, usize)>) -> bool {
+        if self.state == State::Scalar {
+            self.complete(len, spans);
+        }
+        self.state == State::Between
+    }
+
+    /// The number of bytes at the start of the input that are no longer
+    /// needed.
+    fn consumed(&self) -> usize {
+        if self.state == State::Between {
+            self.pos
+        } else {
+            self.start
+        }
+    }
+
+    /// Forget the first `len` bytes of the input.
+    fn advance(&mut self, len: usize) {
+        self.pos -= len;
+        if self.state != State::Between {
+            self.start -= len;
+        }
+    }
+}
+
+/// A decoder of JSON that arrives in chunks. Chunks are scanned as they are
+/// fed and each top-level value is deserialized as soon as it is complete.
+/// Only the incomplete value at the end of the input is buffered, and the
+/// buffer is reused.
+#[repr(C)]
+pub struct Decoder {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    buffer: Vec<u8>,
+    scanner: Scanner,
+    pending: Vec<*mut PyObject>,
+}
+
+#[inline(always)]
+fn as_decoder(obj: *mut PyObject) -> &'static mut Decoder {
+    unsafe { &mut *(obj as *mut Decoder) }
+}
+
+/// Return the contents of a bytes, bytearray, memoryview, or str chunk. The
+/// chunk may end within a UTF-8 sequence, so it is not validated.
+pub fn read_chunk(ptr: *mut PyObject) -> Option<&'static [u8]> {
+    let obj_type_ptr = ob_type!(ptr);
+    unsafe {
+        if is_type!(obj_type_ptr, BYTES_TYPE) {
+            Some(core::slice::from_raw_parts(
+                PyBytes_AS_STRING(ptr) as *const u8,
+                PyBytes_GET_SIZE(ptr) as usize,
+            ))
+        } else if is_type!(obj_type_ptr, STR_TYPE) {
+            let uni = unicode_to_str(ptr);
+            if uni.is_none() {
+                PyErr_Clear();
+            }
+            uni.map(|val| val.as_bytes())
+        } else if is_type!(obj_type_ptr, BYTEARRAY_TYPE) {
+            Some(core::slice::from_raw_parts(
+                PyByteArray_AsString(ptr) as *const u8,
+                PyByteArray_Size(ptr) as usize,
+            ))
+        } else if is_type!(obj_type_ptr, MEMORYVIEW_TYPE) {
+            let membuf = PyMemoryView_GET_BUFFER(ptr);
+            if PyBuffer_IsContiguous(membuf, b'C' as c_char) == 0 {
+                return None;
+            }
+            Some(core::slice::from_raw_parts(
+                (*membuf).buf as *const u8,
+                (*membuf).len as usize,
+            ))
+        } else {
+            None
+        }
+    }
+}
+
+impl Decoder {
+    /// Deserialize the values at `spans` of `data` and append them to
+    /// `pending`. Return the end of the value that failed and its error.
+    fn decode_spans(
+        &mut self,
+        data: &'static [u8],
+        spans: &[(usize, usize)],
+    ) -> Option<(usize, DeserializeError<'static>)> {
+        for &(start, end) in spans {
+            let value = &data[start..end];
+            let res = if unlikely!(!is_valid_utf8(value)) {
+                Err(DeserializeError::invalid(Cow::Borrowed(INVALID_STR)))
+            } else {
+                deserialize_buffer(value, false)
+            };
+            match res {
+                Ok(val) => self.pending.push(val.as_ptr()),
+                Err(err) => return Some((end, err)),
+            }
+        }
+        None
+    }
+
+    /// Return a list of the pending values.
+    fn take_pending(&mut self) -> *mut PyObject {
+        let list = ffi!(PyList_New(self.pending.len() as isize));
+        for (idx, &each) in self.pending.iter().enumerate() {
+            ffi!(PyList_SET_ITEM(list, idx as isize, each));
+        }
+        self.pending.clear();
+        list
+    }
+
+    /// Deserialize the complete values in `data`, which is either the
+    /// buffer or a chunk fed while the buffer was empty. Return the list of
+    /// values, or null with `JSONDecodeError` raised if a value is invalid.
+    /// In that case the values before it are returned by the next call and
+    /// the input after it is scanned again.
+    fn decode(&mut self, data: &'static [u8], is_buffer: bool, finish: bool) -> *mut PyObject {
+        let mut spans: Vec<(usize, usize)> = Vec::new();
+        self.scanner.scan(data, &mut spans, usize::MAX);
+        let complete = !finish || self.scanner.finish(data.len(), &mut spans);
+        let mut ret = match self.decode_spans(data, &spans) {
+            None => null_mut(),
+            Some((end, err)) => {
+                self.scanner = Scanner::new();
+                self.scanner.pos = end;
+                // The error refers to `data`, so it is raised before the
+                // buffer changes.
+                crate::raise_loads_exception(err)
+            }
+        };
+        if ret.is_null() && ffi!(PyErr_Occurred()).is_null() {
+            if complete {
+                ret = self.take_pending();
+            } else {
+                self.scanner = Scanner::new();
+                self.scanner.pos = data.len();
+                crate::raise_loads_exception(DeserializeError::invalid(Cow::Borrowed(
+                    "Unexpected end of data: an incomplete value was fed",
+                )));
+            }
+        }
+        let consumed = self.scanner.consumed();
+        if is_buffer {
+            self.buffer.drain(..consumed);
+        } else {
+            self.buffer.extend_from_slice(&data[consumed..]);
+        }
+        self.scanner.advance(consumed);
+        ret
+    }
+}
+
+/// Deserialize the first value of `ptr` at or after `offset`, skipping
+/// whitespace and RFC 7464 record separators, and return it with the offset
+/// of the end of the value. The input after the value is not read. Offsets
+/// of a str are in characters.
+pub fn deserialize_prefix(
+    ptr: *mut PyObject,
+    offset: usize,
+) -> Result<(core::ptr::NonNull<PyObject>, usize), DeserializeError<'static>> {
+    let data = match read_chunk(ptr) {
+        Some(val) => val,
+        None => {
+            return Err(DeserializeError::invalid(Cow::Borrowed(
+                "Input must be bytes, bytearray, C contiguous memoryview, or str",
+            )))
+        }
+    };
+    // A str that is not ASCII has fewer characters than UTF-8 bytes.
+    let chars = if is_type!(ob_type!(ptr), STR_TYPE) {
+        ffi!(PyUnicode_GetLength(ptr)) as usize
+    } else {
+        data.len()
+    };
+    if unlikely!(offset > chars) {
+        return Err(DeserializeError::invalid(Cow::Borrowed(
+            "loads_prefix() offset is past the end of the input",
+        )));
+    }
+    let is_ascii = chars == data.len();
+    let start = if is_ascii {
+        offset
+    } else {
+        unsafe { std::str::from_utf8_unchecked(data) }
+            .char_indices()
+            .nth(offset)
+            .map_or(data.len(), |(idx, _)| idx)
+    };
+
+    let rest = &data[start..];
+    let mut scanner = Scanner::new();
+    let mut spans: Vec<(usize, usize)> = Vec::with_capacity(1);
+    scanner.scan(rest, &mut spans, 1);
+    if spans.is_empty() && !scanner.finish(rest.len(), &mut spans) {
+        return Err(DeserializeError::invalid(Cow::Borrowed(
+            "Unexpected end of data: the value at offset is incomplete",
+        )));
+    } else if spans.is_empty() {
+        return Err(DeserializeError::invalid(Cow::Borrowed(
+            "Unexpected end of data: no value at offset",
+        )));
+    }
+    let (value_start, value_end) = (start + spans[0].0, start + spans[0].1);
+    let value = &data[value_start..value_end];
+    if unlikely!(!is_valid_utf8(value)) {
+        return Err(DeserializeError::invalid(Cow::Borrowed(INVALID_STR)));
+    }
+    match deserialize_buffer(value, allow_threads(ptr)) {
+        Ok(val) => {
+            let end = if is_ascii {
+                value_end
+            } else {
+                offset
+                    + unsafe { std::str::from_utf8_unchecked(&data[start..value_end]) }
+                        .chars()
+                        .count()
+            };
+            Ok((val, end))
+        }
+        Err(err) => {
+            // Only the value was validated, so the error is rebased on the
+            // input before it only if that is valid as well.
+            let before = &data[..value_start];
+            if is_valid_utf8(before) {
+                let line = before.iter().filter(|&&ch| ch == b'\n').count();
+                let doc = unsafe { std::str::from_utf8_unchecked(&data[..value_end]) };
+                Err(err.relocate(value_start, line, doc))
+            } else {
+                Err(err)
+            }
+        }
+    }
+}
+
+#[cold]
+#[inline(never)]
+fn raise_type_error(msg: &str) -> *mut PyObject {
+    unsafe {
+        let err_msg =
+            PyUnicode_FromStringAndSize(msg.as_ptr() as *const c_char, msg.len() as isize);
+        PyErr_SetObject(PyExc_TypeError, err_msg);
+        Py_DECREF(err_msg);
+    };
+    null_mut()
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_decoder_tp_new(
+    subtype: *mut PyTypeObject,
+    args: *mut PyObject,
+    kwds: *mut PyObject,
+) -> *mut PyObject {
+    if Py_SIZE(args) != 0 || (!kwds.is_null() && PyDict_Size(kwds) != 0) {
+        return raise_type_error("xorjson.Decoder() takes no arguments");
+    }
+    Py_INCREF(subtype as *mut PyObject);
+    let obj = Box::new(Decoder {
+        ob_refcnt: 1,
+        ob_type: subtype,
+        buffer: Vec::new(),
+        scanner: Scanner::new(),
+        pending: Vec::new(),
+    });
+    Box::into_raw(obj) as *mut PyObject
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_decoder_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    let decoder = Box::from_raw(object as *mut Decoder);
+    for &each in decoder.pending.iter() {
+        Py_DECREF(each);
+    }
+    drop(decoder);
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_decoder_feed(
+    object: *mut PyObject,
+    chunk: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let contents =
+        match read_chunk(chunk) {
+            Some(val) => val,
+            None => return raise_type_error(
+                "Decoder.feed() argument must be bytes, bytearray, C contiguous memoryview, or str",
+            ),
+        };
+    let decoder = as_decoder(object);
+    if decoder.buffer.is_empty() {
+        decoder.decode(contents, false, false)
+    } else {
+        decoder.buffer.extend_from_slice(contents);
+        let data = core::slice::from_raw_parts(decoder.buffer.as_ptr(), decoder.buffer.len());
+        decoder.decode(data, true, false)
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_decoder_close(
+    object: *mut PyObject,
+    _unused: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let decoder = as_decoder(object);
+    let data = core::slice::from_raw_parts(decoder.buffer.as_ptr(), decoder.buffer.len());
+    decoder.decode(data, true, true)
+}
+
+#[cfg(Py_3_10)]
+const DECODER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_IMMUTABLETYPE;
+
+#[cfg(not(Py_3_10))]
+const DECODER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT;
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_decodertype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    let methods = Box::new([
+        PyMethodDef {
+            ml_name: "feed\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: xorjson_decoder_feed,
+            },
+            ml_flags: METH_O,
+            ml_doc: "feed(chunk, /)\n--\n\nAdd a chunk of the input and return a list of the values it completes.\0"
+                .as_ptr() as *const c_char,
+        },
+        PyMethodDef {
+            ml_name: "close\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: xorjson_decoder_close,
+            },
+            ml_flags: METH_NOARGS,
+            ml_doc: "close()\n--\n\nEnd the input and return a list of the values it completes.\0"
+                .as_ptr() as *const c_char,
+        },
+        PyMethodDef::zeroed(),
+    ]);
+    crate::module::new_type(
+        module,
+        "xorjson.Decoder\0",
+        core::mem::size_of::<Decoder>(),
+        DECODER_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_new,
+                pfunc: xorjson_decoder_tp_new as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_decoder_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_methods,
+                pfunc: Box::into_raw(methods) as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_doc,
+                pfunc:
+                    "Decoder()\n--\n\nDeserialize JSON values from input that is fed in chunks.\0"
+                        .as_ptr() as *mut c_void,
+            },
+        ],
+    )
+}
@@ -2,7 +2,7 @@
 
 use crate::deserialize::utf8::read_input_to_buf;
 use crate::deserialize::DeserializeError;
-use crate::typeref::EMPTY_UNICODE;
+use crate::typeref::{BYTES_TYPE, EMPTY_UNICODE, STR_TYPE};
 use core::ptr::NonNull;
 
 pub fn deserialize(
@@ -10,7 +10,46 @@ pub fn deserialize(
 ) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
     debug_assert!(ffi!(Py_REFCNT(ptr)) >= 1);
     let buffer = read_input_to_buf(ptr)?;
+    deserialize_buffer(buffer, allow_threads(ptr))
+}
+
+/// Deserialize `ptr` with the `loads()` options `opts`.
+#[cfg(feature = "yyjson")]
+#[cold]
+pub fn deserialize_with_opts(
+    ptr: *mut pyo3_ffi::PyObject,
+    opts: crate::opt::Opt,
+) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+    use crate::deserialize::builder::Builder;
+    use crate::deserialize::yyjson::{with_doc, yyjson_doc_get_root};
 
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    let mut builder = Builder::new(opts)?;
+    with_doc(data, allow_threads(ptr), |doc| {
+        builder.build(yyjson_doc_get_root(doc))
+    })?
+}
+
+/// Documents of at least this many bytes are read with the GIL released.
+pub const ALLOW_THREADS_MIN_LEN: usize = 64 * 1024;
+
+/// Whether the contents of the input `ptr` may be read without the GIL. The
+/// contents of bytearray and memoryview may be changed by another thread.
+#[inline(always)]
+pub fn allow_threads(ptr: *mut pyo3_ffi::PyObject) -> bool {
+    let obj_type_ptr = ob_type!(ptr);
+    is_type!(obj_type_ptr, BYTES_TYPE) || is_type!(obj_type_ptr, STR_TYPE)
+}
+
+/// Deserialize a non-empty buffer that has already been validated as UTF-8.
+/// If `allow_threads` is true, the buffer is immutable and the GIL may be
+/// released while parsing.
+#[inline(always)]
+pub fn deserialize_buffer(
+    buffer: &'static [u8],
+    allow_threads: bool,
+) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
     if unlikely!(buffer.len() == 2) {
         if buffer == b"[]" {
             return Ok(nonnull!(ffi!(PyList_New(0))));
@@ -25,11 +64,12 @@ pub fn deserialize(
 
     #[cfg(feature = "yyjson")]
     {
-        crate::deserialize::yyjson::deserialize_yyjson(buffer_str)
+        crate::deserialize::yyjson::deserialize_yyjson(buffer_str, allow_threads)
     }
 
     #[cfg(not(feature = "yyjson"))]
     {
+        let _ = allow_threads;
         crate::deserialize::json::deserialize_json(buffer_str)
     }
 }
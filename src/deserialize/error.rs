@@ -49,6 +49,28 @@ impl<'a> DeserializeError<'a> {
         }
     }
 
+    /// Rebase an error raised while deserializing `data[offset..]`, which
+    /// begins after `line` newlines, so that it refers to all of `data`.
+    #[cold]
+    #[cfg(feature = "yyjson")]
+    pub fn relocate(self, offset: usize, _line: usize, data: &'a str) -> Self {
+        match self.data {
+            Some(_) => DeserializeError::from_yyjson(self.message, self.pos + offset as i64, data),
+            None => self,
+        }
+    }
+
+    #[cold]
+    #[cfg(not(feature = "yyjson"))]
+    pub fn relocate(self, _offset: usize, line: usize, data: &'a str) -> Self {
+        match self.data {
+            Some(_) => {
+                DeserializeError::from_json(self.message, self.line + line, self.column, data)
+            }
+            None => self,
+        }
+    }
+
     /// Return position of the error in the deserialized data
     #[cold]
     #[cfg(feature = "yyjson")]
@@ -0,0 +1,756 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::decoder::read_chunk;
+use crate::deserialize::deserializer::deserialize_buffer;
+use crate::deserialize::pointer::array_index;
+use crate::deserialize::pyobject::{
+    get_unicode_key, parse_f64, parse_false, parse_i64, parse_none, parse_true, parse_u64,
+};
+use crate::deserialize::utf8::is_valid_utf8;
+use crate::deserialize::DeserializeError;
+use crate::str::{unicode_from_str, unicode_to_str};
+use crate::typeref::{
+    BYTEARRAY_TYPE, BYTES_TYPE, MEMORYVIEW_TYPE, NONE, READ_METHOD_STR, STR_TYPE,
+};
+use crate::util::INVALID_STR;
+use core::ffi::{c_char, c_ulong, c_void};
+use core::ptr::null_mut;
+use pyo3_ffi::*;
+use std::borrow::Cow;
+
+#[derive(Clone, Copy, PartialEq)]
+enum Event {
+    StartMap,
+    MapKey,
+    EndMap,
+    StartArray,
+    EndArray,
+    String,
+    Number,
+    Boolean,
+    Null,
+}
+
+const EVENT_NAMES: [&str; 9] = [
+    "start_map\0",
+    "map_key\0",
+    "end_map\0",
+    "start_array\0",
+    "end_array\0",
+    "string\0",
+    "number\0",
+    "boolean\0",
+    "null\0",
+];
+
+static mut EVENT_STRS: [*mut PyObject; 9] = [null_mut(); 9];
+
+#[derive(Clone, Copy, PartialEq)]
+enum Expect {
+    Value,
+    ValueOrEnd,
+    Key,
+    KeyOrEnd,
+    Colon,
+    CommaOrEnd,
+    Done,
+}
+
+/// Where the value that an event starts is relative to the prefix of
+/// `items()`.
+#[derive(Clone, Copy, PartialEq)]
+enum Location {
+    Other,
+    Target,
+    Element,
+}
+
+enum Step {
+    /// An event and its value, a new reference or null for the events of
+    /// containers.
+    Event(Event, *mut PyObject),
+    End,
+    NeedMore,
+    Invalid(Cow<'static, str>),
+    /// A Python exception is set.
+    Error,
+}
+
+struct Frame {
+    is_object: bool,
+    count: usize,
+    key: Option<String>,
+    matched: bool,
+}
+
+#[inline(always)]
+fn is_whitespace(ch: u8) -> bool {
+    matches!(ch, b' ' | b'\t' | b'\n' | b'\r')
+}
+
+/// Return whether `text` is a JSON integer, or `None` if it is not a valid
+/// number.
+fn number_kind(text: &[u8]) -> Option<bool> {
+    let digits = |mut idx: usize| {
+        while matches!(text.get(idx), Some(b'0'..=b'9')) {
+            idx += 1;
+        }
+        idx
+    };
+    let mut idx = usize::from(text.first() == Some(&b'-'));
+    match text.get(idx) {
+        Some(b'0') => idx += 1,
+        Some(b'1'..=b'9') => idx = digits(idx),
+        _ => return None,
+    }
+    let mut is_int = true;
+    if text.get(idx) == Some(&b'.') {
+        is_int = false;
+        let start = idx + 1;
+        idx = digits(start);
+        if idx == start {
+            return None;
+        }
+    }
+    if matches!(text.get(idx), Some(b'e' | b'E')) {
+        is_int = false;
+        idx += 1;
+        if matches!(text.get(idx), Some(b'+' | b'-')) {
+            idx += 1;
+        }
+        let start = idx;
+        idx = digits(start);
+        if idx == start {
+            return None;
+        }
+    }
+    if idx == text.len() {
+        Some(is_int)
+    } else {
+        None
+    }
+}
+
+/// Return the end of the string starting at `start` and whether it has
+/// escapes, or `None` if it is not complete.
+fn scan_string(data: &[u8], start: usize) -> Option<(usize, bool)> {
+    let mut idx = start + 1;
+    let mut escaped = false;
+    loop {
+        let offset = data[idx..]
+            .iter()
+            .position(|&ch| ch == b'"' || ch == b'\\')?;
+        idx += offset;
+        if data[idx] == b'"' {
+            return Some((idx + 1, escaped));
+        }
+        escaped = true;
+        idx += 2;
+        if idx > data.len() {
+            return None;
+        }
+    }
+}
+
+/// An incremental tokenizer that turns JSON into a stream of events. It
+/// keeps only a stack of the open containers, so its memory is bounded by
+/// nesting depth. Input is consumed only at the end of a complete token, so
+/// a token that is cut off by the end of the input is read again once more
+/// input is available.
+struct Parser {
+    pos: usize,
+    expect: Expect,
+    stack: Vec<Frame>,
+    prefix: Option<Vec<String>>,
+    location: Location,
+}
+
+impl Parser {
+    fn new(prefix: Option<Vec<String>>) -> Self {
+        Parser {
+            pos: 0,
+            expect: Expect::Value,
+            stack: Vec::new(),
+            prefix: prefix,
+            location: Location::Other,
+        }
+    }
+
+    /// Read the next event from `data`. If `eof` is false, more input may
+    /// follow `data`.
+    fn step(&mut self, data: &'static [u8], eof: bool) -> Step {
+        self.location = Location::Other;
+        loop {
+            while self.pos < data.len() && is_whitespace(data[self.pos]) {
+                self.pos += 1;
+            }
+            if self.pos >= data.len() {
+                if !eof {
+                    return Step::NeedMore;
+                } else if self.expect == Expect::Done {
+                    return Step::End;
+                }
+                return Step::Invalid(Cow::Borrowed("Unexpected end of data"));
+            }
+            let ch = data[self.pos];
+            match self.expect {
+                Expect::Done => {
+                    return Step::Invalid(Cow::Borrowed("Trailing data after the document"))
+                }
+                Expect::Colon => {
+                    if ch != b':' {
+                        return Step::Invalid(Cow::Borrowed("Expected ':' after a key"));
+                    }
+                    self.pos += 1;
+                    self.expect = Expect::Value;
+                }
+                Expect::CommaOrEnd => {
+                    let is_object = self.stack.last().map_or(false, |frame| frame.is_object);
+                    if ch == b',' {
+                        self.pos += 1;
+                        self.expect = if is_object {
+                            Expect::Key
+                        } else {
+                            Expect::Value
+                        };
+                    } else if ch == if is_object { b'}' } else { b']' } {
+                        return self.end_container();
+                    } else {
+                        return Step::Invalid(Cow::Borrowed(
+                            "Expected ',' or the end of the container",
+                        ));
+                    }
+                }
+                Expect::Key | Expect::KeyOrEnd => {
+                    if ch == b'}' && self.expect == Expect::KeyOrEnd {
+                        return self.end_container();
+                    } else if ch != b'"' {
+                        return Step::Invalid(Cow::Borrowed("Expected a string key"));
+                    }
+                    return self.read_key(data, eof);
+                }
+                Expect::ValueOrEnd if ch == b']' => return self.end_container(),
+                Expect::Value | Expect::ValueOrEnd => return self.read_value(data, eof),
+            }
+        }
+    }
+
+    fn value_done(&mut self) {
+        match self.stack.last_mut() {
+            Some(frame) => {
+                frame.count += 1;
+                self.expect = Expect::CommaOrEnd;
+            }
+            None => self.expect = Expect::Done,
+        }
+    }
+
+    fn end_container(&mut self) -> Step {
+        self.pos += 1;
+        let frame = self.stack.pop().unwrap_or_else(|| unreachable!());
+        self.value_done();
+        if frame.is_object {
+            Step::Event(Event::EndMap, null_mut())
+        } else {
+            Step::Event(Event::EndArray, null_mut())
+        }
+    }
+
+    /// Return whether the value about to start has the path of the prefix,
+    /// and set `location`.
+    fn locate(&mut self) -> bool {
+        let prefix = match self.prefix.as_ref() {
+            Some(val) => val,
+            None => return false,
+        };
+        let depth = self.stack.len();
+        let matched = match self.stack.last() {
+            None => true,
+            Some(frame) => {
+                if frame.matched && depth == prefix.len() + 1 && !frame.is_object {
+                    self.location = Location::Element;
+                }
+                frame.matched
+                    && depth <= prefix.len()
+                    && if frame.is_object {
+                        frame.key.as_deref() == Some(prefix[depth - 1].as_str())
+                    } else {
+                        array_index(&prefix[depth - 1]) == Some(frame.count)
+                    }
+            }
+        };
+        if matched && depth == prefix.len() {
+            self.location = Location::Target;
+        }
+        matched
+    }
+
+    fn read_value(&mut self, data: &'static [u8], eof: bool) -> Step {
+        let matched = self.locate();
+        match data[self.pos] {
+            ch @ (b'{' | b'[') => {
+                self.pos += 1;
+                let is_object = ch == b'{';
+                self.stack.push(Frame {
+                    is_object: is_object,
+                    count: 0,
+                    key: None,
+                    matched: matched,
+                });
+                if is_object {
+                    self.expect = Expect::KeyOrEnd;
+                    Step::Event(Event::StartMap, null_mut())
+                } else {
+                    self.expect = Expect::ValueOrEnd;
+                    Step::Event(Event::StartArray, null_mut())
+                }
+            }
+            b'"' => self.read_string(data, eof),
+            b'-' | b'0'..=b'9' => self.read_number(data, eof),
+            b't' => self.read_literal(data, eof, b"true", Event::Boolean),
+            b'f' => self.read_literal(data, eof, b"false", Event::Boolean),
+            b'n' => self.read_literal(data, eof, b"null", Event::Null),
+            _ => Step::Invalid(Cow::Borrowed("Unexpected character")),
+        }
+    }
+
+    /// Return the contents of the string at `pos` as a new reference and as
+    /// a `str`, and move past it.
+    fn read_str(
+        &mut self,
+        data: &'static [u8],
+        eof: bool,
+        is_key: bool,
+    ) -> Result<(*mut PyObject, &'static str), Step> {
+        let (end, escaped) = match scan_string(data, self.pos) {
+            Some(val) => val,
+            None if eof => {
+                return Err(Step::Invalid(Cow::Borrowed(
+                    "Unexpected end of data in a string",
+                )))
+            }
+            None => return Err(Step::NeedMore),
+        };
+        let raw = &data[self.pos..end];
+        if unlikely!(!is_valid_utf8(raw)) {
+            return Err(Step::Invalid(Cow::Borrowed(INVALID_STR)));
+        }
+        let ret = if !escaped {
+            if unlikely!(raw.iter().any(|&ch| ch < 0x20)) {
+                return Err(Step::Invalid(Cow::Borrowed(
+                    "Control character in a string",
+                )));
+            }
+            let contents = unsafe { std::str::from_utf8_unchecked(&raw[1..raw.len() - 1]) };
+            let obj = if is_key {
+                get_unicode_key(contents)
+            } else {
+                unicode_from_str(contents)
+            };
+            (obj, contents)
+        } else {
+            match deserialize_buffer(raw, false) {
+                Ok(obj) if is_key => {
+                    let contents = unicode_to_str(obj.as_ptr()).unwrap_or_else(|| {
+                        ffi!(PyErr_Clear());
+                        ""
+                    });
+                    (obj.as_ptr(), contents)
+                }
+                Ok(obj) => (obj.as_ptr(), ""),
+                Err(err) => return Err(Step::Invalid(Cow::Owned(err.message.into_owned()))),
+            }
+        };
+        self.pos = end;
+        Ok(ret)
+    }
+
+    fn read_key(&mut self, data: &'static [u8], eof: bool) -> Step {
+        match self.read_str(data, eof, true) {
+            Ok((obj, contents)) => {
+                let depth = self.stack.len();
+                let track = self
+                    .prefix
+                    .as_ref()
+                    .map_or(false, |prefix| depth <= prefix.len());
+                if let Some(frame) = self.stack.last_mut() {
+                    frame.key = if track && frame.matched {
+                        Some(contents.to_string())
+                    } else {
+                        None
+                    };
+                }
+                self.expect = Expect::Colon;
+                Step::Event(Event::MapKey, obj)
+            }
+            Err(step) => step,
+        }
+    }
+
+    fn read_string(&mut self, data: &'static [u8], eof: bool) -> Step {
+        match self.read_str(data, eof, false) {
+            Ok((obj, _)) => {
+                self.value_done();
+                Step::Event(Event::String, obj)
+            }
+            Err(step) => step,
+        }
+    }
+
+    fn read_number(&mut self, data: &'static [u8], eof: bool) -> Step {
+        let start = self.pos;
+        let mut end = start;
+        while end < data.len()
+            && matches!(data[end], b'0'..=b'9' | b'-' | b'+' | b'.' | b'e' | b'E')
+        {
+            end += 1;
+        }
+        if end == data.len() && !eof {
+            return Step::NeedMore;
+        }
+        let text = &data[start..end];
+        let is_int = match number_kind(text) {
+            Some(val) => val,
+            None => return Step::Invalid(Cow::Borrowed("Invalid number")),
+        };
+        let as_str = unsafe { std::str::from_utf8_unchecked(text) };
+        let obj = if let (true, Ok(val)) = (is_int, as_str.parse::<i64>()) {
+            parse_i64(val)
+        } else if let (true, Ok(val)) = (is_int, as_str.parse::<u64>()) {
+            parse_u64(val)
+        } else {
+            match as_str.parse::<f64>() {
+                Ok(val) if val.is_finite() => parse_f64(val),
+                _ => return Step::Invalid(Cow::Borrowed("Number is out of range")),
+            }
+        };
+        self.pos = end;
+        self.value_done();
+        Step::Event(Event::Number, obj.as_ptr())
+    }
+
+    fn read_literal(
+        &mut self,
+        data: &'static [u8],
+        eof: bool,
+        literal: &[u8],
+        event: Event,
+    ) -> Step {
+        let avail = &data[self.pos..];
+        if avail.len() < literal.len() {
+            if !eof && literal.starts_with(avail) {
+                return Step::NeedMore;
+            }
+            return Step::Invalid(Cow::Borrowed("Invalid literal"));
+        } else if &avail[..literal.len()] != literal {
+            return Step::Invalid(Cow::Borrowed("Invalid literal"));
+        }
+        self.pos += literal.len();
+        self.value_done();
+        let obj = match literal[0] {
+            b't' => parse_true(),
+            b'f' => parse_false(),
+            _ => parse_none(),
+        };
+        Step::Event(event, obj.as_ptr())
+    }
+}
+
+/// Builds Python objects from events without recursion.
+struct Tree {
+    stack: Vec<(*mut PyObject, *mut PyObject)>,
+}
+
+impl Tree {
+    /// Add the event `event` with the value `val` and return the value it
+    /// completes, if any.
+    fn push(&mut self, event: Event, val: *mut PyObject) -> Option<*mut PyObject> {
+        match event {
+            Event::StartMap => self.stack.push((ffi!(PyDict_New()), null_mut())),
+            Event::StartArray => self.stack.push((ffi!(PyList_New(0)), null_mut())),
+            Event::MapKey => {
+                if let Some(top) = self.stack.last_mut() {
+                    top.1 = val;
+                }
+            }
+            Event::EndMap | Event::EndArray => {
+                let (obj, _) = self.stack.pop().unwrap_or_else(|| unreachable!());
+                return self.add(obj);
+            }
+            _ => return self.add(val),
+        }
+        None
+    }
+
+    fn add(&mut self, obj: *mut PyObject) -> Option<*mut PyObject> {
+        match self.stack.last_mut() {
+            None => Some(obj),
+            Some(top) => {
+                if top.1.is_null() {
+                    ffi!(PyList_Append(top.0, obj));
+                } else {
+                    ffi!(PyDict_SetItem(top.0, top.1, obj));
+                    ffi!(Py_DECREF(top.1));
+                    top.1 = null_mut();
+                }
+                ffi!(Py_DECREF(obj));
+                None
+            }
+        }
+    }
+
+    fn is_building(&self) -> bool {
+        !self.stack.is_empty()
+    }
+}
+
+impl Drop for Tree {
+    fn drop(&mut self) {
+        for &(obj, key) in self.stack.iter() {
+            ffi!(Py_DECREF(obj));
+            if !key.is_null() {
+                ffi!(Py_DECREF(key));
+            }
+        }
+    }
+}
+
+/// An iterator of the events of a JSON document that is either a buffer or
+/// read in chunks from a file object. With a prefix, it instead yields the
+/// values that `items()` selects.
+#[repr(C)]
+pub struct EventParser {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    source: *mut PyObject,
+    chunk_size: *mut PyObject,
+    buffer: Vec<u8>,
+    offset: usize,
+    eof: bool,
+    done: bool,
+    parser: Parser,
+    tree: Tree,
+}
+
+#[inline(always)]
+fn as_event_parser(obj: *mut PyObject) -> &'static mut EventParser {
+    unsafe { &mut *(obj as *mut EventParser) }
+}
+
+impl EventParser {
+    /// Read the next chunk of a file object into the buffer, dropping the
+    /// input that has been consumed. Return false with an exception set if
+    /// `read()` fails.
+    fn fill(&mut self) -> bool {
+        self.buffer.drain(..self.parser.pos);
+        self.offset += self.parser.pos;
+        self.parser.pos = 0;
+        let chunk = call_method!(self.source, READ_METHOD_STR, self.chunk_size);
+        if unlikely!(chunk.is_null()) {
+            return false;
+        }
+        let ret = match read_chunk(chunk) {
+            Some(contents) => {
+                self.eof = contents.is_empty();
+                self.buffer.extend_from_slice(contents);
+                true
+            }
+            None => {
+                crate::raise_args_exception(
+                    unsafe { PyExc_TypeError },
+                    "source read() must return bytes, bytearray, or str",
+                );
+                false
+            }
+        };
+        ffi!(Py_DECREF(chunk));
+        ret
+    }
+
+    fn next_step(&mut self) -> Step {
+        loop {
+            let step = if self.chunk_size.is_null() {
+                // A buffer is read again each time as a bytearray may have
+                // been resized.
+                let data = read_chunk(self.source).unwrap_or(b"");
+                self.parser.step(data, true)
+            } else {
+                let data =
+                    unsafe { core::slice::from_raw_parts(self.buffer.as_ptr(), self.buffer.len()) };
+                self.parser.step(data, self.eof)
+            };
+            match step {
+                Step::NeedMore => {
+                    if unlikely!(!self.fill()) {
+                        return Step::Error;
+                    }
+                }
+                step => return step,
+            }
+        }
+    }
+
+    /// Return the value that `items()` yields for an event, if any.
+    fn collect(&mut self, event: Event, val: *mut PyObject) -> Option<*mut PyObject> {
+        let location = self.parser.location;
+        if self.tree.is_building()
+            || location == Location::Element
+            || (location == Location::Target && event != Event::StartArray)
+        {
+            return self.tree.push(event, val);
+        }
+        if !val.is_null() {
+            ffi!(Py_DECREF(val));
+        }
+        None
+    }
+}
+
+/// Return a new iterator of the events of `source`, or of the values under
+/// `prefix` if given, or null with an exception set.
+pub fn new_event_parser(
+    fname: &str,
+    source: *mut PyObject,
+    prefix: Option<Vec<String>>,
+    chunk_size: usize,
+) -> *mut PyObject {
+    let obj_type_ptr = ob_type!(source);
+    let chunk_size = if is_type!(obj_type_ptr, BYTES_TYPE)
+        || is_type!(obj_type_ptr, STR_TYPE)
+        || is_type!(obj_type_ptr, BYTEARRAY_TYPE)
+        || is_type!(obj_type_ptr, MEMORYVIEW_TYPE)
+    {
+        if unlikely!(read_chunk(source).is_none()) {
+            return crate::raise_loads_exception(DeserializeError::invalid(Cow::Borrowed(
+                "Input must be bytes, bytearray, memoryview, or str",
+            )));
+        }
+        null_mut()
+    } else if ffi!(PyObject_HasAttr(source, READ_METHOD_STR)) == 1 {
+        ffi!(PyLong_FromSize_t(chunk_size))
+    } else {
+        return crate::raise_args_exception(
+            unsafe { PyExc_TypeError },
+            &format!(
+                "{}() source must be bytes, bytearray, memoryview, str, or a file object",
+                fname
+            ),
+        );
+    };
+    ffi!(Py_INCREF(source));
+    let ob_type = crate::module::state().event_parser_type;
+    ffi!(Py_INCREF(ob_type as *mut PyObject));
+    let obj = Box::new(EventParser {
+        ob_refcnt: 1,
+        ob_type: ob_type,
+        source: source,
+        chunk_size: chunk_size,
+        buffer: Vec::new(),
+        offset: 0,
+        eof: false,
+        done: false,
+        parser: Parser::new(prefix),
+        tree: Tree { stack: Vec::new() },
+    });
+    Box::into_raw(obj) as *mut PyObject
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_eventparser_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    let parser = Box::from_raw(object as *mut EventParser);
+    Py_DECREF(parser.source);
+    if !parser.chunk_size.is_null() {
+        Py_DECREF(parser.chunk_size);
+    }
+    drop(parser);
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_eventparser_next(object: *mut PyObject) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let parser = as_event_parser(object);
+    if parser.done {
+        return null_mut();
+    }
+    loop {
+        match parser.next_step() {
+            Step::Event(event, val) => {
+                if parser.parser.prefix.is_some() {
+                    if let Some(obj) = parser.collect(event, val) {
+                        return obj;
+                    }
+                    continue;
+                }
+                let tuple = PyTuple_New(2);
+                let name = EVENT_STRS[event as usize];
+                Py_INCREF(name);
+                PyTuple_SET_ITEM(tuple, 0, name);
+                let val = if val.is_null() {
+                    use_immortal!(NONE)
+                } else {
+                    val
+                };
+                PyTuple_SET_ITEM(tuple, 1, val);
+                return tuple;
+            }
+            Step::Invalid(msg) => {
+                parser.done = true;
+                let pos = parser.offset + parser.parser.pos;
+                return crate::raise_loads_exception(DeserializeError::invalid(Cow::Owned(
+                    format!("{} at byte {}", msg, pos),
+                )));
+            }
+            _ => {
+                parser.done = true;
+                return null_mut();
+            }
+        }
+    }
+}
+
+#[cfg(Py_3_10)]
+const EVENT_PARSER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_IMMUTABLETYPE;
+
+#[cfg(not(Py_3_10))]
+const EVENT_PARSER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT;
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_eventparsertype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    crate::module::new_type(
+        module,
+        "xorjson.EventParser\0",
+        core::mem::size_of::<EventParser>(),
+        EVENT_PARSER_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_eventparser_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iter,
+                pfunc: PyObject_SelfIter as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iternext,
+                pfunc: xorjson_eventparser_next as *mut c_void,
+            },
+        ],
+    )
+}
+
+/// Intern the names of events, which all interpreters share.
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub fn init_event_strs() {
+    for (idx, name) in EVENT_NAMES.iter().enumerate() {
+        unsafe {
+            EVENT_STRS[idx] = PyUnicode_InternFromString(name.as_ptr() as *const c_char);
+        }
+    }
+}
@@ -0,0 +1,154 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::utf8::is_valid_utf8;
+use crate::deserialize::DeserializeError;
+use crate::typeref::{CLOSE_METHOD_STR, FILENO_METHOD_STR, OPEN_METHOD_STR, SEEK_METHOD_STR};
+use crate::util::INVALID_STR;
+use core::ffi::c_char;
+use core::ptr::null_mut;
+use pyo3_ffi::*;
+use std::borrow::Cow;
+
+/// A file opened with `io.open()` and mapped read-only with `mmap.mmap()`.
+/// The mapping, buffer export, and file are released on drop.
+pub struct MappedFile {
+    file: *mut PyObject,
+    map: *mut PyObject,
+    view: Py_buffer,
+}
+
+impl MappedFile {
+    /// Open and map `path`. On failure, a Python exception is set, such as
+    /// `FileNotFoundError`, and `None` is returned. An empty file is not
+    /// mapped.
+    #[cold]
+    #[cfg_attr(feature = "optimize", optimize(size))]
+    pub fn open(path: *mut PyObject) -> Option<MappedFile> {
+        unsafe {
+            let mut mapped = MappedFile {
+                file: null_mut(),
+                map: null_mut(),
+                view: core::mem::zeroed::<Py_buffer>(),
+            };
+
+            let io = PyImport_ImportModule("io\0".as_ptr() as *const c_char);
+            if io.is_null() {
+                return None;
+            }
+            let mode = PyUnicode_FromStringAndSize("rb".as_ptr() as *const c_char, 2);
+            mapped.file = call_method!(io, OPEN_METHOD_STR, path, mode);
+            Py_DECREF(mode);
+            Py_DECREF(io);
+            if mapped.file.is_null() {
+                return None;
+            }
+
+            let fileno = call_method!(mapped.file, FILENO_METHOD_STR);
+            if fileno.is_null() {
+                return None;
+            }
+            let whence = PyLong_FromLong(2);
+            let offset = PyLong_FromLong(0);
+            let size = call_method!(mapped.file, SEEK_METHOD_STR, offset, whence);
+            Py_DECREF(whence);
+            if size.is_null() {
+                Py_DECREF(offset);
+                Py_DECREF(fileno);
+                return None;
+            }
+            let len = PyLong_AsLongLong(size);
+            Py_DECREF(size);
+            if len == -1 && !PyErr_Occurred().is_null() {
+                Py_DECREF(offset);
+                Py_DECREF(fileno);
+                return None;
+            }
+            if len == 0 {
+                Py_DECREF(offset);
+                Py_DECREF(fileno);
+                return Some(mapped);
+            }
+
+            let mmap = PyImport_ImportModule("mmap\0".as_ptr() as *const c_char);
+            if mmap.is_null() {
+                Py_DECREF(offset);
+                Py_DECREF(fileno);
+                return None;
+            }
+            let mmap_type = PyObject_GetAttrString(mmap, "mmap\0".as_ptr() as *const c_char);
+            let access = PyObject_GetAttrString(mmap, "ACCESS_READ\0".as_ptr() as *const c_char);
+            Py_DECREF(mmap);
+            if mmap_type.is_null() || access.is_null() {
+                Py_XDECREF(mmap_type);
+                Py_XDECREF(access);
+                Py_DECREF(offset);
+                Py_DECREF(fileno);
+                return None;
+            }
+            let args = PyTuple_New(2);
+            PyTuple_SET_ITEM(args, 0, fileno);
+            PyTuple_SET_ITEM(args, 1, offset);
+            let kwargs = PyDict_New();
+            PyDict_SetItemString(kwargs, "access\0".as_ptr() as *const c_char, access);
+            mapped.map = PyObject_Call(mmap_type, args, kwargs);
+            Py_DECREF(kwargs);
+            Py_DECREF(args);
+            Py_DECREF(access);
+            Py_DECREF(mmap_type);
+            if mapped.map.is_null() {
+                return None;
+            }
+
+            if PyObject_GetBuffer(mapped.map, &mut mapped.view, PyBUF_SIMPLE) != 0 {
+                mapped.view.obj = null_mut();
+                return None;
+            }
+            Some(mapped)
+        }
+    }
+
+    /// Return the contents of the file if it is a non-empty document of
+    /// valid UTF-8.
+    pub fn contents(&self) -> Result<&'static [u8], DeserializeError<'static>> {
+        if unlikely!(self.view.obj.is_null() || self.view.len == 0) {
+            return Err(DeserializeError::invalid(Cow::Borrowed(
+                "Input is a zero-length, empty document",
+            )));
+        }
+        let buffer = unsafe {
+            core::slice::from_raw_parts(self.view.buf as *const u8, self.view.len as usize)
+        };
+        if !is_valid_utf8(buffer) {
+            return Err(DeserializeError::invalid(Cow::Borrowed(INVALID_STR)));
+        }
+        Ok(buffer)
+    }
+}
+
+impl Drop for MappedFile {
+    #[cold]
+    #[cfg_attr(feature = "optimize", optimize(size))]
+    fn drop(&mut self) {
+        unsafe {
+            let mut tp: *mut PyObject = null_mut();
+            let mut val: *mut PyObject = null_mut();
+            let mut traceback: *mut PyObject = null_mut();
+            PyErr_Fetch(&mut tp, &mut val, &mut traceback);
+            if !self.view.obj.is_null() {
+                PyBuffer_Release(&mut self.view);
+            }
+            for each in [self.map, self.file] {
+                if !each.is_null() {
+                    let res = call_method!(each, CLOSE_METHOD_STR);
+                    if res.is_null() {
+                        PyErr_Clear();
+                    } else {
+                        Py_DECREF(res);
+                    }
+                    Py_DECREF(each);
+                }
+            }
+            PyErr_Restore(tp, val, traceback);
+        }
+    }
+}
@@ -0,0 +1,184 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::decoder::read_chunk;
+use crate::deserialize::deserializer::{allow_threads, ALLOW_THREADS_MIN_LEN};
+use crate::deserialize::utf8::is_valid_utf8;
+use crate::deserialize::DeserializeError;
+use crate::util::INVALID_STR;
+use core::ptr::NonNull;
+use pyo3_ffi::PyObject;
+use std::borrow::Cow;
+
+/// Validate the input `ptr` as UTF-8 and call `f` with it. A large
+/// immutable input is validated and passed to `f` with the GIL released,
+/// so `f` must not touch Python objects.
+fn with_input<T>(
+    ptr: *mut PyObject,
+    f: impl FnOnce(&'static str) -> Result<T, DeserializeError<'static>>,
+) -> Result<T, DeserializeError<'static>> {
+    let buffer = match read_chunk(ptr) {
+        Some(val) => val,
+        None => {
+            return Err(DeserializeError::invalid(Cow::Borrowed(
+                "Input must be bytes, bytearray, C contiguous memoryview, or str",
+            )))
+        }
+    };
+    if unlikely!(buffer.is_empty()) {
+        return Err(DeserializeError::invalid(Cow::Borrowed(
+            "Input is a zero-length, empty document",
+        )));
+    }
+    let run = || {
+        if unlikely!(!is_valid_utf8(buffer)) {
+            Err(DeserializeError::invalid(Cow::Borrowed(INVALID_STR)))
+        } else {
+            f(unsafe { std::str::from_utf8_unchecked(buffer) })
+        }
+    };
+    if allow_threads(ptr) && buffer.len() >= ALLOW_THREADS_MIN_LEN {
+        let tstate = ffi!(PyEval_SaveThread());
+        let ret = run();
+        ffi!(PyEval_RestoreThread(tstate));
+        ret
+    } else {
+        run()
+    }
+}
+
+/// Check that `ptr` is a valid JSON document without creating Python
+/// objects.
+pub fn validate_document(ptr: *mut PyObject) -> Result<(), DeserializeError<'static>> {
+    with_input(ptr, |data| {
+        #[cfg(feature = "yyjson")]
+        {
+            crate::deserialize::yyjson::with_root(data, |_| ())
+        }
+
+        #[cfg(not(feature = "yyjson"))]
+        {
+            match serde_json::from_str::<serde::de::IgnoredAny>(data) {
+                Ok(_) => Ok(()),
+                Err(e) => Err(DeserializeError::from_json(
+                    Cow::Owned(e.to_string()),
+                    e.line(),
+                    e.column(),
+                    data,
+                )),
+            }
+        }
+    })
+}
+
+/// Counts of the values in a document.
+#[cfg(feature = "yyjson")]
+#[derive(Default)]
+struct Stats {
+    nodes: usize,
+    objects: usize,
+    arrays: usize,
+    strings: usize,
+    string_bytes: usize,
+    max_depth: usize,
+    max_array_len: usize,
+}
+
+#[cfg(feature = "yyjson")]
+impl Stats {
+    /// Count the values under `root`. yyjson stores a doc's values
+    /// contiguously in document order, with each object key before its
+    /// value, so they are walked in one pass with a stack of the containers
+    /// that are open.
+    fn collect(root: *mut crate::ffi::yyjson::yyjson_val) -> Self {
+        use crate::deserialize::yyjson::*;
+        use crate::ffi::yyjson::yyjson_val;
+
+        struct Open {
+            end: *mut yyjson_val,
+            is_object: bool,
+            next_is_key: bool,
+        }
+
+        let mut stats = Stats::default();
+        let mut stack: Vec<Open> = Vec::new();
+        let end = next_sibling(root);
+        let mut val = root;
+        while val < end {
+            while stack.last().map_or(false, |open| open.end <= val) {
+                stack.pop();
+            }
+            if let Some(open) = stack.last_mut() {
+                if open.is_object {
+                    let is_key = open.next_is_key;
+                    open.next_is_key = !is_key;
+                    if is_key {
+                        stats.string_bytes += unsafe_yyjson_get_len(val);
+                        val = unsafe_yyjson_get_next_non_container(val);
+                        continue;
+                    }
+                }
+            }
+            stats.nodes += 1;
+            match ElementType::from_tag(val) {
+                ElementType::Array | ElementType::Object => {
+                    let len = unsafe_yyjson_get_len(val);
+                    let is_object = !unsafe_yyjson_is_arr(val);
+                    if is_object {
+                        stats.objects += 1;
+                    } else {
+                        stats.arrays += 1;
+                        stats.max_array_len = stats.max_array_len.max(len);
+                    }
+                    stack.push(Open {
+                        end: unsafe_yyjson_get_next_container(val),
+                        is_object: is_object,
+                        next_is_key: true,
+                    });
+                    stats.max_depth = stats.max_depth.max(stack.len());
+                    val = unsafe_yyjson_get_first(val);
+                }
+                ElementType::String => {
+                    stats.strings += 1;
+                    stats.string_bytes += unsafe_yyjson_get_len(val);
+                    val = unsafe_yyjson_get_next_non_container(val);
+                }
+                _ => val = unsafe_yyjson_get_next_non_container(val),
+            }
+        }
+        stats
+    }
+
+    fn to_pydict(&self) -> NonNull<PyObject> {
+        let dict = ffi!(PyDict_New());
+        for (key, val) in [
+            ("nodes\0", self.nodes),
+            ("objects\0", self.objects),
+            ("arrays\0", self.arrays),
+            ("strings\0", self.strings),
+            ("string_bytes\0", self.string_bytes),
+            ("max_depth\0", self.max_depth),
+            ("max_array_len\0", self.max_array_len),
+        ] {
+            let pyval = ffi!(PyLong_FromSize_t(val));
+            ffi!(PyDict_SetItemString(
+                dict,
+                key.as_ptr() as *const core::ffi::c_char,
+                pyval
+            ));
+            ffi!(Py_DECREF(pyval));
+        }
+        nonnull!(dict)
+    }
+}
+
+/// Return a dict of counts of the values in the document `ptr` without
+/// creating Python objects for them.
+#[cfg(feature = "yyjson")]
+pub fn inspect_document(
+    ptr: *mut PyObject,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    let stats = with_input(ptr, |data| {
+        crate::deserialize::yyjson::with_root(data, Stats::collect)
+    })?;
+    Ok(stats.to_pydict())
+}
@@ -0,0 +1,388 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::deserializer::allow_threads;
+use crate::deserialize::utf8::read_input_to_buf;
+use crate::deserialize::yyjson::*;
+use crate::deserialize::DeserializeError;
+use crate::ffi::yyjson::{yyjson_doc, yyjson_doc_free, yyjson_val};
+use crate::str::unicode_to_str;
+use core::ffi::{c_char, c_ulong, c_void};
+use core::ptr::{null_mut, NonNull};
+use pyo3_ffi::*;
+
+/// A read-only view of an array or object in a yyjson doc. Nodes are
+/// converted to Python objects only when accessed. Every view of a doc holds
+/// a reference to the root view, which frees the doc.
+#[repr(C)]
+pub struct LazyDocument {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    owner: *mut PyObject,
+    doc: *mut yyjson_doc,
+    val: *mut yyjson_val,
+}
+
+/// Parse `ptr` and return a `LazyDocument` for the root of the document, or
+/// the value of a document that is a scalar.
+pub fn deserialize_lazy(
+    ptr: *mut PyObject,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    let doc = read_doc_owned(data, allow_threads(ptr))?;
+    let root = yyjson_doc_get_root(doc);
+    if unlikely!(!unsafe_yyjson_is_ctn(root)) {
+        let val = scalar_to_pyobject(root);
+        unsafe { yyjson_doc_free(doc) };
+        return Ok(val);
+    }
+    Ok(nonnull!(new_lazy_document(null_mut(), doc, root)))
+}
+
+fn new_lazy_document(
+    owner: *mut PyObject,
+    doc: *mut yyjson_doc,
+    val: *mut yyjson_val,
+) -> *mut PyObject {
+    let ob_type = crate::module::state().lazy_document_type;
+    ffi!(Py_INCREF(ob_type as *mut PyObject));
+    let obj = Box::new(LazyDocument {
+        ob_refcnt: 1,
+        ob_type: ob_type,
+        owner: owner,
+        doc: doc,
+        val: val,
+    });
+    Box::into_raw(obj) as *mut PyObject
+}
+
+#[inline(always)]
+fn as_lazy(obj: *mut PyObject) -> &'static LazyDocument {
+    unsafe { &*(obj as *mut LazyDocument) }
+}
+
+/// Return `val` as a Python object: a new `LazyDocument` sharing the doc of
+/// `parent` if it is an array or object, otherwise a scalar.
+fn child(parent: *mut PyObject, val: *mut yyjson_val) -> *mut PyObject {
+    if unsafe_yyjson_is_ctn(val) {
+        let lazy = as_lazy(parent);
+        let root = if lazy.owner.is_null() {
+            parent
+        } else {
+            lazy.owner
+        };
+        ffi!(Py_INCREF(root));
+        new_lazy_document(root, lazy.doc, val)
+    } else {
+        scalar_to_pyobject(val).as_ptr()
+    }
+}
+
+#[cold]
+#[inline(never)]
+fn raise_type_error(msg: &str) -> *mut PyObject {
+    unsafe {
+        let err_msg =
+            PyUnicode_FromStringAndSize(msg.as_ptr() as *const c_char, msg.len() as isize);
+        PyErr_SetObject(PyExc_TypeError, err_msg);
+        Py_DECREF(err_msg);
+    };
+    null_mut()
+}
+
+/// Look up `key` in `obj`. If `key` is not found, return null without
+/// setting an exception.
+fn subscript_object(obj: *mut PyObject, key: *mut PyObject) -> *mut PyObject {
+    if unlikely!(ffi!(PyUnicode_Check(key)) == 0) {
+        return null_mut();
+    }
+    match unicode_to_str(key).and_then(|key_str| yyjson_obj_get(as_lazy(obj).val, key_str)) {
+        Some(val) => child(obj, val),
+        None => {
+            ffi!(PyErr_Clear());
+            null_mut()
+        }
+    }
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_lazydocument_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    let lazy = as_lazy(object);
+    if lazy.owner.is_null() {
+        yyjson_doc_free(lazy.doc);
+    } else {
+        Py_DECREF(lazy.owner);
+    }
+    std::alloc::dealloc(object as *mut u8, std::alloc::Layout::new::<LazyDocument>());
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_length(object: *mut PyObject) -> Py_ssize_t {
+    unsafe_yyjson_get_len(as_lazy(object).val) as Py_ssize_t
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_subscript(
+    object: *mut PyObject,
+    key: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let val = as_lazy(object).val;
+    if unsafe_yyjson_is_arr(val) {
+        if unlikely!(PyIndex_Check(key) == 0) {
+            return raise_type_error("LazyDocument array indices must be integers");
+        }
+        let mut idx = PyNumber_AsSsize_t(key, PyExc_IndexError);
+        if unlikely!(idx == -1 && !PyErr_Occurred().is_null()) {
+            return null_mut();
+        }
+        let len = unsafe_yyjson_get_len(val) as Py_ssize_t;
+        if idx < 0 {
+            idx += len;
+        }
+        if unlikely!(idx < 0 || idx >= len) {
+            PyErr_SetString(
+                PyExc_IndexError,
+                "LazyDocument index out of range\0".as_ptr() as *const c_char,
+            );
+            return null_mut();
+        }
+        child(object, yyjson_arr_get(val, idx as usize))
+    } else {
+        let ret = subscript_object(object, key);
+        if unlikely!(ret.is_null()) {
+            PyErr_SetObject(PyExc_KeyError, key);
+        }
+        ret
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_get(
+    object: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    if let Err(msg) = crate::args::parse_args(
+        "get",
+        &["key", "default"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_type_error(&msg);
+    }
+    if unlikely!(unsafe_yyjson_is_arr(as_lazy(object).val)) {
+        return raise_type_error("LazyDocument is not an object");
+    }
+    let ret = subscript_object(object, argv[0].unwrap().as_ptr());
+    if ret.is_null() {
+        match argv[1] {
+            Some(default) => {
+                Py_INCREF(default.as_ptr());
+                default.as_ptr()
+            }
+            None => use_immortal!(crate::typeref::NONE),
+        }
+    } else {
+        ret
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_keys(
+    object: *mut PyObject,
+    _unused: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let val = as_lazy(object).val;
+    if unlikely!(unsafe_yyjson_is_arr(val)) {
+        return raise_type_error("LazyDocument is not an object");
+    }
+    let len = unsafe_yyjson_get_len(val);
+    let list = PyList_New(len as isize);
+    let mut next_key = unsafe_yyjson_get_first(val);
+    for idx in 0..len {
+        let key = yyjson_get_str(next_key);
+        PyList_SET_ITEM(list, idx as isize, crate::str::unicode_from_str(key));
+        next_key = next_sibling(next_key.add(1));
+    }
+    list
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_materialize(
+    object: *mut PyObject,
+    _unused: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    val_to_pyobject(as_lazy(object).val).as_ptr()
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazydocument_iter(object: *mut PyObject) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let val = as_lazy(object).val;
+    Py_INCREF(object);
+    let ob_type = crate::module::state().lazy_iterator_type;
+    Py_INCREF(ob_type as *mut PyObject);
+    let iter = Box::new(LazyIterator {
+        ob_refcnt: 1,
+        ob_type: ob_type,
+        lazy: object,
+        next: unsafe_yyjson_get_first(val),
+        remaining: unsafe_yyjson_get_len(val),
+    });
+    Box::into_raw(iter) as *mut PyObject
+}
+
+/// An iterator of the values of an array or the keys of an object in a
+/// `LazyDocument`, which it holds a reference to. Values are converted as
+/// they are reached.
+#[repr(C)]
+pub struct LazyIterator {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    lazy: *mut PyObject,
+    next: *mut yyjson_val,
+    remaining: usize,
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_lazyiterator_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    let iter = Box::from_raw(object as *mut LazyIterator);
+    Py_DECREF(iter.lazy);
+    drop(iter);
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_lazyiterator_next(object: *mut PyObject) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let iter = &mut *(object as *mut LazyIterator);
+    if iter.remaining == 0 {
+        return null_mut();
+    }
+    iter.remaining -= 1;
+    let val = iter.next;
+    if unsafe_yyjson_is_arr(as_lazy(iter.lazy).val) {
+        iter.next = next_sibling(val);
+        child(iter.lazy, val)
+    } else {
+        iter.next = next_sibling(val.add(1));
+        crate::str::unicode_from_str(yyjson_get_str(val))
+    }
+}
+
+#[cfg(Py_3_10)]
+const LAZY_DOCUMENT_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_IMMUTABLETYPE;
+
+#[cfg(not(Py_3_10))]
+const LAZY_DOCUMENT_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT;
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_lazyiteratortype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    crate::module::new_type(
+        module,
+        "xorjson.LazyIterator\0",
+        core::mem::size_of::<LazyIterator>(),
+        LAZY_DOCUMENT_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_lazyiterator_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iter,
+                pfunc: PyObject_SelfIter as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iternext,
+                pfunc: xorjson_lazyiterator_next as *mut c_void,
+            },
+        ],
+    )
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_lazydocumenttype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    let methods = Box::new([
+        PyMethodDef {
+            ml_name: "get\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: xorjson_lazydocument_get,
+            },
+            ml_flags: METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: "get(key, default=None)\n--\n\nReturn the value of key if the object has it, else default.\0"
+                .as_ptr() as *const c_char,
+        },
+        PyMethodDef {
+            ml_name: "keys\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: xorjson_lazydocument_keys,
+            },
+            ml_flags: METH_NOARGS,
+            ml_doc: "keys()\n--\n\nReturn a list of the keys of the object.\0".as_ptr()
+                as *const c_char,
+        },
+        PyMethodDef {
+            ml_name: "materialize\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: xorjson_lazydocument_materialize,
+            },
+            ml_flags: METH_NOARGS,
+            ml_doc: "materialize()\n--\n\nDeserialize the value to Python objects as loads() does.\0"
+                .as_ptr() as *const c_char,
+        },
+        PyMethodDef::zeroed(),
+    ]);
+    crate::module::new_type(
+        module,
+        "xorjson.LazyDocument\0",
+        core::mem::size_of::<LazyDocument>(),
+        LAZY_DOCUMENT_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_lazydocument_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_mp_length,
+                pfunc: xorjson_lazydocument_length as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_mp_subscript,
+                pfunc: xorjson_lazydocument_subscript as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iter,
+                pfunc: xorjson_lazydocument_iter as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_methods,
+                pfunc: Box::into_raw(methods) as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_doc,
+                pfunc: "A read-only view of a document returned by loads_lazy().\0".as_ptr()
+                    as *mut c_void,
+            },
+        ],
+    )
+}
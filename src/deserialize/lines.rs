@@ -0,0 +1,67 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::deserializer::deserialize_buffer;
+use crate::deserialize::utf8::read_input;
+use crate::deserialize::DeserializeError;
+use crate::typeref::{BYTEARRAY_TYPE, BYTES_TYPE, MEMORYVIEW_TYPE, READ_METHOD_STR, STR_TYPE};
+use core::ptr::NonNull;
+use std::borrow::Cow;
+
+/// Return a new reference to the contents of `ptr`. If `ptr` is a file
+/// object, this is the result of calling its `read()` method; otherwise it
+/// is `ptr` itself.
+pub fn read_file_object(
+    ptr: *mut pyo3_ffi::PyObject,
+) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+    let obj_type_ptr = ob_type!(ptr);
+    if is_type!(obj_type_ptr, BYTES_TYPE)
+        || is_type!(obj_type_ptr, STR_TYPE)
+        || is_type!(obj_type_ptr, MEMORYVIEW_TYPE)
+        || is_type!(obj_type_ptr, BYTEARRAY_TYPE)
+        || ffi!(PyObject_HasAttr(ptr, READ_METHOD_STR)) == 0
+    {
+        ffi!(Py_INCREF(ptr));
+        return Ok(nonnull!(ptr));
+    }
+    let contents = call_method!(ptr, READ_METHOD_STR);
+    if unlikely!(contents.is_null()) {
+        return Err(DeserializeError::invalid(Cow::Borrowed(
+            "File object read() raised an exception",
+        )));
+    }
+    Ok(nonnull!(contents))
+}
+
+/// Deserialize newline-delimited JSON to a list. The input is validated as
+/// UTF-8 once and each non-blank line is then deserialized as a document.
+pub fn deserialize_lines(
+    ptr: *mut pyo3_ffi::PyObject,
+) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+    let buffer = read_input(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+
+    let mut values: Vec<*mut pyo3_ffi::PyObject> = Vec::new();
+    let mut offset: usize = 0;
+    for (idx, line) in buffer.split(|&ch| ch == b'\n').enumerate() {
+        let start = offset;
+        offset += line.len() + 1;
+        if line.iter().all(|&ch| matches!(ch, b' ' | b'\t' | b'\r')) {
+            continue;
+        }
+        match deserialize_buffer(line, false) {
+            Ok(val) => values.push(val.as_ptr()),
+            Err(err) => {
+                for each in values {
+                    ffi!(Py_DECREF(each));
+                }
+                return Err(err.relocate(start, idx, data));
+            }
+        }
+    }
+
+    let list = ffi!(PyList_New(values.len() as isize));
+    for (i, &each) in values.iter().enumerate() {
+        ffi!(PyList_SET_ITEM(list, i as isize, each));
+    }
+    Ok(nonnull!(list))
+}
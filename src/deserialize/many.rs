@@ -0,0 +1,326 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::DeserializeError;
+use core::ptr::NonNull;
+
+pub type ManyResult = Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>>;
+
+/// Why `deserialize_many()` failed.
+pub enum ManyError {
+    /// The first document that failed, in item order.
+    Deserialize(DeserializeError<'static>),
+    /// A thread that parsed documents panicked.
+    Worker,
+}
+
+#[cfg(feature = "yyjson")]
+mod pool {
+    use crate::deserialize::yyjson::DetachedDoc;
+    use core::sync::atomic::{AtomicUsize, Ordering};
+    use once_cell::race::OnceBox;
+    use std::panic::{catch_unwind, AssertUnwindSafe};
+    use std::sync::mpsc::{channel, Receiver, Sender};
+    use std::sync::{Arc, Condvar, Mutex, MutexGuard};
+
+    /// Documents are parsed on the calling thread if their total length is
+    /// less than this, as handing them to other threads costs more than it
+    /// saves.
+    const PARALLEL_MIN_LEN: usize = 64 * 1024;
+
+    type Job = Box<dyn FnOnce() + Send + 'static>;
+
+    fn lock<T>(mutex: &Mutex<T>) -> MutexGuard<'_, T> {
+        mutex.lock().unwrap_or_else(|err| err.into_inner())
+    }
+
+    /// Threads that parse documents for `loads_many()`. They are started as
+    /// calls need them and kept for the life of the process, so that a call
+    /// does not spawn threads.
+    struct Pool {
+        sender: Mutex<Sender<Job>>,
+        receiver: Arc<Mutex<Receiver<Job>>>,
+        threads: Mutex<usize>,
+    }
+
+    static POOL: OnceBox<Pool> = OnceBox::new();
+
+    impl Pool {
+        fn get() -> &'static Pool {
+            POOL.get_or_init(|| {
+                let (sender, receiver) = channel();
+                Box::new(Pool {
+                    sender: Mutex::new(sender),
+                    receiver: Arc::new(Mutex::new(receiver)),
+                    threads: Mutex::new(0),
+                })
+            })
+        }
+
+        /// Start threads until there are `count`, and return how many there
+        /// are, which is fewer if a thread cannot be started.
+        fn reserve(&self, count: usize) -> usize {
+            let mut threads = lock(&self.threads);
+            while *threads < count {
+                let receiver = self.receiver.clone();
+                let spawned = std::thread::Builder::new()
+                    .name(String::from("xorjson-loads-many"))
+                    .spawn(move || loop {
+                        let job = match lock(&receiver).recv() {
+                            Ok(job) => job,
+                            Err(_) => return,
+                        };
+                        job();
+                    });
+                if spawned.is_err() {
+                    break;
+                }
+                *threads += 1;
+            }
+            *threads
+        }
+
+        fn submit(&self, job: Job) {
+            let _ = lock(&self.sender).send(job);
+        }
+    }
+
+    #[derive(Default)]
+    struct HelperState {
+        started: usize,
+        finished: usize,
+        closed: bool,
+        panicked: bool,
+    }
+
+    /// The state shared by a call and the jobs it submits to the pool.
+    #[derive(Default)]
+    struct Helpers {
+        state: Mutex<HelperState>,
+        done: Condvar,
+    }
+
+    impl Helpers {
+        /// Return whether a job may start, which it may not once the call
+        /// has closed.
+        fn start(&self) -> bool {
+            let mut state = lock(&self.state);
+            if state.closed {
+                return false;
+            }
+            state.started += 1;
+            true
+        }
+
+        fn finish(&self, ok: bool) {
+            let mut state = lock(&self.state);
+            state.finished += 1;
+            state.panicked |= !ok;
+            self.done.notify_all();
+        }
+
+        /// Stop the jobs that have not started from starting, wait for those
+        /// that have, and return whether any panicked.
+        fn close(&self) -> bool {
+            let mut state = lock(&self.state);
+            state.closed = true;
+            while state.finished < state.started {
+                state = self.done.wait(state).unwrap_or_else(|err| err.into_inner());
+            }
+            state.panicked
+        }
+    }
+
+    /// Parse each of `inputs` with up to `threads` threads, the calling
+    /// thread and those of the pool. The thread state must be released.
+    /// Return `None` if a thread panicked.
+    pub fn parse(
+        inputs: &[(usize, &'static str)],
+        threads: usize,
+    ) -> Option<Vec<(usize, DetachedDoc)>> {
+        let next = AtomicUsize::new(0);
+        let parsed: Mutex<Vec<(usize, DetachedDoc)>> = Mutex::new(Vec::with_capacity(inputs.len()));
+        let work = || {
+            let mut out: Vec<(usize, DetachedDoc)> = Vec::new();
+            loop {
+                let job = next.fetch_add(1, Ordering::Relaxed);
+                if job >= inputs.len() {
+                    break;
+                }
+                let (idx, data) = inputs[job];
+                out.push((idx, DetachedDoc::read(data)));
+            }
+            lock(&parsed).extend(out);
+        };
+
+        let total: usize = inputs.iter().map(|each| each.1.len()).sum();
+        let mut helpers = threads.clamp(1, inputs.len()) - 1;
+        if total < PARALLEL_MIN_LEN {
+            helpers = 0;
+        }
+        let mut panicked = false;
+        if helpers == 0 {
+            panicked |= catch_unwind(AssertUnwindSafe(work)).is_err();
+        } else {
+            let pool = Pool::get();
+            let state = Arc::new(Helpers::default());
+            let work_ref: &(dyn Fn() + Sync) = &work;
+            // The jobs borrow `work`, which lives until this returns: a job
+            // that has started is waited for, and one that starts after the
+            // call closes does not call it.
+            let work_ref: &'static (dyn Fn() + Sync) = unsafe { core::mem::transmute(work_ref) };
+            for _ in 0..pool.reserve(helpers).min(helpers) {
+                let state = state.clone();
+                pool.submit(Box::new(move || {
+                    if state.start() {
+                        state.finish(catch_unwind(AssertUnwindSafe(work_ref)).is_ok());
+                    }
+                }));
+            }
+            panicked |= catch_unwind(AssertUnwindSafe(&work)).is_err();
+            panicked |= state.close();
+        }
+        if unlikely!(panicked) {
+            return None;
+        }
+        Some(parsed.into_inner().unwrap_or_else(|err| err.into_inner()))
+    }
+}
+
+/// Decrement the objects in `results` and return the first error, if any.
+#[cold]
+fn first_error(results: Vec<ManyResult>) -> Option<DeserializeError<'static>> {
+    let mut first: Option<DeserializeError<'static>> = None;
+    for each in results {
+        match each {
+            Ok(val) => ffi!(Py_DECREF(val.as_ptr())),
+            Err(err) => {
+                if first.is_none() {
+                    first = Some(err);
+                }
+            }
+        }
+    }
+    first
+}
+
+/// Deserialize each of `items` as a document. Inputs of type `bytes` or
+/// `str` are parsed by up to `threads` threads with the GIL released and
+/// then converted to Python objects in order on the calling thread. Threads
+/// other than the calling thread are taken from a pool that is started on
+/// first use, and small inputs are parsed on the calling thread only. The
+/// items must stay alive for as long as the returned errors.
+///
+/// If `return_exceptions` is false, the first error in item order is
+/// returned as `Err` and no objects are returned.
+#[cfg(feature = "yyjson")]
+pub fn deserialize_many(
+    items: &[*mut pyo3_ffi::PyObject],
+    threads: usize,
+    return_exceptions: bool,
+) -> Result<Vec<ManyResult>, ManyError> {
+    use crate::deserialize::deserializer::{allow_threads, deserialize_buffer};
+    use crate::deserialize::utf8::read_input_to_buf;
+    use crate::deserialize::yyjson::DetachedDoc;
+
+    enum Slot {
+        Pending(&'static str),
+        Done(ManyResult),
+    }
+
+    // Inputs that another thread could mutate, bytearray and memoryview,
+    // are deserialized here with the GIL held.
+    let mut slots: Vec<Slot> = Vec::with_capacity(items.len());
+    let mut pending: Vec<usize> = Vec::new();
+    for (idx, &item) in items.iter().enumerate() {
+        let slot = match read_input_to_buf(item) {
+            Err(err) => Slot::Done(Err(err)),
+            Ok(buffer) => {
+                if allow_threads(item) {
+                    pending.push(idx);
+                    Slot::Pending(unsafe { std::str::from_utf8_unchecked(buffer) })
+                } else {
+                    Slot::Done(deserialize_buffer(buffer, false))
+                }
+            }
+        };
+        slots.push(slot);
+    }
+
+    let mut docs: Vec<Option<DetachedDoc>> = (0..items.len()).map(|_| None).collect();
+    if !pending.is_empty() {
+        let inputs: Vec<(usize, &'static str)> = pending
+            .iter()
+            .map(|&idx| match slots[idx] {
+                Slot::Pending(data) => (idx, data),
+                Slot::Done(_) => unreachable!(),
+            })
+            .collect();
+        let tstate = ffi!(PyEval_SaveThread());
+        let parsed = pool::parse(&inputs, threads);
+        ffi!(PyEval_RestoreThread(tstate));
+        let parsed = match parsed {
+            Some(parsed) => parsed,
+            None => {
+                for slot in slots {
+                    if let Slot::Done(Ok(val)) = slot {
+                        ffi!(Py_DECREF(val.as_ptr()));
+                    }
+                }
+                return Err(ManyError::Worker);
+            }
+        };
+        for (idx, doc) in parsed {
+            docs[idx] = Some(doc);
+        }
+    }
+
+    if !return_exceptions {
+        let failed = slots.iter().zip(docs.iter()).any(|(slot, doc)| match slot {
+            Slot::Done(res) => res.is_err(),
+            Slot::Pending(_) => doc.as_ref().map_or(false, DetachedDoc::is_err),
+        });
+        if unlikely!(failed) {
+            let results: Vec<ManyResult> = slots
+                .into_iter()
+                .zip(docs)
+                .filter_map(|(slot, doc)| match slot {
+                    Slot::Done(res) => Some(res),
+                    Slot::Pending(data) => doc
+                        .filter(DetachedDoc::is_err)
+                        .map(|doc| doc.materialize(data)),
+                })
+                .collect();
+            return Err(ManyError::Deserialize(first_error(results).unwrap()));
+        }
+    }
+
+    Ok(slots
+        .into_iter()
+        .zip(docs)
+        .map(|(slot, doc)| match slot {
+            Slot::Done(res) => res,
+            Slot::Pending(data) => doc.unwrap().materialize(data),
+        })
+        .collect())
+}
+
+/// Deserialize each of `items` as a document on the calling thread. The
+/// serde_json backend creates Python objects while parsing, so `threads` is
+/// not used.
+#[cfg(not(feature = "yyjson"))]
+pub fn deserialize_many(
+    items: &[*mut pyo3_ffi::PyObject],
+    _threads: usize,
+    return_exceptions: bool,
+) -> Result<Vec<ManyResult>, ManyError> {
+    let mut results: Vec<ManyResult> = Vec::with_capacity(items.len());
+    for &item in items {
+        let res = crate::deserialize::deserialize(item);
+        if unlikely!(res.is_err() && !return_exceptions) {
+            results.push(res);
+            return Err(ManyError::Deserialize(first_error(results).unwrap()));
+        }
+        results.push(res);
+    }
+    Ok(results)
+}
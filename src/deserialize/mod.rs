@@ -1,9 +1,27 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+#[cfg(feature = "yyjson")]
+mod builder;
 mod cache;
+mod columns;
+mod decoder;
 mod deserializer;
 mod error;
+mod events;
+mod file;
+mod inspect;
+#[cfg(feature = "yyjson")]
+mod lazy;
+mod lines;
+mod many;
+#[cfg(feature = "yyjson")]
+mod numpy;
+mod pointer;
 mod pyobject;
+#[cfg(feature = "yyjson")]
+mod reformat;
+#[cfg(feature = "yyjson")]
+mod typed;
 mod utf8;
 
 #[cfg(not(feature = "yyjson"))]
@@ -12,6 +30,24 @@ mod json;
 #[cfg(feature = "yyjson")]
 mod yyjson;
 
-pub use cache::{KeyMap, KEY_MAP};
-pub use deserializer::deserialize;
+pub use cache::{KeyMap, MAX_CAPACITY, MAX_KEY_LEN};
+pub use columns::deserialize_columns;
+pub use decoder::{deserialize_prefix, xorjson_decodertype_new};
+#[cfg(feature = "yyjson")]
+pub use deserializer::deserialize_with_opts;
+pub use deserializer::{deserialize, deserialize_buffer};
 pub use error::DeserializeError;
+pub use events::{init_event_strs, new_event_parser, xorjson_eventparsertype_new};
+pub use file::MappedFile;
+#[cfg(feature = "yyjson")]
+pub use inspect::inspect_document;
+pub use inspect::validate_document;
+#[cfg(feature = "yyjson")]
+pub use lazy::{deserialize_lazy, xorjson_lazydocumenttype_new, xorjson_lazyiteratortype_new};
+pub use lines::{deserialize_lines, read_file_object};
+pub use many::{deserialize_many, ManyError};
+pub use pointer::{deserialize_paths, parse_pointer};
+#[cfg(feature = "yyjson")]
+pub use reformat::reformat;
+#[cfg(feature = "yyjson")]
+pub use typed::{compile_type, deserialize_typed, TypedCache};
@@ -0,0 +1,208 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::yyjson::*;
+use crate::ffi::yyjson::yyjson_val;
+use crate::typeref::NumpyTypes;
+use core::ffi::c_char;
+use core::ptr::null_mut;
+use pyo3_ffi::*;
+
+#[derive(Clone, Copy, PartialEq)]
+enum DType {
+    Int64,
+    Float64,
+}
+
+/// Whether `val` is a number that fits `DType`, widening `dtype` to
+/// `Float64` for a double.
+#[inline(always)]
+fn is_numeric(val: *mut yyjson_val, dtype: &mut DType) -> bool {
+    match ElementType::from_tag(val) {
+        ElementType::Int64 => true,
+        ElementType::Uint64 => unsafe { (*val).uni.u64_ <= i64::MAX as u64 },
+        ElementType::Double => {
+            *dtype = DType::Float64;
+            true
+        }
+        _ => false,
+    }
+}
+
+/// Whether `arr` has the length `shape[0]` and its elements are numbers,
+/// if `shape` has one dimension, or arrays of shape `shape[1..]`.
+fn is_numeric_array(arr: *mut yyjson_val, shape: &[usize], dtype: &mut DType) -> bool {
+    if unsafe_yyjson_get_len(arr) != shape[0] {
+        return false;
+    }
+    let mut val = unsafe_yyjson_get_first(arr);
+    for _ in 0..shape[0] {
+        let valid = if shape.len() == 1 {
+            is_numeric(val, dtype)
+        } else {
+            unsafe_yyjson_is_arr(val) && is_numeric_array(val, &shape[1..], dtype)
+        };
+        if !valid {
+            return false;
+        }
+        val = next_sibling(val);
+    }
+    true
+}
+
+/// Return the shape and dtype of `arr` if it is a non-empty array of numbers
+/// or a rectangular array of such arrays.
+fn numeric_shape(arr: *mut yyjson_val) -> Option<(Vec<usize>, DType)> {
+    let mut shape: Vec<usize> = Vec::new();
+    let mut val = arr;
+    while unsafe_yyjson_is_arr(val) {
+        let len = unsafe_yyjson_get_len(val);
+        if len == 0 {
+            return None;
+        }
+        shape.push(len);
+        val = unsafe_yyjson_get_first(val);
+    }
+    let mut dtype = DType::Int64;
+    if is_numeric_array(arr, &shape, &mut dtype) {
+        Some((shape, dtype))
+    } else {
+        None
+    }
+}
+
+/// Write the numbers of `arr`, which has `ndim` dimensions, to `out` in C
+/// order.
+fn fill<T: Copy>(
+    arr: *mut yyjson_val,
+    ndim: usize,
+    out: &mut *mut T,
+    convert: fn(*mut yyjson_val) -> T,
+) {
+    let mut val = unsafe_yyjson_get_first(arr);
+    for _ in 0..unsafe_yyjson_get_len(arr) {
+        if ndim == 1 {
+            unsafe {
+                core::ptr::write(*out, convert(val));
+                *out = (*out).add(1);
+            }
+        } else {
+            fill(val, ndim - 1, out, convert);
+        }
+        val = next_sibling(val);
+    }
+}
+
+fn to_i64(val: *mut yyjson_val) -> i64 {
+    match ElementType::from_tag(val) {
+        ElementType::Uint64 => unsafe { (*val).uni.u64_ as i64 },
+        _ => unsafe { (*val).uni.i64_ },
+    }
+}
+
+fn to_f64(val: *mut yyjson_val) -> f64 {
+    match ElementType::from_tag(val) {
+        ElementType::Uint64 => unsafe { (*val).uni.u64_ as f64 },
+        ElementType::Int64 => unsafe { (*val).uni.i64_ as f64 },
+        _ => unsafe { (*val).uni.f64_ },
+    }
+}
+
+/// Return a new, uninitialized `numpy.ndarray` of `shape` and `dtype` and a
+/// writable view of it, or `None` with an exception set.
+unsafe fn new_ndarray(
+    types: &NumpyTypes,
+    shape: &[usize],
+    dtype: DType,
+) -> Option<(*mut PyObject, Py_buffer)> {
+    let pyshape = PyTuple_New(shape.len() as isize);
+    for (idx, &dim) in shape.iter().enumerate() {
+        PyTuple_SET_ITEM(pyshape, idx as isize, PyLong_FromSize_t(dim));
+    }
+    let args = PyTuple_New(1);
+    PyTuple_SET_ITEM(args, 0, pyshape);
+    let kwargs = PyDict_New();
+    let pydtype = match dtype {
+        DType::Int64 => types.int64,
+        DType::Float64 => types.float64,
+    };
+    PyDict_SetItemString(
+        kwargs,
+        "dtype\0".as_ptr() as *const c_char,
+        pydtype as *mut PyObject,
+    );
+    let ndarray = PyObject_Call(types.empty, args, kwargs);
+    Py_DECREF(kwargs);
+    Py_DECREF(args);
+    if unlikely!(ndarray.is_null()) {
+        return None;
+    }
+    let mut view: Py_buffer = core::mem::zeroed();
+    if unlikely!(PyObject_GetBuffer(ndarray, &mut view, PyBUF_WRITABLE) != 0) {
+        Py_DECREF(ndarray);
+        return None;
+    }
+    Some((ndarray, view))
+}
+
+/// Return a new `numpy.ndarray` of `arr` if it is a non-empty array of
+/// numbers or a rectangular array of such arrays, else `None`. The array is
+/// `int64` if every number is an integer that fits and `float64` otherwise.
+/// On failure, `Some(null)` is returned with an exception set.
+pub fn array_to_ndarray(types: &NumpyTypes, arr: *mut yyjson_val) -> Option<*mut PyObject> {
+    let (shape, dtype) = numeric_shape(arr)?;
+    unsafe {
+        let (ndarray, mut view) = match new_ndarray(types, &shape, dtype) {
+            Some(val) => val,
+            None => return Some(null_mut()),
+        };
+        match dtype {
+            DType::Int64 => {
+                let mut out = view.buf as *mut i64;
+                fill(arr, shape.len(), &mut out, to_i64);
+            }
+            DType::Float64 => {
+                let mut out = view.buf as *mut f64;
+                fill(arr, shape.len(), &mut out, to_f64);
+            }
+        }
+        PyBuffer_Release(&mut view);
+        Some(ndarray)
+    }
+}
+
+/// Return a new one-dimensional `numpy.ndarray` of `values` if they are all
+/// numbers, else `None`. A null value is missing and is not a number. On
+/// failure, `Some(null)` is returned with an exception set.
+pub fn values_to_ndarray(types: &NumpyTypes, values: &[*mut yyjson_val]) -> Option<*mut PyObject> {
+    if values.is_empty() {
+        return None;
+    }
+    let mut dtype = DType::Int64;
+    for &val in values {
+        if val.is_null() || !is_numeric(val, &mut dtype) {
+            return None;
+        }
+    }
+    unsafe {
+        let (ndarray, mut view) = match new_ndarray(types, &[values.len()], dtype) {
+            Some(val) => val,
+            None => return Some(null_mut()),
+        };
+        match dtype {
+            DType::Int64 => {
+                let out = view.buf as *mut i64;
+                for (idx, &val) in values.iter().enumerate() {
+                    core::ptr::write(out.add(idx), to_i64(val));
+                }
+            }
+            DType::Float64 => {
+                let out = view.buf as *mut f64;
+                for (idx, &val) in values.iter().enumerate() {
+                    core::ptr::write(out.add(idx), to_f64(val));
+                }
+            }
+        }
+        PyBuffer_Release(&mut view);
+        Some(ndarray)
+    }
+}
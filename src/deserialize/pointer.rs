@@ -0,0 +1,171 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::DeserializeError;
+use crate::opt::Opt;
+use core::ptr::NonNull;
+use pyo3_ffi::PyObject;
+
+/// Parse an RFC 6901 JSON Pointer into its reference tokens, unescaping
+/// `~1` and `~0`. Return `None` if `pointer` is not a valid pointer. The
+/// empty pointer refers to the whole document.
+pub fn parse_pointer(pointer: &str) -> Option<Vec<String>> {
+    if pointer.is_empty() {
+        return Some(Vec::new());
+    }
+    if unlikely!(!pointer.starts_with('/')) {
+        return None;
+    }
+    let mut tokens: Vec<String> = Vec::new();
+    for raw in pointer[1..].split('/') {
+        if likely!(!raw.contains('~')) {
+            tokens.push(raw.to_string());
+            continue;
+        }
+        let mut token = String::with_capacity(raw.len());
+        let mut chars = raw.chars();
+        while let Some(ch) = chars.next() {
+            if ch == '~' {
+                match chars.next() {
+                    Some('0') => token.push('~'),
+                    Some('1') => token.push('/'),
+                    _ => return None,
+                }
+            } else {
+                token.push(ch);
+            }
+        }
+        tokens.push(token);
+    }
+    Some(tokens)
+}
+
+/// Return the array index referred to by `token`, which must be a decimal
+/// integer without leading zeros.
+pub fn array_index(token: &str) -> Option<usize> {
+    if token.is_empty()
+        || (token.len() > 1 && token.starts_with('0'))
+        || !token.bytes().all(|ch| ch.is_ascii_digit())
+    {
+        None
+    } else {
+        token.parse().ok()
+    }
+}
+
+/// Deserialize the values that `pointers` refer to in the document `ptr`
+/// to a dict keyed by the first element of each pair. Pointers that refer
+/// to no value are omitted. Only the selected values are converted to
+/// Python objects.
+#[cfg(feature = "yyjson")]
+pub fn deserialize_paths(
+    ptr: *mut PyObject,
+    pointers: &[(NonNull<PyObject>, Vec<String>)],
+    opts: Opt,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    use crate::deserialize::builder::Builder;
+    use crate::deserialize::deserializer::allow_threads;
+    use crate::deserialize::utf8::read_input_to_buf;
+    use crate::deserialize::yyjson::*;
+
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    let mut builder = if opts == 0 {
+        None
+    } else {
+        Some(Builder::new(opts)?)
+    };
+    with_doc(data, allow_threads(ptr), |doc| {
+        let dict = ffi!(PyDict_New());
+        let root = yyjson_doc_get_root(doc);
+        for (key, tokens) in pointers {
+            if let Some(val) = resolve_yyjson(root, tokens) {
+                let pyval = match builder.as_mut() {
+                    Some(builder) => match builder.build(val) {
+                        Ok(pyval) => pyval.as_ptr(),
+                        Err(err) => {
+                            ffi!(Py_DECREF(dict));
+                            return Err(err);
+                        }
+                    },
+                    None => val_to_pyobject(val).as_ptr(),
+                };
+                ffi!(PyDict_SetItem(dict, key.as_ptr(), pyval));
+                ffi!(Py_DECREF(pyval));
+            }
+        }
+        Ok(nonnull!(dict))
+    })?
+}
+
+/// Return the value `tokens` refer to in `root`, if any.
+#[cfg(feature = "yyjson")]
+pub fn resolve_yyjson(
+    root: *mut crate::ffi::yyjson::yyjson_val,
+    tokens: &[String],
+) -> Option<*mut crate::ffi::yyjson::yyjson_val> {
+    use crate::deserialize::yyjson::*;
+
+    let mut val = root;
+    for token in tokens {
+        if !unsafe_yyjson_is_ctn(val) {
+            return None;
+        } else if unsafe_yyjson_is_arr(val) {
+            let idx = array_index(token)?;
+            if idx >= unsafe_yyjson_get_len(val) {
+                return None;
+            }
+            val = yyjson_arr_get(val, idx);
+        } else {
+            val = yyjson_obj_get(val, token)?;
+        }
+    }
+    Some(val)
+}
+
+/// Deserialize the values that `pointers` refer to in the document `ptr`.
+/// The serde_json backend creates Python objects while parsing, so the
+/// whole document is deserialized and the values are then selected.
+#[cfg(not(feature = "yyjson"))]
+pub fn deserialize_paths(
+    ptr: *mut PyObject,
+    pointers: &[(NonNull<PyObject>, Vec<String>)],
+    _opts: Opt,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    let obj = crate::deserialize::deserialize(ptr)?;
+    let dict = ffi!(PyDict_New());
+    for (key, tokens) in pointers {
+        if let Some(val) = resolve_pyobject(obj.as_ptr(), tokens) {
+            ffi!(PyDict_SetItem(dict, key.as_ptr(), val));
+        }
+    }
+    ffi!(Py_DECREF(obj.as_ptr()));
+    Ok(nonnull!(dict))
+}
+
+/// Return a borrowed reference to the value `tokens` refer to in `root`, a
+/// value returned by `loads()`.
+#[cfg(not(feature = "yyjson"))]
+pub fn resolve_pyobject(root: *mut PyObject, tokens: &[String]) -> Option<*mut PyObject> {
+    use crate::typeref::{DICT_TYPE, LIST_TYPE};
+
+    let mut val = root;
+    for token in tokens {
+        if is_type!(ob_type!(val), DICT_TYPE) {
+            let key = crate::str::unicode_from_str(token);
+            val = ffi!(PyDict_GetItem(val, key));
+            ffi!(Py_DECREF(key));
+            if val.is_null() {
+                return None;
+            }
+        } else if is_type!(ob_type!(val), LIST_TYPE) {
+            let idx = array_index(token)?;
+            if idx >= ffi!(Py_SIZE(val)) as usize {
+                return None;
+            }
+            val = ffi!(PyList_GET_ITEM(val, idx as isize));
+        } else {
+            return None;
+        }
+    }
+    Some(val)
+}
@@ -1,34 +1,26 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
-use crate::deserialize::cache::*;
 use crate::str::{hash_str, unicode_from_str};
 use crate::typeref::{FALSE, NONE, TRUE};
 use core::ptr::NonNull;
 
 #[inline(always)]
 pub fn get_unicode_key(key_str: &str) -> *mut pyo3_ffi::PyObject {
-    if unlikely!(key_str.len() > 64) {
+    crate::module::state().key_map.get(key_str, || {
         let pyob = unicode_from_str(key_str);
         hash_str(pyob);
         pyob
-    } else {
-        let hash = cache_hash(key_str.as_bytes());
-        unsafe {
-            let entry = KEY_MAP
-                .get_mut()
-                .unwrap_or_else(|| unreachable!())
-                .entry(&hash)
-                .or_insert_with(
-                    || hash,
-                    || {
-                        let pyob = unicode_from_str(key_str);
-                        hash_str(pyob);
-                        CachedKey::new(pyob)
-                    },
-                );
-            entry.get()
-        }
-    }
+    })
+}
+
+/// Return a string value, which is shared with earlier equal values if it is
+/// short. Unlike a key, it is not hashed.
+#[cfg(feature = "yyjson")]
+#[inline(always)]
+pub fn get_unicode_value(val_str: &str) -> *mut pyo3_ffi::PyObject {
+    crate::module::state()
+        .value_map
+        .get(val_str, || unicode_from_str(val_str))
 }
 
 #[allow(dead_code)]
@@ -0,0 +1,152 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::deserializer::allow_threads;
+use crate::deserialize::utf8::read_input_to_buf;
+use crate::deserialize::yyjson::*;
+use crate::deserialize::DeserializeError;
+use crate::ffi::yyjson::yyjson_val;
+use crate::opt::{Opt, SORT_KEYS};
+use core::ptr::NonNull;
+use serde::ser::{Serialize, SerializeMap, SerializeSeq, Serializer};
+use smallvec::SmallVec;
+use std::collections::HashMap;
+
+/// As for `dumps()`, containers nested this deep are an error.
+const RECURSION_LIMIT: u16 = 255;
+
+type Members = SmallVec<[(&'static str, *mut yyjson_val); 8]>;
+
+/// Serializes a yyjson value as `dumps()` serializes the result of
+/// `loads()` for it.
+struct ValueSerializer {
+    val: *mut yyjson_val,
+    sort_keys: bool,
+    depth: u16,
+}
+
+impl ValueSerializer {
+    fn child(&self, val: *mut yyjson_val) -> Self {
+        ValueSerializer {
+            val: val,
+            sort_keys: self.sort_keys,
+            depth: self.depth + 1,
+        }
+    }
+}
+
+/// Return whether `members` has a key more than once.
+fn has_duplicate_keys(members: &Members) -> bool {
+    if members.len() <= 16 {
+        members
+            .iter()
+            .enumerate()
+            .any(|(idx, each)| members[..idx].iter().any(|prev| prev.0 == each.0))
+    } else {
+        let mut keys: Vec<&str> = members.iter().map(|each| each.0).collect();
+        keys.sort_unstable();
+        keys.windows(2).any(|pair| pair[0] == pair[1])
+    }
+}
+
+/// Return the members of the object `obj`. Of duplicate keys, the value of
+/// the last is kept in the position of the first, as in the dict that
+/// `loads()` returns.
+fn object_members(obj: *mut yyjson_val, sort_keys: bool) -> Members {
+    let len = unsafe_yyjson_get_len(obj);
+    let mut members: Members = SmallVec::with_capacity(len);
+    let mut next_key = unsafe_yyjson_get_first(obj);
+    for _ in 0..len {
+        let val = unsafe { next_key.add(1) };
+        members.push((yyjson_get_str(next_key), val));
+        next_key = next_sibling(val);
+    }
+    if sort_keys {
+        // The stable sort of the reversed members puts the last of duplicate
+        // keys first, which is the one dedup_by() keeps.
+        members.reverse();
+        members.sort_by(|a, b| a.0.cmp(b.0));
+        members.dedup_by(|a, b| a.0 == b.0);
+    } else if unlikely!(len > 1 && has_duplicate_keys(&members)) {
+        let mut positions: HashMap<&str, usize> = HashMap::with_capacity(len);
+        let mut deduped: Members = SmallVec::with_capacity(len);
+        for &(key, val) in members.iter() {
+            match positions.get(key) {
+                Some(&idx) => deduped[idx].1 = val,
+                None => {
+                    positions.insert(key, deduped.len());
+                    deduped.push((key, val));
+                }
+            }
+        }
+        members = deduped;
+    }
+    members
+}
+
+impl Serialize for ValueSerializer {
+    fn serialize<S>(&self, serializer: S) -> Result<S::Ok, S::Error>
+    where
+        S: Serializer,
+    {
+        let val = self.val;
+        match ElementType::from_tag(val) {
+            ElementType::String => serializer.serialize_str(yyjson_get_str(val)),
+            ElementType::Uint64 => serializer.serialize_u64(unsafe { (*val).uni.u64_ }),
+            ElementType::Int64 => serializer.serialize_i64(unsafe { (*val).uni.i64_ }),
+            ElementType::Double => serializer.serialize_f64(unsafe { (*val).uni.f64_ }),
+            ElementType::Null => serializer.serialize_unit(),
+            ElementType::True => serializer.serialize_bool(true),
+            ElementType::False => serializer.serialize_bool(false),
+            ElementType::Array => {
+                if unlikely!(self.depth == RECURSION_LIMIT) {
+                    err!("Recursion limit reached")
+                }
+                let len = unsafe_yyjson_get_len(val);
+                if len == 0 {
+                    return serializer.serialize_bytes(b"[]");
+                }
+                let mut seq = serializer.serialize_seq(None).unwrap();
+                let mut next = unsafe_yyjson_get_first(val);
+                for _ in 0..len {
+                    seq.serialize_element(&self.child(next))?;
+                    next = next_sibling(next);
+                }
+                seq.end()
+            }
+            ElementType::Object => {
+                if unlikely!(self.depth == RECURSION_LIMIT) {
+                    err!("Recursion limit reached")
+                }
+                if unsafe_yyjson_get_len(val) == 0 {
+                    return serializer.serialize_bytes(b"{}");
+                }
+                let mut map = serializer.serialize_map(None).unwrap();
+                for (key, each) in object_members(val, self.sort_keys) {
+                    map.serialize_key(key).unwrap();
+                    map.serialize_value(&self.child(each))?;
+                }
+                map.end()
+            }
+        }
+    }
+}
+
+/// Reformat the JSON document `ptr` to bytes as `dumps(loads(ptr),
+/// option=opts)` would, without creating Python objects. The outer error is
+/// for an invalid document and the inner error for one that cannot be
+/// serialized.
+pub fn reformat(
+    ptr: *mut pyo3_ffi::PyObject,
+    opts: Opt,
+) -> Result<Result<NonNull<pyo3_ffi::PyObject>, String>, DeserializeError<'static>> {
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    with_doc(data, allow_threads(ptr), |doc| {
+        let root = ValueSerializer {
+            val: yyjson_doc_get_root(doc),
+            sort_keys: opt_enabled!(opts, SORT_KEYS),
+            depth: 0,
+        };
+        crate::serialize::serialize_with(&root, opts)
+    })
+}
@@ -0,0 +1,791 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::builder::Builder;
+use crate::deserialize::pyobject::get_unicode_key;
+use crate::deserialize::yyjson::*;
+use crate::deserialize::DeserializeError;
+use crate::ffi::yyjson::yyjson_val;
+use crate::opt::Opt;
+use crate::typeref::{
+    DATACLASS_FIELDS_STR, DATETIME_TYPE, DATE_TYPE, DICT_TYPE, FALSE, FIELD_TYPE_STR, FLOAT_TYPE,
+    LIST_TYPE, NONE, NONE_TYPE, TRUE,
+};
+use core::ffi::c_char;
+use core::ptr::{null_mut, NonNull};
+use pyo3_ffi::*;
+use std::borrow::Cow;
+
+/// How a value is deserialized for its annotation.
+pub enum TypePlan {
+    Any,
+    Float,
+    DateTime,
+    Date,
+    Uuid,
+    Optional(Box<TypePlan>),
+    List(Box<TypePlan>),
+    Dict(Box<TypePlan>),
+    Dataclass(NonNull<DataclassPlan>),
+}
+
+pub struct DataclassPlan {
+    cls: *mut PyObject,
+    fields: Vec<FieldPlan>,
+    /// Whether the fields can be passed by position. `fields()` leaves out
+    /// pseudo-fields such as `InitVar`, which `__init__` still takes in the
+    /// order they are declared, so with them every field is passed by
+    /// keyword.
+    positional: bool,
+}
+
+struct FieldPlan {
+    name: String,
+    pyname: *mut PyObject,
+    /// Whether the field can only be passed by keyword.
+    kw_only: bool,
+    plan: TypePlan,
+}
+
+struct TypingRefs {
+    get_type_hints: *mut PyObject,
+    get_origin: *mut PyObject,
+    get_args: *mut PyObject,
+    fields: *mut PyObject,
+    union: *mut PyObject,
+    union_type: *mut PyObject,
+}
+
+impl Drop for TypingRefs {
+    fn drop(&mut self) {
+        for each in [
+            self.get_type_hints,
+            self.get_origin,
+            self.get_args,
+            self.fields,
+            self.union,
+            self.union_type,
+        ] {
+            ffi!(Py_XDECREF(each));
+        }
+    }
+}
+
+/// The typing functions and the compiled dataclass plans of an interpreter,
+/// kept in its `ModuleState`. The lock of the cache is not held while
+/// Python code runs.
+#[derive(Default)]
+pub struct TypedCache {
+    refs: Option<Box<TypingRefs>>,
+    /// Plans of each dataclass that has been compiled. A plan holds a
+    /// reference to its class and is kept until the module is freed, so
+    /// plans may refer to each other.
+    plans: Vec<NonNull<DataclassPlan>>,
+}
+
+impl Drop for TypedCache {
+    fn drop(&mut self) {
+        for each in self.plans.drain(..) {
+            unsafe { free_plan(each) };
+        }
+    }
+}
+
+/// Free `plan` and release the references of it and its fields.
+unsafe fn free_plan(plan: NonNull<DataclassPlan>) {
+    let plan = Box::from_raw(plan.as_ptr());
+    for field in plan.fields.iter() {
+        Py_DECREF(field.pyname);
+    }
+    Py_DECREF(plan.cls);
+}
+
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+unsafe fn look_up_attr(module: &str, name: &str) -> *mut PyObject {
+    let module = PyImport_ImportModule(module.as_ptr() as *const c_char);
+    if module.is_null() {
+        PyErr_Clear();
+        return null_mut();
+    }
+    let ptr = PyObject_GetAttrString(module, name.as_ptr() as *const c_char);
+    if ptr.is_null() {
+        PyErr_Clear();
+    }
+    Py_DECREF(module);
+    ptr
+}
+
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+fn load_typing_refs() -> Box<TypingRefs> {
+    unsafe {
+        Box::new(TypingRefs {
+            get_type_hints: look_up_attr("typing\0", "get_type_hints\0"),
+            get_origin: look_up_attr("typing\0", "get_origin\0"),
+            get_args: look_up_attr("typing\0", "get_args\0"),
+            fields: look_up_attr("dataclasses\0", "fields\0"),
+            union: look_up_attr("typing\0", "Union\0"),
+            union_type: look_up_attr("types\0", "UnionType\0"),
+        })
+    }
+}
+
+#[inline(always)]
+unsafe fn call_one(func: *mut PyObject, arg: *mut PyObject) -> *mut PyObject {
+    PyObject_CallFunctionObjArgs(func, arg, null_mut::<PyObject>())
+}
+
+/// Return the typing functions of the interpreter. They are looked up
+/// without the lock held, as importing runs Python code, and are kept until
+/// the module is freed.
+#[cold]
+unsafe fn typing_refs() -> &'static TypingRefs {
+    let typed = &crate::module::state().typed;
+    if let Some(refs) = typed.lock().refs.as_deref() {
+        return &*(refs as *const TypingRefs);
+    }
+    let loaded = load_typing_refs();
+    let mut cache = typed.lock();
+    let refs = cache.refs.get_or_insert(loaded);
+    &*(&**refs as *const TypingRefs)
+}
+
+/// Return the cached plan of the dataclass `cls`, if any.
+fn cached_plan(cls: *mut PyObject) -> Option<NonNull<DataclassPlan>> {
+    let cache = crate::module::state().typed.lock();
+    cache
+        .plans
+        .iter()
+        .find(|each| unsafe { each.as_ref().cls } == cls)
+        .copied()
+}
+
+/// Compile the annotation `hint` to a plan. Dataclasses are compiled once
+/// and cached. Return `None` with an exception set if the annotations of a
+/// dataclass cannot be evaluated.
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub fn compile_type(hint: *mut PyObject) -> Option<TypePlan> {
+    unsafe {
+        // Plans are compiled into `pending` without the lock held, as
+        // evaluating annotations runs Python code, and are cached only if
+        // the whole annotation compiles. If another thread compiles the same
+        // dataclass meanwhile, both plans are cached and the first is used.
+        let refs = typing_refs();
+        let mut pending: Vec<NonNull<DataclassPlan>> = Vec::new();
+        let plan = compile_hint(refs, &mut pending, hint);
+        if plan.is_some() {
+            crate::module::state().typed.lock().plans.extend(pending);
+        } else {
+            // A plan compiled by this call may refer to one that failed, so
+            // none of them are kept.
+            for each in pending {
+                free_plan(each);
+            }
+        }
+        plan
+    }
+}
+
+unsafe fn compile_hint(
+    refs: &TypingRefs,
+    plans: &mut Vec<NonNull<DataclassPlan>>,
+    hint: *mut PyObject,
+) -> Option<TypePlan> {
+    if PyType_Check(hint) != 0 {
+        let tp = hint as *mut PyTypeObject;
+        if tp == DATETIME_TYPE {
+            return Some(TypePlan::DateTime);
+        } else if tp == DATE_TYPE {
+            return Some(TypePlan::Date);
+        } else if tp == crate::module::state().uuid_type {
+            return Some(TypePlan::Uuid);
+        } else if tp == FLOAT_TYPE {
+            return Some(TypePlan::Float);
+        } else if PyObject_HasAttr(hint, DATACLASS_FIELDS_STR) != 0 {
+            return compile_dataclass(refs, plans, hint).map(TypePlan::Dataclass);
+        }
+    }
+    let origin = call_one(refs.get_origin, hint);
+    if unlikely!(origin.is_null()) {
+        return None;
+    }
+    let args = call_one(refs.get_args, hint);
+    if unlikely!(args.is_null()) {
+        Py_DECREF(origin);
+        return None;
+    }
+    let nargs = Py_SIZE(args);
+    let plan = if origin == LIST_TYPE as *mut PyObject {
+        if nargs == 1 {
+            compile_hint(refs, plans, PyTuple_GET_ITEM(args, 0))
+                .map(|each| TypePlan::List(Box::new(each)))
+        } else {
+            Some(TypePlan::List(Box::new(TypePlan::Any)))
+        }
+    } else if origin == DICT_TYPE as *mut PyObject {
+        if nargs == 2 {
+            compile_hint(refs, plans, PyTuple_GET_ITEM(args, 1))
+                .map(|each| TypePlan::Dict(Box::new(each)))
+        } else {
+            Some(TypePlan::Dict(Box::new(TypePlan::Any)))
+        }
+    } else if origin == refs.union || (!refs.union_type.is_null() && origin == refs.union_type) {
+        // Optional[T] is Union[T, None]. Other unions are not converted.
+        let none = NONE_TYPE as *mut PyObject;
+        if nargs == 2 && PyTuple_GET_ITEM(args, 1) == none {
+            compile_hint(refs, plans, PyTuple_GET_ITEM(args, 0))
+                .map(|each| TypePlan::Optional(Box::new(each)))
+        } else if nargs == 2 && PyTuple_GET_ITEM(args, 0) == none {
+            compile_hint(refs, plans, PyTuple_GET_ITEM(args, 1))
+                .map(|each| TypePlan::Optional(Box::new(each)))
+        } else {
+            Some(TypePlan::Any)
+        }
+    } else {
+        Some(TypePlan::Any)
+    };
+    Py_DECREF(args);
+    Py_DECREF(origin);
+    plan
+}
+
+/// Return whether `__dataclass_fields__` of `cls` holds only fields and no
+/// pseudo-fields, or `None` with an exception set.
+#[cold]
+unsafe fn has_only_fields(cls: *mut PyObject) -> Option<bool> {
+    let fields = PyObject_GetAttr(cls, DATACLASS_FIELDS_STR);
+    if unlikely!(fields.is_null()) {
+        return None;
+    }
+    let field_type = crate::module::state().field_type as *mut PyObject;
+    let mut pos = 0;
+    let mut attr: *mut PyObject = null_mut();
+    let mut field: *mut PyObject = null_mut();
+    let mut res = Some(true);
+    while PyDict_Next(fields, &mut pos, &mut attr, &mut field) != 0 {
+        let each = PyObject_GetAttr(field, FIELD_TYPE_STR);
+        if unlikely!(each.is_null()) {
+            res = None;
+            break;
+        }
+        Py_DECREF(each);
+        if each != field_type {
+            res = Some(false);
+            break;
+        }
+    }
+    Py_DECREF(fields);
+    res
+}
+
+unsafe fn compile_dataclass(
+    refs: &TypingRefs,
+    plans: &mut Vec<NonNull<DataclassPlan>>,
+    cls: *mut PyObject,
+) -> Option<NonNull<DataclassPlan>> {
+    for each in plans.iter() {
+        if each.as_ref().cls == cls {
+            return Some(*each);
+        }
+    }
+    if let Some(each) = cached_plan(cls) {
+        return Some(each);
+    }
+    let hints = call_one(refs.get_type_hints, cls);
+    if unlikely!(hints.is_null()) {
+        return None;
+    }
+    let fields = call_one(refs.fields, cls);
+    if unlikely!(fields.is_null()) {
+        Py_DECREF(hints);
+        return None;
+    }
+    // The plan is added to `plans` before its fields are compiled so that a
+    // dataclass may refer to itself.
+    Py_INCREF(cls);
+    let plan = nonnull!(Box::into_raw(Box::new(DataclassPlan {
+        cls: cls,
+        fields: Vec::new(),
+        positional: false,
+    })));
+    plans.push(plan);
+
+    let mut compiled: Vec<FieldPlan> = Vec::new();
+    let mut valid = true;
+    for idx in 0..Py_SIZE(fields) {
+        let field = PyTuple_GET_ITEM(fields, idx);
+        let init = PyObject_GetAttrString(field, "init\0".as_ptr() as *const c_char);
+        if unlikely!(init.is_null()) {
+            valid = false;
+            break;
+        }
+        Py_DECREF(init);
+        if init == FALSE {
+            continue;
+        }
+        let pyname = PyObject_GetAttrString(field, "name\0".as_ptr() as *const c_char);
+        if unlikely!(pyname.is_null()) {
+            valid = false;
+            break;
+        }
+        let name = match crate::str::unicode_to_str(pyname) {
+            Some(val) => val.to_string(),
+            None => {
+                Py_DECREF(pyname);
+                valid = false;
+                break;
+            }
+        };
+        // Field.kw_only is new in Python 3.10.
+        let kw_only = PyObject_GetAttrString(field, "kw_only\0".as_ptr() as *const c_char);
+        if kw_only.is_null() {
+            PyErr_Clear();
+        } else {
+            Py_DECREF(kw_only);
+        }
+        let hint = PyDict_GetItem(hints, pyname);
+        let field_plan = if hint.is_null() {
+            Some(TypePlan::Any)
+        } else {
+            compile_hint(refs, plans, hint)
+        };
+        match field_plan {
+            Some(each) => compiled.push(FieldPlan {
+                name: name,
+                pyname: pyname,
+                kw_only: kw_only == TRUE,
+                plan: each,
+            }),
+            None => {
+                Py_DECREF(pyname);
+                valid = false;
+                break;
+            }
+        }
+    }
+    Py_DECREF(fields);
+    Py_DECREF(hints);
+    // The fields are kept even if the plan failed, so that they are
+    // released with it.
+    (*plan.as_ptr()).fields = compiled;
+    if unlikely!(!valid) {
+        return None;
+    }
+    match has_only_fields(cls) {
+        Some(val) => (*plan.as_ptr()).positional = val,
+        None => return None,
+    }
+    Some(plan)
+}
+
+struct TypedError {
+    message: Cow<'static, str>,
+    path: Vec<String>,
+}
+
+impl TypedError {
+    #[cold]
+    fn new(message: Cow<'static, str>) -> Self {
+        TypedError {
+            message: message,
+            path: Vec::new(),
+        }
+    }
+
+    #[cold]
+    fn at(mut self, token: String) -> Self {
+        self.path.push(token);
+        self
+    }
+
+    #[cold]
+    fn into_deserialize_error(self) -> DeserializeError<'static> {
+        if self.path.is_empty() {
+            return DeserializeError::invalid(self.message);
+        }
+        let mut pointer = String::new();
+        for token in self.path.iter().rev() {
+            pointer.push('/');
+            pointer.push_str(&token.replace('~', "~0").replace('/', "~1"));
+        }
+        DeserializeError::invalid(Cow::Owned(format!("{} at {}", self.message, pointer)))
+    }
+}
+
+#[cold]
+fn expected(what: &'static str) -> TypedError {
+    TypedError::new(Cow::Borrowed(what))
+}
+
+#[cold]
+fn failed() -> TypedError {
+    TypedError::new(Cow::Borrowed(
+        "Failed to create a value while deserializing",
+    ))
+}
+
+/// Return the value of the `len` ASCII digits at the start of `buf`.
+#[inline(always)]
+fn digits(buf: &[u8], len: usize) -> Option<i32> {
+    if buf.len() < len {
+        return None;
+    }
+    let mut val: i32 = 0;
+    for &ch in &buf[..len] {
+        if !ch.is_ascii_digit() {
+            return None;
+        }
+        val = val * 10 + (ch - b'0') as i32;
+    }
+    Some(val)
+}
+
+/// Parse `YYYY-MM-DD` at the start of `buf`.
+fn parse_date(buf: &[u8]) -> Option<(i32, i32, i32)> {
+    if buf.len() < 10 || buf[4] != b'-' || buf[7] != b'-' {
+        return None;
+    }
+    Some((
+        digits(buf, 4)?,
+        digits(&buf[5..], 2)?,
+        digits(&buf[8..], 2)?,
+    ))
+}
+
+struct ParsedDateTime {
+    date: (i32, i32, i32),
+    time: (i32, i32, i32, i32),
+    /// `None` if naive, else the offset from UTC in seconds.
+    offset: Option<i32>,
+}
+
+/// Parse an RFC 3339 datetime, `YYYY-MM-DD[(T| )HH:MM[:SS[.f+]][Z|±HH:MM]]`.
+/// Fractions of a second beyond microseconds are truncated.
+fn parse_datetime(buf: &[u8]) -> Option<ParsedDateTime> {
+    let date = parse_date(buf)?;
+    let mut res = ParsedDateTime {
+        date: date,
+        time: (0, 0, 0, 0),
+        offset: None,
+    };
+    if buf.len() == 10 {
+        return Some(res);
+    }
+    if !matches!(buf[10], b'T' | b't' | b' ') || buf.len() < 16 || buf[13] != b':' {
+        return None;
+    }
+    res.time.0 = digits(&buf[11..], 2)?;
+    res.time.1 = digits(&buf[14..], 2)?;
+    let mut rest = &buf[16..];
+    if rest.first() == Some(&b':') {
+        res.time.2 = digits(&rest[1..], 2)?;
+        rest = &rest[3..];
+        if matches!(rest.first(), Some(b'.') | Some(b',')) {
+            let len = rest[1..]
+                .iter()
+                .take_while(|ch| ch.is_ascii_digit())
+                .count();
+            if len == 0 {
+                return None;
+            }
+            let mut usecond = digits(&rest[1..], len.min(6))?;
+            for _ in len..6 {
+                usecond *= 10;
+            }
+            res.time.3 = usecond;
+            rest = &rest[1 + len..];
+        }
+    }
+    match rest {
+        [] => {}
+        [b'Z'] | [b'z'] => res.offset = Some(0),
+        [sign @ (b'+' | b'-'), hh0, hh1, b':', mm0, mm1] => {
+            let hours = digits(&[*hh0, *hh1], 2)?;
+            let minutes = digits(&[*mm0, *mm1], 2)?;
+            let offset = hours * 3600 + minutes * 60;
+            res.offset = Some(if *sign == b'-' { -offset } else { offset });
+        }
+        _ => return None,
+    }
+    Some(res)
+}
+
+unsafe fn new_datetime(parsed: &ParsedDateTime) -> *mut PyObject {
+    let api = &*PyDateTimeAPI();
+    let tzinfo = match parsed.offset {
+        None => {
+            Py_INCREF(NONE);
+            NONE
+        }
+        Some(0) => {
+            Py_INCREF(api.TimeZone_UTC);
+            api.TimeZone_UTC
+        }
+        Some(offset) => {
+            let delta = (api.Delta_FromDelta)(0, offset, 0, 1, api.DeltaType);
+            if delta.is_null() {
+                return null_mut();
+            }
+            let tzinfo = (api.TimeZone_FromTimeZone)(delta, null_mut());
+            Py_DECREF(delta);
+            if tzinfo.is_null() {
+                return null_mut();
+            }
+            tzinfo
+        }
+    };
+    let (year, month, day) = parsed.date;
+    let (hour, minute, second, usecond) = parsed.time;
+    let datetime = (api.DateTime_FromDateAndTime)(
+        year,
+        month,
+        day,
+        hour,
+        minute,
+        second,
+        usecond,
+        tzinfo,
+        api.DateTimeType,
+    );
+    Py_DECREF(tzinfo);
+    datetime
+}
+
+/// Converts yyjson values to Python objects as directed by a `TypePlan`.
+struct TypedBuilder {
+    builder: Builder,
+}
+
+impl TypedBuilder {
+    /// Return a new reference to `val` deserialized for `plan`.
+    fn build(
+        &mut self,
+        plan: &TypePlan,
+        val: *mut yyjson_val,
+    ) -> Result<*mut PyObject, TypedError> {
+        match plan {
+            TypePlan::Any => match self.builder.build(val) {
+                Ok(obj) => Ok(obj.as_ptr()),
+                Err(_) => Err(failed()),
+            },
+            TypePlan::Optional(inner) => match ElementType::from_tag(val) {
+                ElementType::Null => Ok(use_immortal!(NONE)),
+                _ => self.build(inner, val),
+            },
+            TypePlan::Float => match ElementType::from_tag(val) {
+                ElementType::Int64 => {
+                    Ok(ffi!(PyFloat_FromDouble(unsafe { (*val).uni.i64_ } as f64)))
+                }
+                ElementType::Uint64 => {
+                    Ok(ffi!(PyFloat_FromDouble(unsafe { (*val).uni.u64_ } as f64)))
+                }
+                _ => self.build(&TypePlan::Any, val),
+            },
+            TypePlan::DateTime => {
+                let parsed = match ElementType::from_tag(val) {
+                    ElementType::String => parse_datetime(yyjson_get_str(val).as_bytes()),
+                    _ => None,
+                };
+                let obj = match parsed {
+                    Some(parsed) => unsafe { new_datetime(&parsed) },
+                    None => null_mut(),
+                };
+                nonnull_or(obj, "Expected an ISO 8601 datetime string")
+            }
+            TypePlan::Date => {
+                let parsed = match ElementType::from_tag(val) {
+                    ElementType::String => {
+                        let buf = yyjson_get_str(val).as_bytes();
+                        if buf.len() == 10 {
+                            parse_date(buf)
+                        } else {
+                            None
+                        }
+                    }
+                    _ => None,
+                };
+                let obj = match parsed {
+                    Some((year, month, day)) => unsafe {
+                        let api = &*PyDateTimeAPI();
+                        (api.Date_FromDate)(year, month, day, api.DateType)
+                    },
+                    None => null_mut(),
+                };
+                nonnull_or(obj, "Expected an ISO 8601 date string")
+            }
+            TypePlan::Uuid => match ElementType::from_tag(val) {
+                ElementType::String => {
+                    let pystr = scalar_to_pyobject(val).as_ptr();
+                    let uuid = unsafe {
+                        call_one(crate::module::state().uuid_type as *mut PyObject, pystr)
+                    };
+                    ffi!(Py_DECREF(pystr));
+                    nonnull_or(uuid, "Expected a UUID string")
+                }
+                _ => Err(expected("Expected a UUID string")),
+            },
+            TypePlan::List(item_plan) => {
+                if !unsafe_yyjson_is_arr(val) {
+                    return Err(expected("Expected an array"));
+                }
+                let len = unsafe_yyjson_get_len(val);
+                let list = ffi!(PyList_New(len as isize));
+                let mut next = unsafe_yyjson_get_first(val);
+                for idx in 0..len {
+                    match self.build(item_plan, next) {
+                        Ok(item) => ffi!(PyList_SET_ITEM(list, idx as isize, item)),
+                        Err(err) => {
+                            ffi!(Py_DECREF(list));
+                            return Err(err.at(idx.to_string()));
+                        }
+                    }
+                    next = next_sibling(next);
+                }
+                Ok(list)
+            }
+            TypePlan::Dict(value_plan) => {
+                if !unsafe_yyjson_is_ctn(val) || unsafe_yyjson_is_arr(val) {
+                    return Err(expected("Expected an object"));
+                }
+                let len = unsafe_yyjson_get_len(val);
+                let dict = ffi!(_PyDict_NewPresized(len as isize));
+                let mut next_key = unsafe_yyjson_get_first(val);
+                for _ in 0..len {
+                    let key = yyjson_get_str(next_key);
+                    let next_val = unsafe { next_key.add(1) };
+                    let item = match self.build(value_plan, next_val) {
+                        Ok(item) => item,
+                        Err(err) => {
+                            ffi!(Py_DECREF(dict));
+                            return Err(err.at(key.to_string()));
+                        }
+                    };
+                    let pykey = get_unicode_key(key);
+                    ffi!(PyDict_SetItem(dict, pykey, item));
+                    ffi!(Py_DECREF(pykey));
+                    ffi!(Py_DECREF(item));
+                    next_key = next_sibling(next_val);
+                }
+                Ok(dict)
+            }
+            TypePlan::Dataclass(cls_plan) => {
+                self.build_dataclass(unsafe { cls_plan.as_ref() }, val)
+            }
+        }
+    }
+
+    /// Create an instance of a dataclass by calling it with the fields that
+    /// are in the object `val`, so that defaults and `__post_init__` apply.
+    /// Fields are passed by position up to the first that is missing or
+    /// keyword-only, and the rest by keyword, or all by keyword if the
+    /// dataclass has pseudo-fields. Keys that are not fields are ignored.
+    fn build_dataclass(
+        &mut self,
+        plan: &DataclassPlan,
+        val: *mut yyjson_val,
+    ) -> Result<*mut PyObject, TypedError> {
+        if !unsafe_yyjson_is_ctn(val) || unsafe_yyjson_is_arr(val) {
+            return Err(expected("Expected an object"));
+        }
+        let len = unsafe_yyjson_get_len(val);
+        let mut values: Vec<*mut PyObject> = vec![null_mut(); plan.fields.len()];
+        let mut next_key = unsafe_yyjson_get_first(val);
+        for pos in 0..len {
+            let key = yyjson_get_str(next_key);
+            let next_val = unsafe { next_key.add(1) };
+            // Objects usually have the fields in the order they are declared.
+            let idx = if pos < plan.fields.len() && plan.fields[pos].name == key {
+                Some(pos)
+            } else {
+                plan.fields.iter().position(|field| field.name == key)
+            };
+            if let Some(idx) = idx {
+                match self.build(&plan.fields[idx].plan, next_val) {
+                    Ok(item) => {
+                        // The last of duplicate keys is used, as in loads().
+                        let previous = core::mem::replace(&mut values[idx], item);
+                        ffi!(Py_XDECREF(previous));
+                    }
+                    Err(err) => {
+                        for each in values {
+                            ffi!(Py_XDECREF(each));
+                        }
+                        return Err(err.at(plan.fields[idx].name.clone()));
+                    }
+                }
+            }
+            next_key = next_sibling(next_val);
+        }
+        let nargs = if plan.positional {
+            plan.fields
+                .iter()
+                .zip(values.iter())
+                .take_while(|(field, each)| !field.kw_only && !each.is_null())
+                .count()
+        } else {
+            0
+        };
+        let args = ffi!(PyTuple_New(nargs as Py_ssize_t));
+        for (idx, each) in values[..nargs].iter().enumerate() {
+            ffi!(PyTuple_SET_ITEM(args, idx as Py_ssize_t, *each));
+        }
+        let mut kwargs: *mut PyObject = null_mut();
+        for (field, each) in plan.fields[nargs..].iter().zip(values[nargs..].iter()) {
+            if each.is_null() {
+                continue;
+            }
+            if kwargs.is_null() {
+                kwargs = ffi!(PyDict_New());
+            }
+            ffi!(PyDict_SetItem(kwargs, field.pyname, *each));
+            ffi!(Py_DECREF(*each));
+        }
+        let obj = ffi!(PyObject_Call(plan.cls, args, kwargs));
+        ffi!(Py_DECREF(args));
+        ffi!(Py_XDECREF(kwargs));
+        if unlikely!(obj.is_null()) {
+            let name =
+                unsafe { core::ffi::CStr::from_ptr((*(plan.cls as *mut PyTypeObject)).tp_name) };
+            Err(TypedError::new(Cow::Owned(format!(
+                "Failed to create {}",
+                name.to_string_lossy()
+            ))))
+        } else {
+            Ok(obj)
+        }
+    }
+}
+
+/// Return `obj`, or the error `what` if it is null. An exception raised
+/// while creating `obj` becomes the cause of the error.
+#[inline(always)]
+fn nonnull_or(obj: *mut PyObject, what: &'static str) -> Result<*mut PyObject, TypedError> {
+    if unlikely!(obj.is_null()) {
+        Err(expected(what))
+    } else {
+        Ok(obj)
+    }
+}
+
+/// Deserialize the document `ptr` as directed by `plan`.
+pub fn deserialize_typed(
+    ptr: *mut PyObject,
+    plan: &TypePlan,
+    opts: Opt,
+) -> Result<NonNull<PyObject>, DeserializeError<'static>> {
+    use crate::deserialize::deserializer::allow_threads;
+    use crate::deserialize::utf8::read_input_to_buf;
+
+    let buffer = read_input_to_buf(ptr)?;
+    let data = unsafe { std::str::from_utf8_unchecked(buffer) };
+    let mut builder = TypedBuilder {
+        builder: Builder::new(opts)?,
+    };
+    with_doc(data, allow_threads(ptr), |doc| {
+        match builder.build(plan, yyjson_doc_get_root(doc)) {
+            Ok(obj) => Ok(nonnull!(obj)),
+            Err(err) => Err(err.into_deserialize_error()),
+        }
+    })?
+}
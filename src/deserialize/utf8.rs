@@ -9,7 +9,7 @@ use core::ffi::c_char;
 use std::borrow::Cow;
 
 #[cfg(all(target_arch = "x86_64", not(target_feature = "sse4.2")))]
-fn is_valid_utf8(buf: &[u8]) -> bool {
+pub fn is_valid_utf8(buf: &[u8]) -> bool {
     if std::is_x86_feature_detected!("sse4.2") {
         simdutf8::basic::from_utf8(buf).is_ok()
     } else {
@@ -18,22 +18,37 @@ fn is_valid_utf8(buf: &[u8]) -> bool {
 }
 
 #[cfg(all(target_arch = "x86_64", target_feature = "sse4.2"))]
-fn is_valid_utf8(buf: &[u8]) -> bool {
+pub fn is_valid_utf8(buf: &[u8]) -> bool {
     simdutf8::basic::from_utf8(buf).is_ok()
 }
 
 #[cfg(target_arch = "aarch64")]
-fn is_valid_utf8(buf: &[u8]) -> bool {
+pub fn is_valid_utf8(buf: &[u8]) -> bool {
     simdutf8::basic::from_utf8(buf).is_ok()
 }
 
 #[cfg(not(any(target_arch = "x86_64", target_arch = "aarch64")))]
-fn is_valid_utf8(buf: &[u8]) -> bool {
+pub fn is_valid_utf8(buf: &[u8]) -> bool {
     std::str::from_utf8(buf).is_ok()
 }
 
 pub fn read_input_to_buf(
     ptr: *mut pyo3_ffi::PyObject,
+) -> Result<&'static [u8], DeserializeError<'static>> {
+    let buffer = read_input(ptr)?;
+    if unlikely!(buffer.is_empty()) {
+        Err(DeserializeError::invalid(Cow::Borrowed(
+            "Input is a zero-length, empty document",
+        )))
+    } else {
+        Ok(buffer)
+    }
+}
+
+/// Return the contents of a bytes, bytearray, memoryview, or str as valid
+/// UTF-8. Unlike `read_input_to_buf()`, an empty input is not an error.
+pub fn read_input(
+    ptr: *mut pyo3_ffi::PyObject,
 ) -> Result<&'static [u8], DeserializeError<'static>> {
     let obj_type_ptr = ob_type!(ptr);
     let buffer: &[u8];
@@ -82,11 +97,5 @@ pub fn read_input_to_buf(
             "Input must be bytes, bytearray, memoryview, or str",
         )));
     }
-    if unlikely!(buffer.is_empty()) {
-        Err(DeserializeError::invalid(Cow::Borrowed(
-            "Input is a zero-length, empty document",
-        )))
-    } else {
-        Ok(buffer)
-    }
+    Ok(buffer)
 }
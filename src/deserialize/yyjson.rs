@@ -1,12 +1,13 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+use crate::deserialize::deserializer::ALLOW_THREADS_MIN_LEN;
 use crate::deserialize::pyobject::*;
 use crate::deserialize::DeserializeError;
 use crate::ffi::yyjson::*;
 use crate::str::unicode_from_str;
-use crate::typeref::{yyjson_init, YYJSON_ALLOC, YYJSON_BUFFER_SIZE};
+use crate::typeref::{yyjson_alloc_acquire, yyjson_alloc_release, YYJSONAlloc, YYJSON_BUFFER_SIZE};
 use core::ffi::c_char;
-use core::ptr::{null, null_mut, NonNull};
+use core::ptr::{null, NonNull};
 use std::borrow::Cow;
 
 const YYJSON_TAG_BIT: u8 = 8;
@@ -29,15 +30,15 @@ macro_rules! is_yyjson_tag {
     };
 }
 
-fn yyjson_doc_get_root(doc: *mut yyjson_doc) -> *mut yyjson_val {
+pub fn yyjson_doc_get_root(doc: *mut yyjson_doc) -> *mut yyjson_val {
     unsafe { (*doc).root }
 }
 
-fn unsafe_yyjson_get_len(val: *mut yyjson_val) -> usize {
+pub fn unsafe_yyjson_get_len(val: *mut yyjson_val) -> usize {
     unsafe { ((*val).tag >> YYJSON_TAG_BIT) as usize }
 }
 
-fn unsafe_yyjson_get_first(ctn: *mut yyjson_val) -> *mut yyjson_val {
+pub fn unsafe_yyjson_get_first(ctn: *mut yyjson_val) -> *mut yyjson_val {
     unsafe { ctn.add(1) }
 }
 
@@ -45,87 +46,309 @@ fn yyjson_read_max_memory_usage(len: usize) -> usize {
     (12 * len) + 256
 }
 
-fn unsafe_yyjson_is_ctn(val: *mut yyjson_val) -> bool {
+pub fn unsafe_yyjson_is_ctn(val: *mut yyjson_val) -> bool {
     unsafe { (*val).tag as u8 & 0b00000110 == 0b00000110 }
 }
 
-fn unsafe_yyjson_get_next_container(val: *mut yyjson_val) -> *mut yyjson_val {
+pub fn unsafe_yyjson_is_arr(val: *mut yyjson_val) -> bool {
+    is_yyjson_tag!(val, TAG_ARRAY)
+}
+
+pub fn unsafe_yyjson_get_next_container(val: *mut yyjson_val) -> *mut yyjson_val {
     unsafe { ((val as *mut u8).add((*val).uni.ofs)) as *mut yyjson_val }
 }
 
-fn unsafe_yyjson_get_next_non_container(val: *mut yyjson_val) -> *mut yyjson_val {
+/// Return the value after `val` in its array or object.
+pub fn next_sibling(val: *mut yyjson_val) -> *mut yyjson_val {
+    if unsafe_yyjson_is_ctn(val) {
+        unsafe_yyjson_get_next_container(val)
+    } else {
+        unsafe_yyjson_get_next_non_container(val)
+    }
+}
+
+/// Return the value of `key` in the object `obj`. As with `loads()`, the
+/// last of duplicate keys wins.
+pub fn yyjson_obj_get(obj: *mut yyjson_val, key: &str) -> Option<*mut yyjson_val> {
+    let mut found = None;
+    let mut next_key = unsafe_yyjson_get_first(obj);
+    for _ in 0..unsafe_yyjson_get_len(obj) {
+        let val = unsafe { next_key.add(1) };
+        if yyjson_get_str(next_key) == key {
+            found = Some(val);
+        }
+        next_key = next_sibling(val);
+    }
+    found
+}
+
+/// Return element `idx` of the array `arr`, which must be in bounds.
+pub fn yyjson_arr_get(arr: *mut yyjson_val, idx: usize) -> *mut yyjson_val {
+    let len = unsafe_yyjson_get_len(arr);
+    debug_assert!(idx < len);
+    let first = unsafe_yyjson_get_first(arr);
+    unsafe {
+        // An array without nested containers is contiguous.
+        if unsafe_yyjson_get_next_container(arr) == first.add(len) {
+            return first.add(idx);
+        }
+    }
+    let mut val = first;
+    for _ in 0..idx {
+        val = next_sibling(val);
+    }
+    val
+}
+
+/// An allocator taken from the pool for one document and returned on drop.
+struct PooledAlloc(Option<Box<YYJSONAlloc>>);
+
+impl PooledAlloc {
+    fn new(data: &str) -> Self {
+        if yyjson_read_max_memory_usage(data.len()) < YYJSON_BUFFER_SIZE {
+            PooledAlloc(Some(yyjson_alloc_acquire()))
+        } else {
+            PooledAlloc(None)
+        }
+    }
+
+    fn as_ptr(&self) -> *const yyjson_alc {
+        match &self.0 {
+            Some(alloc) => &alloc.alloc,
+            None => null(),
+        }
+    }
+}
+
+impl Drop for PooledAlloc {
+    fn drop(&mut self) {
+        if let Some(alloc) = self.0.take() {
+            yyjson_alloc_release(alloc);
+        }
+    }
+}
+
+pub fn unsafe_yyjson_get_next_non_container(val: *mut yyjson_val) -> *mut yyjson_val {
     unsafe { ((val as *mut u8).add(YYJSON_VAL_SIZE)) as *mut yyjson_val }
 }
 
+/// Deserialize `data`. If `allow_threads` is true, `data` must not be
+/// mutated while the GIL is released and a large document is read without
+/// holding the GIL. Python objects are then created with the GIL held.
 pub fn deserialize_yyjson(
     data: &'static str,
+    allow_threads: bool,
 ) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
     let mut err = yyjson_read_err {
         code: YYJSON_READ_SUCCESS,
         msg: null(),
         pos: 0,
     };
-    let doc = if yyjson_read_max_memory_usage(data.len()) < YYJSON_BUFFER_SIZE {
-        read_doc_with_buffer(data, &mut err)
+    // The doc is allocated in the pooled buffer, so the allocator must
+    // outlive every yyjson_doc_free() below.
+    let alloc = PooledAlloc::new(data);
+    let doc = read_doc_allow_threads(data, alloc.as_ptr(), allow_threads, &mut err);
+    if unlikely!(doc.is_null()) {
+        Err(read_error(&err, data))
     } else {
-        read_doc_default(data, &mut err)
+        Ok(doc_to_pyobject(doc))
+    }
+}
+
+/// Read `data` with the default allocator and call `f` with the root of the
+/// doc, which is freed when `f` returns. Neither touches Python objects, so
+/// this may be called without the GIL.
+pub fn with_root<T>(
+    data: &'static str,
+    f: impl FnOnce(*mut yyjson_val) -> T,
+) -> Result<T, DeserializeError<'static>> {
+    let mut err = yyjson_read_err {
+        code: YYJSON_READ_SUCCESS,
+        msg: null(),
+        pos: 0,
+    };
+    let doc = read_doc(data, null(), &mut err);
+    if unlikely!(doc.is_null()) {
+        return Err(read_error(&err, data));
+    }
+    let ret = f(yyjson_doc_get_root(doc));
+    unsafe { yyjson_doc_free(doc) };
+    Ok(ret)
+}
+
+/// Read `data` and call `f` with the doc, which is freed when `f` returns.
+/// `allow_threads` is as for `deserialize_yyjson()`.
+pub fn with_doc<T>(
+    data: &'static str,
+    allow_threads: bool,
+    f: impl FnOnce(*mut yyjson_doc) -> T,
+) -> Result<T, DeserializeError<'static>> {
+    let mut err = yyjson_read_err {
+        code: YYJSON_READ_SUCCESS,
+        msg: null(),
+        pos: 0,
     };
+    let alloc = PooledAlloc::new(data);
+    let doc = read_doc_allow_threads(data, alloc.as_ptr(), allow_threads, &mut err);
     if unlikely!(doc.is_null()) {
-        let msg: Cow<str> = unsafe { core::ffi::CStr::from_ptr(err.msg).to_string_lossy() };
-        Err(DeserializeError::from_yyjson(msg, err.pos as i64, data))
+        return Err(read_error(&err, data));
+    }
+    let ret = f(doc);
+    unsafe { yyjson_doc_free(doc) };
+    Ok(ret)
+}
+
+/// Read `data` into a doc that is independent of the input and must be
+/// freed by the caller with `yyjson_doc_free()`. `allow_threads` is as for
+/// `deserialize_yyjson()`.
+pub fn read_doc_owned(
+    data: &'static str,
+    allow_threads: bool,
+) -> Result<*mut yyjson_doc, DeserializeError<'static>> {
+    let mut err = yyjson_read_err {
+        code: YYJSON_READ_SUCCESS,
+        msg: null(),
+        pos: 0,
+    };
+    let doc = read_doc_allow_threads(data, null(), allow_threads, &mut err);
+    if unlikely!(doc.is_null()) {
+        Err(read_error(&err, data))
     } else {
-        let val = yyjson_doc_get_root(doc);
-
-        if unlikely!(!unsafe_yyjson_is_ctn(val)) {
-            let pyval = match ElementType::from_tag(val) {
-                ElementType::String => parse_yy_string(val),
-                ElementType::Uint64 => parse_yy_u64(val),
-                ElementType::Int64 => parse_yy_i64(val),
-                ElementType::Double => parse_yy_f64(val),
-                ElementType::Null => parse_none(),
-                ElementType::True => parse_true(),
-                ElementType::False => parse_false(),
-                ElementType::Array => unreachable!(),
-                ElementType::Object => unreachable!(),
-            };
-            unsafe { yyjson_doc_free(doc) };
-            Ok(pyval)
-        } else if is_yyjson_tag!(val, TAG_ARRAY) {
-            let pyval = nonnull!(ffi!(PyList_New(unsafe_yyjson_get_len(val) as isize)));
-            if unsafe_yyjson_get_len(val) > 0 {
-                populate_yy_array(pyval.as_ptr(), val);
-            }
-            unsafe { yyjson_doc_free(doc) };
-            Ok(pyval)
+        Ok(doc)
+    }
+}
+
+fn read_doc_allow_threads(
+    data: &'static str,
+    alc: *const yyjson_alc,
+    allow_threads: bool,
+    err: &mut yyjson_read_err,
+) -> *mut yyjson_doc {
+    if allow_threads && data.len() >= ALLOW_THREADS_MIN_LEN {
+        let tstate = ffi!(PyEval_SaveThread());
+        let doc = read_doc(data, alc, err);
+        ffi!(PyEval_RestoreThread(tstate));
+        doc
+    } else {
+        read_doc(data, alc, err)
+    }
+}
+
+/// A document read with the default allocator, which may be read on any
+/// thread without the GIL and then converted with it held.
+pub struct DetachedDoc {
+    doc: *mut yyjson_doc,
+    err: yyjson_read_err,
+}
+
+// The doc is owned by whichever thread holds the DetachedDoc.
+unsafe impl Send for DetachedDoc {}
+
+impl DetachedDoc {
+    /// Read `data`. This does not touch Python objects.
+    pub fn read(data: &'static str) -> Self {
+        let mut err = yyjson_read_err {
+            code: YYJSON_READ_SUCCESS,
+            msg: null(),
+            pos: 0,
+        };
+        let doc = read_doc(data, null(), &mut err);
+        DetachedDoc { doc, err }
+    }
+
+    /// Whether `data` failed to parse.
+    pub fn is_err(&self) -> bool {
+        self.doc.is_null()
+    }
+
+    /// Convert the document to Python objects, consuming it. `data` is the
+    /// input it was read from.
+    pub fn materialize(
+        mut self,
+        data: &'static str,
+    ) -> Result<NonNull<pyo3_ffi::PyObject>, DeserializeError<'static>> {
+        if unlikely!(self.doc.is_null()) {
+            Err(read_error(&self.err, data))
         } else {
-            let pyval = nonnull!(ffi!(_PyDict_NewPresized(
-                unsafe_yyjson_get_len(val) as isize
-            )));
-            if unsafe_yyjson_get_len(val) > 0 {
-                populate_yy_object(pyval.as_ptr(), val);
-            }
-            unsafe { yyjson_doc_free(doc) };
-            Ok(pyval)
+            let doc = core::mem::replace(&mut self.doc, core::ptr::null_mut());
+            Ok(doc_to_pyobject(doc))
+        }
+    }
+}
+
+impl Drop for DetachedDoc {
+    fn drop(&mut self) {
+        if !self.doc.is_null() {
+            unsafe { yyjson_doc_free(self.doc) };
         }
     }
 }
 
-fn read_doc_default(data: &'static str, err: &mut yyjson_read_err) -> *mut yyjson_doc {
-    unsafe { yyjson_read_opts(data.as_ptr() as *mut c_char, data.len(), null_mut(), err) }
+#[cold]
+fn read_error(err: &yyjson_read_err, data: &'static str) -> DeserializeError<'static> {
+    let msg: Cow<str> = unsafe { core::ffi::CStr::from_ptr(err.msg).to_string_lossy() };
+    DeserializeError::from_yyjson(msg, err.pos as i64, data)
 }
 
-fn read_doc_with_buffer(data: &'static str, err: &mut yyjson_read_err) -> *mut yyjson_doc {
-    unsafe {
-        yyjson_read_opts(
-            data.as_ptr() as *mut c_char,
-            data.len(),
-            &YYJSON_ALLOC.get_or_init(yyjson_init).alloc,
-            err,
-        )
+/// Convert the root of `doc` to Python objects and free `doc`.
+fn doc_to_pyobject(doc: *mut yyjson_doc) -> NonNull<pyo3_ffi::PyObject> {
+    let pyval = val_to_pyobject(yyjson_doc_get_root(doc));
+    unsafe { yyjson_doc_free(doc) };
+    pyval
+}
+
+/// Convert `val` and its children to Python objects.
+pub fn val_to_pyobject(val: *mut yyjson_val) -> NonNull<pyo3_ffi::PyObject> {
+    if unlikely!(!unsafe_yyjson_is_ctn(val)) {
+        scalar_to_pyobject(val)
+    } else if is_yyjson_tag!(val, TAG_ARRAY) {
+        let pyval = nonnull!(ffi!(PyList_New(unsafe_yyjson_get_len(val) as isize)));
+        if unsafe_yyjson_get_len(val) > 0 {
+            populate_yy_array(pyval.as_ptr(), val);
+        }
+        pyval
+    } else {
+        let pyval = nonnull!(ffi!(_PyDict_NewPresized(
+            unsafe_yyjson_get_len(val) as isize
+        )));
+        if unsafe_yyjson_get_len(val) > 0 {
+            populate_yy_object(pyval.as_ptr(), val);
+        }
+        pyval
     }
 }
 
-enum ElementType {
+/// Convert `val`, which is not an array or object, to a Python object.
+pub fn scalar_to_pyobject(val: *mut yyjson_val) -> NonNull<pyo3_ffi::PyObject> {
+    match ElementType::from_tag(val) {
+        ElementType::String => parse_yy_string(val),
+        ElementType::Uint64 => parse_yy_u64(val),
+        ElementType::Int64 => parse_yy_i64(val),
+        ElementType::Double => parse_yy_f64(val),
+        ElementType::Null => parse_none(),
+        ElementType::True => parse_true(),
+        ElementType::False => parse_false(),
+        ElementType::Array => unreachable!(),
+        ElementType::Object => unreachable!(),
+    }
+}
+
+/// Return the contents of the string `val`, such as an object key.
+pub fn yyjson_get_str(val: *mut yyjson_val) -> &'static str {
+    str_from_slice!((*val).uni.str_ as *const u8, unsafe_yyjson_get_len(val))
+}
+
+/// Read `data` with `alc`, or the default allocator if `alc` is null. This
+/// does not touch Python objects and may be called without the GIL.
+fn read_doc(
+    data: &'static str,
+    alc: *const yyjson_alc,
+    err: &mut yyjson_read_err,
+) -> *mut yyjson_doc {
+    unsafe { yyjson_read_opts(data.as_ptr() as *mut c_char, data.len(), alc, err) }
+}
+
+pub enum ElementType {
     String,
     Uint64,
     Int64,
@@ -138,7 +361,7 @@ enum ElementType {
 }
 
 impl ElementType {
-    fn from_tag(elem: *mut yyjson_val) -> Self {
+    pub fn from_tag(elem: *mut yyjson_val) -> Self {
         match unsafe { (*elem).tag as u8 } {
             TAG_STRING => Self::String,
             TAG_UINT64 => Self::Uint64,
@@ -193,6 +416,10 @@ fn populate_yy_array(list: *mut pyo3_ffi::PyObject, elem: *mut yyjson_val) {
         assume!(len >= 1);
         let mut next = unsafe_yyjson_get_first(elem);
         let mut dptr = (*(list as *mut pyo3_ffi::PyListObject)).ob_item;
+        // The last object that was built by inserting its keys, and its
+        // dict, which the list owns. Following objects with the same keys
+        // are built from a copy of it.
+        let mut shape: Option<(*mut yyjson_val, *mut pyo3_ffi::PyObject)> = None;
 
         for _ in 0..len {
             let val = next;
@@ -204,11 +431,23 @@ fn populate_yy_array(list: *mut pyo3_ffi::PyObject, elem: *mut yyjson_val) {
                     if unsafe_yyjson_get_len(val) > 0 {
                         populate_yy_array(pyval, val);
                     }
+                } else if shape.map_or(false, |(keys, _)| same_keys(keys, val)) {
+                    let pyval = ffi!(PyDict_Copy(shape.unwrap().1));
+                    append_to_list!(dptr, pyval);
+                    populate_yy_object_shaped(pyval, val);
                 } else {
-                    let pyval = ffi!(_PyDict_NewPresized(unsafe_yyjson_get_len(val) as isize));
+                    let len = unsafe_yyjson_get_len(val);
+                    let pyval = ffi!(_PyDict_NewPresized(len as isize));
                     append_to_list!(dptr, pyval);
-                    if unsafe_yyjson_get_len(val) > 0 {
+                    if len > 0 {
                         populate_yy_object(pyval, val);
+                        // An object with duplicate keys has fewer entries
+                        // than keys and cannot be a template.
+                        if ffi!(PyDict_Size(pyval)) as usize == len {
+                            shape = Some((val, pyval));
+                        } else {
+                            shape = None;
+                        }
                     }
                 }
             } else {
@@ -293,3 +532,45 @@ fn populate_yy_object(dict: *mut pyo3_ffi::PyObject, elem: *mut yyjson_val) {
         }
     }
 }
+
+/// Return whether the objects `a` and `b` have the same keys in the same
+/// order.
+fn same_keys(a: *mut yyjson_val, b: *mut yyjson_val) -> bool {
+    let len = unsafe_yyjson_get_len(a);
+    if len != unsafe_yyjson_get_len(b) {
+        return false;
+    }
+    let mut key_a = unsafe_yyjson_get_first(a);
+    let mut key_b = unsafe_yyjson_get_first(b);
+    for _ in 0..len {
+        if yyjson_get_str(key_a) != yyjson_get_str(key_b) {
+            return false;
+        }
+        key_a = next_sibling(unsafe { key_a.add(1) });
+        key_b = next_sibling(unsafe { key_b.add(1) });
+    }
+    true
+}
+
+/// Replace the values of `dict`, a copy of the dict of an earlier object
+/// with the same keys in the same order and without duplicates, with those
+/// of `elem`. The keys and their hashes are reused and the table is already
+/// sized, so no key is hashed, looked up in the key cache, or inserted.
+#[inline(never)]
+fn populate_yy_object_shaped(dict: *mut pyo3_ffi::PyObject, elem: *mut yyjson_val) {
+    unsafe {
+        let len = unsafe_yyjson_get_len(elem);
+        let mut pos = 0;
+        let mut pykey: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
+        let mut prev: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
+        let mut next_key = unsafe_yyjson_get_first(elem);
+        for _ in 0..len {
+            let val = next_key.add(1);
+            next_key = next_sibling(val);
+            pydict_next!(dict, &mut pos, &mut pykey, &mut prev);
+            let pyval = val_to_pyobject(val).as_ptr();
+            add_to_dict!(dict, pykey, pyval);
+            reverse_pydict_incref!(pyval);
+        }
+    }
+}
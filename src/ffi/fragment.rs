@@ -1,6 +1,6 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
-use core::ffi::{c_char, c_ulong};
+use core::ffi::{c_char, c_ulong, c_void};
 use core::ptr::null_mut;
 use pyo3_ffi::*;
 
@@ -31,7 +31,7 @@ fn raise_args_exception() -> *mut PyObject {
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
 pub unsafe extern "C" fn xorjson_fragment_tp_new(
-    _subtype: *mut PyTypeObject,
+    subtype: *mut PyTypeObject,
     args: *mut PyObject,
     kwds: *mut PyObject,
 ) -> *mut PyObject {
@@ -41,9 +41,10 @@ pub unsafe extern "C" fn xorjson_fragment_tp_new(
     } else {
         let contents = PyTuple_GET_ITEM(args, 0);
         Py_INCREF(contents);
+        Py_INCREF(subtype as *mut PyObject);
         let obj = Box::new(Fragment {
             ob_refcnt: 1,
-            ob_type: crate::typeref::FRAGMENT_TYPE,
+            ob_type: subtype,
             contents: contents,
         });
         Box::into_raw(obj) as *mut PyObject
@@ -54,8 +55,10 @@ pub unsafe extern "C" fn xorjson_fragment_tp_new(
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
 pub unsafe extern "C" fn xorjson_fragment_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
     Py_DECREF((*(object as *mut Fragment)).contents);
     std::alloc::dealloc(object as *mut u8, std::alloc::Layout::new::<Fragment>());
+    Py_DECREF(tp as *mut PyObject);
 }
 
 #[cfg(Py_3_10)]
@@ -67,73 +70,21 @@ const FRAGMENT_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT;
 #[no_mangle]
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-pub unsafe extern "C" fn xorjson_fragmenttype_new() -> *mut PyTypeObject {
-    let ob = Box::new(PyTypeObject {
-        ob_base: PyVarObject {
-            ob_base: PyObject {
-                #[cfg(Py_3_12)]
-                ob_refcnt: pyo3_ffi::PyObjectObRefcnt { ob_refcnt: 0 },
-                #[cfg(not(Py_3_12))]
-                ob_refcnt: 0,
-                ob_type: core::ptr::addr_of_mut!(PyType_Type),
+pub unsafe extern "C" fn xorjson_fragmenttype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    crate::module::new_type(
+        module,
+        "xorjson.Fragment\0",
+        core::mem::size_of::<Fragment>(),
+        FRAGMENT_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_new,
+                pfunc: xorjson_fragment_tp_new as *mut c_void,
             },
-            ob_size: 0,
-        },
-        tp_name: "xorjson.Fragment\0".as_ptr() as *const c_char,
-        tp_basicsize: core::mem::size_of::<Fragment>() as isize,
-        tp_itemsize: 0,
-        tp_dealloc: Some(xorjson_fragment_dealloc),
-        tp_init: None,
-        tp_new: Some(xorjson_fragment_tp_new),
-        tp_flags: FRAGMENT_TP_FLAGS,
-        // ...
-        tp_bases: null_mut(),
-        tp_cache: null_mut(),
-        tp_del: None,
-        tp_finalize: None,
-        tp_free: None,
-        tp_is_gc: None,
-        tp_mro: null_mut(),
-        tp_subclasses: null_mut(),
-        tp_vectorcall: None,
-        tp_version_tag: 0,
-        tp_weaklist: null_mut(),
-        #[cfg(not(Py_3_9))]
-        tp_print: None,
-        tp_vectorcall_offset: 0,
-        tp_getattr: None,
-        tp_setattr: None,
-        tp_as_async: null_mut(),
-        tp_repr: None,
-        tp_as_number: null_mut(),
-        tp_as_sequence: null_mut(),
-        tp_as_mapping: null_mut(),
-        tp_hash: None,
-        tp_call: None,
-        tp_str: None,
-        tp_getattro: None,
-        tp_setattro: None,
-        tp_as_buffer: null_mut(),
-        tp_doc: core::ptr::null_mut(),
-        tp_traverse: None,
-        tp_clear: None,
-        tp_richcompare: None,
-        tp_weaklistoffset: 0,
-        tp_iter: None,
-        tp_iternext: None,
-        tp_methods: null_mut(),
-        tp_members: null_mut(),
-        tp_getset: null_mut(),
-        tp_base: null_mut(),
-        tp_dict: null_mut(),
-        tp_descr_get: None,
-        tp_descr_set: None,
-        tp_dictoffset: 0,
-        tp_alloc: None,
-        #[cfg(Py_3_12)]
-        tp_watched: 0,
-    });
-    let ob_ptr = Box::into_raw(ob);
-    PyType_Ready(ob_ptr);
-    ob_ptr
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_fragment_dealloc as *mut c_void,
+            },
+        ],
+    )
 }
@@ -0,0 +1,44 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use core::cell::UnsafeCell;
+use core::ops::{Deref, DerefMut};
+
+/// Data shared between threads that hold a thread state. The GIL protects
+/// it, so locking is free. A guard must not be held while the GIL may be
+/// released, and the lock is not reentrant.
+pub struct PyLock<T> {
+    data: UnsafeCell<T>,
+}
+
+unsafe impl<T: Send> Sync for PyLock<T> {}
+
+impl<T> PyLock<T> {
+    pub const fn new(data: T) -> Self {
+        PyLock {
+            data: UnsafeCell::new(data),
+        }
+    }
+
+    #[inline(always)]
+    pub fn lock(&self) -> PyLockGuard<'_, T> {
+        PyLockGuard { lock: self }
+    }
+}
+
+pub struct PyLockGuard<'a, T> {
+    lock: &'a PyLock<T>,
+}
+
+impl<T> Deref for PyLockGuard<'_, T> {
+    type Target = T;
+
+    fn deref(&self) -> &T {
+        unsafe { &*self.lock.data.get() }
+    }
+}
+
+impl<T> DerefMut for PyLockGuard<'_, T> {
+    fn deref_mut(&mut self) -> &mut T {
+        unsafe { &mut *self.lock.data.get() }
+    }
+}
@@ -3,6 +3,7 @@
 mod buffer;
 mod bytes;
 mod fragment;
+mod lock;
 mod long;
 #[cfg(feature = "yyjson")]
 pub mod yyjson;
@@ -10,4 +11,5 @@ pub mod yyjson;
 pub use buffer::*;
 pub use bytes::*;
 pub use fragment::{xorjson_fragmenttype_new, Fragment};
+pub use lock::PyLock;
 pub use long::{pylong_is_unsigned, pylong_is_zero, pylong_value_signed, pylong_value_unsigned};
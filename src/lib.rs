@@ -29,8 +29,10 @@ extern crate unwinding;
 #[macro_use]
 mod util;
 
+mod args;
 mod deserialize;
 mod ffi;
+mod module;
 mod opt;
 mod serialize;
 mod str;
@@ -42,11 +44,16 @@ use pyo3_ffi::*;
 #[allow(unused_imports)]
 use core::ptr::{null, null_mut, NonNull};
 
+/// Add `obj` to the module, stealing a reference to it as
+/// `PyModule_AddObject()` does, so that the module is freed with its
+/// interpreter.
 #[cfg(Py_3_10)]
 macro_rules! add {
-    ($mptr:expr, $name:expr, $obj:expr) => {
-        PyModule_AddObjectRef($mptr, $name.as_ptr() as *const c_char, $obj);
-    };
+    ($mptr:expr, $name:expr, $obj:expr) => {{
+        let obj = $obj;
+        PyModule_AddObjectRef($mptr, $name.as_ptr() as *const c_char, obj);
+        Py_DECREF(obj);
+    }};
 }
 
 #[cfg(not(Py_3_10))]
@@ -73,6 +80,8 @@ macro_rules! opt {
 #[cfg_attr(feature = "optimize", optimize(size))]
 pub unsafe extern "C" fn xorjson_init_exec(mptr: *mut PyObject) -> c_int {
     typeref::init_typerefs();
+    let state = module::init_module_state(mptr);
+    let _state = module::StateGuard::of_module(mptr);
     {
         let version = env!("CARGO_PKG_VERSION");
         let pyversion =
@@ -81,7 +90,7 @@ pub unsafe extern "C" fn xorjson_init_exec(mptr: *mut PyObject) -> c_int {
     }
     {
         let dumps_doc =
-            "dumps(obj, /, default=None, option=None)\n--\n\nSerialize Python objects to JSON.\0";
+            "dumps(obj, /, default=None, option=None, *, size_hint=None)\n--\n\nSerialize Python objects to JSON.\0";
 
         let wrapped_dumps = PyMethodDef {
             ml_name: "dumps\0".as_ptr() as *const c_char,
@@ -94,32 +103,381 @@ pub unsafe extern "C" fn xorjson_init_exec(mptr: *mut PyObject) -> c_int {
 
         let func = PyCFunction_NewEx(
             Box::into_raw(Box::new(wrapped_dumps)),
-            null_mut(),
+            mptr,
             PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
         );
         add!(mptr, "dumps\0", func);
     }
 
     {
-        let loads_doc = "loads(obj, /)\n--\n\nDeserialize JSON to Python objects.\0";
+        let loads_doc =
+            "loads(obj, /, paths=None, option=None, columns=None, type=None)\n--\n\nDeserialize JSON to Python objects.\0";
 
         let wrapped_loads = PyMethodDef {
             ml_name: "loads\0".as_ptr() as *const c_char,
-            ml_meth: PyMethodDefPointer { PyCFunction: loads },
-            ml_flags: METH_O,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: loads,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
             ml_doc: loads_doc.as_ptr() as *const c_char,
         };
         let func = PyCFunction_NewEx(
             Box::into_raw(Box::new(wrapped_loads)),
-            null_mut(),
+            mptr,
             PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
         );
         add!(mptr, "loads\0", func);
     }
 
-    add!(mptr, "Fragment\0", typeref::FRAGMENT_TYPE as *mut PyObject);
+    {
+        let loads_lines_doc = "loads_lines(obj, /)\n--\n\nDeserialize newline-delimited JSON to a list of Python objects.\0";
+
+        let wrapped_loads_lines = PyMethodDef {
+            ml_name: "loads_lines\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: loads_lines,
+            },
+            ml_flags: METH_O,
+            ml_doc: loads_lines_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_loads_lines)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "loads_lines\0", func);
+    }
+
+    {
+        let load_path_doc =
+            "load_path(path, /)\n--\n\nDeserialize the JSON document in a file to Python objects.\0";
+
+        let wrapped_load_path = PyMethodDef {
+            ml_name: "load_path\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: load_path,
+            },
+            ml_flags: METH_O,
+            ml_doc: load_path_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_load_path)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "load_path\0", func);
+    }
+
+    {
+        let loads_many_doc = "loads_many(buffers, /, threads=None, return_exceptions=False)\n--\n\nDeserialize each JSON document of an iterable, parsing in parallel.\0";
+
+        let wrapped_loads_many = PyMethodDef {
+            ml_name: "loads_many\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: loads_many,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: loads_many_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_loads_many)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "loads_many\0", func);
+    }
+
+    {
+        let loads_prefix_doc = "loads_prefix(obj, /, offset=0)\n--\n\nDeserialize the JSON value at an offset and return it with the offset of its end.\0";
+
+        let wrapped_loads_prefix = PyMethodDef {
+            ml_name: "loads_prefix\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: loads_prefix,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: loads_prefix_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_loads_prefix)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "loads_prefix\0", func);
+    }
+
+    {
+        let loads_lazy_doc =
+            "loads_lazy(obj, /)\n--\n\nDeserialize JSON to a LazyDocument that creates Python objects on access, or to the value of a scalar document.\0";
+
+        let wrapped_loads_lazy = PyMethodDef {
+            ml_name: "loads_lazy\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: loads_lazy,
+            },
+            ml_flags: METH_O,
+            ml_doc: loads_lazy_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_loads_lazy)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "loads_lazy\0", func);
+    }
+
+    {
+        let iterparse_doc = "iterparse(source, /, chunk_size=65536)\n--\n\nIterate over the (event, value) pairs of a JSON document without deserializing it.\0";
+
+        let wrapped_iterparse = PyMethodDef {
+            ml_name: "iterparse\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: iterparse,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: iterparse_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_iterparse)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "iterparse\0", func);
+    }
+
+    {
+        let items_doc = "items(source, prefix, /, chunk_size=65536)\n--\n\nIterate over the elements of the array at a JSON Pointer, deserializing one at a time.\0";
+
+        let wrapped_items = PyMethodDef {
+            ml_name: "items\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: items,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: items_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_items)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "items\0", func);
+    }
+
+    {
+        let reformat_doc = "reformat(obj, /, option=None)\n--\n\nReformat a JSON document to bytes without deserializing it.\0";
+
+        let wrapped_reformat = PyMethodDef {
+            ml_name: "reformat\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: reformat,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: reformat_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_reformat)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "reformat\0", func);
+    }
+
+    {
+        let validate_doc = "validate(obj, /)\n--\n\nRaise JSONDecodeError if obj is not a valid JSON document, without deserializing it.\0";
+
+        let wrapped_validate = PyMethodDef {
+            ml_name: "validate\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: validate,
+            },
+            ml_flags: METH_O,
+            ml_doc: validate_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_validate)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "validate\0", func);
+    }
+
+    {
+        let inspect_doc = "inspect(obj, /)\n--\n\nReturn a dict of counts of the values in a JSON document, without deserializing it.\0";
+
+        let wrapped_inspect = PyMethodDef {
+            ml_name: "inspect\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: inspect,
+            },
+            ml_flags: METH_O,
+            ml_doc: inspect_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_inspect)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "inspect\0", func);
+    }
+
+    {
+        let configure_key_cache_doc = "configure_key_cache(capacity=None, max_key_len=None)\n--\n\nSet the number of slots of the loads() key cache and the length in bytes of the longest key it caches, and clear it.\0";
+
+        let wrapped_configure_key_cache = PyMethodDef {
+            ml_name: "configure_key_cache\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: configure_key_cache,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: configure_key_cache_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_configure_key_cache)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "configure_key_cache\0", func);
+    }
+
+    {
+        let key_cache_info_doc = "key_cache_info()\n--\n\nReturn a dict of the configuration, occupancy, hits, misses, and evictions of the loads() key cache.\0";
+
+        let wrapped_key_cache_info = PyMethodDef {
+            ml_name: "key_cache_info\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: key_cache_info,
+            },
+            ml_flags: METH_NOARGS,
+            ml_doc: key_cache_info_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_key_cache_info)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "key_cache_info\0", func);
+    }
+
+    {
+        let clear_key_cache_doc =
+            "clear_key_cache()\n--\n\nRelease the keys in the loads() key cache.\0";
+
+        let wrapped_clear_key_cache = PyMethodDef {
+            ml_name: "clear_key_cache\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: clear_key_cache,
+            },
+            ml_flags: METH_NOARGS,
+            ml_doc: clear_key_cache_doc.as_ptr() as *const c_char,
+        };
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_clear_key_cache)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "clear_key_cache\0", func);
+    }
+
+    {
+        let dumps_lines_doc = "dumps_lines(iterable, /, default=None, option=None)\n--\n\nSerialize each object of an iterable to newline-delimited JSON.\0";
+
+        let wrapped_dumps_lines = PyMethodDef {
+            ml_name: "dumps_lines\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: dumps_lines,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: dumps_lines_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_dumps_lines)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "dumps_lines\0", func);
+    }
+
+    {
+        let dumps_into_doc = "dumps_into(obj, buffer, /, offset=0, default=None, option=None)\n--\n\nSerialize Python objects to JSON in a writable buffer and return the number of bytes written.\0";
+
+        let wrapped_dumps_into = PyMethodDef {
+            ml_name: "dumps_into\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: dumps_into,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: dumps_into_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_dumps_into)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "dumps_into\0", func);
+    }
+
+    {
+        let dump_doc = "dump(obj, fp, /, default=None, option=None, chunk_size=65536)\n--\n\nSerialize Python objects to JSON, writing it to a file object, socket or file descriptor in chunks.\0";
+
+        let wrapped_dump = PyMethodDef {
+            ml_name: "dump\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: dump,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: dump_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_dump)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "dump\0", func);
+    }
+
+    {
+        let dumps_iter_doc = "dumps_iter(obj, /, default=None, option=None, chunk_size=65536)\n--\n\nSerialize Python objects to JSON, returning an iterator of chunks of the output. Lists, tuples, and generators are serialized an element at a time.\0";
+
+        let wrapped_dumps_iter = PyMethodDef {
+            ml_name: "dumps_iter\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                _PyCFunctionFastWithKeywords: dumps_iter,
+            },
+            ml_flags: pyo3_ffi::METH_FASTCALL | METH_KEYWORDS,
+            ml_doc: dumps_iter_doc.as_ptr() as *const c_char,
+        };
+
+        let func = PyCFunction_NewEx(
+            Box::into_raw(Box::new(wrapped_dumps_iter)),
+            mptr,
+            PyUnicode_InternFromString("xorjson\0".as_ptr() as *const c_char),
+        );
+        add!(mptr, "dumps_iter\0", func);
+    }
+
+    for (name, tp) in [
+        ("Decoder\0", state.decoder_type),
+        ("Encoder\0", state.encoder_type),
+        ("Fragment\0", state.fragment_type),
+        #[cfg(feature = "yyjson")]
+        ("LazyDocument\0", state.lazy_document_type),
+    ] {
+        Py_INCREF(tp as *mut PyObject);
+        add!(mptr, name, tp as *mut PyObject);
+    }
 
     opt!(mptr, "OPT_APPEND_NEWLINE\0", opt::APPEND_NEWLINE);
+    opt!(mptr, "OPT_CACHE_STRINGS\0", opt::CACHE_STRINGS);
+    opt!(mptr, "OPT_DESERIALIZE_NUMPY\0", opt::DESERIALIZE_NUMPY);
     opt!(mptr, "OPT_INDENT_2\0", opt::INDENT_2);
     opt!(mptr, "OPT_NAIVE_UTC\0", opt::NAIVE_UTC);
     opt!(mptr, "OPT_NON_STR_KEYS\0", opt::NON_STR_KEYS);
@@ -146,7 +504,9 @@ pub unsafe extern "C" fn xorjson_init_exec(mptr: *mut PyObject) -> c_int {
     opt!(mptr, "OPT_STRICT_INTEGER\0", opt::STRICT_INTEGER);
     opt!(mptr, "OPT_UTC_Z\0", opt::UTC_Z);
 
-    add!(mptr, "JSONDecodeError\0", typeref::JsonDecodeError);
+    Py_INCREF(state.json_decode_error);
+    add!(mptr, "JSONDecodeError\0", state.json_decode_error);
+    Py_INCREF(typeref::JsonEncodeError);
     add!(mptr, "JSONEncodeError\0", typeref::JsonEncodeError);
 
     0
@@ -156,11 +516,8 @@ pub unsafe extern "C" fn xorjson_init_exec(mptr: *mut PyObject) -> c_int {
 #[allow(non_upper_case_globals)]
 const Py_mod_gil: c_int = 4;
 #[cfg(Py_3_13)]
-#[allow(non_upper_case_globals, dead_code, fuzzy_provenance_casts)]
+#[allow(non_upper_case_globals, fuzzy_provenance_casts)]
 const Py_MOD_GIL_USED: *mut c_void = 0 as *mut c_void;
-#[cfg(Py_3_13)]
-#[allow(non_upper_case_globals, dead_code, fuzzy_provenance_casts)]
-const Py_MOD_GIL_NOT_USED: *mut c_void = 1 as *mut c_void;
 
 #[cfg(not(Py_3_12))]
 const PYMODULEDEF_LEN: usize = 2;
@@ -182,8 +539,10 @@ pub unsafe extern "C" fn PyInit_xorjson() -> *mut PyModuleDef {
         #[cfg(Py_3_12)]
         PyModuleDef_Slot {
             slot: Py_mod_multiple_interpreters,
-            value: Py_MOD_MULTIPLE_INTERPRETERS_NOT_SUPPORTED,
+            value: Py_MOD_PER_INTERPRETER_GIL_SUPPORTED,
         },
+        // The native types are allocated with the object header of a build
+        // with the GIL, so a free-threaded interpreter must enable the GIL.
         #[cfg(Py_3_13)]
         PyModuleDef_Slot {
             slot: Py_mod_gil,
@@ -199,12 +558,12 @@ pub unsafe extern "C" fn PyInit_xorjson() -> *mut PyModuleDef {
         m_base: PyModuleDef_HEAD_INIT,
         m_name: "xorjson\0".as_ptr() as *const c_char,
         m_doc: null(),
-        m_size: 0,
+        m_size: core::mem::size_of::<*mut module::ModuleState>() as isize,
         m_methods: null_mut(),
         m_slots: Box::into_raw(mod_slots) as *mut PyModuleDef_Slot,
-        m_traverse: None,
-        m_clear: None,
-        m_free: None,
+        m_traverse: Some(module::xorjson_traverse),
+        m_clear: Some(module::xorjson_clear),
+        m_free: Some(module::xorjson_free),
     });
     let init_ptr = Box::into_raw(init);
     PyModuleDef_Init(init_ptr);
@@ -215,6 +574,33 @@ pub unsafe extern "C" fn PyInit_xorjson() -> *mut PyModuleDef {
 #[inline(never)]
 #[cfg_attr(feature = "optimize", optimize(size))]
 fn raise_loads_exception(err: deserialize::DeserializeError) -> *mut PyObject {
+    unsafe {
+        let args = loads_exception_args(err);
+        set_loads_exception(args);
+        debug_assert!(ffi!(Py_REFCNT(args)) <= 2);
+        Py_DECREF(args);
+    };
+    null_mut()
+}
+
+/// Return a new `JSONDecodeError` instance for `err` without raising it.
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+fn loads_exception_instance(err: deserialize::DeserializeError) -> *mut PyObject {
+    unsafe {
+        let args = loads_exception_args(err);
+        let exc = PyObject_Call(module::state().json_decode_error, args, null_mut());
+        Py_DECREF(args);
+        exc
+    }
+}
+
+/// Return the `(msg, doc, pos)` arguments of `JSONDecodeError` for `err`.
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+fn loads_exception_args(err: deserialize::DeserializeError) -> *mut PyObject {
     let pos = err.pos();
     let msg = err.message;
     let doc = match err.data {
@@ -233,22 +619,63 @@ fn raise_loads_exception(err: deserialize::DeserializeError) -> *mut PyObject {
         PyTuple_SET_ITEM(args, 0, err_msg);
         PyTuple_SET_ITEM(args, 1, doc);
         PyTuple_SET_ITEM(args, 2, pos);
-        PyErr_SetObject(typeref::JsonDecodeError, args);
-        debug_assert!(ffi!(Py_REFCNT(args)) <= 2);
-        Py_DECREF(args);
-    };
-    null_mut()
+        args
+    }
 }
 
 #[cold]
 #[inline(never)]
 #[cfg_attr(feature = "optimize", optimize(size))]
-fn raise_dumps_exception_fixed(msg: &str) -> *mut PyObject {
+#[cfg(Py_3_12)]
+unsafe fn set_loads_exception(args: *mut PyObject) {
+    let cause_exc: *mut PyObject = PyErr_GetRaisedException();
+
+    PyErr_SetObject(module::state().json_decode_error, args);
+
+    if !cause_exc.is_null() {
+        let exc: *mut PyObject = PyErr_GetRaisedException();
+        PyException_SetCause(exc, cause_exc);
+        PyErr_SetRaisedException(exc);
+    }
+}
+
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+#[cfg(not(Py_3_12))]
+unsafe fn set_loads_exception(args: *mut PyObject) {
+    let mut cause_tp: *mut PyObject = null_mut();
+    let mut cause_val: *mut PyObject = null_mut();
+    let mut cause_traceback: *mut PyObject = null_mut();
+    PyErr_Fetch(&mut cause_tp, &mut cause_val, &mut cause_traceback);
+
+    PyErr_SetObject(module::state().json_decode_error, args);
+
+    if !cause_tp.is_null() {
+        let mut tp: *mut PyObject = null_mut();
+        let mut val: *mut PyObject = null_mut();
+        let mut traceback: *mut PyObject = null_mut();
+        PyErr_Fetch(&mut tp, &mut val, &mut traceback);
+        PyErr_NormalizeException(&mut tp, &mut val, &mut traceback);
+        PyErr_NormalizeException(&mut cause_tp, &mut cause_val, &mut cause_traceback);
+        PyException_SetCause(val, cause_val);
+        Py_DECREF(cause_tp);
+        if !cause_traceback.is_null() {
+            Py_DECREF(cause_traceback);
+        }
+        PyErr_Restore(tp, val, traceback);
+    }
+}
+
+/// Raise `exc` with the message `msg` for invalid arguments.
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+fn raise_args_exception(exc: *mut PyObject, msg: &str) -> *mut PyObject {
     unsafe {
         let err_msg =
             PyUnicode_FromStringAndSize(msg.as_ptr() as *const c_char, msg.len() as isize);
-        PyErr_SetObject(typeref::JsonEncodeError, err_msg);
-        debug_assert!(ffi!(Py_REFCNT(err_msg)) <= 2);
+        PyErr_SetObject(exc, err_msg);
         Py_DECREF(err_msg);
     };
     null_mut()
@@ -257,7 +684,21 @@ fn raise_dumps_exception_fixed(msg: &str) -> *mut PyObject {
 #[cold]
 #[inline(never)]
 #[cfg_attr(feature = "optimize", optimize(size))]
-#[cfg(Py_3_12)]
+fn raise_dumps_exception_fixed(msg: &str) -> *mut PyObject {
+    unsafe {
+        let err_msg =
+            PyUnicode_FromStringAndSize(msg.as_ptr() as *const c_char, msg.len() as isize);
+        PyErr_SetObject(typeref::JsonEncodeError, err_msg);
+        debug_assert!(ffi!(Py_REFCNT(err_msg)) <= 2);
+        Py_DECREF(err_msg);
+    };
+    null_mut()
+}
+
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+#[cfg(Py_3_12)]
 fn raise_dumps_exception_dynamic(err: &str) -> *mut PyObject {
     unsafe {
         let cause_exc: *mut PyObject = PyErr_GetRaisedException();
@@ -314,13 +755,644 @@ fn raise_dumps_exception_dynamic(err: &str) -> *mut PyObject {
 }
 
 #[no_mangle]
-pub unsafe extern "C" fn loads(_self: *mut PyObject, obj: *mut PyObject) -> *mut PyObject {
-    match crate::deserialize::deserialize(obj) {
+pub unsafe extern "C" fn loads(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    if likely!(kwnames.is_null() && PyVectorcall_NARGS(nargs as usize) == 1) {
+        match crate::deserialize::deserialize(*args) {
+            Ok(val) => val.as_ptr(),
+            Err(err) => raise_loads_exception(err),
+        }
+    } else {
+        loads_with_args(args, nargs, kwnames)
+    }
+}
+
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+unsafe fn loads_with_args(
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let mut argv: [Option<NonNull<PyObject>>; 5] = [None, None, None, None, None];
+    if let Err(msg) = args::parse_args(
+        "loads",
+        &["obj", "paths", "option", "columns", "type"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let obj = argv[0].unwrap().as_ptr();
+    let optsbits = match args::parse_option(argv[2], opt::MAX_LOADS_OPT) {
+        Some(val) => val,
+        None => {
+            return raise_loads_exception(deserialize::DeserializeError::invalid(
+                std::borrow::Cow::Borrowed("Invalid opts"),
+            ))
+        }
+    };
+    #[cfg(not(feature = "yyjson"))]
+    {
+        if unlikely!(optsbits != 0) {
+            return raise_args_exception(
+                PyExc_NotImplementedError,
+                "loads() options require xorjson to be built with yyjson",
+            );
+        }
+    }
+    if let Some(typ) = argv[4] {
+        if unlikely!(argv[1].is_some() || argv[3].is_some()) {
+            return raise_args_exception(
+                PyExc_TypeError,
+                "loads() type cannot be used with paths or columns",
+            );
+        }
+        return loads_typed(obj, typ.as_ptr(), optsbits);
+    }
+    if let Some(columns) = argv[3] {
+        if columns.as_ptr() != typeref::FALSE {
+            if unlikely!(argv[1].is_some()) {
+                return raise_args_exception(
+                    PyExc_TypeError,
+                    "loads() paths and columns cannot be used together",
+                );
+            }
+            let tokens = match parse_columns(columns.as_ptr()) {
+                Some(val) => val,
+                None => return null_mut(),
+            };
+            return match crate::deserialize::deserialize_columns(obj, &tokens, optsbits) {
+                Ok(val) => val.as_ptr(),
+                Err(err) => raise_loads_exception(err),
+            };
+        }
+    }
+    match argv[1] {
+        None => {
+            #[cfg(feature = "yyjson")]
+            let res = if optsbits == 0 {
+                crate::deserialize::deserialize(obj)
+            } else {
+                crate::deserialize::deserialize_with_opts(obj, optsbits)
+            };
+            #[cfg(not(feature = "yyjson"))]
+            let res = crate::deserialize::deserialize(obj);
+            match res {
+                Ok(val) => val.as_ptr(),
+                Err(err) => raise_loads_exception(err),
+            }
+        }
+        Some(paths) => {
+            let pointers = match parse_paths(paths.as_ptr()) {
+                Some(val) => val,
+                None => return null_mut(),
+            };
+            let ret = match crate::deserialize::deserialize_paths(obj, &pointers, optsbits) {
+                Ok(val) => val.as_ptr(),
+                Err(err) => raise_loads_exception(err),
+            };
+            for (key, _) in pointers {
+                Py_DECREF(key.as_ptr());
+            }
+            ret
+        }
+    }
+}
+
+#[cfg(feature = "yyjson")]
+#[cold]
+#[inline(never)]
+unsafe fn loads_typed(obj: *mut PyObject, typ: *mut PyObject, optsbits: opt::Opt) -> *mut PyObject {
+    let plan = match crate::deserialize::compile_type(typ) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    match crate::deserialize::deserialize_typed(obj, &plan, optsbits) {
+        Ok(val) => val.as_ptr(),
+        Err(err) => raise_loads_exception(err),
+    }
+}
+
+#[cfg(not(feature = "yyjson"))]
+#[cold]
+#[inline(never)]
+unsafe fn loads_typed(
+    _obj: *mut PyObject,
+    _typ: *mut PyObject,
+    _optsbits: opt::Opt,
+) -> *mut PyObject {
+    raise_args_exception(
+        PyExc_NotImplementedError,
+        "loads() type requires xorjson to be built with yyjson",
+    )
+}
+
+/// Parse the `columns` argument of `loads()`, `True` or a JSON Pointer
+/// string, to reference tokens. Return `None` with an exception set if it
+/// is invalid.
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+unsafe fn parse_columns(columns: *mut PyObject) -> Option<Vec<String>> {
+    if columns == typeref::TRUE {
+        return Some(Vec::new());
+    }
+    if unlikely!(PyUnicode_Check(columns) == 0) {
+        raise_args_exception(PyExc_TypeError, "loads() columns must be a bool or str");
+        return None;
+    }
+    let pointer = crate::str::unicode_to_str(columns)?;
+    match crate::deserialize::parse_pointer(pointer) {
+        Some(tokens) => Some(tokens),
+        None => {
+            raise_args_exception(
+                PyExc_ValueError,
+                &format!("loads() columns is an invalid JSON Pointer: {:?}", pointer),
+            );
+            None
+        }
+    }
+}
+
+/// Parse the `paths` argument of `loads()`, an iterable of JSON Pointer
+/// strings, to new references to each string and its reference tokens.
+/// Return `None` with an exception set if it is invalid.
+#[cold]
+#[inline(never)]
+#[cfg_attr(feature = "optimize", optimize(size))]
+unsafe fn parse_paths(paths: *mut PyObject) -> Option<Vec<(NonNull<PyObject>, Vec<String>)>> {
+    if unlikely!(PyUnicode_Check(paths) != 0) {
+        raise_args_exception(PyExc_TypeError, "loads() paths must be an iterable of str");
+        return None;
+    }
+    let seq = PySequence_Tuple(paths);
+    if unlikely!(seq.is_null()) {
+        return None;
+    }
+    let mut pointers: Vec<(NonNull<PyObject>, Vec<String>)> = Vec::new();
+    let mut valid = true;
+    for idx in 0..Py_SIZE(seq) {
+        let each = PyTuple_GET_ITEM(seq, idx);
+        let parsed = if PyUnicode_Check(each) == 0 {
+            raise_args_exception(PyExc_TypeError, "loads() paths must be an iterable of str");
+            None
+        } else {
+            match crate::str::unicode_to_str(each) {
+                None => None,
+                Some(pointer) => match crate::deserialize::parse_pointer(pointer) {
+                    Some(tokens) => Some(tokens),
+                    None => {
+                        raise_args_exception(
+                            PyExc_ValueError,
+                            &format!(
+                                "loads() paths contains an invalid JSON Pointer: {:?}",
+                                pointer
+                            ),
+                        );
+                        None
+                    }
+                },
+            }
+        };
+        match parsed {
+            Some(tokens) => {
+                Py_INCREF(each);
+                pointers.push((NonNull::new_unchecked(each), tokens));
+            }
+            None => {
+                valid = false;
+                break;
+            }
+        }
+    }
+    Py_DECREF(seq);
+    if unlikely!(!valid) {
+        for (key, _) in pointers {
+            Py_DECREF(key.as_ptr());
+        }
+        return None;
+    }
+    Some(pointers)
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn loads_lines(_self: *mut PyObject, obj: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let contents = match crate::deserialize::read_file_object(obj) {
+        Ok(val) => val.as_ptr(),
+        Err(err) => return raise_loads_exception(err),
+    };
+    let ret = match crate::deserialize::deserialize_lines(contents) {
         Ok(val) => val.as_ptr(),
         Err(err) => raise_loads_exception(err),
+    };
+    Py_DECREF(contents);
+    ret
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn load_path(_self: *mut PyObject, path: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mapped = match crate::deserialize::MappedFile::open(path) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    let ret = match mapped
+        .contents()
+        .and_then(|buffer| crate::deserialize::deserialize_buffer(buffer, true))
+    {
+        Ok(val) => val.as_ptr(),
+        Err(err) => raise_loads_exception(err),
+    };
+    drop(mapped);
+    ret
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn loads_many(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 3] = [None, None, None];
+    if let Err(msg) = args::parse_args(
+        "loads_many",
+        &["buffers", "threads", "return_exceptions"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let default_threads = std::thread::available_parallelism().map_or(1, |val| val.get());
+    let threads = match args::parse_usize(argv[1], default_threads) {
+        Some(0) => {
+            return raise_args_exception(PyExc_ValueError, "loads_many() threads must be positive")
+        }
+        Some(val) => val,
+        None => {
+            return raise_args_exception(PyExc_TypeError, "loads_many() threads must be an int")
+        }
+    };
+    let return_exceptions = match argv[2] {
+        Some(val) => match PyObject_IsTrue(val.as_ptr()) {
+            -1 => return null_mut(),
+            val => val == 1,
+        },
+        None => false,
+    };
+
+    // A tuple keeps each buffer alive while errors refer to it.
+    let buffers = PySequence_Tuple(argv[0].unwrap().as_ptr());
+    if unlikely!(buffers.is_null()) {
+        return null_mut();
+    }
+    let items = core::slice::from_raw_parts(
+        (*buffers.cast::<PyTupleObject>()).ob_item.as_ptr(),
+        Py_SIZE(buffers) as usize,
+    );
+    let ret = match crate::deserialize::deserialize_many(items, threads, return_exceptions) {
+        Ok(results) => {
+            let list = PyList_New(results.len() as isize);
+            let mut failed = false;
+            for (idx, res) in results.into_iter().enumerate() {
+                let val = match res {
+                    Ok(val) => val.as_ptr(),
+                    Err(_) if failed => null_mut(),
+                    Err(err) => loads_exception_instance(err),
+                };
+                if unlikely!(val.is_null()) {
+                    failed = true;
+                    PyList_SET_ITEM(list, idx as isize, use_immortal!(typeref::NONE));
+                } else {
+                    PyList_SET_ITEM(list, idx as isize, val);
+                }
+            }
+            if unlikely!(failed) {
+                Py_DECREF(list);
+                null_mut()
+            } else {
+                list
+            }
+        }
+        Err(crate::deserialize::ManyError::Deserialize(err)) => raise_loads_exception(err),
+        Err(crate::deserialize::ManyError::Worker) => raise_args_exception(
+            PyExc_RuntimeError,
+            "loads_many() a thread parsing documents panicked",
+        ),
+    };
+    Py_DECREF(buffers);
+    ret
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn loads_prefix(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    if let Err(msg) = args::parse_args(
+        "loads_prefix",
+        &["obj", "offset"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let offset = match args::parse_usize(argv[1], 0) {
+        Some(val) => val,
+        None => {
+            return raise_args_exception(
+                PyExc_TypeError,
+                "loads_prefix() offset must be a non-negative int",
+            )
+        }
+    };
+    match crate::deserialize::deserialize_prefix(argv[0].unwrap().as_ptr(), offset) {
+        Ok((val, end)) => {
+            let tuple = PyTuple_New(2);
+            PyTuple_SET_ITEM(tuple, 0, val.as_ptr());
+            PyTuple_SET_ITEM(tuple, 1, PyLong_FromSize_t(end));
+            tuple
+        }
+        Err(err) => raise_loads_exception(err),
     }
 }
 
+#[no_mangle]
+pub unsafe extern "C" fn reformat(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    if let Err(msg) = args::parse_args(
+        "reformat",
+        &["obj", "option"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let optsbits = match args::parse_option(argv[1], opt::MAX_OPT) {
+        Some(val) => val,
+        None => return raise_dumps_exception_fixed("Invalid opts"),
+    };
+    if unlikely!(optsbits & !opt::REFORMAT_OPTS != 0) {
+        return raise_dumps_exception_fixed(
+            "reformat() option supports only OPT_APPEND_NEWLINE, OPT_INDENT_2, and OPT_SORT_KEYS",
+        );
+    }
+
+    #[cfg(feature = "yyjson")]
+    {
+        match crate::deserialize::reformat(argv[0].unwrap().as_ptr(), optsbits) {
+            Ok(Ok(val)) => val.as_ptr(),
+            Ok(Err(err)) => raise_dumps_exception_dynamic(err.as_str()),
+            Err(err) => raise_loads_exception(err),
+        }
+    }
+
+    #[cfg(not(feature = "yyjson"))]
+    {
+        raise_args_exception(
+            PyExc_NotImplementedError,
+            "reformat() requires xorjson to be built with yyjson",
+        )
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn validate(_self: *mut PyObject, obj: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    match crate::deserialize::validate_document(obj) {
+        Ok(()) => use_immortal!(typeref::NONE),
+        Err(err) => raise_loads_exception(err),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn inspect(_self: *mut PyObject, obj: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    #[cfg(feature = "yyjson")]
+    {
+        match crate::deserialize::inspect_document(obj) {
+            Ok(val) => val.as_ptr(),
+            Err(err) => raise_loads_exception(err),
+        }
+    }
+
+    #[cfg(not(feature = "yyjson"))]
+    {
+        let _ = obj;
+        raise_args_exception(
+            PyExc_NotImplementedError,
+            "inspect() requires xorjson to be built with yyjson",
+        )
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn configure_key_cache(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    if let Err(msg) = args::parse_args(
+        "configure_key_cache",
+        &["capacity", "max_key_len"],
+        0,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let map = &module::state().key_map;
+    let mut values = [map.capacity(), map.max_key_len()];
+    for (idx, (name, max)) in [
+        ("capacity", deserialize::MAX_CAPACITY),
+        ("max_key_len", deserialize::MAX_KEY_LEN),
+    ]
+    .into_iter()
+    .enumerate()
+    {
+        match args::parse_usize(argv[idx], values[idx]) {
+            Some(val) if val <= max => values[idx] = val,
+            Some(_) => {
+                return raise_args_exception(
+                    PyExc_ValueError,
+                    &format!("configure_key_cache() {} must be at most {}", name, max),
+                )
+            }
+            None => {
+                return raise_args_exception(
+                    PyExc_TypeError,
+                    &format!("configure_key_cache() {} must be a non-negative int", name),
+                )
+            }
+        }
+    }
+    map.configure(values[0], values[1]);
+    use_immortal!(typeref::NONE)
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn key_cache_info(_self: *mut PyObject, _: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    module::state().key_map.to_pydict().as_ptr()
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn clear_key_cache(_self: *mut PyObject, _: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    module::state().key_map.clear();
+    use_immortal!(typeref::NONE)
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn loads_lazy(_self: *mut PyObject, obj: *mut PyObject) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    #[cfg(feature = "yyjson")]
+    {
+        match crate::deserialize::deserialize_lazy(obj) {
+            Ok(val) => val.as_ptr(),
+            Err(err) => raise_loads_exception(err),
+        }
+    }
+
+    #[cfg(not(feature = "yyjson"))]
+    {
+        let _ = obj;
+        raise_args_exception(
+            PyExc_NotImplementedError,
+            "loads_lazy() requires xorjson to be built with yyjson",
+        )
+    }
+}
+
+const DEFAULT_CHUNK_SIZE: usize = 65536;
+
+/// Parse the `chunk_size` argument of `iterparse()`, `items()`, `dump()` and
+/// `dumps_iter()`. Return `None` with an exception set if it is invalid.
+unsafe fn parse_chunk_size(fname: &str, ptr: Option<NonNull<PyObject>>) -> Option<usize> {
+    match args::parse_usize(ptr, DEFAULT_CHUNK_SIZE) {
+        Some(0) | None => {
+            raise_args_exception(
+                PyExc_ValueError,
+                &format!("{}() chunk_size must be a positive int", fname),
+            );
+            None
+        }
+        Some(val) => Some(val),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn iterparse(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    if let Err(msg) = args::parse_args(
+        "iterparse",
+        &["source", "chunk_size"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let chunk_size = match parse_chunk_size("iterparse", argv[1]) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    crate::deserialize::new_event_parser("iterparse", argv[0].unwrap().as_ptr(), None, chunk_size)
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn items(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 3] = [None, None, None];
+    if let Err(msg) = args::parse_args(
+        "items",
+        &["source", "prefix", "chunk_size"],
+        2,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_args_exception(PyExc_TypeError, &msg);
+    }
+    let prefix = argv[1].unwrap().as_ptr();
+    if unlikely!(PyUnicode_Check(prefix) == 0) {
+        return raise_args_exception(PyExc_TypeError, "items() prefix must be a str");
+    }
+    let pointer = match crate::str::unicode_to_str(prefix) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    let tokens = match crate::deserialize::parse_pointer(pointer) {
+        Some(val) => val,
+        None => {
+            return raise_args_exception(
+                PyExc_ValueError,
+                &format!("items() prefix is an invalid JSON Pointer: {:?}", pointer),
+            )
+        }
+    };
+    let chunk_size = match parse_chunk_size("items", argv[2]) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    crate::deserialize::new_event_parser(
+        "items",
+        argv[0].unwrap().as_ptr(),
+        Some(tokens),
+        chunk_size,
+    )
+}
+
 #[no_mangle]
 pub unsafe extern "C" fn dumps(
     _self: *mut PyObject,
@@ -328,8 +1400,10 @@ pub unsafe extern "C" fn dumps(
     nargs: Py_ssize_t,
     kwnames: *mut PyObject,
 ) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
     let mut default: Option<NonNull<PyObject>> = None;
     let mut optsptr: Option<NonNull<PyObject>> = None;
+    let mut size_hint: Option<NonNull<PyObject>> = None;
 
     let num_args = PyVectorcall_NARGS(nargs as usize);
     if unlikely!(num_args == 0) {
@@ -360,6 +1434,11 @@ pub unsafe extern "C" fn dumps(
                     );
                 }
                 optsptr = Some(NonNull::new_unchecked(*args.offset(num_args + i)));
+            } else if arg == typeref::SIZE_HINT {
+                let val = *args.offset(num_args + i);
+                if val != typeref::NONE {
+                    size_hint = Some(NonNull::new_unchecked(val));
+                }
             } else {
                 return raise_dumps_exception_fixed("dumps() got an unexpected keyword argument");
             }
@@ -379,8 +1458,199 @@ pub unsafe extern "C" fn dumps(
         }
     }
 
-    match crate::serialize::serialize(*args, default, optsbits as opt::Opt) {
+    let mut capacity: Option<usize> = None;
+    if unlikely!(size_hint.is_some()) {
+        match args::parse_usize(size_hint, 0) {
+            Some(val) => capacity = Some(val),
+            None => {
+                return raise_dumps_exception_fixed("dumps() size_hint must be a non-negative int")
+            }
+        }
+    }
+
+    match crate::serialize::serialize(*args, default, optsbits as opt::Opt, capacity) {
         Ok(val) => val.as_ptr(),
         Err(err) => raise_dumps_exception_dynamic(err.as_str()),
     }
 }
+
+#[no_mangle]
+pub unsafe extern "C" fn dumps_lines(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 3] = [None, None, None];
+    if let Err(msg) = args::parse_args(
+        "dumps_lines",
+        &["iterable", "default", "option"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_dumps_exception_fixed(&msg);
+    }
+    let optsbits = match args::parse_option(argv[2], opt::MAX_OPT) {
+        Some(val) => val,
+        None => return raise_dumps_exception_fixed("Invalid opts"),
+    };
+    if unlikely!(opt_enabled!(optsbits, opt::INDENT_2)) {
+        return raise_dumps_exception_fixed("dumps_lines() does not support OPT_INDENT_2");
+    }
+
+    match crate::serialize::serialize_lines(argv[0].unwrap().as_ptr(), argv[1], optsbits) {
+        Ok(val) => val.as_ptr(),
+        Err(err) => raise_dumps_exception_dynamic(err.as_str()),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn dumps_into(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 5] = [None, None, None, None, None];
+    if let Err(msg) = args::parse_args(
+        "dumps_into",
+        &["obj", "buffer", "offset", "default", "option"],
+        2,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_dumps_exception_fixed(&msg);
+    }
+    let offset = match args::parse_usize(argv[2], 0) {
+        Some(val) => val,
+        None => {
+            return raise_args_exception(
+                PyExc_TypeError,
+                "dumps_into() offset must be a non-negative int",
+            )
+        }
+    };
+    let optsbits = match args::parse_option(argv[4], opt::MAX_OPT) {
+        Some(val) => val,
+        None => return raise_dumps_exception_fixed("Invalid opts"),
+    };
+
+    match crate::serialize::serialize_into(
+        argv[0].unwrap().as_ptr(),
+        argv[3],
+        optsbits,
+        argv[1].unwrap().as_ptr(),
+        offset,
+    ) {
+        Ok(len) => PyLong_FromSize_t(len),
+        Err(serialize::IntoError::NotWritable) => {
+            PyErr_Clear();
+            raise_args_exception(
+                PyExc_TypeError,
+                "dumps_into() buffer must be an object with a writable contiguous buffer",
+            )
+        }
+        Err(serialize::IntoError::Offset(len)) => raise_args_exception(
+            PyExc_ValueError,
+            &format!(
+                "dumps_into() offset is greater than the length of the buffer, {}",
+                len
+            ),
+        ),
+        Err(serialize::IntoError::Overflow(len, available)) => raise_args_exception(
+            PyExc_ValueError,
+            &format!(
+                "dumps_into() output of {} bytes does not fit in the {} bytes of the buffer after offset",
+                len, available
+            ),
+        ),
+        Err(serialize::IntoError::Serialize(err)) => raise_dumps_exception_dynamic(err.as_str()),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn dump(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 5] = [None, None, None, None, None];
+    if let Err(msg) = args::parse_args(
+        "dump",
+        &["obj", "fp", "default", "option", "chunk_size"],
+        2,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_dumps_exception_fixed(&msg);
+    }
+    let optsbits = match args::parse_option(argv[3], opt::MAX_OPT) {
+        Some(val) => val,
+        None => return raise_dumps_exception_fixed("Invalid opts"),
+    };
+    let chunk_size = match parse_chunk_size("dump", argv[4]) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    let sink = match crate::serialize::Sink::new(argv[1].unwrap().as_ptr()) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+
+    match crate::serialize::serialize_to_sink(
+        argv[0].unwrap().as_ptr(),
+        argv[2],
+        optsbits,
+        sink,
+        chunk_size,
+    ) {
+        Ok(()) => use_immortal!(typeref::NONE),
+        Err(serialize::DumpError::Sink(err)) => {
+            err.restore();
+            null_mut()
+        }
+        Err(serialize::DumpError::Serialize(err)) => raise_dumps_exception_dynamic(err.as_str()),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn dumps_iter(
+    _self: *mut PyObject,
+    args: *const *mut PyObject,
+    nargs: Py_ssize_t,
+    kwnames: *mut PyObject,
+) -> *mut PyObject {
+    let _state = module::StateGuard::of_module(_self);
+    let mut argv: [Option<NonNull<PyObject>>; 4] = [None, None, None, None];
+    if let Err(msg) = args::parse_args(
+        "dumps_iter",
+        &["obj", "default", "option", "chunk_size"],
+        1,
+        args,
+        nargs,
+        kwnames,
+        &mut argv,
+    ) {
+        return raise_dumps_exception_fixed(&msg);
+    }
+    let optsbits = match args::parse_option(argv[2], opt::MAX_OPT) {
+        Some(val) => val,
+        None => return raise_dumps_exception_fixed("Invalid opts"),
+    };
+    let chunk_size = match parse_chunk_size("dumps_iter", argv[3]) {
+        Some(val) => val,
+        None => return null_mut(),
+    };
+    crate::serialize::new_dumps_iter(argv[0].unwrap().as_ptr(), argv[1], optsbits, chunk_size)
+}
@@ -0,0 +1,278 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::deserialize::KeyMap;
+#[cfg(feature = "yyjson")]
+use crate::deserialize::TypedCache;
+#[cfg(feature = "yyjson")]
+use crate::ffi::PyLock;
+use crate::serialize::SizeHint;
+use crate::typeref::NumpyTypes;
+use core::cell::Cell;
+use core::ffi::{c_char, c_int, c_uint, c_ulong, c_void};
+use core::ptr::{addr_of_mut, null, null_mut, NonNull};
+use core::sync::atomic::{AtomicPtr, Ordering};
+use once_cell::race::OnceBox;
+use pyo3_ffi::*;
+
+#[cfg(Py_3_9)]
+extern "C" {
+    fn PyType_GetModuleState(tp: *mut PyTypeObject) -> *mut c_void;
+}
+
+/// The state of one module object: the objects that belong to its
+/// interpreter and the caches of its strings. The builtin types, immortal
+/// objects and interned strings in `typeref` are shared by all interpreters.
+pub struct ModuleState {
+    pub key_map: KeyMap,
+    /// Short string values, used with `OPT_CACHE_STRINGS` so that repeated
+    /// values share one object. It is separate from `key_map` so that values
+    /// do not evict keys.
+    pub value_map: KeyMap,
+    /// The length of recent output of `dumps()`.
+    pub size_hint: SizeHint,
+    pub json_decode_error: *mut PyObject,
+    pub decoder_type: *mut PyTypeObject,
+    pub dumps_iter_type: *mut PyTypeObject,
+    pub encoder_type: *mut PyTypeObject,
+    pub event_parser_type: *mut PyTypeObject,
+    pub fragment_type: *mut PyTypeObject,
+    #[cfg(feature = "yyjson")]
+    pub lazy_document_type: *mut PyTypeObject,
+    #[cfg(feature = "yyjson")]
+    pub lazy_iterator_type: *mut PyTypeObject,
+    pub enum_type: *mut PyTypeObject,
+    pub field_type: *mut PyTypeObject,
+    pub uuid_type: *mut PyTypeObject,
+    #[cfg(Py_3_9)]
+    pub zoneinfo_type: *mut PyTypeObject,
+    pub numpy_types: OnceBox<Option<NonNull<NumpyTypes>>>,
+    #[cfg(feature = "yyjson")]
+    pub typed: PyLock<TypedCache>,
+}
+
+impl ModuleState {
+    #[cold]
+    #[cfg_attr(feature = "optimize", optimize(size))]
+    unsafe fn new(mptr: *mut PyObject) -> Self {
+        ModuleState {
+            key_map: KeyMap::default(),
+            value_map: KeyMap::default(),
+            size_hint: SizeHint::new(),
+            json_decode_error: crate::typeref::look_up_json_exc(),
+            decoder_type: crate::deserialize::xorjson_decodertype_new(mptr),
+            dumps_iter_type: crate::serialize::xorjson_dumpsitertype_new(mptr),
+            encoder_type: crate::serialize::xorjson_encodertype_new(mptr),
+            event_parser_type: crate::deserialize::xorjson_eventparsertype_new(mptr),
+            fragment_type: crate::ffi::xorjson_fragmenttype_new(mptr),
+            #[cfg(feature = "yyjson")]
+            lazy_document_type: crate::deserialize::xorjson_lazydocumenttype_new(mptr),
+            #[cfg(feature = "yyjson")]
+            lazy_iterator_type: crate::deserialize::xorjson_lazyiteratortype_new(mptr),
+            enum_type: crate::typeref::look_up_enum_type(),
+            field_type: crate::typeref::look_up_field_type(),
+            uuid_type: crate::typeref::look_up_uuid_type(),
+            #[cfg(Py_3_9)]
+            zoneinfo_type: crate::typeref::look_up_zoneinfo_type(),
+            numpy_types: OnceBox::new(),
+            #[cfg(feature = "yyjson")]
+            typed: PyLock::new(TypedCache::default()),
+        }
+    }
+
+    /// Return the references that the state owns, for the garbage collector.
+    fn refs(&mut self) -> Vec<*mut *mut PyObject> {
+        let mut refs: Vec<*mut *mut PyObject> = vec![
+            addr_of_mut!(self.json_decode_error),
+            addr_of_mut!(self.decoder_type).cast(),
+            addr_of_mut!(self.dumps_iter_type).cast(),
+            addr_of_mut!(self.encoder_type).cast(),
+            addr_of_mut!(self.event_parser_type).cast(),
+            addr_of_mut!(self.fragment_type).cast(),
+            addr_of_mut!(self.enum_type).cast(),
+            addr_of_mut!(self.field_type).cast(),
+            addr_of_mut!(self.uuid_type).cast(),
+        ];
+        #[cfg(feature = "yyjson")]
+        refs.push(addr_of_mut!(self.lazy_document_type).cast());
+        #[cfg(feature = "yyjson")]
+        refs.push(addr_of_mut!(self.lazy_iterator_type).cast());
+        #[cfg(Py_3_9)]
+        refs.push(addr_of_mut!(self.zoneinfo_type).cast());
+        refs
+    }
+}
+
+thread_local! {
+    /// The state of the module whose function or type the thread is calling.
+    static ACTIVE: Cell<*const ModuleState> = const { Cell::new(null()) };
+}
+
+/// The state of the module most recently created. It is used when no state
+/// is active, which is the case for the types of Python 3.8, as they cannot
+/// find their module.
+static LATEST: AtomicPtr<ModuleState> = AtomicPtr::new(null_mut());
+
+/// Return the state of the module being called on this thread. The module
+/// is alive, as a function or type of it is being called.
+#[inline(always)]
+pub fn state() -> &'static ModuleState {
+    let active = ACTIVE.with(Cell::get);
+    if likely!(!active.is_null()) {
+        unsafe { &*active }
+    } else {
+        unsafe { &*LATEST.load(Ordering::Acquire) }
+    }
+}
+
+/// Make the state of a module the one `state()` returns until it is
+/// dropped. Each function of the module and each method of its types enters
+/// the state of its own module, so that modules imported again or by other
+/// interpreters do not share state.
+pub struct StateGuard {
+    previous: *const ModuleState,
+}
+
+impl StateGuard {
+    #[inline(always)]
+    fn enter(state: *const ModuleState) -> Self {
+        StateGuard {
+            previous: ACTIVE.with(|active| active.replace(state)),
+        }
+    }
+
+    /// Enter the state of the module `mptr`, the `self` of its functions.
+    #[inline(always)]
+    pub fn of_module(mptr: *mut PyObject) -> Self {
+        StateGuard::enter(unsafe { *state_slot(mptr) })
+    }
+
+    /// Enter the state of the module that created the type `tp`.
+    #[inline(always)]
+    pub fn of_type(tp: *mut PyTypeObject) -> Self {
+        #[cfg(Py_3_9)]
+        let state = unsafe { *(PyType_GetModuleState(tp) as *mut *mut ModuleState) };
+        #[cfg(not(Py_3_9))]
+        let state = {
+            let _ = tp;
+            ACTIVE.with(Cell::get)
+        };
+        StateGuard::enter(state)
+    }
+
+    /// Enter the state of the module that created the type of `obj`.
+    #[inline(always)]
+    pub fn of_object(obj: *mut PyObject) -> Self {
+        StateGuard::of_type(ob_type!(obj))
+    }
+}
+
+impl Drop for StateGuard {
+    #[inline(always)]
+    fn drop(&mut self) {
+        ACTIVE.with(|active| active.set(self.previous));
+    }
+}
+
+#[inline(always)]
+unsafe fn state_slot(mptr: *mut PyObject) -> *mut *mut ModuleState {
+    PyModule_GetState(mptr) as *mut *mut ModuleState
+}
+
+/// Create the state of the module `mptr`.
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe fn init_module_state(mptr: *mut PyObject) -> &'static ModuleState {
+    let state = Box::into_raw(Box::new(ModuleState::new(mptr)));
+    *state_slot(mptr) = state;
+    LATEST.store(state, Ordering::Release);
+    &*state
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_traverse(
+    mptr: *mut PyObject,
+    visit: visitproc,
+    arg: *mut c_void,
+) -> c_int {
+    let state = *state_slot(mptr);
+    if !state.is_null() {
+        for each in (*state).refs() {
+            if !(*each).is_null() {
+                let ret = visit(*each, arg);
+                if ret != 0 {
+                    return ret;
+                }
+            }
+        }
+    }
+    0
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_clear(mptr: *mut PyObject) -> c_int {
+    let state = *state_slot(mptr);
+    if !state.is_null() {
+        for each in (*state).refs() {
+            let obj = *each;
+            *each = null_mut();
+            Py_XDECREF(obj);
+        }
+    }
+    0
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_free(mptr: *mut c_void) {
+    let mptr = mptr as *mut PyObject;
+    let slot = state_slot(mptr);
+    if slot.is_null() || (*slot).is_null() {
+        return;
+    }
+    xorjson_clear(mptr);
+    let state = *slot;
+    *slot = null_mut();
+    let _ = LATEST.compare_exchange(state, null_mut(), Ordering::AcqRel, Ordering::Acquire);
+    drop(Box::from_raw(state));
+}
+
+/// Return a new type of the module `mptr` with the functions of `slots`. A
+/// type without `Py_tp_new` cannot be created from Python.
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe fn new_type(
+    mptr: *mut PyObject,
+    name: &'static str,
+    basicsize: usize,
+    flags: c_ulong,
+    mut slots: Vec<PyType_Slot>,
+) -> *mut PyTypeObject {
+    let instantiable = slots.iter().any(|each| each.slot == Py_tp_new);
+    slots.push(PyType_Slot {
+        slot: 0,
+        pfunc: null_mut(),
+    });
+    let mut spec = PyType_Spec {
+        name: name.as_ptr() as *const c_char,
+        basicsize: basicsize as c_int,
+        itemsize: 0,
+        flags: flags as c_uint,
+        slots: slots.as_mut_ptr(),
+    };
+    #[cfg(Py_3_9)]
+    let tp = PyType_FromModuleAndSpec(mptr, &mut spec, null_mut()) as *mut PyTypeObject;
+    #[cfg(not(Py_3_9))]
+    let tp = {
+        let _ = mptr;
+        PyType_FromSpec(&mut spec) as *mut PyTypeObject
+    };
+    if !instantiable && !tp.is_null() {
+        (*tp).tp_new = None;
+    }
+    tp
+}
@@ -15,12 +15,19 @@ pub const PASSTHROUGH_DATETIME: Opt = 1 << 9;
 pub const APPEND_NEWLINE: Opt = 1 << 10;
 pub const PASSTHROUGH_DATACLASS: Opt = 1 << 11;
 
+// loads() options are above the range of dumps() options.
+pub const DESERIALIZE_NUMPY: Opt = 1 << 12;
+pub const CACHE_STRINGS: Opt = 1 << 13;
+
 // deprecated
 pub const SERIALIZE_DATACLASS: Opt = 0;
 pub const SERIALIZE_UUID: Opt = 0;
 
 pub const SORT_OR_NON_STR_KEYS: Opt = SORT_KEYS | NON_STR_KEYS;
 
+// Only formatting options apply to reformat().
+pub const REFORMAT_OPTS: Opt = APPEND_NEWLINE | INDENT_2 | SORT_KEYS;
+
 pub const NOT_PASSTHROUGH: Opt =
     !(PASSTHROUGH_DATETIME | PASSTHROUGH_DATACLASS | PASSTHROUGH_SUBCLASS);
 
@@ -38,3 +45,5 @@ pub const MAX_OPT: i32 = (APPEND_NEWLINE
     | SORT_KEYS
     | STRICT_INTEGER
     | UTC_Z) as i32;
+
+pub const MAX_LOADS_OPT: i32 = (CACHE_STRINGS | DESERIALIZE_NUMPY) as i32;
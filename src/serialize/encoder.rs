@@ -0,0 +1,397 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::ffi::PyLock;
+use crate::opt::{Opt, MAX_OPT};
+use crate::serialize::obtype::ObType;
+use crate::serialize::per_type::dataclass_field_names;
+use crate::serialize::writer::SizeHint;
+use crate::str::unicode_to_str;
+use crate::typeref::NONE;
+use core::cell::Cell;
+use core::ffi::{c_char, c_int, c_ulong, c_void};
+use core::ptr::{addr_of_mut, null, null_mut, NonNull};
+use pyo3_ffi::*;
+
+/// The number of types whose dispatch each encoder caches.
+const MAX_CACHED_TYPES: usize = 64;
+
+/// Types that are not builtin, such as dataclasses and enums, are resolved
+/// by the encoder once instead of on each object. It keeps a reference to
+/// each type so that an address is not reused by another type.
+#[derive(Default)]
+struct EncoderCache {
+    types: Vec<(*mut PyTypeObject, ObType)>,
+    plans: Vec<(*mut PyTypeObject, *mut PyObject)>,
+}
+
+unsafe impl Send for EncoderCache {}
+
+impl Drop for EncoderCache {
+    fn drop(&mut self) {
+        for &(tp, _) in self.types.iter() {
+            ffi!(Py_DECREF(tp as *mut PyObject));
+        }
+        for &(tp, plan) in self.plans.iter() {
+            ffi!(Py_DECREF(tp as *mut PyObject));
+            ffi!(Py_DECREF(plan));
+        }
+    }
+}
+
+/// An encoder is tracked by the garbage collector, as `default` and the
+/// cached types can refer back to it, for example by a closure or a class
+/// attribute.
+#[repr(C)]
+pub struct Encoder {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    default: Option<NonNull<PyObject>>,
+    opts: Opt,
+    /// The length of the output of the encoder, apart from `dumps()`.
+    size_hint: SizeHint,
+    cache: PyLock<EncoderCache>,
+}
+
+thread_local! {
+    /// The encoder that is serializing on this thread, if any.
+    static ACTIVE: Cell<*const Encoder> = const { Cell::new(null()) };
+}
+
+/// Return whether the options of the encoder are those of the serializer
+/// state `opts`, which also counts recursion.
+#[inline(always)]
+fn same_opts(encoder_opts: Opt, opts: Opt) -> bool {
+    (encoder_opts ^ opts) & MAX_OPT as Opt == 0
+}
+
+#[inline(always)]
+fn active() -> Option<&'static Encoder> {
+    unsafe { ACTIVE.with(Cell::get).as_ref() }
+}
+
+/// Return the cached dispatch of `ob_type` if an encoder with options
+/// `opts` is serializing.
+#[inline(always)]
+pub fn cached_obtype(ob_type: *mut PyTypeObject, opts: Opt) -> Option<ObType> {
+    let encoder = active()?;
+    if !same_opts(encoder.opts, opts) {
+        return None;
+    }
+    let cache = encoder.cache.lock();
+    cache
+        .types
+        .iter()
+        .find(|each| each.0 == ob_type)
+        .map(|each| each.1)
+}
+
+/// Cache the dispatch of `ob_type` in the encoder that is serializing, if
+/// any, for options `opts`.
+#[cold]
+pub fn cache_obtype(ob_type: *mut PyTypeObject, opts: Opt, obtype: ObType) {
+    if let Some(encoder) = active() {
+        if !same_opts(encoder.opts, opts) {
+            return;
+        }
+        let mut cache = encoder.cache.lock();
+        if cache.types.len() < MAX_CACHED_TYPES && !cache.types.iter().any(|each| each.0 == ob_type)
+        {
+            ffi!(Py_INCREF(ob_type as *mut PyObject));
+            cache.types.push((ob_type, obtype));
+        }
+    }
+}
+
+/// Return a new reference to the tuple of the names of the fields to
+/// serialize of the dataclass `ptr`, if an encoder is serializing. The
+/// names are found once for each type.
+pub fn dataclass_plan(ptr: *mut PyObject) -> Option<NonNull<PyObject>> {
+    let encoder = active()?;
+    let ob_type = ob_type!(ptr);
+    {
+        let cache = encoder.cache.lock();
+        if let Some(each) = cache.plans.iter().find(|each| each.0 == ob_type) {
+            ffi!(Py_INCREF(each.1));
+            return Some(nonnull!(each.1));
+        }
+    }
+    let plan = NonNull::new(dataclass_field_names(ptr))?;
+    let mut cache = encoder.cache.lock();
+    if cache.plans.len() < MAX_CACHED_TYPES && !cache.plans.iter().any(|each| each.0 == ob_type) {
+        ffi!(Py_INCREF(ob_type as *mut PyObject));
+        ffi!(Py_INCREF(plan.as_ptr()));
+        cache.plans.push((ob_type, plan.as_ptr()));
+    }
+    Some(plan)
+}
+
+/// Make the encoder the active encoder of the thread until it is dropped.
+struct ActiveGuard {
+    previous: *const Encoder,
+}
+
+impl ActiveGuard {
+    fn new(encoder: &Encoder) -> Self {
+        ActiveGuard {
+            previous: ACTIVE.with(|active| active.replace(encoder)),
+        }
+    }
+}
+
+impl Drop for ActiveGuard {
+    fn drop(&mut self) {
+        ACTIVE.with(|active| active.set(self.previous));
+    }
+}
+
+#[inline(always)]
+fn as_encoder(obj: *mut PyObject) -> &'static Encoder {
+    unsafe { &*(obj as *mut Encoder) }
+}
+
+/// Return the arguments of `Encoder()`, `default` and `option`, from the
+/// arguments of `tp_new`.
+unsafe fn parse_new_args(
+    args: *mut PyObject,
+    kwds: *mut PyObject,
+) -> Result<[Option<NonNull<PyObject>>; 2], String> {
+    const NAMES: [&str; 2] = ["default", "option"];
+    let mut argv: [Option<NonNull<PyObject>>; 2] = [None, None];
+    let num_args = Py_SIZE(args) as usize;
+    if num_args > argv.len() {
+        return Err(format!(
+            "Encoder() takes at most 2 arguments ({} given)",
+            num_args
+        ));
+    }
+    for (idx, slot) in argv.iter_mut().enumerate().take(num_args) {
+        *slot = Some(nonnull!(PyTuple_GET_ITEM(args, idx as Py_ssize_t)));
+    }
+    if !kwds.is_null() {
+        let mut pos: Py_ssize_t = 0;
+        let mut key: *mut PyObject = null_mut();
+        let mut value: *mut PyObject = null_mut();
+        while PyDict_Next(kwds, &mut pos, &mut key, &mut value) != 0 {
+            let kwname = unicode_to_str(key).unwrap_or("");
+            let idx = match NAMES.iter().position(|&name| name == kwname) {
+                Some(idx) => idx,
+                None => {
+                    return Err(format!(
+                        "Encoder() got an unexpected keyword argument: '{}'",
+                        kwname
+                    ))
+                }
+            };
+            if idx < num_args {
+                return Err(format!(
+                    "Encoder() got multiple values for argument: '{}'",
+                    NAMES[idx]
+                ));
+            }
+            argv[idx] = Some(nonnull!(value));
+        }
+    }
+    for slot in argv.iter_mut() {
+        if matches!(slot, Some(val) if val.as_ptr() == NONE) {
+            *slot = None;
+        }
+    }
+    Ok(argv)
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_encoder_tp_new(
+    subtype: *mut PyTypeObject,
+    args: *mut PyObject,
+    kwds: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_type(subtype);
+    let argv = match parse_new_args(args, kwds) {
+        Ok(val) => val,
+        Err(msg) => return crate::raise_dumps_exception_fixed(&msg),
+    };
+    let opts = match crate::args::parse_option(argv[1], MAX_OPT) {
+        Some(val) => val,
+        None => return crate::raise_dumps_exception_fixed("Invalid opts"),
+    };
+    // The object is allocated by the type so that it has the header of the
+    // garbage collector, and it holds a reference to the type.
+    let obj = PyType_GenericAlloc(subtype, 0);
+    if obj.is_null() {
+        return null_mut();
+    }
+    if let Some(default) = argv[0] {
+        Py_INCREF(default.as_ptr());
+    }
+    let encoder = obj as *mut Encoder;
+    addr_of_mut!((*encoder).default).write(argv[0]);
+    addr_of_mut!((*encoder).opts).write(opts);
+    addr_of_mut!((*encoder).size_hint).write(SizeHint::new());
+    addr_of_mut!((*encoder).cache).write(PyLock::new(EncoderCache::default()));
+    obj
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_encoder_traverse(
+    object: *mut PyObject,
+    visit: visitproc,
+    arg: *mut c_void,
+) -> c_int {
+    let encoder = as_encoder(object);
+    let cache = encoder.cache.lock();
+    let refs = [(*object).ob_type as *mut PyObject]
+        .into_iter()
+        .chain(encoder.default.map(NonNull::as_ptr))
+        .chain(cache.types.iter().map(|each| each.0 as *mut PyObject))
+        .chain(
+            cache
+                .plans
+                .iter()
+                .flat_map(|each| [each.0 as *mut PyObject, each.1]),
+        );
+    for each in refs {
+        let ret = visit(each, arg);
+        if ret != 0 {
+            return ret;
+        }
+    }
+    0
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_encoder_clear(object: *mut PyObject) -> c_int {
+    let encoder = object as *mut Encoder;
+    let default = (*encoder).default.take();
+    let cache = core::mem::take(&mut *(*encoder).cache.lock());
+    drop(cache);
+    if let Some(default) = default {
+        Py_DECREF(default.as_ptr());
+    }
+    0
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_encoder_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    PyObject_GC_UnTrack(object as *mut c_void);
+    xorjson_encoder_clear(object);
+    core::ptr::drop_in_place(object as *mut Encoder);
+    PyObject_GC_Del(object as *mut c_void);
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_encoder_encode(
+    object: *mut PyObject,
+    obj: *mut PyObject,
+) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let encoder = as_encoder(object);
+    let res = {
+        let _guard = ActiveGuard::new(encoder);
+        crate::serialize::serialize_sized(
+            obj,
+            encoder.default,
+            encoder.opts,
+            encoder.size_hint.capacity(),
+        )
+    };
+    match res {
+        Ok(val) => {
+            encoder.size_hint.update(Py_SIZE(val.as_ptr()) as usize);
+            val.as_ptr()
+        }
+        Err(err) => crate::raise_dumps_exception_dynamic(err.as_str()),
+    }
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_encoder_size_hint(
+    object: *mut PyObject,
+    _closure: *mut c_void,
+) -> *mut PyObject {
+    PyLong_FromSize_t(as_encoder(object).size_hint.get())
+}
+
+#[cfg(Py_3_10)]
+const ENCODER_TP_FLAGS: c_ulong =
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC | Py_TPFLAGS_IMMUTABLETYPE;
+
+#[cfg(not(Py_3_10))]
+const ENCODER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC;
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_encodertype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    let methods = Box::new([
+        PyMethodDef {
+            ml_name: "encode\0".as_ptr() as *const c_char,
+            ml_meth: PyMethodDefPointer {
+                PyCFunction: xorjson_encoder_encode,
+            },
+            ml_flags: METH_O,
+            ml_doc: "encode(obj, /)\n--\n\nSerialize Python objects to JSON.\0".as_ptr()
+                as *const c_char,
+        },
+        PyMethodDef::zeroed(),
+    ]);
+    let getset = Box::new([
+        PyGetSetDef {
+            name: "size_hint\0".as_ptr() as *const c_char,
+            get: Some(xorjson_encoder_size_hint),
+            set: None,
+            doc: "The size in bytes of the buffer that encode() starts with.\0".as_ptr()
+                as *const c_char,
+            closure: null_mut(),
+        },
+        PyGetSetDef {
+            name: null(),
+            get: None,
+            set: None,
+            doc: null(),
+            closure: null_mut(),
+        },
+    ]);
+    crate::module::new_type(
+        module,
+        "xorjson.Encoder\0",
+        core::mem::size_of::<Encoder>(),
+        ENCODER_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_new,
+                pfunc: xorjson_encoder_tp_new as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_encoder_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_traverse,
+                pfunc: xorjson_encoder_traverse as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_clear,
+                pfunc: xorjson_encoder_clear as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_methods,
+                pfunc: Box::into_raw(methods) as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_getset,
+                pfunc: Box::into_raw(getset) as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_doc,
+                pfunc: "Encoder(default=None, option=None)\n--\n\nSerialize Python objects to JSON with the same default and option.\0"
+                    .as_ptr() as *mut c_void,
+            },
+        ],
+    )
+}
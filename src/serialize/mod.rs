@@ -1,10 +1,18 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+mod encoder;
 mod error;
 mod obtype;
 mod per_type;
 mod serializer;
 mod state;
+mod stream;
 mod writer;
 
-pub use serializer::serialize;
+pub use encoder::xorjson_encodertype_new;
+pub use serializer::{
+    serialize, serialize_into, serialize_lines, serialize_sized, serialize_to_sink, serialize_with,
+    DumpError, IntoError,
+};
+pub use stream::{new_dumps_iter, xorjson_dumpsitertype_new};
+pub use writer::{Sink, SizeHint};
@@ -5,11 +5,12 @@ use crate::opt::{
 };
 use crate::serialize::per_type::{is_numpy_array, is_numpy_scalar};
 use crate::typeref::{
-    BOOL_TYPE, DATACLASS_FIELDS_STR, DATETIME_TYPE, DATE_TYPE, DICT_TYPE, ENUM_TYPE, FLOAT_TYPE,
-    FRAGMENT_TYPE, INT_TYPE, LIST_TYPE, NONE_TYPE, STR_TYPE, TIME_TYPE, TUPLE_TYPE, UUID_TYPE,
+    BOOL_TYPE, DATACLASS_FIELDS_STR, DATETIME_TYPE, DATE_TYPE, DICT_TYPE, FLOAT_TYPE, INT_TYPE,
+    LIST_TYPE, NONE_TYPE, STR_TYPE, TIME_TYPE, TUPLE_TYPE,
 };
 
 #[repr(u32)]
+#[derive(Clone, Copy)]
 pub enum ObType {
     Str,
     Int,
@@ -59,11 +60,26 @@ pub fn pyobject_to_obtype(obj: *mut pyo3_ffi::PyObject, opts: Opt) -> ObType {
 #[cfg_attr(feature = "optimize", optimize(size))]
 #[inline(never)]
 pub fn pyobject_to_obtype_unlikely(ob_type: *mut pyo3_ffi::PyTypeObject, opts: Opt) -> ObType {
-    if is_class_by_type!(ob_type, UUID_TYPE) {
+    if let Some(obtype) = crate::serialize::encoder::cached_obtype(ob_type, opts) {
+        return obtype;
+    }
+    let obtype = resolve_obtype(ob_type, opts);
+    crate::serialize::encoder::cache_obtype(ob_type, opts, obtype);
+    obtype
+}
+
+#[cfg_attr(feature = "optimize", optimize(size))]
+#[inline(never)]
+fn resolve_obtype(ob_type: *mut pyo3_ffi::PyTypeObject, opts: Opt) -> ObType {
+    let state = crate::module::state();
+    let uuid_type = state.uuid_type;
+    let fragment_type = state.fragment_type;
+    let enum_type = state.enum_type;
+    if is_class_by_type!(ob_type, uuid_type) {
         return ObType::Uuid;
     } else if is_class_by_type!(ob_type, TUPLE_TYPE) {
         return ObType::Tuple;
-    } else if is_class_by_type!(ob_type, FRAGMENT_TYPE) {
+    } else if is_class_by_type!(ob_type, fragment_type) {
         return ObType::Fragment;
     }
 
@@ -87,7 +103,7 @@ pub fn pyobject_to_obtype_unlikely(ob_type: *mut pyo3_ffi::PyTypeObject, opts: O
         }
     }
 
-    if is_subclass_by_type!(ob_type, ENUM_TYPE) {
+    if is_subclass_by_type!(ob_type, enum_type) {
         return ObType::Enum;
     }
 
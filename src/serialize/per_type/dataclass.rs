@@ -5,9 +5,7 @@ use crate::serialize::per_type::dict::ZeroDictSerializer;
 use crate::serialize::serializer::PyObjectSerializer;
 use crate::serialize::state::SerializerState;
 use crate::str::unicode_to_str;
-use crate::typeref::{
-    DATACLASS_FIELDS_STR, DICT_STR, FIELD_TYPE, FIELD_TYPE_STR, SLOTS_STR, STR_TYPE,
-};
+use crate::typeref::{DATACLASS_FIELDS_STR, DICT_STR, FIELD_TYPE_STR, SLOTS_STR, STR_TYPE};
 
 use serde::ser::{Serialize, SerializeMap, Serializer};
 
@@ -92,7 +90,7 @@ impl Serialize for DataclassFastSerializer {
         if unlikely!(len == 0) {
             return ZeroDictSerializer::new().serialize(serializer);
         }
-        let mut map = serializer.serialize_map(None).unwrap();
+        let mut map = serializer.serialize_map(None)?;
 
         let mut pos = 0;
         let mut next_key: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
@@ -121,7 +119,7 @@ impl Serialize for DataclassFastSerializer {
                 continue;
             }
             let pyvalue = PyObjectSerializer::new(value, self.state, self.default);
-            map.serialize_key(key_as_str).unwrap();
+            map.serialize_key(key_as_str)?;
             map.serialize_value(&pyvalue)?;
         }
         map.end()
@@ -148,6 +146,66 @@ impl DataclassFallbackSerializer {
     }
 }
 
+/// Return a new tuple of the names of the fields of the dataclass `ptr`
+/// that are serialized, or null if a name is not valid UTF-8.
+pub fn dataclass_field_names(ptr: *mut pyo3_ffi::PyObject) -> *mut pyo3_ffi::PyObject {
+    let fields = ffi!(PyObject_GetAttr(ptr, DATACLASS_FIELDS_STR));
+    ffi!(Py_DECREF(fields));
+    let mut names: Vec<*mut pyo3_ffi::PyObject> =
+        Vec::with_capacity(ffi!(Py_SIZE(fields)) as usize);
+    let mut pos = 0;
+    let mut attr: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
+    let mut field: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
+    while ffi!(PyDict_Next(fields, &mut pos, &mut attr, &mut field)) != 0 {
+        let field_type = ffi!(PyObject_GetAttr(field, FIELD_TYPE_STR));
+        ffi!(Py_DECREF(field_type));
+        if field_type as *mut pyo3_ffi::PyTypeObject != crate::module::state().field_type {
+            continue;
+        }
+        match unicode_to_str(attr) {
+            None => return core::ptr::null_mut(),
+            Some(key) if key.as_bytes()[0] == b'_' => continue,
+            Some(_) => names.push(attr),
+        }
+    }
+    let tuple = ffi!(PyTuple_New(names.len() as pyo3_ffi::Py_ssize_t));
+    for (idx, &name) in names.iter().enumerate() {
+        ffi!(Py_INCREF(name));
+        ffi!(PyTuple_SET_ITEM(tuple, idx as pyo3_ffi::Py_ssize_t, name));
+    }
+    tuple
+}
+
+impl DataclassFallbackSerializer {
+    /// Serialize the fields named by `plan`, a tuple of `str`.
+    fn serialize_plan<S>(
+        &self,
+        plan: *mut pyo3_ffi::PyObject,
+        serializer: S,
+    ) -> Result<S::Ok, S::Error>
+    where
+        S: Serializer,
+    {
+        let len = ffi!(Py_SIZE(plan)) as usize;
+        if unlikely!(len == 0) {
+            return ZeroDictSerializer::new().serialize(serializer);
+        }
+        let mut map = serializer.serialize_map(None)?;
+        for idx in 0..len {
+            let attr = ffi!(PyTuple_GET_ITEM(plan, idx as pyo3_ffi::Py_ssize_t));
+            let key_as_str = unicode_to_str(attr).unwrap();
+            let value = ffi!(PyObject_GetAttr(self.ptr, attr));
+            debug_assert!(ffi!(Py_REFCNT(value)) >= 2);
+            ffi!(Py_DECREF(value));
+            let pyvalue = PyObjectSerializer::new(value, self.state, self.default);
+
+            map.serialize_key(key_as_str)?;
+            map.serialize_value(&pyvalue)?
+        }
+        map.end()
+    }
+}
+
 impl Serialize for DataclassFallbackSerializer {
     #[cold]
     #[inline(never)]
@@ -155,6 +213,11 @@ impl Serialize for DataclassFallbackSerializer {
     where
         S: Serializer,
     {
+        if let Some(plan) = crate::serialize::encoder::dataclass_plan(self.ptr) {
+            let ret = self.serialize_plan(plan.as_ptr(), serializer);
+            ffi!(Py_DECREF(plan.as_ptr()));
+            return ret;
+        }
         let fields = ffi!(PyObject_GetAttr(self.ptr, DATACLASS_FIELDS_STR));
         debug_assert!(ffi!(Py_REFCNT(fields)) >= 2);
         ffi!(Py_DECREF(fields));
@@ -162,7 +225,7 @@ impl Serialize for DataclassFallbackSerializer {
         if unlikely!(len == 0) {
             return ZeroDictSerializer::new().serialize(serializer);
         }
-        let mut map = serializer.serialize_map(None).unwrap();
+        let mut map = serializer.serialize_map(None)?;
 
         let mut pos = 0;
         let mut next_key: *mut pyo3_ffi::PyObject = core::ptr::null_mut();
@@ -179,7 +242,7 @@ impl Serialize for DataclassFallbackSerializer {
             let field_type = ffi!(PyObject_GetAttr(field, FIELD_TYPE_STR));
             debug_assert!(ffi!(Py_REFCNT(field_type)) >= 2);
             ffi!(Py_DECREF(field_type));
-            if unsafe { field_type as *mut pyo3_ffi::PyTypeObject != FIELD_TYPE } {
+            if field_type as *mut pyo3_ffi::PyTypeObject != crate::module::state().field_type {
                 continue;
             }
 
@@ -199,7 +262,7 @@ impl Serialize for DataclassFallbackSerializer {
             ffi!(Py_DECREF(value));
             let pyvalue = PyObjectSerializer::new(value, self.state, self.default);
 
-            map.serialize_key(key_as_str).unwrap();
+            map.serialize_key(key_as_str)?;
             map.serialize_value(&pyvalue)?
         }
         map.end()
@@ -5,8 +5,6 @@ use crate::serialize::error::SerializeError;
 use crate::serialize::per_type::datetimelike::{
     DateTimeBuffer, DateTimeError, DateTimeLike, Offset,
 };
-#[cfg(Py_3_9)]
-use crate::typeref::ZONEINFO_TYPE;
 use crate::typeref::{CONVERT_METHOD_STR, DST_STR, NORMALIZE_METHOD_STR, UTCOFFSET_METHOD_STR};
 use serde::ser::{Serialize, Serializer};
 
@@ -209,7 +207,7 @@ impl DateTimeLike for DateTime {
             Ok(Offset::default())
         } else {
             let tzinfo = ffi!(PyDateTime_DATE_GET_TZINFO(self.ptr));
-            if unsafe { ob_type!(tzinfo) == ZONEINFO_TYPE } {
+            if ob_type!(tzinfo) == crate::module::state().zoneinfo_type {
                 // zoneinfo
                 let py_offset = call_method!(tzinfo, UTCOFFSET_METHOD_STR, self.ptr);
                 let offset = Offset {
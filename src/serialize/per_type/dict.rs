@@ -92,79 +92,79 @@ macro_rules! impl_serialize_entry {
     ($map:expr, $self:expr, $key:expr, $value:expr) => {
         match pyobject_to_obtype($value, $self.state.opts()) {
             ObType::Str => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&StrSerializer::new($value))?;
             }
             ObType::StrSubclass => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&StrSubclassSerializer::new($value))?;
             }
             ObType::Int => {
                 if unlikely!(opt_enabled!($self.state.opts(), STRICT_INTEGER)) {
-                    $map.serialize_key($key).unwrap();
+                    $map.serialize_key($key)?;
                     $map.serialize_value(&Int53Serializer::new($value))?;
                 } else {
-                    $map.serialize_key($key).unwrap();
+                    $map.serialize_key($key)?;
                     $map.serialize_value(&IntSerializer::new($value))?;
                 }
             }
             ObType::None => {
-                $map.serialize_key($key).unwrap();
-                $map.serialize_value(&NoneSerializer::new()).unwrap();
+                $map.serialize_key($key)?;
+                $map.serialize_value(&NoneSerializer::new())?;
             }
             ObType::Float => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&FloatSerializer::new($value))?;
             }
             ObType::Bool => {
-                $map.serialize_key($key).unwrap();
-                $map.serialize_value(&BoolSerializer::new($value)).unwrap();
+                $map.serialize_key($key)?;
+                $map.serialize_value(&BoolSerializer::new($value))?;
             }
             ObType::Datetime => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&DateTime::new($value, $self.state.opts()))?;
             }
             ObType::Date => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&Date::new($value))?;
             }
             ObType::Time => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&Time::new($value, $self.state.opts()))?;
             }
             ObType::Uuid => {
-                $map.serialize_key($key).unwrap();
-                $map.serialize_value(&UUID::new($value)).unwrap();
+                $map.serialize_key($key)?;
+                $map.serialize_value(&UUID::new($value))?;
             }
             ObType::Dict => {
                 let pyvalue = DictGenericSerializer::new($value, $self.state, $self.default);
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&pyvalue)?;
             }
             ObType::List => {
                 if ffi!(Py_SIZE($value)) == 0 {
-                    $map.serialize_key($key).unwrap();
-                    $map.serialize_value(&ZeroListSerializer::new()).unwrap();
+                    $map.serialize_key($key)?;
+                    $map.serialize_value(&ZeroListSerializer::new())?;
                 } else {
                     let pyvalue =
                         ListTupleSerializer::from_list($value, $self.state, $self.default);
-                    $map.serialize_key($key).unwrap();
+                    $map.serialize_key($key)?;
                     $map.serialize_value(&pyvalue)?;
                 }
             }
             ObType::Tuple => {
                 if ffi!(Py_SIZE($value)) == 0 {
-                    $map.serialize_key($key).unwrap();
-                    $map.serialize_value(&ZeroListSerializer::new()).unwrap();
+                    $map.serialize_key($key)?;
+                    $map.serialize_value(&ZeroListSerializer::new())?;
                 } else {
                     let pyvalue =
                         ListTupleSerializer::from_tuple($value, $self.state, $self.default);
-                    $map.serialize_key($key).unwrap();
+                    $map.serialize_key($key)?;
                     $map.serialize_value(&pyvalue)?;
                 }
             }
             ObType::Dataclass => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&DataclassGenericSerializer::new(&PyObjectSerializer::new(
                     $value,
                     $self.state,
@@ -172,7 +172,7 @@ macro_rules! impl_serialize_entry {
                 )))?;
             }
             ObType::Enum => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&EnumSerializer::new(&PyObjectSerializer::new(
                     $value,
                     $self.state,
@@ -180,7 +180,7 @@ macro_rules! impl_serialize_entry {
                 )))?;
             }
             ObType::NumpyArray => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&NumpySerializer::new(&PyObjectSerializer::new(
                     $value,
                     $self.state,
@@ -188,15 +188,15 @@ macro_rules! impl_serialize_entry {
                 )))?;
             }
             ObType::NumpyScalar => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&NumpyScalar::new($value, $self.state.opts()))?;
             }
             ObType::Fragment => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&FragmentSerializer::new($value))?;
             }
             ObType::Unknown => {
-                $map.serialize_key($key).unwrap();
+                $map.serialize_key($key)?;
                 $map.serialize_value(&DefaultSerializer::new(&PyObjectSerializer::new(
                     $value,
                     $self.state,
@@ -225,7 +225,7 @@ impl Serialize for Dict {
 
         pydict_next!(self.ptr, &mut pos, &mut next_key, &mut next_value);
 
-        let mut map = serializer.serialize_map(None).unwrap();
+        let mut map = serializer.serialize_map(None)?;
 
         let len = ffi!(Py_SIZE(self.ptr)) as usize;
         assume!(len > 0);
@@ -299,10 +299,10 @@ impl Serialize for DictSortedKey {
 
         items.sort_unstable_by(|a, b| a.0.cmp(b.0));
 
-        let mut map = serializer.serialize_map(None).unwrap();
+        let mut map = serializer.serialize_map(None)?;
         for (key, val) in items.iter() {
             let pyvalue = PyObjectSerializer::new(*val, self.state, self.default);
-            map.serialize_key(key).unwrap();
+            map.serialize_key(key)?;
             map.serialize_value(&pyvalue)?;
         }
         map.end()
@@ -508,10 +508,10 @@ impl Serialize for DictNonStrKey {
             sort_non_str_dict_items(&mut items);
         }
 
-        let mut map = serializer.serialize_map(None).unwrap();
+        let mut map = serializer.serialize_map(None)?;
         for (key, val) in items.iter() {
             let pyvalue = PyObjectSerializer::new(*val, self.state, self.default);
-            map.serialize_key(key).unwrap();
+            map.serialize_key(key)?;
             map.serialize_value(&pyvalue)?;
         }
         map.end()
@@ -91,7 +91,7 @@ impl Serialize for ListTupleSerializer {
             err!(SerializeError::RecursionLimit)
         }
         debug_assert!(self.len >= 1);
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for idx in 0..self.len {
             let value = unsafe { *((self.data_ptr).add(idx)) };
             match pyobject_to_obtype(value, self.state.opts()) {
@@ -109,13 +109,13 @@ impl Serialize for ListTupleSerializer {
                     }
                 }
                 ObType::None => {
-                    seq.serialize_element(&NoneSerializer::new()).unwrap();
+                    seq.serialize_element(&NoneSerializer::new())?;
                 }
                 ObType::Float => {
                     seq.serialize_element(&FloatSerializer::new(value))?;
                 }
                 ObType::Bool => {
-                    seq.serialize_element(&BoolSerializer::new(value)).unwrap();
+                    seq.serialize_element(&BoolSerializer::new(value))?;
                 }
                 ObType::Datetime => {
                     seq.serialize_element(&DateTime::new(value, self.state.opts()))?;
@@ -127,7 +127,7 @@ impl Serialize for ListTupleSerializer {
                     seq.serialize_element(&Time::new(value, self.state.opts()))?;
                 }
                 ObType::Uuid => {
-                    seq.serialize_element(&UUID::new(value)).unwrap();
+                    seq.serialize_element(&UUID::new(value))?;
                 }
                 ObType::Dict => {
                     let pyvalue = DictGenericSerializer::new(value, self.state, self.default);
@@ -135,7 +135,7 @@ impl Serialize for ListTupleSerializer {
                 }
                 ObType::List => {
                     if ffi!(Py_SIZE(value)) == 0 {
-                        seq.serialize_element(&ZeroListSerializer::new()).unwrap();
+                        seq.serialize_element(&ZeroListSerializer::new())?;
                     } else {
                         let pyvalue =
                             ListTupleSerializer::from_list(value, self.state, self.default);
@@ -144,7 +144,7 @@ impl Serialize for ListTupleSerializer {
                 }
                 ObType::Tuple => {
                     if ffi!(Py_SIZE(value)) == 0 {
-                        seq.serialize_element(&ZeroListSerializer::new()).unwrap();
+                        seq.serialize_element(&ZeroListSerializer::new())?;
                     } else {
                         let pyvalue =
                             ListTupleSerializer::from_tuple(value, self.state, self.default);
@@ -17,7 +17,7 @@ mod pyenum;
 mod unicode;
 mod uuid;
 
-pub use dataclass::DataclassGenericSerializer;
+pub use dataclass::{dataclass_field_names, DataclassGenericSerializer};
 pub use datetime::{Date, DateTime, Time};
 pub use datetimelike::{DateTimeBuffer, DateTimeError, DateTimeLike, Offset};
 pub use default::DefaultSerializer;
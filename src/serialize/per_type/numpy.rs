@@ -5,7 +5,7 @@ use crate::serialize::per_type::{
     DateTimeBuffer, DateTimeError, DateTimeLike, DefaultSerializer, Offset, ZeroListSerializer,
 };
 use crate::serialize::serializer::PyObjectSerializer;
-use crate::typeref::{load_numpy_types, ARRAY_STRUCT_STR, DESCR_STR, DTYPE_STR, NUMPY_TYPES};
+use crate::typeref::{load_numpy_types, ARRAY_STRUCT_STR, DESCR_STR, DTYPE_STR};
 use chrono::{Datelike, NaiveDate, NaiveDateTime, Timelike};
 use core::ffi::{c_char, c_int, c_void};
 use pyo3_ffi::*;
@@ -60,7 +60,11 @@ macro_rules! slice {
 
 #[cold]
 pub fn is_numpy_scalar(ob_type: *mut PyTypeObject) -> bool {
-    let numpy_types = unsafe { NUMPY_TYPES.get_or_init(load_numpy_types) };
+    let numpy_types = unsafe {
+        crate::module::state()
+            .numpy_types
+            .get_or_init(load_numpy_types)
+    };
     if numpy_types.is_none() {
         false
     } else {
@@ -83,7 +87,11 @@ pub fn is_numpy_scalar(ob_type: *mut PyTypeObject) -> bool {
 
 #[cold]
 pub fn is_numpy_array(ob_type: *mut PyTypeObject) -> bool {
-    let numpy_types = unsafe { NUMPY_TYPES.get_or_init(load_numpy_types) };
+    let numpy_types = unsafe {
+        crate::module::state()
+            .numpy_types
+            .get_or_init(load_numpy_types)
+    };
     if numpy_types.is_none() {
         false
     } else {
@@ -312,9 +320,9 @@ impl Serialize for NumpyArray {
         if unlikely!(!(self.depth >= self.dimensions() || self.shape()[self.depth] != 0)) {
             ZeroListSerializer::new().serialize(serializer)
         } else if !self.children.is_empty() {
-            let mut seq = serializer.serialize_seq(None).unwrap();
+            let mut seq = serializer.serialize_seq(None)?;
             for child in &self.children {
-                seq.serialize_element(child).unwrap();
+                seq.serialize_element(child)?;
             }
             seq.end()
         } else {
@@ -396,9 +404,9 @@ impl<'a> Serialize for NumpyF64Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeF64 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeF64 { obj: each })?;
         }
         seq.end()
     }
@@ -437,9 +445,9 @@ impl<'a> Serialize for NumpyF32Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeF32 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeF32 { obj: each })?;
         }
         seq.end()
     }
@@ -478,9 +486,9 @@ impl<'a> Serialize for NumpyF16Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeF16 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeF16 { obj: each })?;
         }
         seq.end()
     }
@@ -521,9 +529,9 @@ impl<'a> Serialize for NumpyU64Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeU64 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeU64 { obj: each })?;
         }
         seq.end()
     }
@@ -562,9 +570,9 @@ impl<'a> Serialize for NumpyU32Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeU32 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeU32 { obj: each })?;
         }
         seq.end()
     }
@@ -603,9 +611,9 @@ impl<'a> Serialize for NumpyU16Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeU16 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeU16 { obj: each })?;
         }
         seq.end()
     }
@@ -644,9 +652,9 @@ impl<'a> Serialize for NumpyI64Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeI64 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeI64 { obj: each })?;
         }
         seq.end()
     }
@@ -685,9 +693,9 @@ impl<'a> Serialize for NumpyI32Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeI32 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeI32 { obj: each })?;
         }
         seq.end()
     }
@@ -726,9 +734,9 @@ impl<'a> Serialize for NumpyI16Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeI16 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeI16 { obj: each })?;
         }
         seq.end()
     }
@@ -767,9 +775,9 @@ impl<'a> Serialize for NumpyI8Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeI8 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeI8 { obj: each })?;
         }
         seq.end()
     }
@@ -808,9 +816,9 @@ impl<'a> Serialize for NumpyU8Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeU8 { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeU8 { obj: each })?;
         }
         seq.end()
     }
@@ -848,9 +856,9 @@ impl<'a> Serialize for NumpyBoolArray<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
-            seq.serialize_element(&DataTypeBool { obj: each }).unwrap();
+            seq.serialize_element(&DataTypeBool { obj: each })?;
         }
         seq.end()
     }
@@ -892,8 +900,13 @@ impl Serialize for NumpyScalar {
     {
         unsafe {
             let ob_type = ob_type!(self.ptr);
-            let scalar_types =
-                unsafe { NUMPY_TYPES.get_or_init(load_numpy_types).unwrap().as_ref() };
+            let scalar_types = unsafe {
+                crate::module::state()
+                    .numpy_types
+                    .get_or_init(load_numpy_types)
+                    .unwrap()
+                    .as_ref()
+            };
             if ob_type == scalar_types.float64 {
                 (*(self.ptr as *mut NumpyFloat64)).serialize(serializer)
             } else if ob_type == scalar_types.float32 {
@@ -1329,13 +1342,13 @@ impl<'a> Serialize for NumpyDatetime64Array<'a> {
     where
         S: Serializer,
     {
-        let mut seq = serializer.serialize_seq(None).unwrap();
+        let mut seq = serializer.serialize_seq(None)?;
         for &each in self.data.iter() {
             let dt = self
                 .unit
                 .datetime(each, self.opts)
                 .map_err(NumpyDateTimeError::into_serde_err)?;
-            seq.serialize_element(&dt).unwrap();
+            seq.serialize_element(&dt)?;
         }
         seq.end()
     }
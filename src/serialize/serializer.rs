@@ -9,22 +9,61 @@ use crate::serialize::per_type::{
     StrSerializer, StrSubclassSerializer, Time, ZeroListSerializer, UUID,
 };
 use crate::serialize::state::SerializerState;
-use crate::serialize::writer::{to_writer, to_writer_pretty, BytesWriter};
+use crate::serialize::writer::{
+    to_writer, to_writer_pretty, BufferWriter, BytesWriter, ChunkWriter, Sink, SinkError,
+};
 use core::ptr::NonNull;
 use serde::ser::{Serialize, Serializer};
 use std::io::Write;
 
+/// Serialize `ptr` to bytes. The buffer starts with `size_hint` bytes, or
+/// else the average length of recent output of `dumps()` in the
+/// interpreter.
 pub fn serialize(
     ptr: *mut pyo3_ffi::PyObject,
     default: Option<NonNull<pyo3_ffi::PyObject>>,
     opts: Opt,
+    size_hint: Option<usize>,
+) -> Result<NonNull<pyo3_ffi::PyObject>, String> {
+    let learned = &crate::module::state().size_hint;
+    let capacity = size_hint.unwrap_or_else(|| learned.capacity());
+    let val = serialize_sized(ptr, default, opts, capacity)?;
+    learned.update(ffi!(Py_SIZE(val.as_ptr())) as usize);
+    Ok(val)
+}
+
+/// Serialize `ptr` to a buffer that starts with at least `capacity` bytes.
+pub fn serialize_sized(
+    ptr: *mut pyo3_ffi::PyObject,
+    default: Option<NonNull<pyo3_ffi::PyObject>>,
+    opts: Opt,
+    capacity: usize,
 ) -> Result<NonNull<pyo3_ffi::PyObject>, String> {
-    let mut buf = BytesWriter::default();
     let obj = PyObjectSerializer::new(ptr, SerializerState::new(opts), default);
+    match BytesWriter::with_capacity(capacity) {
+        Some(buf) => write_with(&obj, opts, buf),
+        None => Err(String::from("Failed to allocate the output buffer")),
+    }
+}
+
+/// Serialize `value` to bytes, formatted according to the `OPT_INDENT_2`
+/// and `OPT_APPEND_NEWLINE` options of `opts`.
+pub fn serialize_with<T: Serialize>(
+    value: &T,
+    opts: Opt,
+) -> Result<NonNull<pyo3_ffi::PyObject>, String> {
+    write_with(value, opts, BytesWriter::default())
+}
+
+fn write_with<T: Serialize>(
+    value: &T,
+    opts: Opt,
+    mut buf: BytesWriter,
+) -> Result<NonNull<pyo3_ffi::PyObject>, String> {
     let res = if opt_disabled!(opts, INDENT_2) {
-        to_writer(&mut buf, &obj)
+        to_writer(&mut buf, value)
     } else {
-        to_writer_pretty(&mut buf, &obj)
+        to_writer_pretty(&mut buf, value)
     };
     match res {
         Ok(_) => {
@@ -40,6 +79,120 @@ pub fn serialize(
     }
 }
 
+/// The reason that `serialize_into()` failed.
+pub enum IntoError {
+    /// The object has no writable contiguous buffer. An exception is set.
+    NotWritable,
+    /// The offset is greater than the length of the buffer, which is given.
+    Offset(usize),
+    /// The output of the first length does not fit in the second length,
+    /// that of the buffer after the offset.
+    Overflow(usize, usize),
+    Serialize(String),
+}
+
+/// Serialize `ptr` to the writable buffer of `target` from `offset` and
+/// return the length of the output. A `bytearray` is resized if needed.
+pub fn serialize_into(
+    ptr: *mut pyo3_ffi::PyObject,
+    default: Option<NonNull<pyo3_ffi::PyObject>>,
+    opts: Opt,
+    target: *mut pyo3_ffi::PyObject,
+    offset: usize,
+) -> Result<usize, IntoError> {
+    let mut buf = BufferWriter::new(target, offset).ok_or(IntoError::NotWritable)?;
+    if unlikely!(offset > buf.initial_len()) {
+        return Err(IntoError::Offset(buf.initial_len()));
+    }
+    let obj = PyObjectSerializer::new(ptr, SerializerState::new(opts), default);
+    let res = if opt_disabled!(opts, INDENT_2) {
+        to_writer(&mut buf, &obj)
+    } else {
+        to_writer_pretty(&mut buf, &obj)
+    };
+    if res.is_ok() && opt_enabled!(opts, APPEND_NEWLINE) {
+        let _ = buf.write(b"\n");
+    }
+    buf.finish();
+    match res {
+        Err(err) => Err(IntoError::Serialize(err.to_string())),
+        Ok(_) if unlikely!(buf.overflow()) => {
+            Err(IntoError::Overflow(buf.len(), buf.initial_len() - offset))
+        }
+        Ok(_) => Ok(buf.len()),
+    }
+}
+
+/// The reason that `serialize_to_sink()` failed.
+pub enum DumpError {
+    /// Writing to the sink raised the exception.
+    Sink(SinkError),
+    Serialize(String),
+}
+
+/// Serialize `ptr` to `sink` in chunks of `chunk_size` bytes, so that the
+/// output is not held in memory at once. If the sink fails, serializing
+/// stops and the exception of the sink is returned.
+pub fn serialize_to_sink(
+    ptr: *mut pyo3_ffi::PyObject,
+    default: Option<NonNull<pyo3_ffi::PyObject>>,
+    opts: Opt,
+    sink: Sink,
+    chunk_size: usize,
+) -> Result<(), DumpError> {
+    let mut buf = ChunkWriter::new(sink, chunk_size);
+    let obj = PyObjectSerializer::new(ptr, SerializerState::new(opts), default);
+    let res = if opt_disabled!(opts, INDENT_2) {
+        to_writer(&mut buf, &obj)
+    } else {
+        to_writer_pretty(&mut buf, &obj)
+    };
+    if res.is_ok() && opt_enabled!(opts, APPEND_NEWLINE) {
+        let _ = buf.write(b"\n");
+    }
+    let flushed = buf.finish();
+    match (flushed, res) {
+        (Err(err), _) => Err(DumpError::Sink(err)),
+        (Ok(_), Err(err)) => Err(DumpError::Serialize(err.to_string())),
+        (Ok(_), Ok(_)) => Ok(()),
+    }
+}
+
+/// Serialize each object of an iterable followed by a newline, as JSON Lines,
+/// to one buffer.
+pub fn serialize_lines(
+    ptr: *mut pyo3_ffi::PyObject,
+    default: Option<NonNull<pyo3_ffi::PyObject>>,
+    opts: Opt,
+) -> Result<NonNull<pyo3_ffi::PyObject>, String> {
+    let iter = ffi!(PyObject_GetIter(ptr));
+    if unlikely!(iter.is_null()) {
+        return Err(String::from("dumps_lines() argument must be iterable"));
+    }
+    let mut buf = BytesWriter::default();
+    loop {
+        let item = ffi!(PyIter_Next(iter));
+        if item.is_null() {
+            break;
+        }
+        let obj = PyObjectSerializer::new(item, SerializerState::new(opts), default);
+        let res = to_writer(&mut buf, &obj);
+        ffi!(Py_DECREF(item));
+        if let Err(err) = res {
+            ffi!(Py_DECREF(iter));
+            ffi!(_Py_Dealloc(buf.bytes_ptr().as_ptr()));
+            return Err(err.to_string());
+        }
+        let _ = buf.write(b"\n");
+    }
+    ffi!(Py_DECREF(iter));
+    if unlikely!(!ffi!(PyErr_Occurred()).is_null()) {
+        ffi!(_Py_Dealloc(buf.bytes_ptr().as_ptr()));
+        return Err(String::from("dumps_lines() iteration raised an exception"));
+    }
+    Ok(buf.finish())
+}
+
 pub struct PyObjectSerializer {
     pub ptr: *mut pyo3_ffi::PyObject,
     pub state: SerializerState,
@@ -0,0 +1,332 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::opt::{Opt, APPEND_NEWLINE, INDENT_2};
+use crate::serialize::serializer::PyObjectSerializer;
+use crate::serialize::state::SerializerState;
+use crate::serialize::writer::{to_writer, to_writer_pretty};
+use crate::typeref::{LIST_TYPE, TUPLE_TYPE};
+use core::ffi::{c_char, c_ulong, c_void};
+use core::ptr::{null_mut, NonNull};
+use pyo3_ffi::*;
+
+/// The number of arrays that can be open at once, as for `dumps()`.
+const MAX_DEPTH: usize = 255;
+
+/// An array whose elements are being serialized. The iterator keeps a
+/// reference to the list, tuple, or generator.
+struct Frame {
+    obj: *mut PyObject,
+    idx: usize,
+    first: bool,
+}
+
+impl Frame {
+    /// Return a new reference to the next element, or null at the end or
+    /// with an exception set if a generator raised.
+    fn next(&mut self) -> *mut PyObject {
+        let ob_type = ob_type!(self.obj);
+        let item = if ob_type == unsafe { LIST_TYPE } {
+            // The list may change while its elements are serialized.
+            if self.idx >= ffi!(Py_SIZE(self.obj)) as usize {
+                return null_mut();
+            }
+            ffi!(PyList_GET_ITEM(self.obj, self.idx as Py_ssize_t))
+        } else if ob_type == unsafe { TUPLE_TYPE } {
+            if self.idx >= ffi!(Py_SIZE(self.obj)) as usize {
+                return null_mut();
+            }
+            ffi!(PyTuple_GET_ITEM(self.obj, self.idx as Py_ssize_t))
+        } else {
+            return ffi!(PyIter_Next(self.obj));
+        };
+        self.idx += 1;
+        ffi!(Py_INCREF(item));
+        item
+    }
+}
+
+/// An iterator of the output of `dumps()` in chunks of `chunk_size` bytes.
+///
+/// Lists, tuples, and generators are written an element at a time, so a
+/// generator is only advanced as chunks are taken and the whole output is
+/// never held. Any other value, such as a dict, is serialized in one piece
+/// as by `dumps()`, so other iterators are passed to `default`.
+#[repr(C)]
+pub struct DumpsIter {
+    pub ob_refcnt: pyo3_ffi::Py_ssize_t,
+    pub ob_type: *mut pyo3_ffi::PyTypeObject,
+    root: *mut PyObject,
+    default: Option<NonNull<PyObject>>,
+    opts: Opt,
+    chunk_size: usize,
+    buf: Vec<u8>,
+    pos: usize,
+    stack: Vec<Frame>,
+    done: bool,
+}
+
+#[inline(always)]
+fn as_dumps_iter(obj: *mut PyObject) -> &'static mut DumpsIter {
+    unsafe { &mut *(obj as *mut DumpsIter) }
+}
+
+/// Return whether `obj` is written an element at a time.
+#[inline(always)]
+fn is_streamed(obj: *mut PyObject) -> bool {
+    let ob_type = ob_type!(obj);
+    unsafe { ob_type == LIST_TYPE || ob_type == TUPLE_TYPE || PyGen_Check(obj) != 0 }
+}
+
+/// Why a step of `DumpsIter` failed.
+enum StepError {
+    /// A generator raised the exception that is set.
+    Iterator,
+    Serialize(String),
+}
+
+impl DumpsIter {
+    fn pretty(&self) -> bool {
+        opt_enabled!(self.opts, INDENT_2)
+    }
+
+    fn newline_indent(&mut self, depth: usize) {
+        self.buf.push(b'\n');
+        self.buf.resize(self.buf.len() + depth * 2, b' ');
+    }
+
+    /// Write `obj`, or open an array for it if it is streamed.
+    fn write_value(&mut self, obj: *mut PyObject) -> Result<(), StepError> {
+        let depth = self.stack.len();
+        if is_streamed(obj) {
+            if unlikely!(depth >= MAX_DEPTH) {
+                return Err(StepError::Serialize(String::from(
+                    "Recursion limit reached",
+                )));
+            }
+            ffi!(Py_INCREF(obj));
+            self.stack.push(Frame {
+                obj: obj,
+                idx: 0,
+                first: true,
+            });
+            self.buf.push(b'[');
+            return Ok(());
+        }
+        let mut state = SerializerState::new(self.opts);
+        for _ in 0..depth {
+            state = state.copy_for_recursive_call();
+        }
+        let value = PyObjectSerializer::new(obj, state, self.default);
+        let start = self.buf.len();
+        let res = if self.pretty() {
+            to_writer_pretty(&mut self.buf, &value)
+        } else {
+            to_writer(&mut self.buf, &value)
+        };
+        if let Err(err) = res {
+            return Err(StepError::Serialize(err.to_string()));
+        }
+        if self.pretty() && depth > 0 {
+            self.indent_from(start, depth);
+        }
+        Ok(())
+    }
+
+    /// Indent the lines of the value written from `start` by `depth` levels.
+    /// A value is serialized as if it were at the top level, and strings are
+    /// escaped, so each newline in it is one it is formatted with.
+    #[cold]
+    fn indent_from(&mut self, start: usize, depth: usize) {
+        if !self.buf[start..].contains(&b'\n') {
+            return;
+        }
+        let value = self.buf.split_off(start);
+        for &each in value.iter() {
+            if each == b'\n' {
+                self.newline_indent(depth);
+            } else {
+                self.buf.push(each);
+            }
+        }
+    }
+
+    /// Write the next element of the innermost array, or close it.
+    fn step(&mut self) -> Result<(), StepError> {
+        if !self.root.is_null() {
+            let root = self.root;
+            self.root = null_mut();
+            let res = self.write_value(root);
+            ffi!(Py_DECREF(root));
+            return res;
+        }
+        let depth = self.stack.len();
+        let frame = self.stack.last_mut().unwrap();
+        let first = frame.first;
+        let item = frame.next();
+        if item.is_null() {
+            if unlikely!(!ffi!(PyErr_Occurred()).is_null()) {
+                return Err(StepError::Iterator);
+            }
+            let frame = self.stack.pop().unwrap();
+            ffi!(Py_DECREF(frame.obj));
+            if self.pretty() && !first {
+                self.newline_indent(depth - 1);
+            }
+            self.buf.push(b']');
+            return Ok(());
+        }
+        frame.first = false;
+        if !first {
+            self.buf.push(b',');
+        }
+        if self.pretty() {
+            self.newline_indent(depth);
+        }
+        let res = self.write_value(item);
+        ffi!(Py_DECREF(item));
+        res
+    }
+
+    /// Return the next chunk of the output, copied to `bytes`.
+    fn take(&mut self, len: usize) -> *mut PyObject {
+        let chunk = ffi!(PyBytes_FromStringAndSize(
+            self.buf.as_ptr().add(self.pos) as *const c_char,
+            len as Py_ssize_t
+        ));
+        self.pos += len;
+        chunk
+    }
+
+    fn next_chunk(&mut self) -> Result<*mut PyObject, StepError> {
+        loop {
+            let available = self.buf.len() - self.pos;
+            if available >= self.chunk_size {
+                return Ok(self.take(self.chunk_size));
+            }
+            if self.root.is_null() && self.stack.is_empty() {
+                self.done = true;
+                if available == 0 {
+                    return Ok(null_mut());
+                }
+                return Ok(self.take(available));
+            }
+            if self.pos > 0 {
+                self.buf.drain(..self.pos);
+                self.pos = 0;
+            }
+            self.step()?;
+            if self.root.is_null()
+                && self.stack.is_empty()
+                && opt_enabled!(self.opts, APPEND_NEWLINE)
+            {
+                self.buf.push(b'\n');
+            }
+        }
+    }
+
+    fn clear(&mut self) {
+        if !self.root.is_null() {
+            ffi!(Py_DECREF(self.root));
+            self.root = null_mut();
+        }
+        for frame in self.stack.drain(..) {
+            ffi!(Py_DECREF(frame.obj));
+        }
+        if let Some(default) = self.default.take() {
+            ffi!(Py_DECREF(default.as_ptr()));
+        }
+    }
+}
+
+/// Return a new iterator of the output of `ptr` in chunks of `chunk_size`
+/// bytes.
+pub fn new_dumps_iter(
+    ptr: *mut PyObject,
+    default: Option<NonNull<PyObject>>,
+    opts: Opt,
+    chunk_size: usize,
+) -> *mut PyObject {
+    ffi!(Py_INCREF(ptr));
+    if let Some(default) = default {
+        ffi!(Py_INCREF(default.as_ptr()));
+    }
+    let ob_type = crate::module::state().dumps_iter_type;
+    ffi!(Py_INCREF(ob_type as *mut PyObject));
+    let obj = Box::new(DumpsIter {
+        ob_refcnt: 1,
+        ob_type: ob_type,
+        root: ptr,
+        default: default,
+        opts: opts,
+        chunk_size: chunk_size,
+        buf: Vec::new(),
+        pos: 0,
+        stack: Vec::new(),
+        done: false,
+    });
+    Box::into_raw(obj) as *mut PyObject
+}
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_dumpsiter_dealloc(object: *mut PyObject) {
+    let tp = (*object).ob_type;
+    let mut iter = Box::from_raw(object as *mut DumpsIter);
+    iter.clear();
+    drop(iter);
+    Py_DECREF(tp as *mut PyObject);
+}
+
+#[no_mangle]
+pub unsafe extern "C" fn xorjson_dumpsiter_next(object: *mut PyObject) -> *mut PyObject {
+    let _state = crate::module::StateGuard::of_object(object);
+    let iter = as_dumps_iter(object);
+    if iter.done {
+        return null_mut();
+    }
+    match iter.next_chunk() {
+        Ok(chunk) => chunk,
+        Err(err) => {
+            iter.done = true;
+            iter.clear();
+            iter.buf = Vec::new();
+            match err {
+                StepError::Iterator => null_mut(),
+                StepError::Serialize(msg) => crate::raise_dumps_exception_dynamic(msg.as_str()),
+            }
+        }
+    }
+}
+
+#[cfg(Py_3_10)]
+const DUMPS_ITER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_IMMUTABLETYPE;
+
+#[cfg(not(Py_3_10))]
+const DUMPS_ITER_TP_FLAGS: c_ulong = Py_TPFLAGS_DEFAULT;
+
+#[no_mangle]
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+pub unsafe extern "C" fn xorjson_dumpsitertype_new(module: *mut PyObject) -> *mut PyTypeObject {
+    crate::module::new_type(
+        module,
+        "xorjson.DumpsIter\0",
+        core::mem::size_of::<DumpsIter>(),
+        DUMPS_ITER_TP_FLAGS,
+        vec![
+            PyType_Slot {
+                slot: Py_tp_dealloc,
+                pfunc: xorjson_dumpsiter_dealloc as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iter,
+                pfunc: PyObject_SelfIter as *mut c_void,
+            },
+            PyType_Slot {
+                slot: Py_tp_iternext,
+                pfunc: xorjson_dumpsiter_next as *mut c_void,
+            },
+        ],
+    )
+}
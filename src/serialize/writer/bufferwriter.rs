@@ -0,0 +1,258 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::serialize::writer::WriteExt;
+use crate::typeref::BYTEARRAY_TYPE;
+use pyo3_ffi::{
+    PyBUF_WRITABLE, PyBuffer_Release, PyByteArray_Resize, PyErr_Clear, PyObject,
+    PyObject_GetBuffer, Py_buffer, Py_ssize_t,
+};
+use std::io::Error;
+
+/// Writes to the writable buffer of an object from an offset. A `bytearray`
+/// is resized if the output does not fit, and any other buffer is written
+/// until it is full.
+///
+/// The serializer reserves more than it writes, so a reservation that does
+/// not fit in the buffer is written to `scratch` and copied to the buffer if
+/// what is written fits. Once the output does not fit, it is still counted
+/// so that the length it needs is known.
+///
+/// The buffer is exported while the writer exists, so `default` cannot
+/// resize it.
+pub struct BufferWriter {
+    target: *mut PyObject,
+    view: Py_buffer,
+    growable: bool,
+    offset: usize,
+    initial_len: usize,
+    base: *mut u8,
+    cap: usize,
+    len: usize,
+    scratch: Vec<u8>,
+    direct: bool,
+    overflow: bool,
+}
+
+impl BufferWriter {
+    /// Return a writer to the buffer of `target` from `offset`, or `None`
+    /// with an exception set if it has no writable contiguous buffer.
+    pub fn new(target: *mut PyObject, offset: usize) -> Option<Self> {
+        let mut writer = BufferWriter {
+            target: target,
+            view: unsafe { core::mem::zeroed::<Py_buffer>() },
+            growable: ob_type!(target) == unsafe { BYTEARRAY_TYPE },
+            offset: offset,
+            initial_len: 0,
+            base: core::ptr::null_mut(),
+            cap: 0,
+            len: 0,
+            scratch: Vec::new(),
+            direct: true,
+            overflow: false,
+        };
+        if !writer.export() {
+            return None;
+        }
+        writer.initial_len = writer.view.len as usize;
+        Some(writer)
+    }
+
+    /// The length of the buffer when the writer was created.
+    pub fn initial_len(&self) -> usize {
+        self.initial_len
+    }
+
+    /// The length of the output, including what did not fit.
+    pub fn len(&self) -> usize {
+        self.len
+    }
+
+    /// Whether the output did not fit in the buffer.
+    pub fn overflow(&self) -> bool {
+        self.overflow
+    }
+
+    /// Release the buffer. A `bytearray` that was resized is shrunk to end
+    /// with the output.
+    pub fn finish(&mut self) {
+        self.release();
+        let end = self.offset + self.len;
+        let size = end.max(self.initial_len);
+        if self.growable
+            && !self.overflow
+            && self.cap + self.offset > size
+            && ffi!(PyByteArray_Resize(self.target, size as Py_ssize_t)) != 0
+        {
+            ffi!(PyErr_Clear());
+        }
+    }
+
+    fn export(&mut self) -> bool {
+        if ffi!(PyObject_GetBuffer(
+            self.target,
+            &mut self.view,
+            PyBUF_WRITABLE
+        )) != 0
+        {
+            self.view.obj = core::ptr::null_mut();
+            return false;
+        }
+        let len = self.view.len as usize;
+        self.cap = len.saturating_sub(self.offset);
+        self.base = unsafe { (self.view.buf as *mut u8).add(self.offset.min(len)) };
+        true
+    }
+
+    fn release(&mut self) {
+        if !self.view.obj.is_null() {
+            ffi!(PyBuffer_Release(&mut self.view));
+            self.view.obj = core::ptr::null_mut();
+        }
+    }
+
+    /// Resize a `bytearray` so that `end` bytes fit after the offset. It
+    /// cannot be resized while anything else exports its buffer.
+    #[cold]
+    #[inline(never)]
+    fn grow(&mut self, end: usize) -> bool {
+        self.release();
+        let size = self.offset + end.max(self.cap * 2);
+        let resized = ffi!(PyByteArray_Resize(self.target, size as Py_ssize_t)) == 0;
+        if !resized {
+            ffi!(PyErr_Clear());
+            self.growable = false;
+        }
+        if !self.export() {
+            ffi!(PyErr_Clear());
+            self.cap = 0;
+            self.growable = false;
+            return false;
+        }
+        resized
+    }
+
+    #[cold]
+    #[inline(never)]
+    fn reserve_slow(&mut self, len: usize) {
+        let end = self.len + len;
+        if self.growable && !self.overflow && self.grow(end) && end <= self.cap {
+            self.direct = true;
+            return;
+        }
+        self.direct = false;
+        if self.scratch.len() < len {
+            self.scratch.resize(len, 0);
+        }
+    }
+
+    #[inline(always)]
+    fn buffer_ptr(&mut self) -> *mut u8 {
+        if likely!(self.direct) {
+            unsafe { self.base.add(self.len) }
+        } else {
+            self.scratch.as_mut_ptr()
+        }
+    }
+
+    /// Account for `len` bytes written at `buffer_ptr()`.
+    #[inline(always)]
+    fn written(&mut self, len: usize) {
+        if unlikely!(!self.direct) {
+            if !self.overflow && self.len + len <= self.cap {
+                unsafe {
+                    core::ptr::copy_nonoverlapping(
+                        self.scratch.as_ptr(),
+                        self.base.add(self.len),
+                        len,
+                    );
+                }
+            } else {
+                self.overflow = true;
+            }
+        }
+        self.len += len;
+    }
+}
+
+impl Drop for BufferWriter {
+    fn drop(&mut self) {
+        self.release();
+    }
+}
+
+impl std::io::Write for BufferWriter {
+    fn write(&mut self, buf: &[u8]) -> Result<usize, Error> {
+        let _ = self.write_all(buf);
+        Ok(buf.len())
+    }
+
+    fn write_all(&mut self, buf: &[u8]) -> Result<(), Error> {
+        (&mut *self).reserve(buf.len());
+        unsafe {
+            core::ptr::copy_nonoverlapping(buf.as_ptr(), self.buffer_ptr(), buf.len());
+        };
+        self.written(buf.len());
+        Ok(())
+    }
+
+    fn flush(&mut self) -> Result<(), Error> {
+        Ok(())
+    }
+}
+
+impl WriteExt for &mut BufferWriter {
+    #[inline(always)]
+    fn as_mut_buffer_ptr(&mut self) -> *mut u8 {
+        self.buffer_ptr()
+    }
+
+    #[inline(always)]
+    fn reserve(&mut self, len: usize) {
+        if likely!(self.len + len <= self.cap) {
+            self.direct = true;
+        } else {
+            self.reserve_slow(len);
+        }
+    }
+
+    #[inline(always)]
+    fn set_written(&mut self, len: usize) {
+        self.written(len);
+    }
+
+    fn write_str(&mut self, val: &str) -> Result<(), Error> {
+        self.reserve(val.len() + 2);
+        unsafe {
+            let ptr = self.buffer_ptr();
+            core::ptr::write(ptr, b'"');
+            core::ptr::copy_nonoverlapping(val.as_ptr(), ptr.add(1), val.len());
+            core::ptr::write(ptr.add(val.len() + 1), b'"');
+        };
+        self.written(val.len() + 2);
+        Ok(())
+    }
+
+    unsafe fn write_reserved_fragment(&mut self, val: &[u8]) -> Result<(), Error> {
+        unsafe {
+            core::ptr::copy_nonoverlapping(val.as_ptr(), self.buffer_ptr(), val.len());
+        };
+        self.written(val.len());
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_punctuation(&mut self, val: u8) -> Result<(), Error> {
+        unsafe { core::ptr::write(self.buffer_ptr(), val) };
+        self.written(1);
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_indent(&mut self, len: usize) -> Result<(), Error> {
+        unsafe {
+            core::ptr::write_bytes(self.buffer_ptr(), b' ', len);
+        };
+        self.written(len);
+        Ok(())
+    }
+}
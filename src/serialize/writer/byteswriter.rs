@@ -2,13 +2,61 @@
 
 use core::ffi::c_char;
 use core::ptr::NonNull;
+use core::sync::atomic::{AtomicUsize, Ordering};
 use pyo3_ffi::{
-    PyBytesObject, PyBytes_FromStringAndSize, PyObject, PyVarObject, Py_ssize_t, _PyBytes_Resize,
+    PyBytesObject, PyBytes_FromStringAndSize, PyErr_Clear, PyObject, PyVarObject, Py_ssize_t,
+    _PyBytes_Resize,
 };
 use std::io::Error;
 
 const BUFFER_LENGTH: usize = 1024;
 
+/// The largest capacity that is learned. Longer output grows the buffer as
+/// it is written, so that one very long output does not make the following
+/// writers start with buffers far larger than they need.
+const MAX_LEARNED_LENGTH: usize = 4 * 1024 * 1024;
+
+/// A moving average of the length of recent output, used as the initial
+/// capacity of a writer so that output of a similar length is written
+/// without growing the buffer.
+pub struct SizeHint {
+    len: AtomicUsize,
+}
+
+impl SizeHint {
+    pub const fn new() -> Self {
+        SizeHint {
+            len: AtomicUsize::new(0),
+        }
+    }
+
+    #[inline(always)]
+    pub fn get(&self) -> usize {
+        self.len.load(Ordering::Relaxed)
+    }
+
+    /// Return the capacity to start a writer with, which leaves room for
+    /// output somewhat longer than the average, up to `MAX_LEARNED_LENGTH`.
+    #[inline(always)]
+    pub fn capacity(&self) -> usize {
+        let len = self.get();
+        (len + len / 8).min(MAX_LEARNED_LENGTH)
+    }
+
+    /// Add the length of an output, at most `MAX_LEARNED_LENGTH`, to the
+    /// average. A change of less than 1/64 is not stored, so that threads
+    /// writing output of a steady length do not contend for the value.
+    #[inline(always)]
+    pub fn update(&self, len: usize) {
+        let len = len.min(MAX_LEARNED_LENGTH);
+        let prev = self.get();
+        let next = prev - prev / 4 + len / 4;
+        if next.abs_diff(prev) > prev / 64 {
+            self.len.store(next, Ordering::Relaxed);
+        }
+    }
+}
+
 pub struct BytesWriter {
     cap: usize,
     len: usize,
@@ -20,10 +68,35 @@ impl BytesWriter {
         BytesWriter {
             cap: BUFFER_LENGTH,
             len: 0,
-            bytes: unsafe {
-                PyBytes_FromStringAndSize(core::ptr::null_mut(), BUFFER_LENGTH as isize)
-                    as *mut PyBytesObject
-            },
+            bytes: BytesWriter::alloc(BUFFER_LENGTH),
+        }
+    }
+
+    /// Return a writer whose buffer starts with `capacity` bytes, or the
+    /// default if that is less. A capacity is only an estimate, so if it
+    /// cannot be allocated the default is used instead. Return `None`, with
+    /// `MemoryError` set, if that cannot be allocated either.
+    pub fn with_capacity(capacity: usize) -> Option<Self> {
+        let mut cap = capacity.clamp(BUFFER_LENGTH, isize::MAX as usize);
+        let mut bytes = BytesWriter::alloc(cap);
+        if unlikely!(bytes.is_null()) && cap > BUFFER_LENGTH {
+            unsafe { PyErr_Clear() };
+            cap = BUFFER_LENGTH;
+            bytes = BytesWriter::alloc(cap);
+        }
+        if unlikely!(bytes.is_null()) {
+            return None;
+        }
+        Some(BytesWriter {
+            cap: cap,
+            len: 0,
+            bytes: bytes,
+        })
+    }
+
+    fn alloc(cap: usize) -> *mut PyBytesObject {
+        unsafe {
+            PyBytes_FromStringAndSize(core::ptr::null_mut(), cap as isize) as *mut PyBytesObject
         }
     }
 
@@ -0,0 +1,405 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::serialize::writer::WriteExt;
+use crate::typeref::{INT_TYPE, NONE, WRITE_METHOD_STR};
+use core::ffi::{c_char, c_int};
+use pyo3_ffi::*;
+use std::io::Error;
+
+/// Where a `ChunkWriter` writes its chunks.
+pub enum Sink {
+    /// A method of an object, such as `write()` of a file object or
+    /// `sendall()` of a socket, that is called with each chunk as `bytes`.
+    /// The flag is set for an `io.RawIOBase`, whose `write()` returns how
+    /// much it wrote, or `None` if it would block.
+    Method(*mut PyObject, *mut PyObject, bool),
+    /// A blocking file descriptor, written with `write(2)` without the GIL.
+    #[cfg(unix)]
+    Fd(c_int),
+}
+
+#[cold]
+unsafe fn set_type_error() {
+    let msg = "dump() fp must have a write() method, or be a socket or a file descriptor\0";
+    PyErr_SetString(PyExc_TypeError, msg.as_ptr() as *const c_char);
+}
+
+#[cold]
+unsafe fn set_write_error(exc: *mut PyObject, msg: &str) {
+    PyErr_SetString(exc, msg.as_ptr() as *const c_char);
+}
+
+/// Return whether `obj` is an `io.RawIOBase`, or -1 with an exception set.
+unsafe fn is_raw_stream(obj: *mut PyObject) -> c_int {
+    let module = PyImport_ImportModule("io\0".as_ptr() as *const c_char);
+    if module.is_null() {
+        return -1;
+    }
+    let raw = PyObject_GetAttrString(module, "RawIOBase\0".as_ptr() as *const c_char);
+    Py_DECREF(module);
+    if raw.is_null() {
+        return -1;
+    }
+    let res = PyObject_IsInstance(obj, raw);
+    Py_DECREF(raw);
+    res
+}
+
+/// Call the method `name` of `obj` without arguments.
+unsafe fn call(obj: *mut PyObject, name: &str) -> *mut PyObject {
+    let name = PyUnicode_InternFromString(name.as_ptr() as *const c_char);
+    let res = call_method!(obj, name);
+    Py_DECREF(name);
+    res
+}
+
+/// Return the file descriptor of an int, or -1 with an exception set.
+#[cfg(unix)]
+unsafe fn as_fd(obj: *mut PyObject) -> c_int {
+    let fd = PyLong_AsLong(obj);
+    if fd < 0 || fd > c_int::MAX as _ {
+        if PyErr_Occurred().is_null() {
+            set_type_error();
+        }
+        return -1;
+    }
+    fd as c_int
+}
+
+impl Sink {
+    /// Return the sink for `fp`: a file descriptor, an object with a
+    /// `write()` method, or a socket. A blocking socket is written with
+    /// `write(2)` and a socket with a timeout with `sendall()`. Return `None`
+    /// with an exception set if `fp` is none of these.
+    pub unsafe fn new(fp: *mut PyObject) -> Option<Sink> {
+        if PyBool_Check(fp) != 0 {
+            set_type_error();
+            return None;
+        }
+        if PyLong_Check(fp) != 0 {
+            return Sink::from_fd(fp);
+        }
+        if PyObject_HasAttr(fp, WRITE_METHOD_STR) == 1 {
+            let raw = is_raw_stream(fp);
+            if raw == -1 {
+                return None;
+            }
+            Py_INCREF(fp);
+            Py_INCREF(WRITE_METHOD_STR);
+            return Some(Sink::Method(fp, WRITE_METHOD_STR, raw == 1));
+        }
+        let sendall = PyUnicode_InternFromString("sendall\0".as_ptr() as *const c_char);
+        if PyObject_HasAttr(fp, sendall) == 1 {
+            let timeout = call(fp, "gettimeout\0");
+            if timeout.is_null() {
+                Py_DECREF(sendall);
+                return None;
+            }
+            Py_DECREF(timeout);
+            if timeout == NONE {
+                Py_DECREF(sendall);
+                let fileno = call(fp, "fileno\0");
+                if fileno.is_null() {
+                    return None;
+                }
+                let sink = Sink::from_fd(fileno);
+                Py_DECREF(fileno);
+                return sink;
+            }
+            Py_INCREF(fp);
+            return Some(Sink::Method(fp, sendall, false));
+        }
+        Py_DECREF(sendall);
+        set_type_error();
+        None
+    }
+
+    #[cfg(unix)]
+    unsafe fn from_fd(fd: *mut PyObject) -> Option<Sink> {
+        match as_fd(fd) {
+            -1 => None,
+            fd => Some(Sink::Fd(fd)),
+        }
+    }
+
+    #[cfg(not(unix))]
+    unsafe fn from_fd(fd: *mut PyObject) -> Option<Sink> {
+        let _ = fd;
+        set_type_error();
+        None
+    }
+
+    /// Write all of `data`. Return `false` with an exception set if it fails.
+    unsafe fn write(&mut self, mut data: &[u8]) -> bool {
+        while !data.is_empty() {
+            let written = match self {
+                Sink::Method(obj, name, raw) => {
+                    let bytes = PyBytes_FromStringAndSize(
+                        data.as_ptr() as *const c_char,
+                        data.len() as Py_ssize_t,
+                    );
+                    let res = call_method!(*obj, *name, bytes);
+                    Py_DECREF(bytes);
+                    if res.is_null() {
+                        return false;
+                    }
+                    // An unbuffered file may write part of the chunk and
+                    // return how much it wrote.
+                    let mut written = data.len();
+                    if (*res).ob_type == INT_TYPE {
+                        let val = PyLong_AsSsize_t(res);
+                        if val >= 0 && (val as usize) < data.len() {
+                            written = val as usize;
+                        }
+                        PyErr_Clear();
+                    } else if res == NONE && *raw {
+                        written = 0;
+                    }
+                    Py_DECREF(res);
+                    if unlikely!(written == 0) {
+                        if res == NONE {
+                            set_write_error(
+                                PyExc_BlockingIOError,
+                                "dump() fp.write() would block\0",
+                            );
+                        } else {
+                            set_write_error(PyExc_OSError, "dump() fp.write() wrote 0 bytes\0");
+                        }
+                        return false;
+                    }
+                    written
+                }
+                #[cfg(unix)]
+                Sink::Fd(fd) => match write_fd(*fd, data) {
+                    Some(val) => val,
+                    None => return false,
+                },
+            };
+            data = &data[written..];
+        }
+        true
+    }
+}
+
+/// Write some of `data` to `fd` without the GIL. Return the number of bytes
+/// written, or `None` with an exception set.
+#[cfg(unix)]
+unsafe fn write_fd(fd: c_int, data: &[u8]) -> Option<usize> {
+    use std::io::Write;
+    use std::os::unix::io::FromRawFd;
+    let mut file = core::mem::ManuallyDrop::new(std::fs::File::from_raw_fd(fd));
+    loop {
+        let state = PyEval_SaveThread();
+        let res = file.write(data);
+        PyEval_RestoreThread(state);
+        match res {
+            Ok(val) => return Some(val),
+            Err(err) if err.kind() == std::io::ErrorKind::Interrupted => {
+                if PyErr_CheckSignals() != 0 {
+                    return None;
+                }
+            }
+            Err(err) => {
+                let msg = err.to_string();
+                let args = PyTuple_New(2);
+                PyTuple_SET_ITEM(
+                    args,
+                    0,
+                    PyLong_FromLong(err.raw_os_error().unwrap_or(0) as _),
+                );
+                PyTuple_SET_ITEM(
+                    args,
+                    1,
+                    PyUnicode_FromStringAndSize(
+                        msg.as_ptr() as *const c_char,
+                        msg.len() as Py_ssize_t,
+                    ),
+                );
+                PyErr_SetObject(PyExc_OSError, args);
+                Py_DECREF(args);
+                return None;
+            }
+        }
+    }
+}
+
+impl Drop for Sink {
+    fn drop(&mut self) {
+        if let Sink::Method(obj, name, _) = *self {
+            ffi!(Py_DECREF(obj));
+            ffi!(Py_DECREF(name));
+        }
+    }
+}
+
+/// An exception raised by a sink, kept until serializing stops.
+pub struct SinkError {
+    #[cfg(Py_3_12)]
+    exc: *mut PyObject,
+    #[cfg(not(Py_3_12))]
+    exc: (*mut PyObject, *mut PyObject, *mut PyObject),
+}
+
+impl SinkError {
+    fn fetch() -> Self {
+        #[cfg(Py_3_12)]
+        let exc = ffi!(PyErr_GetRaisedException());
+        #[cfg(not(Py_3_12))]
+        let exc = {
+            let mut exc = (
+                core::ptr::null_mut(),
+                core::ptr::null_mut(),
+                core::ptr::null_mut(),
+            );
+            ffi!(PyErr_Fetch(&mut exc.0, &mut exc.1, &mut exc.2));
+            exc
+        };
+        SinkError { exc: exc }
+    }
+
+    /// Raise the exception.
+    pub fn restore(self) {
+        #[cfg(Py_3_12)]
+        ffi!(PyErr_SetRaisedException(self.exc));
+        #[cfg(not(Py_3_12))]
+        ffi!(PyErr_Restore(self.exc.0, self.exc.1, self.exc.2));
+    }
+}
+
+/// Writes the output to a `Sink` in chunks of at most `chunk_size` bytes,
+/// unless a single value is longer, so that memory does not grow with the
+/// length of the output. Once the sink fails, writes return an error so that
+/// serializing stops, and the exception is returned by `finish()`.
+pub struct ChunkWriter {
+    buf: Vec<u8>,
+    chunk_size: usize,
+    sink: Sink,
+    error: Option<SinkError>,
+}
+
+impl ChunkWriter {
+    pub fn new(sink: Sink, chunk_size: usize) -> Self {
+        ChunkWriter {
+            buf: Vec::with_capacity(chunk_size),
+            chunk_size: chunk_size,
+            sink: sink,
+            error: None,
+        }
+    }
+
+    /// Write what is buffered to the sink.
+    pub fn flush_chunk(&mut self) {
+        if !self.buf.is_empty() && self.error.is_none() && !unsafe { self.sink.write(&self.buf) } {
+            self.error = Some(SinkError::fetch());
+        }
+        self.buf.clear();
+    }
+
+    /// Write what is left to the sink and return its error, if any.
+    pub fn finish(&mut self) -> Result<(), SinkError> {
+        self.flush_chunk();
+        match self.error.take() {
+            Some(err) => Err(err),
+            None => Ok(()),
+        }
+    }
+
+    /// Return an error if the sink has failed.
+    #[inline(always)]
+    fn check(&self) -> Result<(), Error> {
+        if unlikely!(self.error.is_some()) {
+            return Err(Error::from(std::io::ErrorKind::Other));
+        }
+        Ok(())
+    }
+
+    #[cold]
+    #[inline(never)]
+    fn reserve_slow(&mut self, len: usize) {
+        self.flush_chunk();
+        if len > self.buf.capacity() {
+            self.buf.reserve(len);
+        }
+    }
+
+    #[inline(always)]
+    fn buffer_ptr(&mut self) -> *mut u8 {
+        unsafe { self.buf.as_mut_ptr().add(self.buf.len()) }
+    }
+
+    #[inline(always)]
+    fn written(&mut self, len: usize) {
+        debug_assert!(self.buf.len() + len <= self.buf.capacity());
+        unsafe { self.buf.set_len(self.buf.len() + len) };
+    }
+}
+
+impl std::io::Write for ChunkWriter {
+    fn write(&mut self, buf: &[u8]) -> Result<usize, Error> {
+        self.write_all(buf)?;
+        Ok(buf.len())
+    }
+
+    fn write_all(&mut self, buf: &[u8]) -> Result<(), Error> {
+        (&mut *self).reserve(buf.len());
+        self.check()?;
+        self.buf.extend_from_slice(buf);
+        Ok(())
+    }
+
+    fn flush(&mut self) -> Result<(), Error> {
+        Ok(())
+    }
+}
+
+impl WriteExt for &mut ChunkWriter {
+    #[inline(always)]
+    fn as_mut_buffer_ptr(&mut self) -> *mut u8 {
+        self.buffer_ptr()
+    }
+
+    #[inline(always)]
+    fn reserve(&mut self, len: usize) {
+        if unlikely!(self.buf.len() + len > self.chunk_size) {
+            self.reserve_slow(len);
+        }
+    }
+
+    #[inline(always)]
+    fn set_written(&mut self, len: usize) {
+        self.written(len);
+    }
+
+    fn write_str(&mut self, val: &str) -> Result<(), Error> {
+        self.reserve(val.len() + 2);
+        self.check()?;
+        self.buf.push(b'"');
+        self.buf.extend_from_slice(val.as_bytes());
+        self.buf.push(b'"');
+        Ok(())
+    }
+
+    unsafe fn write_reserved_fragment(&mut self, val: &[u8]) -> Result<(), Error> {
+        self.check()?;
+        self.buf.extend_from_slice(val);
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_punctuation(&mut self, val: u8) -> Result<(), Error> {
+        self.check()?;
+        unsafe { core::ptr::write(self.buffer_ptr(), val) };
+        self.written(1);
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_indent(&mut self, len: usize) -> Result<(), Error> {
+        self.check()?;
+        unsafe {
+            core::ptr::write_bytes(self.buffer_ptr(), b' ', len);
+        };
+        self.written(len);
+        Ok(())
+    }
+}
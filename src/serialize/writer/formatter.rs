@@ -187,7 +187,7 @@ pub trait Formatter {
         W: ?Sized + io::Write + WriteExt,
     {
         reserve_minimum!(writer);
-        unsafe { writer.write_reserved_punctuation(b'[').unwrap() };
+        unsafe { writer.write_reserved_punctuation(b'[')? };
         Ok(())
     }
 
@@ -197,7 +197,7 @@ pub trait Formatter {
         W: ?Sized + io::Write + WriteExt,
     {
         reserve_minimum!(writer);
-        unsafe { writer.write_reserved_punctuation(b']').unwrap() };
+        unsafe { writer.write_reserved_punctuation(b']')? };
         Ok(())
     }
 
@@ -208,7 +208,7 @@ pub trait Formatter {
     {
         reserve_minimum!(writer);
         if !first {
-            unsafe { writer.write_reserved_punctuation(b',').unwrap() }
+            unsafe { writer.write_reserved_punctuation(b',')? };
         }
         Ok(())
     }
@@ -228,7 +228,7 @@ pub trait Formatter {
     {
         reserve_minimum!(writer);
         unsafe {
-            writer.write_reserved_punctuation(b'{').unwrap();
+            writer.write_reserved_punctuation(b'{')?;
         }
         Ok(())
     }
@@ -240,7 +240,7 @@ pub trait Formatter {
     {
         reserve_minimum!(writer);
         unsafe {
-            writer.write_reserved_punctuation(b'}').unwrap();
+            writer.write_reserved_punctuation(b'}')?;
         }
         Ok(())
     }
@@ -253,7 +253,7 @@ pub trait Formatter {
         reserve_minimum!(writer);
         if !first {
             unsafe {
-                writer.write_reserved_punctuation(b',').unwrap();
+                writer.write_reserved_punctuation(b',')?;
             }
         }
         Ok(())
@@ -409,7 +409,7 @@ impl Formatter for PrettyFormatter {
         W: ?Sized + io::Write + WriteExt,
     {
         reserve_minimum!(writer);
-        unsafe { writer.write_reserved_fragment(b": ").unwrap() };
+        unsafe { writer.write_reserved_fragment(b": ")? };
         Ok(())
     }
 
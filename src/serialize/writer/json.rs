@@ -158,8 +158,7 @@ where
     #[inline(always)]
     fn serialize_bytes(self, value: &[u8]) -> Result<()> {
         self.writer.reserve(value.len() + 32);
-        unsafe { self.writer.write_reserved_fragment(value).unwrap() };
-        Ok(())
+        unsafe { self.writer.write_reserved_fragment(value) }.map_err(Error::io)
     }
 
     #[inline]
@@ -174,13 +173,16 @@ where
         debug_assert!(name.len() <= 36);
         reserve_minimum!(self.writer);
         unsafe {
-            self.writer.write_reserved_punctuation(b'"').unwrap();
+            self.writer
+                .write_reserved_punctuation(b'"')
+                .map_err(Error::io)?;
             self.writer
                 .write_reserved_fragment(name.as_bytes())
-                .unwrap();
-            self.writer.write_reserved_punctuation(b'"').unwrap();
+                .map_err(Error::io)?;
+            self.writer
+                .write_reserved_punctuation(b'"')
+                .map_err(Error::io)
         }
-        Ok(())
     }
 
     fn serialize_unit_variant(
@@ -311,21 +313,21 @@ where
         self.ser
             .formatter
             .begin_array_value(&mut self.ser.writer, self.state == State::First)
-            .unwrap();
+            .map_err(Error::io)?;
         self.state = State::Rest;
         value.serialize(&mut *self.ser)?;
         self.ser
             .formatter
             .end_array_value(&mut self.ser.writer)
             .map_err(Error::io)
-            .unwrap();
-        Ok(())
     }
 
     #[inline]
     fn end(self) -> Result<()> {
-        self.ser.formatter.end_array(&mut self.ser.writer).unwrap();
-        Ok(())
+        self.ser
+            .formatter
+            .end_array(&mut self.ser.writer)
+            .map_err(Error::io)
     }
 }
 
@@ -353,7 +355,7 @@ where
         self.ser
             .formatter
             .begin_object_key(&mut self.ser.writer, self.state == State::First)
-            .unwrap();
+            .map_err(Error::io)?;
         self.state = State::Rest;
 
         key.serialize(MapKeySerializer { ser: self.ser })?;
@@ -361,8 +363,7 @@ where
         self.ser
             .formatter
             .end_object_key(&mut self.ser.writer)
-            .unwrap();
-        Ok(())
+            .map_err(Error::io)
     }
 
     #[inline]
@@ -373,19 +374,20 @@ where
         self.ser
             .formatter
             .begin_object_value(&mut self.ser.writer)
-            .unwrap();
+            .map_err(Error::io)?;
         value.serialize(&mut *self.ser)?;
         self.ser
             .formatter
             .end_object_value(&mut self.ser.writer)
-            .unwrap();
-        Ok(())
+            .map_err(Error::io)
     }
 
     #[inline]
     fn end(self) -> Result<()> {
-        self.ser.formatter.end_object(&mut self.ser.writer).unwrap();
-        Ok(())
+        self.ser
+            .formatter
+            .end_object(&mut self.ser.writer)
+            .map_err(Error::io)
     }
 }
 
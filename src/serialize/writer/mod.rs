@@ -1,9 +1,14 @@
 // SPDX-License-Identifier: Apache-2.0
 
+mod bufferwriter;
 mod byteswriter;
+mod chunkwriter;
 mod formatter;
 mod json;
 mod str;
+mod vecwriter;
 
-pub use byteswriter::{BytesWriter, WriteExt};
+pub use bufferwriter::BufferWriter;
+pub use byteswriter::{BytesWriter, SizeHint, WriteExt};
+pub use chunkwriter::{ChunkWriter, Sink, SinkError};
 pub use json::{to_writer, to_writer_pretty};
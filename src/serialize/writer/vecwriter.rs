@@ -0,0 +1,53 @@
+// SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+use crate::serialize::writer::WriteExt;
+use std::io::Error;
+
+/// Writes to the end of a `Vec`, for output that is copied out in pieces
+/// rather than returned as one `bytes` object.
+impl WriteExt for &mut Vec<u8> {
+    #[inline(always)]
+    fn as_mut_buffer_ptr(&mut self) -> *mut u8 {
+        unsafe { self.as_mut_ptr().add(self.len()) }
+    }
+
+    #[inline(always)]
+    fn reserve(&mut self, len: usize) {
+        Vec::reserve(*self, len);
+    }
+
+    #[inline(always)]
+    fn set_written(&mut self, len: usize) {
+        debug_assert!(self.len() + len <= self.capacity());
+        unsafe { self.set_len(self.len() + len) };
+    }
+
+    fn write_str(&mut self, val: &str) -> Result<(), Error> {
+        Vec::reserve(*self, val.len() + 2);
+        self.push(b'"');
+        self.extend_from_slice(val.as_bytes());
+        self.push(b'"');
+        Ok(())
+    }
+
+    unsafe fn write_reserved_fragment(&mut self, val: &[u8]) -> Result<(), Error> {
+        self.extend_from_slice(val);
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_punctuation(&mut self, val: u8) -> Result<(), Error> {
+        unsafe { core::ptr::write(self.as_mut_buffer_ptr(), val) };
+        self.set_written(1);
+        Ok(())
+    }
+
+    #[inline(always)]
+    unsafe fn write_reserved_indent(&mut self, len: usize) -> Result<(), Error> {
+        unsafe {
+            core::ptr::write_bytes(self.as_mut_buffer_ptr(), b' ', len);
+        };
+        self.set_written(len);
+        Ok(())
+    }
+}
@@ -1,16 +1,17 @@
 // SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
-use crate::ffi::xorjson_fragmenttype_new;
 use core::ffi::c_char;
 #[cfg(feature = "yyjson")]
 use core::ffi::c_void;
 #[cfg(feature = "yyjson")]
 use core::mem::MaybeUninit;
 use core::ptr::{null_mut, NonNull};
-use once_cell::race::{OnceBool, OnceBox};
+use once_cell::race::OnceBool;
 use pyo3_ffi::*;
 #[cfg(feature = "yyjson")]
 use std::cell::UnsafeCell;
+#[cfg(feature = "yyjson")]
+use std::sync::Mutex;
 
 pub struct NumpyTypes {
     pub array: *mut PyTypeObject,
@@ -27,10 +28,12 @@ pub struct NumpyTypes {
     pub uint8: *mut PyTypeObject,
     pub bool_: *mut PyTypeObject,
     pub datetime64: *mut PyTypeObject,
+    pub empty: *mut PyObject,
 }
 
 pub static mut DEFAULT: *mut PyObject = null_mut();
 pub static mut OPTION: *mut PyObject = null_mut();
+pub static mut SIZE_HINT: *mut PyObject = null_mut();
 
 pub static mut NONE: *mut PyObject = null_mut();
 pub static mut TRUE: *mut PyObject = null_mut();
@@ -51,20 +54,17 @@ pub static mut DATETIME_TYPE: *mut PyTypeObject = null_mut();
 pub static mut DATE_TYPE: *mut PyTypeObject = null_mut();
 pub static mut TIME_TYPE: *mut PyTypeObject = null_mut();
 pub static mut TUPLE_TYPE: *mut PyTypeObject = null_mut();
-pub static mut UUID_TYPE: *mut PyTypeObject = null_mut();
-pub static mut ENUM_TYPE: *mut PyTypeObject = null_mut();
-pub static mut FIELD_TYPE: *mut PyTypeObject = null_mut();
-pub static mut FRAGMENT_TYPE: *mut PyTypeObject = null_mut();
-
-pub static mut NUMPY_TYPES: OnceBox<Option<NonNull<NumpyTypes>>> = OnceBox::new();
-
-#[cfg(Py_3_9)]
-pub static mut ZONEINFO_TYPE: *mut PyTypeObject = null_mut();
 
 pub static mut UTCOFFSET_METHOD_STR: *mut PyObject = null_mut();
 pub static mut NORMALIZE_METHOD_STR: *mut PyObject = null_mut();
 pub static mut CONVERT_METHOD_STR: *mut PyObject = null_mut();
 pub static mut DST_STR: *mut PyObject = null_mut();
+pub static mut READ_METHOD_STR: *mut PyObject = null_mut();
+pub static mut WRITE_METHOD_STR: *mut PyObject = null_mut();
+pub static mut OPEN_METHOD_STR: *mut PyObject = null_mut();
+pub static mut FILENO_METHOD_STR: *mut PyObject = null_mut();
+pub static mut SEEK_METHOD_STR: *mut PyObject = null_mut();
+pub static mut CLOSE_METHOD_STR: *mut PyObject = null_mut();
 
 pub static mut DICT_STR: *mut PyObject = null_mut();
 pub static mut DATACLASS_FIELDS_STR: *mut PyObject = null_mut();
@@ -89,8 +89,37 @@ pub struct YYJSONAlloc {
     _buffer: Box<YYJSONBuffer>,
 }
 
+// The buffer is only used by the thread that took the allocator from the pool.
+#[cfg(feature = "yyjson")]
+unsafe impl Send for YYJSONAlloc {}
+
+/// Maximum number of idle allocators kept for reuse.
+#[cfg(feature = "yyjson")]
+const YYJSON_ALLOC_POOL_SIZE: usize = 4;
+
+#[cfg(feature = "yyjson")]
+static YYJSON_ALLOC_POOL: Mutex<Vec<Box<YYJSONAlloc>>> = Mutex::new(Vec::new());
+
+/// Take an idle allocator from the pool or create one. A document read
+/// with it must be freed before it is returned with `yyjson_alloc_release()`.
+#[cfg(feature = "yyjson")]
+pub fn yyjson_alloc_acquire() -> Box<YYJSONAlloc> {
+    YYJSON_ALLOC_POOL
+        .lock()
+        .ok()
+        .and_then(|mut pool| pool.pop())
+        .unwrap_or_else(yyjson_init)
+}
+
+/// Return an allocator to the pool, freeing it if the pool is full.
 #[cfg(feature = "yyjson")]
-pub static mut YYJSON_ALLOC: OnceBox<YYJSONAlloc> = OnceBox::new();
+pub fn yyjson_alloc_release(alloc: Box<YYJSONAlloc>) {
+    if let Ok(mut pool) = YYJSON_ALLOC_POOL.lock() {
+        if pool.len() < YYJSON_ALLOC_POOL_SIZE {
+            pool.push(alloc);
+        }
+    }
+}
 
 #[cfg(feature = "yyjson")]
 pub fn yyjson_init() -> Box<YYJSONAlloc> {
@@ -120,15 +149,57 @@ pub fn yyjson_init() -> Box<YYJSONAlloc> {
 
 #[allow(non_upper_case_globals)]
 pub static mut JsonEncodeError: *mut PyObject = null_mut();
-#[allow(non_upper_case_globals)]
-pub static mut JsonDecodeError: *mut PyObject = null_mut();
 
 static INIT: OnceBool = OnceBool::new();
 
+extern "C" {
+    fn PyInterpreterState_Main() -> *mut PyInterpreterState;
+    #[cfg(Py_3_9)]
+    fn PyInterpreterState_Get() -> *mut PyInterpreterState;
+    #[cfg(not(Py_3_9))]
+    fn _PyInterpreterState_Get() -> *mut PyInterpreterState;
+}
+
+/// Set up the references that all interpreters share: builtin types,
+/// immortal objects and interned strings. Those that belong to one
+/// interpreter are in its `ModuleState`. They are created by the main
+/// interpreter, whose objects outlive the others, even if another
+/// interpreter imports the module first.
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
 pub fn init_typerefs() {
-    INIT.get_or_init(_init_typerefs_impl);
+    if INIT.get().is_some() {
+        return;
+    }
+    unsafe {
+        #[cfg(Py_3_9)]
+        let current = PyInterpreterState_Get();
+        #[cfg(not(Py_3_9))]
+        let current = _PyInterpreterState_Get();
+        let main = PyInterpreterState_Main();
+        if current == main {
+            INIT.get_or_init(_init_typerefs_impl);
+        } else {
+            run_in_interpreter(main, || {
+                INIT.get_or_init(_init_typerefs_impl);
+            });
+        }
+    }
+}
+
+/// Call `func` with a new thread state of the interpreter `interp`, and then
+/// return to the thread state of the caller.
+#[cold]
+#[cfg_attr(feature = "optimize", optimize(size))]
+unsafe fn run_in_interpreter(interp: *mut PyInterpreterState, func: impl FnOnce()) {
+    let tstate = PyThreadState_New(interp);
+    let caller = PyEval_SaveThread();
+    PyEval_RestoreThread(tstate);
+    func();
+    PyThreadState_Clear(tstate);
+    PyEval_SaveThread();
+    PyThreadState_Delete(tstate);
+    PyEval_RestoreThread(caller);
 }
 
 #[cold]
@@ -137,10 +208,6 @@ fn _init_typerefs_impl() -> bool {
     unsafe {
         debug_assert!(crate::opt::MAX_OPT < u16::MAX as i32);
 
-        assert!(crate::deserialize::KEY_MAP
-            .set(crate::deserialize::KeyMap::default())
-            .is_ok());
-        FRAGMENT_TYPE = xorjson_fragmenttype_new();
         PyDateTime_IMPORT();
         NONE = Py_None();
         TRUE = Py_True();
@@ -169,20 +236,18 @@ fn _init_typerefs_impl() -> bool {
         DATETIME_TYPE = look_up_datetime_type();
         DATE_TYPE = look_up_date_type();
         TIME_TYPE = look_up_time_type();
-        UUID_TYPE = look_up_uuid_type();
-        ENUM_TYPE = look_up_enum_type();
-        FIELD_TYPE = look_up_field_type();
-
-        #[cfg(Py_3_9)]
-        {
-            ZONEINFO_TYPE = look_up_zoneinfo_type();
-        }
 
         INT_ATTR_STR = PyUnicode_InternFromString("int\0".as_ptr() as *const c_char);
         UTCOFFSET_METHOD_STR = PyUnicode_InternFromString("utcoffset\0".as_ptr() as *const c_char);
         NORMALIZE_METHOD_STR = PyUnicode_InternFromString("normalize\0".as_ptr() as *const c_char);
         CONVERT_METHOD_STR = PyUnicode_InternFromString("convert\0".as_ptr() as *const c_char);
         DST_STR = PyUnicode_InternFromString("dst\0".as_ptr() as *const c_char);
+        READ_METHOD_STR = PyUnicode_InternFromString("read\0".as_ptr() as *const c_char);
+        WRITE_METHOD_STR = PyUnicode_InternFromString("write\0".as_ptr() as *const c_char);
+        OPEN_METHOD_STR = PyUnicode_InternFromString("open\0".as_ptr() as *const c_char);
+        FILENO_METHOD_STR = PyUnicode_InternFromString("fileno\0".as_ptr() as *const c_char);
+        SEEK_METHOD_STR = PyUnicode_InternFromString("seek\0".as_ptr() as *const c_char);
+        CLOSE_METHOD_STR = PyUnicode_InternFromString("close\0".as_ptr() as *const c_char);
         DICT_STR = PyUnicode_InternFromString("__dict__\0".as_ptr() as *const c_char);
         DATACLASS_FIELDS_STR =
             PyUnicode_InternFromString("__dataclass_fields__\0".as_ptr() as *const c_char);
@@ -195,16 +260,17 @@ fn _init_typerefs_impl() -> bool {
         VALUE_STR = PyUnicode_InternFromString("value\0".as_ptr() as *const c_char);
         DEFAULT = PyUnicode_InternFromString("default\0".as_ptr() as *const c_char);
         OPTION = PyUnicode_InternFromString("option\0".as_ptr() as *const c_char);
+        SIZE_HINT = PyUnicode_InternFromString("size_hint\0".as_ptr() as *const c_char);
+        crate::deserialize::init_event_strs();
         JsonEncodeError = pyo3_ffi::PyExc_TypeError;
         Py_INCREF(JsonEncodeError);
-        JsonDecodeError = look_up_json_exc();
     };
     true
 }
 
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-unsafe fn look_up_json_exc() -> *mut PyObject {
+pub unsafe fn look_up_json_exc() -> *mut PyObject {
     let module = PyImport_ImportModule("json\0".as_ptr() as *const c_char);
     let module_dict = PyObject_GenericGetDict(module, null_mut());
     let ptr = PyMapping_GetItemString(module_dict, "JSONDecodeError\0".as_ptr() as *const c_char);
@@ -216,7 +282,6 @@ unsafe fn look_up_json_exc() -> *mut PyObject {
     Py_DECREF(ptr);
     Py_DECREF(module_dict);
     Py_DECREF(module);
-    Py_INCREF(res);
     res
 }
 
@@ -253,6 +318,7 @@ pub fn load_numpy_types() -> Box<Option<NonNull<NumpyTypes>>> {
             uint8: look_up_numpy_type(numpy_module_dict, "uint8\0"),
             bool_: look_up_numpy_type(numpy_module_dict, "bool_\0"),
             datetime64: look_up_numpy_type(numpy_module_dict, "datetime64\0"),
+            empty: look_up_numpy_type(numpy_module_dict, "empty\0") as *mut PyObject,
         });
         Py_XDECREF(numpy_module_dict);
         Py_XDECREF(numpy);
@@ -262,7 +328,7 @@ pub fn load_numpy_types() -> Box<Option<NonNull<NumpyTypes>>> {
 
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-unsafe fn look_up_field_type() -> *mut PyTypeObject {
+pub unsafe fn look_up_field_type() -> *mut PyTypeObject {
     let module = PyImport_ImportModule("dataclasses\0".as_ptr() as *const c_char);
     let module_dict = PyObject_GenericGetDict(module, null_mut());
     let ptr = PyMapping_GetItemString(module_dict, "_FIELD\0".as_ptr() as *const c_char)
@@ -274,7 +340,7 @@ unsafe fn look_up_field_type() -> *mut PyTypeObject {
 
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-unsafe fn look_up_enum_type() -> *mut PyTypeObject {
+pub unsafe fn look_up_enum_type() -> *mut PyTypeObject {
     let module = PyImport_ImportModule("enum\0".as_ptr() as *const c_char);
     let module_dict = PyObject_GenericGetDict(module, null_mut());
     let ptr = PyMapping_GetItemString(module_dict, "EnumMeta\0".as_ptr() as *const c_char)
@@ -286,11 +352,12 @@ unsafe fn look_up_enum_type() -> *mut PyTypeObject {
 
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-unsafe fn look_up_uuid_type() -> *mut PyTypeObject {
+pub unsafe fn look_up_uuid_type() -> *mut PyTypeObject {
     let uuid_mod = PyImport_ImportModule("uuid\0".as_ptr() as *const c_char);
     let uuid_mod_dict = PyObject_GenericGetDict(uuid_mod, null_mut());
     let uuid = PyMapping_GetItemString(uuid_mod_dict, "NAMESPACE_DNS\0".as_ptr() as *const c_char);
     let ptr = (*uuid).ob_type;
+    Py_INCREF(ptr as *mut PyObject);
     Py_DECREF(uuid);
     Py_DECREF(uuid_mod_dict);
     Py_DECREF(uuid_mod);
@@ -337,7 +404,7 @@ unsafe fn look_up_time_type() -> *mut PyTypeObject {
 #[cfg(Py_3_9)]
 #[cold]
 #[cfg_attr(feature = "optimize", optimize(size))]
-unsafe fn look_up_zoneinfo_type() -> *mut PyTypeObject {
+pub unsafe fn look_up_zoneinfo_type() -> *mut PyTypeObject {
     let module = PyImport_ImportModule("zoneinfo\0".as_ptr() as *const c_char);
     let module_dict = PyObject_GenericGetDict(module, null_mut());
     let ptr = PyMapping_GetItemString(module_dict, "ZoneInfo\0".as_ptr() as *const c_char)
@@ -150,6 +150,17 @@ macro_rules! call_method {
     ($obj1:expr, $obj2:expr, $obj3:expr) => {
         unsafe { pyo3_ffi::PyObject_CallMethodOneArg($obj1, $obj2, $obj3) }
     };
+    ($obj1:expr, $obj2:expr, $obj3:expr, $obj4:expr) => {
+        unsafe {
+            pyo3_ffi::PyObject_CallMethodObjArgs(
+                $obj1,
+                $obj2,
+                $obj3,
+                $obj4,
+                core::ptr::null_mut() as *mut pyo3_ffi::PyObject,
+            )
+        }
+    };
 }
 
 #[cfg(not(Py_3_9))]
@@ -173,6 +184,17 @@ macro_rules! call_method {
             )
         }
     };
+    ($obj1:expr, $obj2:expr, $obj3:expr, $obj4:expr) => {
+        unsafe {
+            pyo3_ffi::PyObject_CallMethodObjArgs(
+                $obj1,
+                $obj2,
+                $obj3,
+                $obj4,
+                core::ptr::null_mut() as *mut pyo3_ffi::PyObject,
+            )
+        }
+    };
 }
 
 macro_rules! str_hash {
@@ -244,11 +244,12 @@ class TestApi:
         """
         assert (
             str(inspect.signature(xorjson.dumps))
-            == "(obj, /, default=None, option=None)"
+            == "(obj, /, default=None, option=None, *, size_hint=None)"
         )
         inspect.signature(xorjson.dumps).bind("str")
         inspect.signature(xorjson.dumps).bind("str", default=default, option=1)
         inspect.signature(xorjson.dumps).bind("str", default=None, option=None)
+        inspect.signature(xorjson.dumps).bind("str", size_hint=1024)
 
     def test_loads_signature(self):
         """
@@ -278,6 +279,41 @@ class TestApi:
         c = "c" * 4096 * 4096
         assert xorjson.dumps([a, b, c]) == f'["{a}","{b}","{c}"]'.encode("utf-8")
 
+    def test_bytes_size_hint(self):
+        """
+        dumps() size_hint smaller than, equal to, and greater than the output
+        """
+        obj = ["a" * 900, "b" * 4096, {"c": list(range(1000))}]
+        ref = xorjson.dumps(obj)
+        for size_hint in (0, 1, 1024, len(ref) - 1, len(ref), len(ref) * 4):
+            assert xorjson.dumps(obj, size_hint=size_hint) == ref
+        assert xorjson.dumps(obj, size_hint=None) == ref
+
+    def test_bytes_size_hint_huge(self):
+        """
+        dumps() size_hint too large to allocate falls back to the default
+        """
+        for size_hint in (2**40, 2**62, 2**63, 2**64 - 1):
+            assert xorjson.dumps([1], size_hint=size_hint) == b"[1]"
+
+    def test_bytes_size_hint_invalid(self):
+        """
+        dumps() size_hint must be a non-negative int
+        """
+        for size_hint in (-1, 1.5, "1024"):
+            with pytest.raises(xorjson.JSONEncodeError):
+                xorjson.dumps([], size_hint=size_hint)
+
+    def test_bytes_learned_size(self):
+        """
+        dumps() output of varying length after its buffer size is learned
+        """
+        large = ["a" * 4096] * 256
+        for _ in range(16):
+            xorjson.dumps(large)
+        assert xorjson.dumps([1]) == b"[1]"
+        assert xorjson.dumps(large * 4) == xorjson.dumps(large * 4, size_hint=0)
+
     def test_bytes_null_terminated(self):
         """
         dumps() PyBytesObject buffer is null-terminated
@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+YYJSON = hasattr(xorjson, "LazyDocument")
+
+
+@pytest.mark.skipif(not YYJSON, reason="OPT_CACHE_STRINGS requires yyjson")
+class TestCacheStrings:
+    def test_cache_strings(self):
+        """
+        OPT_CACHE_STRINGS equal short values are one object
+        """
+        data = b'[{"status": "open"}, {"status": "open"}, ["open", "closed"]]'
+        obj = xorjson.loads(data, option=xorjson.OPT_CACHE_STRINGS)
+        assert obj == xorjson.loads(data)
+        assert obj[0]["status"] is obj[1]["status"]
+        assert obj[0]["status"] is obj[2][0]
+
+    def test_cache_strings_across_calls(self):
+        """
+        OPT_CACHE_STRINGS values are shared between calls
+        """
+        first = xorjson.loads(b'["EUR"]', option=xorjson.OPT_CACHE_STRINGS)
+        second = xorjson.loads(b'{"a": "EUR"}', option=xorjson.OPT_CACHE_STRINGS)
+        assert first[0] is second["a"]
+
+    def test_cache_strings_long(self):
+        """
+        OPT_CACHE_STRINGS values longer than 64 bytes are not cached
+        """
+        value = "a" * 65
+        data = xorjson.dumps([value, value])
+        obj = xorjson.loads(data, option=xorjson.OPT_CACHE_STRINGS)
+        assert obj == [value, value]
+        assert obj[0] is not obj[1]
+
+    def test_cache_strings_unicode(self):
+        """
+        OPT_CACHE_STRINGS non-ASCII and escaped values
+        """
+        data = '["\\u00e9", "é", "\\ud83d\\ude00", "😀", "", ""]'.encode("utf-8")
+        obj = xorjson.loads(data, option=xorjson.OPT_CACHE_STRINGS)
+        assert obj == ["é", "é", "😀", "😀", "", ""]
+        assert obj[0] is obj[1]
+        assert obj[2] is obj[3]
+
+    def test_cache_strings_default(self):
+        """
+        loads() does not share values without OPT_CACHE_STRINGS
+        """
+        obj = xorjson.loads(b'["open", "open"]')
+        assert obj[0] is not obj[1]
+
+    def test_cache_strings_fixture(self):
+        """
+        OPT_CACHE_STRINGS github.json matches loads()
+        """
+        data = read_fixture_bytes("github.json.xz")
+        obj = xorjson.loads(data, option=xorjson.OPT_CACHE_STRINGS)
+        assert obj == xorjson.loads(data)
+        types = [each["type"] for each in obj]
+        assert len({id(each) for each in types}) < len(types)
+
+    def test_cache_strings_paths(self):
+        """
+        OPT_CACHE_STRINGS with paths and columns
+        """
+        data = b'[{"a": "x"}, {"a": "x"}]'
+        paths = xorjson.loads(
+            data, paths=["/0/a", "/1/a"], option=xorjson.OPT_CACHE_STRINGS
+        )
+        assert paths["/0/a"] is paths["/1/a"]
+        columns = xorjson.loads(data, columns=True, option=xorjson.OPT_CACHE_STRINGS)
+        assert columns["a"][0] is columns["a"][1]
+
+    def test_cache_strings_dumps(self):
+        """
+        dumps() rejects OPT_CACHE_STRINGS
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps([], option=xorjson.OPT_CACHE_STRINGS)
@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+
+class TestLoadsColumns:
+    def test_loads_columns(self):
+        """
+        loads() columns pivots an array of objects
+        """
+        data = b'[{"ts":1,"price":1.5,"qty":10},{"ts":2,"price":2.5,"qty":20}]'
+        assert xorjson.loads(data, columns=True) == {
+            "ts": [1, 2],
+            "price": [1.5, 2.5],
+            "qty": [10, 20],
+        }
+
+    def test_loads_columns_key_order(self):
+        """
+        loads() columns are in order of first appearance
+        """
+        data = b'[{"a":1,"b":2},{"b":3,"c":4,"a":5}]'
+        res = xorjson.loads(data, columns=True)
+        assert list(res) == ["a", "b", "c"]
+        assert res == {"a": [1, 5], "b": [2, 3], "c": [None, 4]}
+
+    def test_loads_columns_missing(self):
+        """
+        loads() columns missing keys are None
+        """
+        data = b'[{"a":1},{},{"b":2},{"a":3}]'
+        assert xorjson.loads(data, columns=True) == {
+            "a": [1, None, None, 3],
+            "b": [None, None, 2, None],
+        }
+
+    def test_loads_columns_duplicate_key(self):
+        """
+        loads() columns last duplicate key wins as in loads()
+        """
+        data = b'[{"a":1,"a":2}]'
+        assert xorjson.loads(data, columns=True) == {"a": [2]}
+
+    def test_loads_columns_nested(self):
+        """
+        loads() columns values are deserialized as in loads()
+        """
+        data = b'[{"a":{"b":[1,"x"]},"c":null}]'
+        assert xorjson.loads(data, columns=True) == {
+            "a": [{"b": [1, "x"]}],
+            "c": [None],
+        }
+
+    def test_loads_columns_empty(self):
+        """
+        loads() columns empty array
+        """
+        assert xorjson.loads(b"[]", columns=True) == {}
+        assert xorjson.loads(b"[{}]", columns=True) == {}
+
+    def test_loads_columns_pointer(self):
+        """
+        loads() columns JSON Pointer to an array of objects
+        """
+        data = b'{"data":{"rows":[{"a":1},{"a":2}]},"meta":{}}'
+        assert xorjson.loads(data, columns="/data/rows") == {"a": [1, 2]}
+        assert xorjson.loads(b'[{"a":1}]', columns="") == {"a": [1]}
+
+    def test_loads_columns_false(self):
+        """
+        loads() columns False or None deserializes as usual
+        """
+        assert xorjson.loads(b'[{"a":1}]', columns=False) == [{"a": 1}]
+        assert xorjson.loads(b'[{"a":1}]', columns=None) == [{"a": 1}]
+
+    def test_loads_columns_not_records(self):
+        """
+        loads() columns raises if the value is not an array of objects
+        """
+        for data in (b'{"a":1}', b"[1]", b'[{"a":1},[2]]', b"1"):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads(data, columns=True)
+
+    def test_loads_columns_not_found(self):
+        """
+        loads() columns raises if the pointer refers to no value
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads(b'{"a":[]}', columns="/b")
+
+    def test_loads_columns_invalid_document(self):
+        """
+        loads() columns raises on an invalid document
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads(b'[{"a":1}', columns=True)
+
+    def test_loads_columns_invalid_arg(self):
+        """
+        loads() columns invalid argument
+        """
+        with pytest.raises(TypeError):
+            xorjson.loads(b"[]", columns=1)
+        with pytest.raises(ValueError):
+            xorjson.loads(b"[]", columns="a")
+        with pytest.raises(TypeError):
+            xorjson.loads(b"[]", columns=True, paths=["/a"])
+
+    def test_loads_columns_large(self):
+        """
+        loads() columns many records
+        """
+        records = [{"id": idx, "name": str(idx)} for idx in range(10000)]
+        res = xorjson.loads(xorjson.dumps(records), columns=True)
+        assert res["id"] == list(range(10000))
+        assert res["name"] == [str(idx) for idx in range(10000)]
+
+
+@pytest.mark.skipif(numpy is None, reason="numpy is not installed")
+@pytest.mark.skipif(
+    not hasattr(xorjson, "LazyDocument"), reason="requires yyjson backend"
+)
+class TestLoadsColumnsNumpy:
+    def test_loads_columns_numpy(self):
+        """
+        loads() columns OPT_DESERIALIZE_NUMPY numeric columns are ndarray
+        """
+        data = b'[{"ts":1,"price":1.5,"sym":"a"},{"ts":2,"price":2,"sym":"b"}]'
+        res = xorjson.loads(
+            data, columns=True, option=xorjson.OPT_DESERIALIZE_NUMPY
+        )
+        assert res["ts"].dtype == numpy.int64
+        assert res["ts"].tolist() == [1, 2]
+        assert res["price"].dtype == numpy.float64
+        assert res["price"].tolist() == [1.5, 2.0]
+        assert res["sym"] == ["a", "b"]
+
+    def test_loads_columns_numpy_missing(self):
+        """
+        loads() columns OPT_DESERIALIZE_NUMPY columns with missing values
+        are lists
+        """
+        data = b'[{"a":1},{"b":2}]'
+        res = xorjson.loads(
+            data, columns=True, option=xorjson.OPT_DESERIALIZE_NUMPY
+        )
+        assert res == {"a": [1, None], "b": [None, 2]}
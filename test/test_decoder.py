@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+
+def feed_all(data, size):
+    decoder = xorjson.Decoder()
+    res = []
+    for idx in range(0, len(data), size):
+        res.extend(decoder.feed(data[idx : idx + size]))
+    res.extend(decoder.close())
+    return res
+
+
+class TestDecoder:
+    def test_decoder_one(self):
+        """
+        Decoder.feed() complete document
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b'{"a":[1,2]}') == [{"a": [1, 2]}]
+        assert decoder.close() == []
+
+    def test_decoder_chunks(self):
+        """
+        Decoder.feed() value split across chunks
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b'{"a":') == []
+        assert decoder.feed(b'[1,') == []
+        assert decoder.feed(b"2]}") == [{"a": [1, 2]}]
+
+    def test_decoder_concatenated(self):
+        """
+        Decoder.feed() concatenated values
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b'{"a":1}{"b":2}[3]"s"') == [
+            {"a": 1},
+            {"b": 2},
+            [3],
+            "s",
+        ]
+
+    def test_decoder_separators(self):
+        """
+        Decoder.feed() whitespace and RFC 7464 record separators
+        """
+        data = b'\x1e{"a":1}\n\x1e{"b":2}\r\n  [3]\t'
+        assert feed_all(data, 3) == [{"a": 1}, {"b": 2}, [3]]
+
+    def test_decoder_scalar(self):
+        """
+        Decoder.feed() number at end of chunk is completed by a separator or
+        close()
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b"12") == []
+        assert decoder.feed(b"3 4") == [123]
+        assert decoder.feed(b"5") == []
+        assert decoder.close() == [45]
+        assert decoder.feed(b"true null false ") == [True, None, False]
+
+    def test_decoder_string_escape(self):
+        """
+        Decoder.feed() brackets, quotes, and escapes in strings
+        """
+        data = b'{"a":"}]\\"{["}["\\\\",{"b":"\\u00e9"}]'
+        assert feed_all(data, 1) == [{"a": '}]"{['}, ["\\", {"b": "é"}]]
+
+    def test_decoder_utf8_split(self):
+        """
+        Decoder.feed() multi-byte UTF-8 sequence split across chunks
+        """
+        data = '["é漢\U0001f600"]'.encode("utf-8")
+        for size in range(1, len(data)):
+            assert feed_all(data, size) == [["é漢\U0001f600"]]
+
+    def test_decoder_fixture(self):
+        """
+        Decoder.feed() fixtures in chunks match loads()
+        """
+        for filename in ("twitter.json.xz", "github.json.xz", "canada.json.xz"):
+            data = read_fixture_bytes(filename)
+            expected = xorjson.loads(data)
+            assert feed_all(data, 65536) == [expected]
+            assert feed_all(data + b"\n" + data, 4093) == [expected, expected]
+
+    def test_decoder_input_types(self):
+        """
+        Decoder.feed() bytes, bytearray, memoryview, and str
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b"[1") == []
+        assert decoder.feed(bytearray(b",2")) == []
+        assert decoder.feed(memoryview(b",3")) == []
+        assert decoder.feed("]") == [[1, 2, 3]]
+
+    def test_decoder_input_invalid(self):
+        """
+        Decoder.feed() invalid argument
+        """
+        decoder = xorjson.Decoder()
+        with pytest.raises(TypeError):
+            decoder.feed(1)
+        with pytest.raises(TypeError):
+            xorjson.Decoder(1)
+
+    def test_decoder_invalid_value(self):
+        """
+        Decoder.feed() invalid value raises and the decoder continues after it
+        """
+        decoder = xorjson.Decoder()
+        with pytest.raises(xorjson.JSONDecodeError):
+            decoder.feed(b'[1] {"a" 1} [2]')
+        assert decoder.feed(b"") == [[1], [2]]
+
+    def test_decoder_invalid_utf8(self):
+        """
+        Decoder.feed() invalid UTF-8
+        """
+        decoder = xorjson.Decoder()
+        with pytest.raises(xorjson.JSONDecodeError):
+            decoder.feed(b'["\xff"]')
+
+    def test_decoder_close_incomplete(self):
+        """
+        Decoder.close() incomplete value raises
+        """
+        decoder = xorjson.Decoder()
+        assert decoder.feed(b'[1] {"a":') == [[1]]
+        with pytest.raises(xorjson.JSONDecodeError):
+            decoder.close()
+        assert decoder.feed(b"[2]") == [[2]]
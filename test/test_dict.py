@@ -167,3 +167,51 @@ class TestDict:
                 self.b = 1
 
         assert xorjson.dumps(C().__dict__) == b'{"a":0,"b":1}'
+
+    def test_dict_records(self):
+        """
+        loads() array of objects with the same keys
+        """
+        obj = [
+            {"id": idx, "name": str(idx), "tags": [], "x": None} for idx in range(64)
+        ]
+        assert xorjson.loads(xorjson.dumps(obj)) == obj
+        assert [list(each) for each in xorjson.loads(xorjson.dumps(obj))] == [
+            ["id", "name", "tags", "x"]
+        ] * 64
+
+    def test_dict_records_independent(self):
+        """
+        loads() objects with the same keys are distinct dicts
+        """
+        records = xorjson.loads(b'[{"a": 1, "b": [2]}, {"a": 3, "b": [4]}]')
+        records[0]["a"] = 0
+        records[0]["c"] = 5
+        del records[0]["b"]
+        assert records == [{"a": 0, "c": 5}, {"a": 3, "b": [4]}]
+
+    def test_dict_records_shapes(self):
+        """
+        loads() array of objects with differing keys, order, and duplicates
+        """
+        data = (
+            b'[{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"a": 5, "b": 6},'
+            b' {"a": 7, "a": 8}, {"a": 9}, {"a": 10, "b": 11, "c": 12},'
+            b' {"a": 13, "b": 14}, {}, {"a": 15, "b": {"a": 16, "b": 17}},'
+            b' 18, {"a": 19, "b": 20}]'
+        )
+        loaded = xorjson.loads(data)
+        assert loaded == [
+            {"a": 1, "b": 2},
+            {"b": 3, "a": 4},
+            {"a": 5, "b": 6},
+            {"a": 8},
+            {"a": 9},
+            {"a": 10, "b": 11, "c": 12},
+            {"a": 13, "b": 14},
+            {},
+            {"a": 15, "b": {"a": 16, "b": 17}},
+            18,
+            {"a": 19, "b": 20},
+        ]
+        assert list(loaded[1]) == ["b", "a"]
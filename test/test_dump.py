@@ -0,0 +1,258 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import io
+import os
+import socket
+import threading
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+
+class Custom:
+    pass
+
+
+class ChunkRecorder:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+class PartialWriter(io.RawIOBase):
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, chunk):
+        self.data += bytes(chunk[:3])
+        return min(len(chunk), 3)
+
+
+class StalledWriter(io.RawIOBase):
+    def __init__(self, result):
+        self.result = result
+
+    def writable(self):
+        return True
+
+    def write(self, chunk):
+        return self.result
+
+
+class FailingWriter:
+    def __init__(self):
+        self.calls = 0
+
+    def write(self, chunk):
+        self.calls += 1
+        raise OSError("disk full")
+
+
+def read_all(fd):
+    data = b""
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return data
+        data += chunk
+
+
+class TestDump:
+    def test_dump_bytesio(self):
+        """
+        dump() to a file object
+        """
+        fp = io.BytesIO()
+        assert xorjson.dump({"a": [1, 2]}, fp) is None
+        assert fp.getvalue() == b'{"a":[1,2]}'
+
+    def test_dump_file(self, tmp_path):
+        """
+        dump() to a file opened in binary mode
+        """
+        obj = read_fixture_obj("github.json.xz")
+        path = tmp_path / "out.json"
+        option = xorjson.OPT_INDENT_2
+        with open(path, "wb") as fp:
+            xorjson.dump(obj, fp, option=option)
+        assert path.read_bytes() == xorjson.dumps(obj, option=option)
+
+    def test_dump_chunks(self):
+        """
+        dump() writes chunks of at most chunk_size bytes
+        """
+        obj = [{"key": "value", "num": idx} for idx in range(1000)]
+        fp = ChunkRecorder()
+        xorjson.dump(obj, fp, chunk_size=256)
+        assert len(fp.chunks) > 1
+        assert all(isinstance(chunk, bytes) for chunk in fp.chunks)
+        assert all(len(chunk) <= 256 for chunk in fp.chunks)
+        assert b"".join(fp.chunks) == xorjson.dumps(obj)
+
+    def test_dump_chunk_larger_value(self):
+        """
+        dump() a value longer than chunk_size
+        """
+        obj = ["a" * 1000, "b"]
+        fp = ChunkRecorder()
+        xorjson.dump(obj, fp, chunk_size=16)
+        assert b"".join(fp.chunks) == xorjson.dumps(obj)
+
+    def test_dump_partial_write(self):
+        """
+        dump() writes the rest of a chunk a raw file did not write
+        """
+        fp = PartialWriter()
+        xorjson.dump({"a": "b" * 100}, fp)
+        assert fp.data == xorjson.dumps({"a": "b" * 100})
+
+    def test_dump_stalled_write(self):
+        """
+        dump() raises if a raw file writes nothing
+        """
+        with pytest.raises(OSError):
+            xorjson.dump([1], StalledWriter(0))
+        with pytest.raises(BlockingIOError):
+            xorjson.dump([1], StalledWriter(None))
+
+    def test_dump_append_newline(self):
+        """
+        dump() OPT_APPEND_NEWLINE
+        """
+        fp = io.BytesIO()
+        xorjson.dump([], fp, option=xorjson.OPT_APPEND_NEWLINE)
+        assert fp.getvalue() == b"[]\n"
+
+    def test_dump_default(self):
+        """
+        dump() default
+        """
+        fp = io.BytesIO()
+        xorjson.dump([Custom()], fp, default=lambda obj: "c")
+        assert fp.getvalue() == b'["c"]'
+
+    @pytest.mark.skipif(os.name != "posix", reason="requires write(2)")
+    def test_dump_fd(self):
+        """
+        dump() to a file descriptor
+        """
+        obj = read_fixture_obj("github.json.xz")
+        ref = xorjson.dumps(obj)
+        rfd, wfd = os.pipe()
+        try:
+            result = []
+            reader = threading.Thread(target=lambda: result.append(read_all(rfd)))
+            reader.start()
+            xorjson.dump(obj, wfd, chunk_size=1024)
+            os.close(wfd)
+            wfd = -1
+            reader.join()
+            assert result == [ref]
+        finally:
+            os.close(rfd)
+            if wfd != -1:
+                os.close(wfd)
+
+    @pytest.mark.skipif(os.name != "posix", reason="requires write(2)")
+    def test_dump_fd_error(self):
+        """
+        dump() to a pipe whose reader is closed raises OSError
+        """
+        rfd, wfd = os.pipe()
+        os.close(rfd)
+        try:
+            with pytest.raises(OSError):
+                xorjson.dump([1], wfd)
+        finally:
+            os.close(wfd)
+
+    @pytest.mark.skipif(os.name != "posix", reason="requires write(2)")
+    def test_dump_socket(self):
+        """
+        dump() to a socket, with and without a timeout
+        """
+        obj = {"a": list(range(10000))}
+        for timeout in (None, 5.0):
+            left, right = socket.socketpair()
+            try:
+                left.settimeout(timeout)
+                result = []
+                reader = threading.Thread(
+                    target=lambda: result.append(read_all(right.fileno()))
+                )
+                reader.start()
+                xorjson.dump(obj, left, chunk_size=512)
+                left.shutdown(socket.SHUT_WR)
+                reader.join()
+                assert result == [xorjson.dumps(obj)]
+            finally:
+                left.close()
+                right.close()
+
+    def test_dump_write_error(self):
+        """
+        dump() raises the exception of fp.write() and stops writing
+        """
+        fp = FailingWriter()
+        with pytest.raises(OSError, match="disk full"):
+            xorjson.dump(["a" * 100] * 100, fp, chunk_size=64)
+        assert fp.calls == 1
+
+    def test_dump_write_error_stops(self):
+        """
+        dump() stops serializing once fp.write() raises
+        """
+        calls = []
+
+        def default(obj):
+            calls.append(obj)
+            return "a" * 100
+
+        with pytest.raises(OSError, match="disk full"):
+            xorjson.dump(
+                [Custom()] * 1000, FailingWriter(), default=default, chunk_size=64
+            )
+        assert len(calls) <= 2
+
+    def test_dump_error(self):
+        """
+        dump() raises JSONEncodeError for unsupported types
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dump(Custom(), io.BytesIO())
+
+    def test_dump_fp_invalid(self):
+        """
+        dump() fp must be a file object, socket or file descriptor
+        """
+        for fp in (None, "out.json", b"", -1, True, False):
+            with pytest.raises(TypeError):
+                xorjson.dump([], fp)
+
+    def test_dump_chunk_size_invalid(self):
+        """
+        dump() chunk_size must be a positive int
+        """
+        with pytest.raises(ValueError):
+            xorjson.dump([], io.BytesIO(), chunk_size=0)
+        with pytest.raises(ValueError):
+            xorjson.dump([], io.BytesIO(), chunk_size="1")
+
+    def test_dump_args(self):
+        """
+        dump() arguments
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dump([])  # type: ignore
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dump([], io.BytesIO(), option=-1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dump([], io.BytesIO(), size=1)  # type: ignore
@@ -0,0 +1,187 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import array
+import mmap
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None  # type: ignore
+
+
+class Custom:
+    pass
+
+
+class TestDumpsInto:
+    def test_dumps_into_bytearray(self):
+        """
+        dumps_into() bytearray that is large enough
+        """
+        buffer = bytearray(b"x" * 32)
+        assert xorjson.dumps_into({"a": [1, 2]}, buffer) == 11
+        assert buffer == b'{"a":[1,2]}' + b"x" * 21
+
+    def test_dumps_into_offset(self):
+        """
+        dumps_into() offset
+        """
+        buffer = bytearray(16)
+        assert xorjson.dumps_into([1], buffer, 4) == 3
+        assert xorjson.dumps_into("a", buffer, offset=7) == 3
+        assert buffer[:10] == b'\x00\x00\x00\x00[1]"a"'
+
+    def test_dumps_into_bytearray_grow(self):
+        """
+        dumps_into() extends a bytearray to end with the output
+        """
+        buffer = bytearray(b"head")
+        obj = read_fixture_obj("github.json.xz")
+        ref = xorjson.dumps(obj)
+        assert xorjson.dumps_into(obj, buffer, offset=4) == len(ref)
+        assert buffer == b"head" + ref
+
+    def test_dumps_into_bytearray_empty(self):
+        """
+        dumps_into() empty bytearray
+        """
+        buffer = bytearray()
+        assert xorjson.dumps_into({"a": "b" * 4096}, buffer) == len(buffer)
+        assert xorjson.loads(buffer) == {"a": "b" * 4096}
+
+    def test_dumps_into_bytearray_exported(self):
+        """
+        dumps_into() bytearray that cannot be resized while it is exported
+        """
+        buffer = bytearray(4)
+        view = memoryview(buffer)
+        with pytest.raises(ValueError):
+            xorjson.dumps_into([1, 2, 3], buffer)
+        view.release()
+        assert xorjson.dumps_into([1, 2, 3], buffer) == 7
+        assert buffer == b"[1,2,3]"
+
+    def test_dumps_into_memoryview_overflow(self):
+        """
+        dumps_into() raises ValueError if the output does not fit
+        """
+        buffer = bytearray(8)
+        with pytest.raises(ValueError, match="11 bytes"):
+            xorjson.dumps_into({"a": [1, 2]}, memoryview(buffer))
+        assert len(buffer) == 8
+
+    def test_dumps_into_exact(self):
+        """
+        dumps_into() output that fills the buffer exactly
+        """
+        buffer = bytearray(11)
+        assert xorjson.dumps_into({"a": [1, 2]}, memoryview(buffer)) == 11
+        assert buffer == b'{"a":[1,2]}'
+
+    def test_dumps_into_mmap(self):
+        """
+        dumps_into() mmap
+        """
+        obj = read_fixture_obj("github.json.xz")
+        ref = xorjson.dumps(obj, option=xorjson.OPT_INDENT_2)
+        with mmap.mmap(-1, len(ref) + 16) as buffer:
+            option = xorjson.OPT_INDENT_2
+            written = xorjson.dumps_into(obj, buffer, 16, option=option)
+            assert written == len(ref)
+            assert buffer[16:] == ref
+
+    @pytest.mark.skipif(shared_memory is None, reason="requires shared_memory")
+    def test_dumps_into_shared_memory(self):
+        """
+        dumps_into() multiprocessing.shared_memory
+        """
+        shm = shared_memory.SharedMemory(create=True, size=64)
+        try:
+            option = xorjson.OPT_APPEND_NEWLINE
+            written = xorjson.dumps_into(["a", None], shm.buf, option=option)
+            assert bytes(shm.buf[:written]) == b'["a",null]\n'
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_dumps_into_default(self):
+        """
+        dumps_into() default
+        """
+        buffer = bytearray()
+        written = xorjson.dumps_into([Custom()], buffer, default=lambda obj: "c")
+        assert written == 5
+        assert buffer == b'["c"]'
+
+    def test_dumps_into_default_resize(self):
+        """
+        dumps_into() default cannot resize the buffer being written
+        """
+        buffer = bytearray(b"x" * 64)
+
+        def default(obj):
+            with pytest.raises(BufferError):
+                buffer.extend(b"y")
+            return 1
+
+        assert xorjson.dumps_into([Custom()], buffer, default=default) == 3
+        assert buffer[:3] == b"[1]"
+
+    def test_dumps_into_error(self):
+        """
+        dumps_into() raises JSONEncodeError for unsupported types
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_into(Custom(), bytearray(64))
+
+    def test_dumps_into_readonly(self):
+        """
+        dumps_into() buffer must be writable
+        """
+        for buffer in (b"x" * 16, memoryview(b"x" * 16), "x" * 16, None):
+            with pytest.raises(TypeError):
+                xorjson.dumps_into([], buffer)
+
+    def test_dumps_into_non_contiguous(self):
+        """
+        dumps_into() buffer must be contiguous
+        """
+        buffer = memoryview(bytearray(16))[::2]
+        with pytest.raises(TypeError):
+            xorjson.dumps_into([], buffer)
+
+    def test_dumps_into_array(self):
+        """
+        dumps_into() array.array
+        """
+        buffer = array.array("B", bytes(8))
+        assert xorjson.dumps_into([1], buffer) == 3
+        assert buffer.tobytes()[:3] == b"[1]"
+
+    def test_dumps_into_offset_invalid(self):
+        """
+        dumps_into() offset must be a non-negative int within the buffer
+        """
+        with pytest.raises(TypeError):
+            xorjson.dumps_into([], bytearray(4), -1)
+        with pytest.raises(TypeError):
+            xorjson.dumps_into([], bytearray(4), "1")
+        with pytest.raises(ValueError):
+            xorjson.dumps_into([], bytearray(4), 5)
+
+    def test_dumps_into_args(self):
+        """
+        dumps_into() arguments
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_into([])  # type: ignore
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_into([], bytearray(), option=-1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_into([], bytearray(), size=1)  # type: ignore
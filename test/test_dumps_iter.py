@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+
+class Custom:
+    pass
+
+
+def rows(count):
+    for idx in range(count):
+        yield {"id": idx, "name": "row %d" % idx}
+
+
+class TestDumpsIter:
+    def test_dumps_iter(self):
+        """
+        dumps_iter() joins to the output of dumps()
+        """
+        obj = read_fixture_obj("github.json.xz")
+        chunks = list(xorjson.dumps_iter(obj, chunk_size=1024))
+        assert all(isinstance(chunk, bytes) for chunk in chunks)
+        assert b"".join(chunks) == xorjson.dumps(obj)
+
+    def test_dumps_iter_chunk_size(self):
+        """
+        dumps_iter() chunks are chunk_size bytes other than the last
+        """
+        obj = [{"a": "b" * 100}] * 100 + ["c" * 1000]
+        chunks = list(xorjson.dumps_iter(obj, chunk_size=64))
+        assert all(len(chunk) == 64 for chunk in chunks[:-1])
+        assert 0 < len(chunks[-1]) <= 64
+        assert b"".join(chunks) == xorjson.dumps(obj)
+
+    def test_dumps_iter_scalar(self):
+        """
+        dumps_iter() value that is not an array
+        """
+        assert list(xorjson.dumps_iter({"a": 1})) == [b'{"a":1}']
+        assert list(xorjson.dumps_iter(None)) == [b"null"]
+
+    def test_dumps_iter_empty(self):
+        """
+        dumps_iter() empty arrays
+        """
+        assert list(xorjson.dumps_iter([])) == [b"[]"]
+        assert list(xorjson.dumps_iter(x for x in ())) == [b"[]"]
+        assert list(xorjson.dumps_iter([(), [[]]])) == [b"[[],[[]]]"]
+
+    def test_dumps_iter_generator(self):
+        """
+        dumps_iter() serializes generators as arrays
+        """
+        obj = {"rows": None, "count": 3}
+        ref = xorjson.dumps([list(rows(3)), obj])
+        assert b"".join(xorjson.dumps_iter((rows(3), obj))) == ref
+
+    def test_dumps_iter_lazy(self):
+        """
+        dumps_iter() advances a generator only as chunks are taken
+        """
+        pulled = []
+
+        def gen():
+            for idx in range(1000):
+                pulled.append(idx)
+                yield "x" * 10
+
+        chunks = xorjson.dumps_iter([gen()], chunk_size=100)
+        assert pulled == []
+        next(chunks)
+        assert 0 < len(pulled) < 20
+        rest = b"".join(chunks)
+        assert len(pulled) == 1000
+        assert rest.endswith(b'"]]')
+
+    def test_dumps_iter_nested(self):
+        """
+        dumps_iter() generators nested in lists
+        """
+        obj = [1, (x for x in [2, (3, (str(x) for x in range(3)))]), [rows(2)]]
+        ref = xorjson.dumps([1, [2, [3, ["0", "1", "2"]]], [list(rows(2))]])
+        assert b"".join(xorjson.dumps_iter(obj, chunk_size=4)) == ref
+
+    def test_dumps_iter_indent(self):
+        """
+        dumps_iter() OPT_INDENT_2
+        """
+        obj = [[{"a": [1, {"b": []}]}], [], [[2, 3]], "c"]
+        option = xorjson.OPT_INDENT_2
+        ref = xorjson.dumps(obj, option=option)
+        inner = (x for x in [{"a": [1, {"b": []}]}])
+        streamed = [inner, [], [(x for x in [2, 3])], "c"]
+        chunks = xorjson.dumps_iter(streamed, option=option, chunk_size=8)
+        assert b"".join(chunks) == ref
+
+    def test_dumps_iter_append_newline(self):
+        """
+        dumps_iter() OPT_APPEND_NEWLINE
+        """
+        option = xorjson.OPT_APPEND_NEWLINE
+        assert b"".join(xorjson.dumps_iter([1], option=option)) == b"[1]\n"
+
+    def test_dumps_iter_default(self):
+        """
+        dumps_iter() default
+        """
+        chunks = xorjson.dumps_iter([Custom()], default=lambda obj: "c")
+        assert b"".join(chunks) == b'["c"]'
+
+    def test_dumps_iter_error(self):
+        """
+        dumps_iter() raises JSONEncodeError when the value is reached
+        """
+        chunks = xorjson.dumps_iter(["a" * 100, Custom()], chunk_size=16)
+        assert next(chunks) == b'["' + b"a" * 14
+        with pytest.raises(xorjson.JSONEncodeError):
+            list(chunks)
+        assert list(chunks) == []
+
+    def test_dumps_iter_generator_error(self):
+        """
+        dumps_iter() raises the exception of a generator
+        """
+
+        def gen():
+            yield 1
+            raise ValueError("cursor closed")
+
+        with pytest.raises(ValueError, match="cursor closed"):
+            list(xorjson.dumps_iter([gen()]))
+
+    def test_dumps_iter_recursion(self):
+        """
+        dumps_iter() recursion limit
+        """
+        obj = []
+        for _ in range(300):
+            obj = [(x for x in [obj])]
+        with pytest.raises(xorjson.JSONEncodeError):
+            list(xorjson.dumps_iter(obj))
+
+    def test_dumps_iter_other_iterator(self):
+        """
+        dumps_iter() passes iterators that are not generators to default, as
+        dumps() does
+        """
+        obj = [iter([1, 2]), {"a": 1}.keys()]
+        for default in (list, lambda obj: "i"):
+            ref = xorjson.dumps(obj, default=default)
+            assert b"".join(xorjson.dumps_iter(obj, default=default)) == ref
+        with pytest.raises(xorjson.JSONEncodeError):
+            list(xorjson.dumps_iter([iter([1])]))
+
+    def test_dumps_iter_args(self):
+        """
+        dumps_iter() arguments
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_iter()  # type: ignore
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_iter([], option=-1)
+        with pytest.raises(ValueError):
+            xorjson.dumps_iter([], chunk_size=0)
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import dataclasses
+import datetime
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+
+@dataclasses.dataclass
+class Record:
+    id: int
+    name: str
+
+
+class TestDumpsLines:
+    def test_dumps_lines(self):
+        """
+        dumps_lines() list
+        """
+        assert xorjson.dumps_lines([{"a": 1}, [2, 3], "str", 4, None]) == (
+            b'{"a":1}\n[2,3]\n"str"\n4\nnull\n'
+        )
+
+    def test_dumps_lines_empty(self):
+        """
+        dumps_lines() empty iterable
+        """
+        assert xorjson.dumps_lines([]) == b""
+        assert xorjson.dumps_lines(iter(())) == b""
+
+    def test_dumps_lines_generator(self):
+        """
+        dumps_lines() generator
+        """
+        assert (
+            xorjson.dumps_lines({"id": i} for i in range(3))
+            == b'{"id":0}\n{"id":1}\n{"id":2}\n'
+        )
+
+    def test_dumps_lines_dataclass(self):
+        """
+        dumps_lines() dataclass records
+        """
+        assert (
+            xorjson.dumps_lines([Record(1, "a"), Record(2, "b")])
+            == b'{"id":1,"name":"a"}\n{"id":2,"name":"b"}\n'
+        )
+
+    def test_dumps_lines_default(self):
+        """
+        dumps_lines() default
+        """
+        assert xorjson.dumps_lines([object], default=lambda _: "x") == b'"x"\n'
+        assert (
+            xorjson.dumps_lines([object], lambda _: "x", xorjson.OPT_SORT_KEYS)
+            == b'"x"\n'
+        )
+
+    def test_dumps_lines_option(self):
+        """
+        dumps_lines() option
+        """
+        assert (
+            xorjson.dumps_lines(
+                [{"b": 1, "a": datetime.datetime(2000, 1, 1)}],
+                option=xorjson.OPT_SORT_KEYS | xorjson.OPT_NAIVE_UTC,
+            )
+            == b'{"a":"2000-01-01T00:00:00+00:00","b":1}\n'
+        )
+
+    def test_dumps_lines_indent(self):
+        """
+        dumps_lines() OPT_INDENT_2 is not supported
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([{}], option=xorjson.OPT_INDENT_2)
+
+    def test_dumps_lines_invalid_opts(self):
+        """
+        dumps_lines() invalid option
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([], option=-1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([], option="a")
+
+    def test_dumps_lines_arguments(self):
+        """
+        dumps_lines() invalid arguments
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines()
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([], foo=1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([], None, None, None)
+
+    def test_dumps_lines_not_iterable(self):
+        """
+        dumps_lines() not iterable
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines(1)
+
+    def test_dumps_lines_unsupported(self):
+        """
+        dumps_lines() unsupported type in record
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps_lines([1, object()])
+
+    def test_dumps_lines_iteration_error(self):
+        """
+        dumps_lines() exception raised by iterator is the cause
+        """
+
+        def gen():
+            yield 1
+            raise ValueError("gen")
+
+        with pytest.raises(xorjson.JSONEncodeError) as exc_info:
+            xorjson.dumps_lines(gen())
+        assert isinstance(exc_info.value.__cause__, ValueError)
+
+    def test_dumps_lines_roundtrip(self):
+        """
+        dumps_lines(), loads_lines() roundtrip of fixture records
+        """
+        val = read_fixture_obj("github.json.xz")
+        assert xorjson.loads_lines(xorjson.dumps_lines(val)) == val
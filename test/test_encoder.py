@@ -0,0 +1,215 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import dataclasses
+import enum
+import gc
+import uuid
+import weakref
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+
+@dataclasses.dataclass
+class Record:
+    id: int
+    name: str
+
+
+@dataclasses.dataclass
+class SlotsRecord:
+    __slots__ = ("id", "_private", "name")
+    id: int
+    _private: int
+    name: str
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class Custom:
+    def __init__(self, val):
+        self.val = val
+
+
+def default(obj):
+    if isinstance(obj, Custom):
+        return obj.val
+    raise TypeError
+
+
+class TestEncoder:
+    def test_encoder(self):
+        """
+        Encoder.encode() is dumps() with the encoder's arguments
+        """
+        encoder = xorjson.Encoder()
+        obj = {"a": [1, 2.5, "b", None, True], "c": {"d": []}}
+        assert encoder.encode(obj) == xorjson.dumps(obj)
+
+    def test_encoder_option(self):
+        """
+        Encoder(option=)
+        """
+        encoder = xorjson.Encoder(
+            option=xorjson.OPT_SORT_KEYS | xorjson.OPT_APPEND_NEWLINE
+        )
+        assert encoder.encode({"b": 1, "a": 2}) == b'{"a":2,"b":1}\n'
+
+    def test_encoder_default(self):
+        """
+        Encoder(default=)
+        """
+        encoder = xorjson.Encoder(default=default)
+        assert encoder.encode([Custom(1), Custom("a")]) == b'[1,"a"]'
+        with pytest.raises(xorjson.JSONEncodeError):
+            encoder.encode(object())
+
+    def test_encoder_positional(self):
+        """
+        Encoder() default and option as positional arguments
+        """
+        encoder = xorjson.Encoder(default, xorjson.OPT_SORT_KEYS)
+        assert encoder.encode({"b": Custom(1), "a": 2}) == b'{"a":2,"b":1}'
+
+    def test_encoder_none(self):
+        """
+        Encoder() default and option of None
+        """
+        encoder = xorjson.Encoder(default=None, option=None)
+        assert encoder.encode([1]) == b"[1]"
+
+    def test_encoder_invalid_option(self):
+        """
+        Encoder() option is validated once
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.Encoder(option=-1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.Encoder(option="a")
+
+    def test_encoder_invalid_args(self):
+        """
+        Encoder() unexpected arguments
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.Encoder(default, 0, 1)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.Encoder(fallback=default)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.Encoder(default, default=default)
+
+    def test_encoder_encode_args(self):
+        """
+        Encoder.encode() takes one positional argument
+        """
+        encoder = xorjson.Encoder()
+        with pytest.raises(TypeError):
+            encoder.encode()  # type: ignore
+        with pytest.raises(TypeError):
+            encoder.encode(1, 2)  # type: ignore
+
+    def test_encoder_types(self):
+        """
+        Encoder.encode() types whose dispatch is cached
+        """
+        encoder = xorjson.Encoder(default=default)
+        obj = [
+            Record(1, "a"),
+            SlotsRecord(2, 0, "b"),
+            Color.RED,
+            uuid.UUID("7202d115-7ff3-4c81-a7c1-2a1f067b1ece"),
+            (1, 2),
+            Custom(3),
+        ]
+        for _ in range(3):
+            assert encoder.encode(obj) == xorjson.dumps(obj, default=default)
+
+    def test_encoder_slots_dataclass(self):
+        """
+        Encoder.encode() dataclass with __slots__ skips private fields
+        """
+        encoder = xorjson.Encoder()
+        for idx in range(3):
+            assert encoder.encode(SlotsRecord(idx, 0, "a")) == (
+                b'{"id":%d,"name":"a"}' % idx
+            )
+
+    def test_encoder_option_in_default(self):
+        """
+        dumps() in default of Encoder.encode() uses its own option
+        """
+
+        def nested(obj):
+            if isinstance(obj, Custom):
+                data = xorjson.dumps(
+                    Record(1, "a"),
+                    default=lambda val: "passthrough",
+                    option=xorjson.OPT_PASSTHROUGH_DATACLASS,
+                )
+                return xorjson.Fragment(data)
+            raise TypeError
+
+        encoder = xorjson.Encoder(default=nested)
+        assert encoder.encode([Record(1, "a"), Custom(1)]) == (
+            b'[{"id":1,"name":"a"},"passthrough"]'
+        )
+
+    def test_encoder_size_hint(self):
+        """
+        Encoder.size_hint follows the size of the output
+        """
+        encoder = xorjson.Encoder()
+        assert encoder.size_hint == 0
+        obj = read_fixture_obj("github.json.xz")
+        size = len(encoder.encode(obj))
+        for _ in range(16):
+            assert encoder.encode(obj) == xorjson.dumps(obj)
+        assert size * 0.9 < encoder.size_hint <= size
+
+    def test_encoder_size_hint_bounded(self):
+        """
+        Encoder.size_hint is at most 4MiB after a much longer output
+        """
+        encoder = xorjson.Encoder()
+        assert len(encoder.encode(["a" * (64 * 1024 * 1024)])) > 64 * 1024 * 1024
+        assert encoder.size_hint <= 4 * 1024 * 1024
+        for _ in range(16):
+            assert encoder.encode([1]) == b"[1]"
+        assert encoder.size_hint < 4 * 1024 * 1024 // 64
+
+    def test_encoder_reused(self):
+        """
+        Encoder.encode() is reentrant from default
+        """
+        encoder = xorjson.Encoder(
+            default=lambda obj: xorjson.Fragment(encoder.encode(obj.val))
+        )
+        assert encoder.encode([Custom([Custom(1)])]) == b"[[1]]"
+
+    def test_encoder_gc(self):
+        """
+        Encoder cycles through default and its cached types are collected
+        """
+        holder = Custom(None)
+        holder.val = xorjson.Encoder(default=lambda obj: holder)
+        assert gc.is_tracked(holder.val)
+        ref = weakref.ref(holder)
+        del holder
+        gc.collect()
+        assert ref() is None
+
+        @dataclasses.dataclass
+        class Cyclic:
+            id: int
+
+        Cyclic.encoder = xorjson.Encoder()
+        assert Cyclic.encoder.encode(Cyclic(1)) == b'{"id":1}'
+        ref = weakref.ref(Cyclic)
+        del Cyclic
+        gc.collect()
+        assert ref() is None
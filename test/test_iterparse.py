@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import io
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+
+class TestIterparse:
+    def test_iterparse_events(self):
+        """
+        iterparse() events of a document
+        """
+        data = b'{"a": [1, 2.5, "s"], "b": {"c": null, "d": true}}'
+        assert list(xorjson.iterparse(data)) == [
+            ("start_map", None),
+            ("map_key", "a"),
+            ("start_array", None),
+            ("number", 1),
+            ("number", 2.5),
+            ("string", "s"),
+            ("end_array", None),
+            ("map_key", "b"),
+            ("start_map", None),
+            ("map_key", "c"),
+            ("null", None),
+            ("map_key", "d"),
+            ("boolean", True),
+            ("end_map", None),
+            ("end_map", None),
+        ]
+
+    def test_iterparse_scalar(self):
+        """
+        iterparse() scalar document
+        """
+        assert list(xorjson.iterparse(b" false ")) == [("boolean", False)]
+        assert list(xorjson.iterparse('"\\u00e9\\n"')) == [("string", "é\n")]
+
+    def test_iterparse_numbers(self):
+        """
+        iterparse() numbers match loads()
+        """
+        data = b"[0, -1, 18446744073709551615, -9223372036854775808, 1e3, -0.5E-2]"
+        events = list(xorjson.iterparse(data))
+        assert [val for (_, val) in events[1:-1]] == xorjson.loads(data)
+
+    def test_iterparse_file(self):
+        """
+        iterparse() file object read in small chunks
+        """
+        data = b'{"key": ["value", 12345, true, null, "\\"escaped\\""]}'
+        expected = list(xorjson.iterparse(data))
+        for size in (1, 2, 3, 7):
+            fp = io.BytesIO(data)
+            assert list(xorjson.iterparse(fp, chunk_size=size)) == expected
+        fp = io.StringIO(data.decode("utf-8"))
+        assert list(xorjson.iterparse(fp, chunk_size=2)) == expected
+
+    def test_iterparse_fixture(self):
+        """
+        items() empty prefix rebuilds a fixture read from a file
+        """
+        data = read_fixture_bytes("twitter.json.xz")
+        items = list(xorjson.items(io.BytesIO(data), "", chunk_size=4096))
+        assert items == [xorjson.loads(data)]
+
+    @pytest.mark.parametrize(
+        "data",
+        (b"", b"[1,", b'{"a" 1}', b"[1 2]", b"[01]", b'"a', b"tru", b"[1] 2", b"{1:2}"),
+    )
+    def test_iterparse_invalid(self, data):
+        """
+        iterparse() invalid document raises JSONDecodeError
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            list(xorjson.iterparse(data))
+        with pytest.raises(xorjson.JSONDecodeError):
+            list(xorjson.iterparse(io.BytesIO(data), chunk_size=1))
+
+    def test_iterparse_invalid_position(self):
+        """
+        iterparse() error message includes the byte offset
+        """
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            list(xorjson.iterparse(io.BytesIO(b'[1, 2, "a", x]'), chunk_size=2))
+        assert "at byte 12" in str(exc_info.value)
+
+    def test_iterparse_read_error(self):
+        """
+        iterparse() propagates an exception raised by read()
+        """
+
+        class Source:
+            def read(self, size):
+                raise ValueError("read")
+
+        with pytest.raises(ValueError):
+            list(xorjson.iterparse(Source()))
+
+    def test_iterparse_args(self):
+        """
+        iterparse() invalid arguments
+        """
+        with pytest.raises(TypeError):
+            xorjson.iterparse(1)
+        with pytest.raises(ValueError):
+            xorjson.iterparse(b"[]", chunk_size=0)
+
+
+class TestItems:
+    def test_items_array(self):
+        """
+        items() elements of the array at prefix
+        """
+        data = b'{"meta": {"n": 2}, "rows": [{"a": 1}, [2, {"b": []}], "c"]}'
+        assert list(xorjson.items(data, "/rows")) == [{"a": 1}, [2, {"b": []}], "c"]
+
+    def test_items_root(self):
+        """
+        items() empty prefix yields elements of a top-level array
+        """
+        data = b'[{"a": 1}, {"a": 2}]'
+        fp = io.BytesIO(data)
+        assert list(xorjson.items(fp, "", chunk_size=3)) == [{"a": 1}, {"a": 2}]
+
+    def test_items_nested(self):
+        """
+        items() prefix with an array index and escaped key
+        """
+        data = b'{"x": [0, {"a/b": [true, false]}]}'
+        assert list(xorjson.items(data, "/x/1/a~1b")) == [True, False]
+
+    def test_items_not_array(self):
+        """
+        items() value at prefix that is not an array is yielded whole
+        """
+        data = b'{"a": {"b": 1}, "c": 2}'
+        assert list(xorjson.items(data, "/a")) == [{"b": 1}]
+        assert list(xorjson.items(data, "/c")) == [2]
+
+    def test_items_missing(self):
+        """
+        items() prefix that refers to no value yields nothing
+        """
+        assert list(xorjson.items(b'{"a": [1]}', "/b")) == []
+        assert list(xorjson.items(b'{"a": [1]}', "/a/0/b")) == []
+
+    def test_items_invalid(self):
+        """
+        items() invalid document after the selected values raises
+        """
+        it = xorjson.items(b'{"a": [1, 2], "b": x}', "/a")
+        assert next(it) == 1
+        assert next(it) == 2
+        with pytest.raises(xorjson.JSONDecodeError):
+            next(it)
+
+    def test_items_prefix(self):
+        """
+        items() invalid prefix
+        """
+        with pytest.raises(ValueError):
+            xorjson.items(b"[]", "a")
+        with pytest.raises(TypeError):
+            xorjson.items(b"[]", 1)
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+@pytest.fixture(autouse=True)
+def default_key_cache():
+    xorjson.configure_key_cache(capacity=2048, max_key_len=64)
+    yield
+    xorjson.configure_key_cache(capacity=2048, max_key_len=64)
+
+
+class TestKeyCache:
+    def test_key_cache_info(self):
+        """
+        key_cache_info() after configure_key_cache()
+        """
+        assert xorjson.key_cache_info() == {
+            "capacity": 2048,
+            "max_key_len": 64,
+            "occupancy": 0,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def test_key_cache_counters(self):
+        """
+        key_cache_info() hits and misses of loads()
+        """
+        xorjson.loads(b'[{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"b": 5}]')
+        info = xorjson.key_cache_info()
+        assert info["misses"] == 2
+        assert info["hits"] == 3
+        assert (info["occupancy"], info["evictions"]) == (2, 0)
+
+    def test_key_cache_shared(self):
+        """
+        loads() cached keys are one object
+        """
+        first = xorjson.loads(b'{"key": 1}')
+        second = xorjson.loads(b'{"key": 2}')
+        assert next(iter(first)) is next(iter(second))
+
+    def test_key_cache_max_key_len(self):
+        """
+        configure_key_cache() keys longer than max_key_len are not cached
+        """
+        xorjson.configure_key_cache(max_key_len=3)
+        assert xorjson.loads(b'{"abc": 1, "abcd": 2}') == {"abc": 1, "abcd": 2}
+        info = xorjson.key_cache_info()
+        assert (info["max_key_len"], info["misses"], info["occupancy"]) == (3, 1, 1)
+
+    def test_key_cache_long_keys(self):
+        """
+        configure_key_cache() keys longer than 64 bytes
+        """
+        key = "k" * 100
+        xorjson.configure_key_cache(max_key_len=128)
+        first = xorjson.loads(xorjson.dumps({key: 1}))
+        second = xorjson.loads(xorjson.dumps({key: 2}))
+        assert next(iter(first)) is next(iter(second))
+        assert second == {key: 2}
+
+    def test_key_cache_capacity(self):
+        """
+        configure_key_cache() capacity is rounded up to a power of two
+        """
+        xorjson.configure_key_cache(1000)
+        assert xorjson.key_cache_info()["capacity"] == 1024
+        xorjson.configure_key_cache(1)
+        xorjson.loads(xorjson.dumps({str(idx): idx for idx in range(10)}))
+        info = xorjson.key_cache_info()
+        assert (info["occupancy"], info["misses"], info["evictions"]) == (1, 10, 9)
+
+    def test_key_cache_disabled(self):
+        """
+        configure_key_cache() capacity of 0 disables the cache
+        """
+        xorjson.configure_key_cache(capacity=0)
+        obj = {"a": [{"b": 1}, {"b": 2}]}
+        assert xorjson.loads(xorjson.dumps(obj)) == obj
+        assert xorjson.key_cache_info()["misses"] == 0
+        assert xorjson.key_cache_info()["capacity"] == 0
+
+    def test_key_cache_clear(self):
+        """
+        clear_key_cache() releases cached keys and keeps the counters
+        """
+        xorjson.loads(b'{"a": 1, "b": 2}')
+        assert xorjson.clear_key_cache() is None
+        info = xorjson.key_cache_info()
+        assert (info["occupancy"], info["misses"]) == (0, 2)
+        assert xorjson.loads(b'{"a": 1, "b": 2}') == {"a": 1, "b": 2}
+        assert xorjson.key_cache_info()["misses"] == 4
+
+    def test_configure_key_cache_invalid(self):
+        """
+        configure_key_cache() invalid arguments
+        """
+        with pytest.raises(TypeError):
+            xorjson.configure_key_cache(capacity="1")
+        with pytest.raises(TypeError):
+            xorjson.configure_key_cache(max_key_len=-1)
+        with pytest.raises(ValueError):
+            xorjson.configure_key_cache(capacity=1 << 21)
+        with pytest.raises(ValueError):
+            xorjson.configure_key_cache(max_key_len=1025)
+        with pytest.raises(TypeError):
+            xorjson.configure_key_cache(size=1)
+        assert xorjson.key_cache_info()["capacity"] == 2048
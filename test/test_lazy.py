@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes, read_fixture_obj
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(xorjson, "LazyDocument"), reason="requires yyjson backend"
+)
+
+
+class TestLoadsLazy:
+    def test_loads_lazy_object(self):
+        """
+        loads_lazy() object access
+        """
+        doc = xorjson.loads_lazy(b'{"a":1,"b":"str","c":null,"d":[1,2]}')
+        assert isinstance(doc, xorjson.LazyDocument)
+        assert len(doc) == 4
+        assert doc["a"] == 1
+        assert doc["b"] == "str"
+        assert doc["c"] is None
+        assert isinstance(doc["d"], xorjson.LazyDocument)
+        assert doc["d"][1] == 2
+
+    def test_loads_lazy_missing_key(self):
+        """
+        loads_lazy() missing key raises KeyError
+        """
+        doc = xorjson.loads_lazy(b'{"a":1}')
+        with pytest.raises(KeyError):
+            doc["b"]
+        with pytest.raises(KeyError):
+            doc[1]
+
+    def test_loads_lazy_get(self):
+        """
+        loads_lazy() get()
+        """
+        doc = xorjson.loads_lazy('{"a":{"b":true}}')
+        assert doc.get("a").get("b") is True
+        assert doc.get("missing") is None
+        assert doc.get("missing", 2) == 2
+        assert doc.get("missing", default=3) == 3
+
+    def test_loads_lazy_duplicate_key(self):
+        """
+        loads_lazy() last duplicate key wins as in loads()
+        """
+        data = b'{"a":1,"a":2}'
+        assert xorjson.loads_lazy(data)["a"] == xorjson.loads(data)["a"] == 2
+
+    def test_loads_lazy_array(self):
+        """
+        loads_lazy() array indexing
+        """
+        doc = xorjson.loads_lazy(b'[1,[2,3],{"a":4},5]')
+        assert len(doc) == 4
+        assert doc[0] == 1
+        assert doc[1].materialize() == [2, 3]
+        assert doc[2]["a"] == 4
+        assert doc[3] == 5
+        assert doc[-1] == 5
+        assert doc[-4] == 1
+        with pytest.raises(IndexError):
+            doc[4]
+        with pytest.raises(IndexError):
+            doc[-5]
+        with pytest.raises(TypeError):
+            doc["a"]
+
+    def test_loads_lazy_flat_array(self):
+        """
+        loads_lazy() array without nested containers
+        """
+        doc = xorjson.loads_lazy(b'[0,1.5,"a",true,null]')
+        assert [doc[i] for i in range(len(doc))] == [0, 1.5, "a", True, None]
+
+    def test_loads_lazy_iter(self):
+        """
+        loads_lazy() iteration yields keys of objects, values of arrays
+        """
+        doc = xorjson.loads_lazy(b'{"a":[1,{"b":2}],"c":3}')
+        assert list(doc) == ["a", "c"]
+        assert doc.keys() == ["a", "c"]
+        assert "a" in doc
+        values = list(doc["a"])
+        assert values[0] == 1
+        assert values[1].materialize() == {"b": 2}
+
+    def test_loads_lazy_iter_partial(self):
+        """
+        loads_lazy() iterator converts values as they are reached and keeps
+        the document alive
+        """
+        it = iter(xorjson.loads_lazy(b'[1,[2,{"a":3}],"b",{}]'))
+        assert next(it) == 1
+        assert next(it).materialize() == [2, {"a": 3}]
+        rest = list(it)
+        assert rest[0] == "b"
+        assert rest[1].materialize() == {}
+        assert list(it) == []
+        keys = iter(xorjson.loads_lazy(b'{"a":[1],"b":{"c":2},"d":3}'))
+        assert list(keys) == ["a", "b", "d"]
+        assert list(iter(xorjson.loads_lazy(b"[]"))) == []
+        assert list(iter(xorjson.loads_lazy(b"{}"))) == []
+
+    def test_loads_lazy_materialize(self):
+        """
+        loads_lazy() materialize() equals loads()
+        """
+        for fixture in ("twitter.json.xz", "github.json.xz", "canada.json.xz"):
+            data = read_fixture_bytes(fixture)
+            assert xorjson.loads_lazy(data).materialize() == xorjson.loads(data)
+
+    def test_loads_lazy_nested(self):
+        """
+        loads_lazy() nested access into a fixture
+        """
+        val = read_fixture_obj("twitter.json.xz")
+        doc = xorjson.loads_lazy(read_fixture_bytes("twitter.json.xz"))
+        assert doc["search_metadata"]["count"] == val["search_metadata"]["count"]
+        assert (
+            doc["statuses"][-1]["user"]["screen_name"]
+            == val["statuses"][-1]["user"]["screen_name"]
+        )
+
+    def test_loads_lazy_outlives_root(self):
+        """
+        loads_lazy() child views keep the document alive
+        """
+        child = xorjson.loads_lazy(b'{"a":{"b":[1,2,3]}}')["a"]["b"]
+        assert child.materialize() == [1, 2, 3]
+
+    def test_loads_lazy_scalar(self):
+        """
+        loads_lazy() scalar document returns the value
+        """
+        for data in (b'"str"', b"1", b"1.5", b"true", b"null"):
+            assert xorjson.loads_lazy(data) == xorjson.loads(data)
+
+    def test_loads_lazy_read_only(self):
+        """
+        loads_lazy() LazyDocument is read-only
+        """
+        doc = xorjson.loads_lazy(b'{"a":1}')
+        with pytest.raises(TypeError):
+            doc["a"] = 2
+        with pytest.raises(TypeError):
+            xorjson.LazyDocument()
+
+    def test_loads_lazy_invalid(self):
+        """
+        loads_lazy() invalid input
+        """
+        for val in (b"", b"{", b'"\xed\xa0\x80"', 1):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads_lazy(val)
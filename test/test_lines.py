@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import io
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_obj
+
+
+class TestLoadsLines:
+    def test_loads_lines(self):
+        """
+        loads_lines() bytes
+        """
+        assert xorjson.loads_lines(b'{"a":1}\n[2,3]\n"str"\n4\n') == [
+            {"a": 1},
+            [2, 3],
+            "str",
+            4,
+        ]
+
+    def test_loads_lines_types(self):
+        """
+        loads_lines() str, bytearray, memoryview
+        """
+        data = '{"a":1}\n{"b":2}'
+        expected = [{"a": 1}, {"b": 2}]
+        assert xorjson.loads_lines(data) == expected
+        assert xorjson.loads_lines(bytearray(data.encode("utf-8"))) == expected
+        assert xorjson.loads_lines(memoryview(data.encode("utf-8"))) == expected
+
+    def test_loads_lines_file(self):
+        """
+        loads_lines() file object
+        """
+        assert xorjson.loads_lines(io.BytesIO(b"1\n2\n")) == [1, 2]
+        assert xorjson.loads_lines(io.StringIO("1\n2\n")) == [1, 2]
+
+    def test_loads_lines_blank(self):
+        """
+        loads_lines() skips blank lines and handles CRLF
+        """
+        assert xorjson.loads_lines(b"\n\r\n[]\r\n  \n{}\r\n\t\n") == [[], {}]
+
+    def test_loads_lines_empty(self):
+        """
+        loads_lines() empty input
+        """
+        assert xorjson.loads_lines(b"") == []
+        assert xorjson.loads_lines(b"\n\n") == []
+
+    def test_loads_lines_invalid_line(self):
+        """
+        loads_lines() invalid record raises with document position
+        """
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.loads_lines(b"[1]\n[2]\n{3}\n")
+        assert exc_info.value.lineno == 3
+
+    def test_loads_lines_multiline_record(self):
+        """
+        loads_lines() a record may not span lines
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads_lines(b"[1,\n2]\n")
+
+    def test_loads_lines_invalid_utf8(self):
+        """
+        loads_lines() invalid UTF-8
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads_lines(b'"\xed\xa0\x80"\n')
+
+    def test_loads_lines_invalid_type(self):
+        """
+        loads_lines() invalid type
+        """
+        for val in (1, 3.14, [], {}, None):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads_lines(val)
+
+    def test_loads_lines_file_read_raises(self):
+        """
+        loads_lines() file object read() exception is the cause
+        """
+
+        class Reader:
+            def read(self):
+                raise OSError("read failed")
+
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.loads_lines(Reader())
+        assert isinstance(exc_info.value.__cause__, OSError)
+
+    def test_loads_lines_fixture(self):
+        """
+        loads_lines() roundtrip of fixture records
+        """
+        val = read_fixture_obj("twitter.json.xz")["statuses"]
+        data = b"\n".join(xorjson.dumps(each) for each in val)
+        assert xorjson.loads_lines(data) == val
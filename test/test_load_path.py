@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes, read_fixture_obj
+
+
+class TestLoadPath:
+    def test_load_path(self, tmp_path):
+        """
+        load_path() str and pathlib.Path
+        """
+        path = tmp_path / "doc.json"
+        path.write_bytes(b'{"a":[1,2,3],"b":"\xc3\xa9"}')
+        expected = {"a": [1, 2, 3], "b": "\xe9"}
+        assert xorjson.load_path(path) == expected
+        assert xorjson.load_path(str(path)) == expected
+        assert xorjson.load_path(str(path).encode("utf-8")) == expected
+
+    def test_load_path_fixture(self, tmp_path):
+        """
+        load_path() fixture
+        """
+        path = tmp_path / "twitter.json"
+        path.write_bytes(read_fixture_bytes("twitter.json.xz"))
+        assert xorjson.load_path(path) == read_fixture_obj("twitter.json.xz")
+
+    def test_load_path_empty(self, tmp_path):
+        """
+        load_path() empty file
+        """
+        path = tmp_path / "empty.json"
+        path.write_bytes(b"")
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.load_path(path)
+
+    def test_load_path_invalid(self, tmp_path):
+        """
+        load_path() invalid JSON
+        """
+        path = tmp_path / "invalid.json"
+        path.write_bytes(b'{"a":')
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.load_path(path)
+
+    def test_load_path_invalid_utf8(self, tmp_path):
+        """
+        load_path() invalid UTF-8
+        """
+        path = tmp_path / "invalid.json"
+        path.write_bytes(b'"\xed\xa0\x80"')
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.load_path(path)
+
+    def test_load_path_missing(self, tmp_path):
+        """
+        load_path() missing file raises FileNotFoundError
+        """
+        with pytest.raises(FileNotFoundError):
+            xorjson.load_path(tmp_path / "missing.json")
+
+    def test_load_path_directory(self, tmp_path):
+        """
+        load_path() directory raises OSError
+        """
+        with pytest.raises(OSError):
+            xorjson.load_path(tmp_path)
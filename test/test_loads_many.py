@@ -0,0 +1,122 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import threading
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes, read_fixture_obj
+
+
+class TestLoadsMany:
+    def test_loads_many(self):
+        """
+        loads_many() list of bytes
+        """
+        assert xorjson.loads_many([b"1", b'"a"', b"[1,2]", b'{"a":null}']) == [
+            1,
+            "a",
+            [1, 2],
+            {"a": None},
+        ]
+
+    def test_loads_many_types(self):
+        """
+        loads_many() bytes, str, bytearray, memoryview in one batch
+        """
+        assert xorjson.loads_many(
+            [b"[1]", "[2]", bytearray(b"[3]"), memoryview(b"[4]")]
+        ) == [[1], [2], [3], [4]]
+
+    def test_loads_many_iterable(self):
+        """
+        loads_many() tuple and generator
+        """
+        assert xorjson.loads_many((b"1", b"2")) == [1, 2]
+        assert xorjson.loads_many(str(i) for i in range(3)) == [0, 1, 2]
+
+    def test_loads_many_empty(self):
+        """
+        loads_many() empty batch
+        """
+        assert xorjson.loads_many([]) == []
+
+    def test_loads_many_order(self):
+        """
+        loads_many() preserves order across threads
+        """
+        data = [xorjson.dumps({"idx": i, "val": [i] * (i % 7)}) for i in range(5000)]
+        expected = [{"idx": i, "val": [i] * (i % 7)} for i in range(5000)]
+        for threads in (1, 2, 8, 64):
+            assert xorjson.loads_many(data, threads=threads) == expected
+
+    def test_loads_many_fixture(self):
+        """
+        loads_many() large documents
+        """
+        fixtures = ("twitter.json.xz", "citm_catalog.json.xz", "canada.json.xz")
+        data = [read_fixture_bytes(each) for each in fixtures]
+        expected = [read_fixture_obj(each) for each in fixtures]
+        assert xorjson.loads_many(data * 2, threads=4) == expected * 2
+
+    def test_loads_many_concurrent(self):
+        """
+        loads_many() called from several threads at once
+        """
+        data = [read_fixture_bytes("twitter.json.xz")] * 8
+        expected = [xorjson.loads(data[0])] * 8
+        results = []
+
+        def run():
+            for _ in range(4):
+                results.append(xorjson.loads_many(data, threads=4))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for each in threads:
+            each.start()
+        for each in threads:
+            each.join()
+        assert len(results) == 16
+        assert all(each == expected for each in results)
+
+    def test_loads_many_raises_first(self):
+        """
+        loads_many() raises the first error in order
+        """
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.loads_many([b"[]", bytearray(b"[1,"), b"{", b""], threads=4)
+        assert exc_info.value.doc == "[1,"
+
+    def test_loads_many_return_exceptions(self):
+        """
+        loads_many() return_exceptions=True returns errors in place
+        """
+        res = xorjson.loads_many(
+            [b"[]", b"{", "", b"\xff", 1, bytearray(b"2")], return_exceptions=True
+        )
+        assert res[0] == []
+        assert res[5] == 2
+        for each in res[1:5]:
+            assert isinstance(each, xorjson.JSONDecodeError)
+        assert res[1].doc == "{"
+
+    def test_loads_many_threads_invalid(self):
+        """
+        loads_many() invalid threads
+        """
+        with pytest.raises(ValueError):
+            xorjson.loads_many([b"1"], threads=0)
+        with pytest.raises(TypeError):
+            xorjson.loads_many([b"1"], threads="1")
+
+    def test_loads_many_invalid_args(self):
+        """
+        loads_many() invalid arguments
+        """
+        with pytest.raises(TypeError):
+            xorjson.loads_many()
+        with pytest.raises(TypeError):
+            xorjson.loads_many(1)
+        with pytest.raises(TypeError):
+            xorjson.loads_many([b"1"], unknown=True)
@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+
+def read_all(buf):
+    values = []
+    offset = 0
+    while bytes(buf[offset:]).strip(b" \t\r\n\x1e"):
+        value, offset = xorjson.loads_prefix(buf, offset)
+        values.append(value)
+    return values
+
+
+class TestLoadsPrefix:
+    def test_loads_prefix(self):
+        """
+        loads_prefix() returns the value and the offset of its end
+        """
+        assert xorjson.loads_prefix(b'{"a":1}{"b":2}') == ({"a": 1}, 7)
+        assert xorjson.loads_prefix(b'{"a":1}{"b":2}', 7) == ({"b": 2}, 14)
+        assert xorjson.loads_prefix(b'{"a":1}{"b":2}', offset=7) == ({"b": 2}, 14)
+
+    def test_loads_prefix_concatenated(self):
+        """
+        loads_prefix() walks concatenated values without slicing
+        """
+        buf = b'{"a":[1,"}"]}[2]"s"3 true\n\x1e{"b":null}'
+        expected = [{"a": [1, "}"]}, [2], "s", 3, True, {"b": None}]
+        assert read_all(buf) == expected
+        assert read_all(memoryview(buf)) == expected
+        assert read_all(bytearray(buf)) == expected
+
+    def test_loads_prefix_separators(self):
+        """
+        loads_prefix() skips whitespace and RFC 7464 record separators
+        """
+        assert xorjson.loads_prefix(b"\x1e [1]\n") == ([1], 5)
+
+    def test_loads_prefix_trailing_invalid(self):
+        """
+        loads_prefix() does not read the input after the value
+        """
+        assert xorjson.loads_prefix(b"[1] \xff{") == ([1], 3)
+
+    def test_loads_prefix_str(self):
+        """
+        loads_prefix() offsets of a str are in characters
+        """
+        buf = '"é"["ü"]'
+        assert xorjson.loads_prefix(buf) == ("é", 3)
+        assert xorjson.loads_prefix(buf, 3) == (["ü"], 8)
+
+    def test_loads_prefix_invalid(self):
+        """
+        loads_prefix() invalid or incomplete value raises JSONDecodeError
+        """
+        for buf in (b"[1,]", b'{"a":1', b"   ", b"", b"[1] [2"):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads_prefix(buf, 3 if buf == b"[1] [2" else 0)
+
+    def test_loads_prefix_offset(self):
+        """
+        loads_prefix() invalid offset
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads_prefix(b"[1]", 4)
+        with pytest.raises(TypeError):
+            xorjson.loads_prefix(b"[1]", -1)
+        with pytest.raises(TypeError):
+            xorjson.loads_prefix(b"[1]", "1")
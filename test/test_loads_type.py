@@ -0,0 +1,317 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import datetime
+import sys
+import uuid
+from dataclasses import InitVar, dataclass, field
+from typing import Dict, List, Optional
+
+import pytest
+
+import xorjson
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(xorjson, "LazyDocument"), reason="requires yyjson backend"
+)
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+
+@dataclass
+class Event:
+    id: uuid.UUID
+    ts: datetime.datetime
+    day: datetime.date
+    name: str
+    tags: List[str]
+    points: List[Point]
+    meta: Dict[str, Point]
+    parent: Optional[Point] = None
+    count: int = 0
+
+
+@dataclass
+class Node:
+    value: int
+    children: List["Node"] = field(default_factory=list)
+
+
+@dataclass
+class Derived:
+    a: int
+    b: int = field(init=False)
+
+    def __post_init__(self):
+        self.b = self.a * 2
+
+
+EVENT = b"""{
+    "id": "7202d115-7ff3-4c81-a7c1-2a1f067b1ece",
+    "ts": "2024-03-01T12:30:45.123456+01:00",
+    "day": "2024-03-01",
+    "name": "event",
+    "tags": ["a", "b"],
+    "points": [{"x": 1, "y": 2.5}],
+    "meta": {"origin": {"x": 0.5, "y": 0}},
+    "parent": null,
+    "unknown": [1, 2, 3]
+}"""
+
+
+class TestLoadsType:
+    def test_loads_type(self):
+        """
+        loads() type nested dataclasses
+        """
+        res = xorjson.loads(EVENT, type=Event)
+        assert res == Event(
+            id=uuid.UUID("7202d115-7ff3-4c81-a7c1-2a1f067b1ece"),
+            ts=datetime.datetime(
+                2024,
+                3,
+                1,
+                12,
+                30,
+                45,
+                123456,
+                tzinfo=datetime.timezone(datetime.timedelta(hours=1)),
+            ),
+            day=datetime.date(2024, 3, 1),
+            name="event",
+            tags=["a", "b"],
+            points=[Point(1.0, 2.5)],
+            meta={"origin": Point(0.5, 0.0)},
+            parent=None,
+            count=0,
+        )
+        assert isinstance(res.points[0].x, float)
+
+    def test_loads_type_optional(self):
+        """
+        loads() type Optional dataclass
+        """
+        res = xorjson.loads(b'{"x":1,"y":2}', type=Optional[Point])
+        assert res == Point(1.0, 2.0)
+        assert xorjson.loads(b"null", type=Optional[Point]) is None
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="X | None")
+    def test_loads_type_union_none(self):
+        """
+        loads() type X | None
+        """
+        assert xorjson.loads(b"null", type=eval("Point | None")) is None
+
+    def test_loads_type_list(self):
+        """
+        loads() type list of dataclass
+        """
+        assert xorjson.loads(b'[{"x":1,"y":2}]', type=List[Point]) == [
+            Point(1.0, 2.0)
+        ]
+
+    def test_loads_type_recursive(self):
+        """
+        loads() type dataclass that refers to itself
+        """
+        data = b'{"value":1,"children":[{"value":2},{"value":3,"children":[]}]}'
+        assert xorjson.loads(data, type=Node) == Node(
+            1, [Node(2, []), Node(3, [])]
+        )
+
+    def test_loads_type_init_false(self):
+        """
+        loads() type ignores fields that are not in __init__
+        """
+        res = xorjson.loads(b'{"a":2,"b":100}', type=Derived)
+        assert res.a == 2
+        assert res.b == 4
+
+    def test_loads_type_missing_optional_field(self):
+        """
+        loads() type fields after a missing field with a default
+        """
+
+        @dataclass
+        class Defaults:
+            a: int
+            b: int = 2
+            c: int = 3
+
+        assert xorjson.loads(b'{"c":30,"a":10}', type=Defaults) == Defaults(10, 2, 30)
+        assert xorjson.loads(b'{"b":20,"a":10}', type=Defaults) == Defaults(10, 20)
+        assert xorjson.loads(b'{"a":1,"a":10}', type=Defaults) == Defaults(10)
+
+    def test_loads_type_init_var(self):
+        """
+        loads() type fields declared after an InitVar
+        """
+
+        @dataclass
+        class Scaled:
+            a: int
+            scale: InitVar[int] = 1
+            b: int = 0
+
+            def __post_init__(self, scale):
+                self.a *= scale
+
+        assert xorjson.loads(b'{"a":1,"b":2}', type=Scaled) == Scaled(1, b=2)
+        assert xorjson.loads(b'{"b":2,"a":1}', type=Scaled) == Scaled(1, b=2)
+        assert xorjson.loads(b'{"a":3}', type=Scaled) == Scaled(3)
+
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="kw_only")
+    def test_loads_type_kw_only(self):
+        """
+        loads() type keyword-only fields
+        """
+
+        @dataclass(kw_only=True)
+        class KwOnly:
+            a: int
+            b: int = 2
+
+        assert xorjson.loads(b'{"b":20,"a":10}', type=KwOnly) == KwOnly(a=10, b=20)
+        assert xorjson.loads(b'{"a":10}', type=KwOnly) == KwOnly(a=10)
+
+    def test_loads_type_datetime(self):
+        """
+        loads() type datetime formats
+        """
+
+        @dataclass
+        class Stamp:
+            ts: datetime.datetime
+
+        for val, expected in (
+            (
+                "2024-03-01T00:00:00Z",
+                datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc),
+            ),
+            ("2024-03-01 01:02:03", datetime.datetime(2024, 3, 1, 1, 2, 3)),
+            ("2024-03-01T01:02", datetime.datetime(2024, 3, 1, 1, 2)),
+            ("2024-03-01", datetime.datetime(2024, 3, 1)),
+            (
+                "2024-03-01T01:02:03.1234567-05:30",
+                datetime.datetime(
+                    2024,
+                    3,
+                    1,
+                    1,
+                    2,
+                    3,
+                    123456,
+                    tzinfo=datetime.timezone(
+                        -datetime.timedelta(hours=5, minutes=30)
+                    ),
+                ),
+            ),
+        ):
+            res = xorjson.loads(xorjson.dumps({"ts": val}), type=Stamp)
+            assert res.ts == expected
+            assert res.ts.tzinfo == expected.tzinfo
+
+    def test_loads_type_cached(self):
+        """
+        loads() type repeated calls
+        """
+        for _ in range(100):
+            assert xorjson.loads(b'{"x":1,"y":2}', type=Point) == Point(1.0, 2.0)
+
+    def test_loads_type_error_path(self):
+        """
+        loads() type error refers to the value by JSON Pointer
+        """
+        data = b'[{"value":1,"children":[{"value":2,"children":{}}]}]'
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.loads(data, type=List[Node])
+        assert str(exc_info.value).startswith(
+            "Expected an array at /0/children/0/children"
+        )
+
+    def test_loads_type_invalid_value(self):
+        """
+        loads() type invalid annotated values raise JSONDecodeError
+        """
+
+        @dataclass
+        class Typed:
+            ts: Optional[datetime.datetime] = None
+            day: Optional[datetime.date] = None
+            id: Optional[uuid.UUID] = None
+
+        for data in (
+            b'{"ts":"2024-13-01T00:00:00"}',
+            b'{"ts":"2024-03-01T00:00:00+0100"}',
+            b'{"ts":1}',
+            b'{"day":"2024-03-01T00:00:00"}',
+            b'{"id":"abc"}',
+            b"[]",
+        ):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads(data, type=Typed)
+
+    def test_loads_type_missing_field(self):
+        """
+        loads() type missing required field raises JSONDecodeError with the
+        TypeError as cause
+        """
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.loads(b'{"x":1}', type=Point)
+        assert isinstance(exc_info.value.__cause__, TypeError)
+
+    def test_loads_type_unresolved_annotation(self):
+        """
+        loads() type raises the error of evaluating annotations
+        """
+
+        @dataclass
+        class Unresolved:
+            a: "DoesNotExist"  # type: ignore # noqa: F821
+
+        with pytest.raises(NameError):
+            xorjson.loads(b'{"a":1}', type=Unresolved)
+
+    def test_loads_type_unresolved_retry(self):
+        """
+        loads() type compiles a dataclass again after its annotations failed
+        """
+
+        @dataclass
+        class Later:
+            a: "Defined"  # type: ignore # noqa: F821
+
+        with pytest.raises(NameError):
+            xorjson.loads(b'{"a":{"x":1}}', type=Later)
+        globals()["Defined"] = Point
+        try:
+            res = xorjson.loads(b'{"a":{"x":1,"y":2}}', type=Later)
+        finally:
+            del globals()["Defined"]
+        assert res == Later(Point(1.0, 2.0))
+
+    def test_loads_type_invalid_document(self):
+        """
+        loads() type invalid document
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads(b'{"x":1', type=Point)
+
+    def test_loads_type_invalid_args(self):
+        """
+        loads() type cannot be used with paths or columns
+        """
+        with pytest.raises(TypeError):
+            xorjson.loads(b"[]", type=Point, paths=["/a"])
+        with pytest.raises(TypeError):
+            xorjson.loads(b"[]", type=Point, columns=True)
+
+    def test_loads_type_roundtrip(self):
+        """
+        loads() type round trip with dumps()
+        """
+        obj = Node(1, [Node(2, [Node(3)])])
+        assert xorjson.loads(xorjson.dumps(obj), type=Node) == obj
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+
+def loads_numpy(data):
+    return xorjson.loads(data, option=xorjson.OPT_DESERIALIZE_NUMPY)
+
+
+@pytest.mark.skipif(numpy is None, reason="numpy is not installed")
+@pytest.mark.skipif(
+    not hasattr(xorjson, "LazyDocument"), reason="requires yyjson backend"
+)
+class TestNumpyLoads:
+    def test_numpy_loads_int64(self):
+        """
+        OPT_DESERIALIZE_NUMPY array of int
+        """
+        res = loads_numpy(b"[1,-2,3,9223372036854775807]")
+        assert isinstance(res, numpy.ndarray)
+        assert res.dtype == numpy.int64
+        assert res.tolist() == [1, -2, 3, 9223372036854775807]
+
+    def test_numpy_loads_float64(self):
+        """
+        OPT_DESERIALIZE_NUMPY array of float and int is float64
+        """
+        res = loads_numpy(b"[1.5,2,-3.25]")
+        assert res.dtype == numpy.float64
+        assert res.tolist() == [1.5, 2.0, -3.25]
+
+    def test_numpy_loads_d2(self):
+        """
+        OPT_DESERIALIZE_NUMPY rectangular nested arrays
+        """
+        res = loads_numpy(b"[[1,2,3],[4,5,6]]")
+        assert res.shape == (2, 3)
+        assert res.dtype == numpy.int64
+        assert res.tolist() == [[1, 2, 3], [4, 5, 6]]
+
+    def test_numpy_loads_d3(self):
+        """
+        OPT_DESERIALIZE_NUMPY three dimensions
+        """
+        res = loads_numpy(b"[[[1.0],[2]],[[3],[4]]]")
+        assert res.shape == (2, 2, 1)
+        assert res.dtype == numpy.float64
+
+    def test_numpy_loads_ragged(self):
+        """
+        OPT_DESERIALIZE_NUMPY ragged arrays are lists of ndarray
+        """
+        res = loads_numpy(b"[[1,2],[3]]")
+        assert isinstance(res, list)
+        assert [each.tolist() for each in res] == [[1, 2], [3]]
+
+    def test_numpy_loads_mixed_depth(self):
+        """
+        OPT_DESERIALIZE_NUMPY arrays that mix numbers and arrays are lists
+        """
+        res = loads_numpy(b"[1,[2]]")
+        assert isinstance(res, list)
+        assert res[0] == 1
+        assert res[1].tolist() == [2]
+        res = loads_numpy(b"[[1],[[2]]]")
+        assert isinstance(res, list)
+
+    def test_numpy_loads_not_numeric(self):
+        """
+        OPT_DESERIALIZE_NUMPY arrays with other values are lists
+        """
+        assert loads_numpy(b'[1,"a"]') == [1, "a"]
+        assert loads_numpy(b"[true,false]") == [True, False]
+        assert loads_numpy(b"[1,null]") == [1, None]
+        assert loads_numpy(b"[]") == []
+        assert loads_numpy(b"[[]]") == [[]]
+
+    def test_numpy_loads_uint64_overflow(self):
+        """
+        OPT_DESERIALIZE_NUMPY integers above int64 are kept as list
+        """
+        assert loads_numpy(b"[18446744073709551615]") == [18446744073709551615]
+
+    def test_numpy_loads_object(self):
+        """
+        OPT_DESERIALIZE_NUMPY arrays nested in objects
+        """
+        res = loads_numpy(b'{"a":[1,2],"b":{"c":[[1.5]]},"d":"str"}')
+        assert res["a"].tolist() == [1, 2]
+        assert res["b"]["c"].tolist() == [[1.5]]
+        assert res["d"] == "str"
+
+    def test_numpy_loads_scalar(self):
+        """
+        OPT_DESERIALIZE_NUMPY scalar document
+        """
+        assert loads_numpy(b"1") == 1
+
+    def test_numpy_loads_canada(self):
+        """
+        OPT_DESERIALIZE_NUMPY canada.json coordinates
+        """
+        data = read_fixture_bytes("canada.json.xz")
+        val = xorjson.loads(data)
+        res = loads_numpy(data)
+        coords = res["features"][0]["geometry"]["coordinates"]
+        expected = val["features"][0]["geometry"]["coordinates"]
+        assert [each.tolist() for each in coords] == expected
+
+    def test_numpy_loads_paths(self):
+        """
+        OPT_DESERIALIZE_NUMPY with paths
+        """
+        res = xorjson.loads(
+            b'{"a":{"b":[1,2]}}',
+            paths=["/a/b"],
+            option=xorjson.OPT_DESERIALIZE_NUMPY,
+        )
+        assert res["/a/b"].tolist() == [1, 2]
+
+    def test_numpy_loads_roundtrip(self):
+        """
+        OPT_DESERIALIZE_NUMPY round trip with OPT_SERIALIZE_NUMPY
+        """
+        data = b"[[1.5,2.5],[3.5,4.5]]"
+        assert (
+            xorjson.dumps(loads_numpy(data), option=xorjson.OPT_SERIALIZE_NUMPY)
+            == data
+        )
+
+
+class TestLoadsOption:
+    def test_loads_option_invalid(self):
+        """
+        loads() invalid option
+        """
+        for val in (-1, 1 << 20, "a", 1.5):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.loads(b"[]", option=val)
+
+    def test_dumps_option_deserialize_numpy(self):
+        """
+        dumps() rejects OPT_DESERIALIZE_NUMPY
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.dumps([], option=xorjson.OPT_DESERIALIZE_NUMPY)
@@ -0,0 +1,129 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes, read_fixture_obj
+
+
+class TestLoadsPaths:
+    def test_loads_paths(self):
+        """
+        loads() paths selects values by JSON Pointer
+        """
+        data = b'{"data":{"items":[1,2,{"x":3}]},"meta":{"cursor":"abc"}}'
+        assert xorjson.loads(data, paths=["/data/items", "/meta/cursor"]) == {
+            "/data/items": [1, 2, {"x": 3}],
+            "/meta/cursor": "abc",
+        }
+
+    def test_loads_paths_array_index(self):
+        """
+        loads() paths array indices
+        """
+        data = b'[[10,11],[20,{"a":21}]]'
+        assert xorjson.loads(data, paths=["/0/1", "/1/1/a", "/1"]) == {
+            "/0/1": 11,
+            "/1/1/a": 21,
+            "/1": [20, {"a": 21}],
+        }
+
+    def test_loads_paths_array_index_invalid(self):
+        """
+        loads() paths omits leading zero, negative, and out of range indices
+        """
+        data = b"[1,2,3]"
+        assert xorjson.loads(data, paths=["/01", "/-1", "/-", "/3", "/a"]) == {}
+
+    def test_loads_paths_root(self):
+        """
+        loads() paths empty pointer is the whole document
+        """
+        assert xorjson.loads(b'{"a":1}', paths=[""]) == {"": {"a": 1}}
+
+    def test_loads_paths_missing(self):
+        """
+        loads() paths omits pointers that refer to no value
+        """
+        data = b'{"a":{"b":1}}'
+        assert xorjson.loads(data, paths=["/a/c", "/a/b/c", "/x"]) == {}
+
+    def test_loads_paths_escape(self):
+        """
+        loads() paths ~0 and ~1 escapes
+        """
+        data = b'{"a/b":1,"m~n":2,"":3," ":4}'
+        assert xorjson.loads(data, paths=["/a~1b", "/m~0n", "/", "/ "]) == {
+            "/a~1b": 1,
+            "/m~0n": 2,
+            "/": 3,
+            "/ ": 4,
+        }
+
+    def test_loads_paths_duplicate_key(self):
+        """
+        loads() paths last duplicate key wins as in loads()
+        """
+        assert xorjson.loads(b'{"a":1,"a":2}', paths=["/a"]) == {"/a": 2}
+
+    def test_loads_paths_empty(self):
+        """
+        loads() paths empty selects nothing
+        """
+        assert xorjson.loads(b"[1]", paths=[]) == {}
+        assert xorjson.loads(b"[1]", paths=None) == [1]
+
+    def test_loads_paths_fixture(self):
+        """
+        loads() paths on fixtures
+        """
+        val = read_fixture_obj("twitter.json.xz")
+        res = xorjson.loads(
+            read_fixture_bytes("twitter.json.xz"),
+            paths=("/search_metadata", "/statuses/0/user/screen_name"),
+        )
+        assert res == {
+            "/search_metadata": val["search_metadata"],
+            "/statuses/0/user/screen_name": val["statuses"][0]["user"]["screen_name"],
+        }
+        val = read_fixture_obj("github.json.xz")
+        res = xorjson.loads(read_fixture_bytes("github.json.xz"), paths=["/0"])
+        assert res == {"/0": val[0]}
+
+    def test_loads_paths_invalid_pointer(self):
+        """
+        loads() paths invalid pointer raises ValueError
+        """
+        for pointer in ("a", "/a~", "/a~2"):
+            with pytest.raises(ValueError):
+                xorjson.loads(b"{}", paths=[pointer])
+
+    def test_loads_paths_invalid_type(self):
+        """
+        loads() paths must be an iterable of str
+        """
+        with pytest.raises(TypeError):
+            xorjson.loads(b"{}", paths="/a")
+        with pytest.raises(TypeError):
+            xorjson.loads(b"{}", paths=[1])
+        with pytest.raises(TypeError):
+            xorjson.loads(b"{}", paths=1)
+
+    def test_loads_paths_invalid_document(self):
+        """
+        loads() paths invalid document raises JSONDecodeError
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads(b"{", paths=["/a"])
+
+    def test_loads_invalid_args(self):
+        """
+        loads() invalid arguments
+        """
+        with pytest.raises(TypeError):
+            xorjson.loads()
+        with pytest.raises(TypeError):
+            xorjson.loads(b"{}", unknown=1)
+        with pytest.raises(TypeError):
+            xorjson.loads(b"{}", None, None)
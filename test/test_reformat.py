@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+YYJSON = hasattr(xorjson, "LazyDocument")
+
+OPTIONS = (
+    None,
+    xorjson.OPT_INDENT_2,
+    xorjson.OPT_SORT_KEYS,
+    xorjson.OPT_APPEND_NEWLINE,
+    xorjson.OPT_INDENT_2 | xorjson.OPT_SORT_KEYS | xorjson.OPT_APPEND_NEWLINE,
+)
+
+
+@pytest.mark.skipif(not YYJSON, reason="reformat() requires yyjson")
+class TestReformat:
+    def test_reformat(self):
+        """
+        reformat() compact output
+        """
+        data = b'{ "a" : [1, 2.5, -3, "s\\u00e9"], "b": {"c": null, "d": true} }'
+        expected = b'{"a":[1,2.5,-3,"s\xc3\xa9"],"b":{"c":null,"d":true}}'
+        assert xorjson.reformat(data) == expected
+        assert xorjson.reformat(data.decode("utf-8")) == xorjson.reformat(data)
+        assert xorjson.reformat(memoryview(data)) == xorjson.reformat(data)
+
+    @pytest.mark.parametrize("option", OPTIONS)
+    def test_reformat_option(self, option):
+        """
+        reformat() matches dumps(loads()) with each option
+        """
+        data = b'{"z": [], "b": {}, "a": [{"y": 1, "x": [0.1, false]}, {}], "c": ""}'
+        expected = xorjson.dumps(xorjson.loads(data), option=option)
+        assert xorjson.reformat(data, option=option) == expected
+
+    @pytest.mark.parametrize(
+        "fixture", ("twitter.json.xz", "github.json.xz", "canada.json.xz")
+    )
+    @pytest.mark.parametrize("option", OPTIONS)
+    def test_reformat_fixture(self, fixture, option):
+        """
+        reformat() fixture matches dumps(loads())
+        """
+        data = read_fixture_bytes(fixture)
+        expected = xorjson.dumps(xorjson.loads(data), option=option)
+        assert xorjson.reformat(data, option) == expected
+
+    def test_reformat_duplicate_keys(self):
+        """
+        reformat() duplicate keys keep the last value, as loads() does
+        """
+        data = b'{"b": 1, "a": 2, "b": 3}'
+        assert xorjson.reformat(data) == b'{"b":3,"a":2}'
+        assert xorjson.reformat(data, xorjson.OPT_SORT_KEYS) == b'{"a":2,"b":3}'
+
+    def test_reformat_scalar(self):
+        """
+        reformat() scalar document
+        """
+        assert xorjson.reformat(b" 1e2 ") == xorjson.dumps(1e2)
+        assert xorjson.reformat(b"18446744073709551615") == b"18446744073709551615"
+        assert xorjson.reformat(b"null", xorjson.OPT_APPEND_NEWLINE) == b"null\n"
+
+    def test_reformat_recursion(self):
+        """
+        reformat() recursion limit of dumps()
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.reformat(b"[" * 256 + b"]" * 256)
+
+    def test_reformat_invalid(self):
+        """
+        reformat() invalid document raises JSONDecodeError
+        """
+        for data in (b"", b"[1,", b'{"a" 1}', b'"\xff"'):
+            with pytest.raises(xorjson.JSONDecodeError):
+                xorjson.reformat(data)
+
+    def test_reformat_option_invalid(self):
+        """
+        reformat() option other than formatting options raises JSONEncodeError
+        """
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.reformat(b"[]", xorjson.OPT_NON_STR_KEYS)
+        with pytest.raises(xorjson.JSONEncodeError):
+            xorjson.reformat(b"[]", option="1")
@@ -0,0 +1,204 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import importlib.util
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import xorjson
+
+try:
+    import _interpreters as interpreters
+except ImportError:
+    try:
+        import _xxsubinterpreters as interpreters
+    except ImportError:
+        interpreters = None
+
+YYJSON = hasattr(xorjson, "LazyDocument")
+
+SETUP = f"""
+import sys
+sys.path[:0] = {sys.path!r}
+import xorjson
+"""
+
+
+def run_string(interp, script):
+    # Before Python 3.13, a failed script raises instead.
+    error = interpreters.run_string(interp, SETUP + textwrap.dedent(script))
+    assert error is None, error
+
+
+def run(script):
+    interp = interpreters.create()
+    try:
+        run_string(interp, script)
+    finally:
+        interpreters.destroy(interp)
+
+
+def load_copy():
+    spec = importlib.util.find_spec(xorjson.xorjson.__name__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestModuleState:
+    def test_module_imported_again(self):
+        """
+        a module imported again has its own state, and the functions of the
+        first module keep using theirs
+        """
+        copy = load_copy()
+        assert copy.JSONDecodeError is not xorjson.JSONDecodeError
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads("[")
+        with pytest.raises(copy.JSONDecodeError):
+            copy.loads("[")
+        xorjson.clear_key_cache()
+        copy.loads(b'{"copy": 1}')
+        assert xorjson.key_cache_info()["occupancy"] == 0
+        assert copy.key_cache_info()["occupancy"] == 1
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 9), reason="types find their module from 3.9"
+    )
+    def test_module_imported_again_types(self):
+        """
+        the types of a module imported again raise the errors of their module
+        """
+        copy = load_copy()
+        assert copy.Decoder is not xorjson.Decoder
+        with pytest.raises(xorjson.JSONDecodeError) as exc_info:
+            xorjson.Decoder().feed(b"[1,]")
+        assert not isinstance(exc_info.value, copy.JSONDecodeError)
+        with pytest.raises(copy.JSONDecodeError):
+            copy.Decoder().feed(b"[1,]")
+
+
+@pytest.mark.skipif(
+    interpreters is None or sys.version_info < (3, 12),
+    reason="requires interpreters with their own GIL",
+)
+class TestSubinterpreters:
+    def test_subinterpreter(self):
+        """
+        dumps() and loads() in an interpreter with its own GIL
+        """
+        run(
+            """
+            import dataclasses
+            import enum
+            import json
+            import uuid
+
+            class Color(enum.Enum):
+                RED = 1
+
+            @dataclasses.dataclass
+            class Point:
+                x: int
+                y: int
+
+            val = {"a": [1, 2.5, "b", None, True], "c": {"d": []}}
+            assert xorjson.loads(xorjson.dumps(val)) == val
+            assert xorjson.dumps(xorjson.Fragment(b"[1]")) == b"[1]"
+            assert xorjson.dumps([Color.RED, Point(1, 2)]) == b'[1,{"x":1,"y":2}]'
+            uid = uuid.UUID("7202d115-7ff3-4c81-a7c1-2a1f067b1ece")
+            assert xorjson.dumps(uid) == b'"7202d115-7ff3-4c81-a7c1-2a1f067b1ece"'
+            assert xorjson.Decoder().feed(b"[1] [2]") == [[1], [2]]
+            try:
+                xorjson.loads("[")
+            except xorjson.JSONDecodeError as exc:
+                assert isinstance(exc, json.JSONDecodeError)
+            else:
+                raise AssertionError
+            """
+        )
+
+    @pytest.mark.skipif(not YYJSON, reason="type requires yyjson")
+    def test_subinterpreter_typed(self):
+        """
+        loads() type compiles dataclasses of each interpreter separately
+        """
+        run(
+            """
+            import dataclasses
+
+            @dataclasses.dataclass
+            class Point:
+                x: int
+                y: int
+
+            assert xorjson.loads(b'{"x":1,"y":2}', type=Point) == Point(1, 2)
+            doc = xorjson.loads_lazy(b'{"a":[1,2]}')
+            assert doc["a"].materialize() == [1, 2]
+            """
+        )
+
+    def test_subinterpreter_key_cache(self):
+        """
+        each interpreter has its own key cache
+        """
+        xorjson.clear_key_cache()
+        run(
+            """
+            xorjson.clear_key_cache()
+            xorjson.loads(b'{"subinterpreter": 1, "key": 2}')
+            assert xorjson.key_cache_info()["occupancy"] == 2
+            """
+        )
+        assert xorjson.key_cache_info()["occupancy"] == 0
+
+    def test_subinterpreter_destroyed(self):
+        """
+        the module works after the state of another interpreter is freed
+        """
+        for _ in range(4):
+            run("assert xorjson.loads(b'{\"a\": 1}') == {'a': 1}")
+            assert xorjson.loads(b'{"a": 1}') == {"a": 1}
+        assert xorjson.dumps(xorjson.Fragment(b"1")) == b"1"
+
+    def test_subinterpreters_threads(self):
+        """
+        dumps() and loads() concurrently in several interpreters
+        """
+        script = """
+            val = [{"id": idx, "name": f"n{idx}", "tags": ["a"]} for idx in range(500)]
+            for _ in range(50):
+                data = xorjson.dumps(val)
+                assert xorjson.loads(data) == val
+            """
+        interps = [interpreters.create() for _ in range(4)]
+        try:
+            with ThreadPoolExecutor(max_workers=len(interps)) as executor:
+                futures = [executor.submit(run_string, val, script) for val in interps]
+                for future in futures:
+                    future.result()
+        finally:
+            for interp in interps:
+                interpreters.destroy(interp)
+        assert xorjson.loads(b"[1]") == [1]
+
+    def test_subinterpreter_imports_first(self):
+        """
+        a sub-interpreter can import xorjson before the main interpreter
+        """
+        script = f"""
+import sys
+import {interpreters.__name__} as interpreters
+interp = interpreters.create()
+check = "assert xorjson.loads(b'[1]') == [1]"
+error = interpreters.run_string(interp, {SETUP!r} + check)
+assert error is None, error
+sys.path[:0] = {sys.path!r}
+import xorjson
+assert xorjson.loads(b'{{"a": 1}}') == {{"a": 1}}
+interpreters.destroy(interp)
+"""
+        subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+from concurrent.futures import ThreadPoolExecutor
+
+import xorjson
+
+from .util import read_fixture_bytes, read_fixture_obj
+
+
+class TestThreads:
+    def test_loads_threads(self):
+        """
+        loads() large documents concurrently from several threads
+        """
+        fixtures = ("twitter.json.xz", "citm_catalog.json.xz", "canada.json.xz")
+        data = [read_fixture_bytes(each) for each in fixtures]
+        expected = [read_fixture_obj(each) for each in fixtures]
+        assert all(len(each) > 64 * 1024 for each in data)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(4):
+                results = list(executor.map(xorjson.loads, data * 4))
+                assert results == expected * 4
+
+    def test_loads_threads_str(self):
+        """
+        loads() large str concurrently from several threads
+        """
+        data = read_fixture_bytes("twitter.json.xz").decode("utf-8")
+        expected = read_fixture_obj("twitter.json.xz")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(xorjson.loads, [data] * 16)) == [expected] * 16
+
+    def test_loads_threads_mixed_sizes(self):
+        """
+        loads() small and large documents concurrently share pooled buffers
+        """
+        large = read_fixture_bytes("twitter.json.xz")
+        large_expected = read_fixture_obj("twitter.json.xz")
+        small = b'{"a":[1,2,3]}'
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(xorjson.loads, [large, small] * 16))
+        assert results == [large_expected, {"a": [1, 2, 3]}] * 16
+
+    def test_loads_bytearray_large(self):
+        """
+        loads() large bytearray, which is parsed with the GIL held
+        """
+        data = read_fixture_bytes("twitter.json.xz")
+        assert xorjson.loads(bytearray(data)) == read_fixture_obj("twitter.json.xz")
+
+    def test_loads_threads_key_cache(self):
+        """
+        loads() concurrently with clear_key_cache() and key_cache_info()
+        """
+        docs = [
+            xorjson.dumps([{f"key_{idx}_{col}": col for col in range(64)}] * 4)
+            for idx in range(32)
+        ]
+        expected = [xorjson.loads(each) for each in docs]
+
+        def run(idx):
+            if idx % 8 == 0:
+                xorjson.clear_key_cache()
+                return xorjson.key_cache_info()["capacity"]
+            return xorjson.loads(docs[idx % len(docs)]) == expected[idx % len(docs)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(run, range(512)))
+        assert all(results)
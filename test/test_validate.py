@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+import pytest
+
+import xorjson
+
+from .util import read_fixture_bytes
+
+YYJSON = hasattr(xorjson, "LazyDocument")
+
+
+class TestValidate:
+    def test_validate(self):
+        """
+        validate() valid document returns None
+        """
+        assert xorjson.validate(b'{"a": [1, 2.5, "s", null]}') is None
+        assert xorjson.validate("[]") is None
+        assert xorjson.validate(bytearray(b"1")) is None
+        assert xorjson.validate(memoryview(b'"a"')) is None
+
+    @pytest.mark.parametrize(
+        "data", (b"", b"[1,]", b'{"a"}', b"[1] 2", b'"\xff"', "[1", b"nul")
+    )
+    def test_validate_invalid(self, data):
+        """
+        validate() invalid document raises JSONDecodeError like loads()
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.loads(data)
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.validate(data)
+
+    def test_validate_fixture(self):
+        """
+        validate() large fixture, read with the GIL released
+        """
+        data = read_fixture_bytes("twitter.json.xz")
+        assert xorjson.validate(data) is None
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.validate(data[:-1])
+
+    def test_validate_type(self):
+        """
+        validate() unsupported input type
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.validate(1)
+
+
+@pytest.mark.skipif(not YYJSON, reason="inspect() requires yyjson")
+class TestInspect:
+    def test_inspect(self):
+        """
+        inspect() counts of values
+        """
+        data = b'{"ab": [1, "xyz", {"c": null}], "d": [], "e": "f"}'
+        assert xorjson.inspect(data) == {
+            "nodes": 8,
+            "objects": 2,
+            "arrays": 2,
+            "strings": 2,
+            "string_bytes": 9,
+            "max_depth": 3,
+            "max_array_len": 3,
+        }
+
+    def test_inspect_scalar(self):
+        """
+        inspect() scalar document
+        """
+        assert xorjson.inspect(b'"abc"') == {
+            "nodes": 1,
+            "objects": 0,
+            "arrays": 0,
+            "strings": 1,
+            "string_bytes": 3,
+            "max_depth": 0,
+            "max_array_len": 0,
+        }
+
+    def test_inspect_fixture(self):
+        """
+        inspect() node count matches the deserialized document
+        """
+
+        def count(obj):
+            if isinstance(obj, dict):
+                return 1 + sum(count(val) for val in obj.values())
+            if isinstance(obj, list):
+                return 1 + sum(count(val) for val in obj)
+            return 1
+
+        data = read_fixture_bytes("citm_catalog.json.xz")
+        assert xorjson.inspect(data)["nodes"] == count(xorjson.loads(data))
+
+    def test_inspect_invalid(self):
+        """
+        inspect() invalid document raises JSONDecodeError
+        """
+        with pytest.raises(xorjson.JSONDecodeError):
+            xorjson.inspect(b"[1,")